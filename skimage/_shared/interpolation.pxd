@@ -2,26 +2,26 @@
 cdef double nearest_neighbour_interpolation(double* image, Py_ssize_t rows,
                                             Py_ssize_t cols, double r,
                                             double c, char mode,
-                                            double cval)
+                                            double cval) nogil
 
 cdef double bilinear_interpolation(double* image, Py_ssize_t rows, Py_ssize_t cols,
                                    double r, double c, char mode,
-                                   double cval)
+                                   double cval) nogil
 
-cdef double quadratic_interpolation(double x, double[3] f)
+cdef double quadratic_interpolation(double x, double[3] f) nogil
 cdef double biquadratic_interpolation(double* image, Py_ssize_t rows, Py_ssize_t cols,
                                       double r, double c, char mode,
-                                      double cval)
+                                      double cval) nogil
 
-cdef double cubic_interpolation(double x, double[4] f)
+cdef double cubic_interpolation(double x, double[4] f) nogil
 cdef double bicubic_interpolation(double* image, Py_ssize_t rows, Py_ssize_t cols,
                                   double r, double c, char mode,
-                                  double cval)
+                                  double cval) nogil
 
 cdef double get_pixel2d(double* image, Py_ssize_t rows, Py_ssize_t cols, Py_ssize_t r,
-                        Py_ssize_t c, char mode, double cval)
+                        Py_ssize_t c, char mode, double cval) nogil
 
 cdef double get_pixel3d(double* image, Py_ssize_t rows, Py_ssize_t cols, Py_ssize_t dims,
-                        Py_ssize_t r, Py_ssize_t c, Py_ssize_t d, char mode, double cval)
+                        Py_ssize_t r, Py_ssize_t c, Py_ssize_t d, char mode, double cval) nogil
 
-cdef Py_ssize_t coord_map(Py_ssize_t dim, Py_ssize_t coord, char mode)
+cdef Py_ssize_t coord_map(Py_ssize_t dim, Py_ssize_t coord, char mode) nogil
@@ -5,14 +5,14 @@
 from libc.math cimport ceil, floor
 
 
-cdef inline Py_ssize_t round(double r):
+cdef inline Py_ssize_t round(double r) nogil:
     return <Py_ssize_t>((r + 0.5) if (r > 0.0) else (r - 0.5))
 
 
 cdef inline double nearest_neighbour_interpolation(double* image, Py_ssize_t rows,
                                                    Py_ssize_t cols, double r,
                                                    double c, char mode,
-                                                   double cval):
+                                                   double cval) nogil:
     """Nearest neighbour interpolation at a given position in the image.
 
     Parameters
@@ -40,7 +40,7 @@ cdef inline double nearest_neighbour_interpolation(double* image, Py_ssize_t row
 
 cdef inline double bilinear_interpolation(double* image, Py_ssize_t rows,
                                           Py_ssize_t cols, double r, double c,
-                                          char mode, double cval):
+                                          char mode, double cval) nogil:
     """Bilinear interpolation at a given position in the image.
 
     Parameters
@@ -62,7 +62,7 @@ cdef inline double bilinear_interpolation(double* image, Py_ssize_t rows,
         Interpolated value.
 
     """
-    cdef double dr, dc
+    cdef double dr, dc, top, bottom
     cdef Py_ssize_t minr, minc, maxr, maxc
 
     minr = <Py_ssize_t>floor(r)
@@ -78,7 +78,7 @@ cdef inline double bilinear_interpolation(double* image, Py_ssize_t rows,
     return (1 - dr) * top + dr * bottom
 
 
-cdef inline double quadratic_interpolation(double x, double[3] f):
+cdef inline double quadratic_interpolation(double x, double[3] f) nogil:
     """Quadratic interpolation.
 
     Parameters
@@ -99,7 +99,7 @@ cdef inline double quadratic_interpolation(double x, double[3] f):
 
 cdef inline double biquadratic_interpolation(double* image, Py_ssize_t rows,
                                              Py_ssize_t cols, double r, double c,
-                                             char mode, double cval):
+                                             char mode, double cval) nogil:
     """Biquadratic interpolation at a given position in the image.
 
     Parameters
@@ -150,7 +150,7 @@ cdef inline double biquadratic_interpolation(double* image, Py_ssize_t rows,
     return quadratic_interpolation(xr, fr)
 
 
-cdef inline double cubic_interpolation(double x, double[4] f):
+cdef inline double cubic_interpolation(double x, double[4] f) nogil:
     """Cubic interpolation.
 
     Parameters
@@ -175,7 +175,7 @@ cdef inline double cubic_interpolation(double x, double[4] f):
 
 cdef inline double bicubic_interpolation(double* image, Py_ssize_t rows,
                                          Py_ssize_t cols, double r, double c,
-                                         char mode, double cval):
+                                         char mode, double cval) nogil:
     """Bicubic interpolation at a given position in the image.
 
     Parameters
@@ -223,7 +223,8 @@ cdef inline double bicubic_interpolation(double* image, Py_ssize_t rows,
 
 
 cdef inline double get_pixel2d(double* image, Py_ssize_t rows, Py_ssize_t cols,
-                               Py_ssize_t r, Py_ssize_t c, char mode, double cval):
+                               Py_ssize_t r, Py_ssize_t c, char mode,
+                               double cval) nogil:
     """Get a pixel from the image, taking wrapping mode into consideration.
 
     Parameters
@@ -256,7 +257,7 @@ cdef inline double get_pixel2d(double* image, Py_ssize_t rows, Py_ssize_t cols,
 
 cdef inline double get_pixel3d(double* image, Py_ssize_t rows, Py_ssize_t cols,
                                Py_ssize_t dims, Py_ssize_t r, Py_ssize_t c, Py_ssize_t d,
-                               char mode, double cval):
+                               char mode, double cval) nogil:
     """Get a pixel from the image, taking wrapping mode into consideration.
 
     Parameters
@@ -289,7 +290,8 @@ cdef inline double get_pixel3d(double* image, Py_ssize_t rows, Py_ssize_t cols,
                      + d]
 
 
-cdef inline Py_ssize_t coord_map(Py_ssize_t dim, Py_ssize_t coord, char mode):
+cdef inline Py_ssize_t coord_map(Py_ssize_t dim, Py_ssize_t coord,
+                                 char mode) nogil:
     """
     Wrap a coordinate, according to a given mode.
 
@@ -305,6 +307,9 @@ cdef inline Py_ssize_t coord_map(Py_ssize_t dim, Py_ssize_t coord, char mode):
 
     """
     dim = dim - 1
+    if dim == 0:
+        # a single pixel is its own reflection and continuation
+        return 0
     if mode == 'R': # reflect
         if coord < 0:
             # How many times times does the coordinate wrap?
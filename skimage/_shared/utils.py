@@ -1,11 +1,13 @@
 import warnings
 import functools
 import sys
+import threading
 
 from . import six
 
 
-__all__ = ['deprecated', 'get_bound_method_class']
+__all__ = ['deprecated', 'get_bound_method_class', 'effective_n_jobs',
+           'run_in_bands']
 
 
 class skimage_deprecation(Warning):
@@ -71,3 +73,64 @@ def get_bound_method_class(m):
 
     """
     return m.im_class if sys.version < '3' else m.__self__.__class__
+
+
+def effective_n_jobs(n_jobs=1):
+    """Return the number of threads to use for a requested `n_jobs`.
+
+    Values smaller than 1 select all available CPU cores.
+
+    """
+    if n_jobs is None or n_jobs < 1:
+        try:
+            import multiprocessing
+            return multiprocessing.cpu_count()
+        except (ImportError, NotImplementedError):
+            return 1
+    return int(n_jobs)
+
+
+def run_in_bands(func, length, n_jobs=1):
+    """Call ``func(start, stop)`` for contiguous bands covering ``[0, length)``.
+
+    Every band is processed in its own thread, so this only pays off if `func`
+    releases the GIL for the bulk of its work. Exceptions raised by `func` are
+    re-raised in the calling thread.
+
+    Parameters
+    ----------
+    func : callable
+        Function called as ``func(start, stop)`` for each band.
+    length : int
+        Total length of the range to split into bands.
+    n_jobs : int, optional
+        Number of bands (and threads). Values smaller than 1 select all
+        available CPU cores. The number of bands never exceeds `length`.
+
+    """
+    n_bands = min(effective_n_jobs(n_jobs), length)
+    if n_bands < 1:
+        return
+    bounds = [(length * i) // n_bands for i in range(n_bands + 1)]
+
+    if n_bands == 1:
+        func(0, length)
+        return
+
+    errors = []
+
+    def work(start, stop):
+        try:
+            func(start, stop)
+        except Exception:
+            errors.append(sys.exc_info())
+
+    threads = [threading.Thread(target=work, args=(bounds[i], bounds[i + 1]))
+               for i in range(n_bands)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if errors:
+        six.reraise(*errors[0])
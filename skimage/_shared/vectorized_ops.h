@@ -13,6 +13,7 @@
 #elif defined(_MSC_VER)
 #define inline __inline
 typedef unsigned __int16 uint16_t;
+typedef unsigned __int32 uint32_t;
 #endif
 
 /**
@@ -108,3 +109,57 @@ static inline void sub16(uint16_t *dest, uint16_t *src)
     for (i = 0; i < 16; i++) dest[i] -= src[i];
 }
 #endif
+
+/**
+ * Add 16 unsigned 16-bit integers to 16 unsigned 32-bit integers using SSE2,
+ * if available.
+ */
+#if defined(__SSE2__)
+static inline void add16_32(uint32_t *dest, uint16_t *src)
+{
+    __m128i *d, *s;
+    __m128i zero = _mm_setzero_si128();
+    int i;
+
+    d = (__m128i *) dest;
+    s = (__m128i *) src;
+    for (i = 0; i < 2; i++, s++, d += 2) {
+        d[0] = _mm_add_epi32(d[0], _mm_unpacklo_epi16(*s, zero));
+        d[1] = _mm_add_epi32(d[1], _mm_unpackhi_epi16(*s, zero));
+    }
+}
+#else
+static inline void add16_32(uint32_t *dest, uint16_t *src)
+{
+    int i;
+
+    for (i = 0; i < 16; i++) dest[i] += src[i];
+}
+#endif
+
+/**
+ * Subtract 16 unsigned 16-bit integers from 16 unsigned 32-bit integers
+ * using SSE2, if available.
+ */
+#if defined(__SSE2__)
+static inline void sub16_32(uint32_t *dest, uint16_t *src)
+{
+    __m128i *d, *s;
+    __m128i zero = _mm_setzero_si128();
+    int i;
+
+    d = (__m128i *) dest;
+    s = (__m128i *) src;
+    for (i = 0; i < 2; i++, s++, d += 2) {
+        d[0] = _mm_sub_epi32(d[0], _mm_unpacklo_epi16(*s, zero));
+        d[1] = _mm_sub_epi32(d[1], _mm_unpackhi_epi16(*s, zero));
+    }
+}
+#else
+static inline void sub16_32(uint32_t *dest, uint16_t *src)
+{
+    int i;
+
+    for (i = 0; i < 16; i++) dest[i] -= src[i];
+}
+#endif
@@ -1,7 +1,7 @@
 from .lpi_filter import inverse, wiener, LPIFilter2D
 from .ctmf import median_filter
 from ._gaussian import gaussian_filter
-from ._canny import canny
+from ._canny import canny, canny_batch
 from .edges import (sobel, hsobel, vsobel, scharr, hscharr, vscharr, prewitt,
                     hprewitt, vprewitt, roberts, roberts_positive_diagonal,
                     roberts_negative_diagonal)
@@ -19,6 +19,7 @@ __all__ = ['inverse',
            'median_filter',
            'gaussian_filter',
            'canny',
+           'canny_batch',
            'sobel',
            'hsobel',
            'vsobel',
@@ -13,10 +13,11 @@ Original author: Lee Kamentsky
 """
 
 import numpy as np
-import scipy.ndimage as ndi
-from scipy.ndimage import (gaussian_filter,
-                           generate_binary_structure, binary_erosion, label)
+from scipy.ndimage import (gaussian_filter, generate_binary_structure,
+                           binary_erosion)
 from skimage import dtype_limits
+from skimage._shared.utils import run_in_bands
+from ._canny_cy import _nonmaximum_suppression, _hysteresis
 
 
 def smooth_with_function_and_mask(image, function, mask):
@@ -49,7 +50,8 @@ def smooth_with_function_and_mask(image, function, mask):
     return output_image
 
 
-def canny(image, sigma=1., low_threshold=None, high_threshold=None, mask=None):
+def canny(image, sigma=1., low_threshold=None, high_threshold=None, mask=None,
+          n_jobs=1):
     """Edge filter an image using the Canny algorithm.
 
     Parameters
@@ -66,6 +68,9 @@ def canny(image, sigma=1., low_threshold=None, high_threshold=None, mask=None):
         If None, high_threshold is set to 20% of dtype's max.
     mask : array, dtype=bool, optional
         Mask to limit the application of Canny to a certain area.
+    n_jobs : int, optional
+        Number of threads, each processing a band of rows. Values smaller
+        than 1 select all available CPU cores.
 
     Returns
     -------
@@ -74,7 +79,7 @@ def canny(image, sigma=1., low_threshold=None, high_threshold=None, mask=None):
 
     See also
     --------
-    skimage.sobel
+    skimage.sobel, canny_batch
 
     Notes
     -----
@@ -98,6 +103,12 @@ def canny(image, sigma=1., low_threshold=None, high_threshold=None, mask=None):
       high threshold as edges. Then recursively label any point above the
       low threshold that is 8-connected to a labeled point as an edge.
 
+    The gradients, their norm and the non-maximum suppression are computed
+    in a single compiled pass over bands of rows, which only keeps three rows
+    of gradients in memory. The hysteresis is a union-find over the
+    candidate pixels in which every tree records whether it contains a pixel
+    above the high threshold.
+
     References
     -----------
     Canny, J., A Computational Approach To Edge Detection, IEEE Trans.
@@ -149,122 +160,143 @@ def canny(image, sigma=1., low_threshold=None, high_threshold=None, mask=None):
     # because who knows what lies beyond the edge of the image?
     #
 
+    image = np.asarray(image)
     if image.ndim != 2:
         raise TypeError("The input 'image' must be a two-dimensional array.")
 
+    low_threshold, high_threshold, mask = _check_args(
+        image, low_threshold, high_threshold, mask)
+
+    return _canny_frame(image, sigma, low_threshold, high_threshold,
+                        mask, _prepare_mask(mask, image.shape, sigma), n_jobs)
+
+
+def canny_batch(images, sigma=1., low_threshold=None, high_threshold=None,
+                mask=None, n_jobs=1):
+    """Edge filter a stack of images using the Canny algorithm.
+
+    Every image is processed as by `canny`, with the same parameters.
+
+    Parameters
+    -----------
+    images : 3D array
+        Stack of greyscale images along the first axis; can be of any dtype.
+    sigma : float
+        Standard deviation of the Gaussian filter.
+    low_threshold : float
+        Lower bound for hysteresis thresholding (linking edges).
+        If None, low_threshold is set to 10% of dtype's max.
+    high_threshold : float
+        Upper bound for hysteresis thresholding (linking edges).
+        If None, high_threshold is set to 20% of dtype's max.
+    mask : array, dtype=bool, optional
+        Mask to limit the application of Canny to a certain area, either a
+        single 2D mask shared by all images or a 3D stack of one mask per
+        image.
+    n_jobs : int, optional
+        Number of threads, each processing a group of images. Values smaller
+        than 1 select all available CPU cores.
+
+    Returns
+    -------
+    output : 3D array
+        The binary edge maps, with the same shape as `images`.
+
+    See also
+    --------
+    canny
+
+    """
+    images = np.asarray(images)
+    if images.ndim != 3:
+        raise TypeError("The input 'images' must be a stack of "
+                        "two-dimensional arrays.")
+
+    low_threshold, high_threshold, mask = _check_args(
+        images, low_threshold, high_threshold, mask)
+
+    #
+    # The images are processed in parallel. A mask shared by all images is
+    # only smoothed and eroded once.
+    #
+    frame_shape = images.shape[1:]
+    shared_mask = mask is None or mask.ndim == 2
+    if shared_mask:
+        prepared = _prepare_mask(mask, frame_shape, sigma)
+    edges = np.empty(images.shape, dtype=bool)
+
+    def process_frames(start, stop):
+        for n in range(start, stop):
+            if shared_mask:
+                frame_mask, frame_prepared = mask, prepared
+            else:
+                frame_mask = mask[n]
+                frame_prepared = _prepare_mask(frame_mask, frame_shape, sigma)
+            edges[n] = _canny_frame(images[n], sigma, low_threshold,
+                                    high_threshold, frame_mask,
+                                    frame_prepared, 1)
+
+    run_in_bands(process_frames, images.shape[0], n_jobs)
+    return edges
+
+
+def _check_args(image, low_threshold, high_threshold, mask):
+    """Default thresholds and validated mask of `canny` and `canny_batch`."""
     if low_threshold is None:
         low_threshold = 0.1 * dtype_limits(image)[1]
 
     if high_threshold is None:
         high_threshold = 0.2 * dtype_limits(image)[1]
 
+    if mask is not None:
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape not in (image.shape, image.shape[-2:]):
+            raise ValueError("The shape of 'mask' must match the shape of "
+                             "'image' or of a single frame.")
+
+    return low_threshold, high_threshold, mask
+
+
+def _prepare_mask(mask, shape, sigma):
+    """Smoothed mask and eroded mask of a single frame.
+
+    Without a mask, every pixel but the border is a candidate, which
+    `_nonmaximum_suppression` already takes care of.
+    """
     if mask is None:
-        mask = np.ones(image.shape, dtype=bool)
-    fsmooth = lambda x: gaussian_filter(x, sigma, mode='constant')
-    smoothed = smooth_with_function_and_mask(image, fsmooth, mask)
-    jsobel = ndi.sobel(smoothed, axis=1)
-    isobel = ndi.sobel(smoothed, axis=0)
-    abs_isobel = np.abs(isobel)
-    abs_jsobel = np.abs(jsobel)
-    magnitude = np.hypot(isobel, jsobel)
+        bleed_over = gaussian_filter(np.ones(shape), sigma, mode='constant')
+        return bleed_over, None
 
+    bleed_over = gaussian_filter(mask.astype(float), sigma, mode='constant')
     #
     # Make the eroded mask. Setting the border value to zero will wipe
     # out the image edges for us.
     #
     s = generate_binary_structure(2, 2)
     eroded_mask = binary_erosion(mask, s, border_value=0)
-    eroded_mask = eroded_mask & (magnitude > 0)
-    #
-    #--------- Find local maxima --------------
-    #
-    # Assign each point to have a normal of 0-45 degrees, 45-90 degrees,
-    # 90-135 degrees and 135-180 degrees.
-    #
-    local_maxima = np.zeros(image.shape, bool)
-    #----- 0 to 45 degrees ------
-    pts_plus = (isobel >= 0) & (jsobel >= 0) & (abs_isobel >= abs_jsobel)
-    pts_minus = (isobel <= 0) & (jsobel <= 0) & (abs_isobel >= abs_jsobel)
-    pts = pts_plus | pts_minus
-    pts = eroded_mask & pts
-    # Get the magnitudes shifted left to make a matrix of the points to the
-    # right of pts. Similarly, shift left and down to get the points to the
-    # top right of pts.
-    c1 = magnitude[1:, :][pts[:-1, :]]
-    c2 = magnitude[1:, 1:][pts[:-1, :-1]]
-    m = magnitude[pts]
-    w = abs_jsobel[pts] / abs_isobel[pts]
-    c_plus = c2 * w + c1 * (1 - w) <= m
-    c1 = magnitude[:-1, :][pts[1:, :]]
-    c2 = magnitude[:-1, :-1][pts[1:, 1:]]
-    c_minus = c2 * w + c1 * (1 - w) <= m
-    local_maxima[pts] = c_plus & c_minus
-    #----- 45 to 90 degrees ------
-    # Mix diagonal and vertical
-    #
-    pts_plus = (isobel >= 0) & (jsobel >= 0) & (abs_isobel <= abs_jsobel)
-    pts_minus = (isobel <= 0) & (jsobel <= 0) & (abs_isobel <= abs_jsobel)
-    pts = pts_plus | pts_minus
-    pts = eroded_mask & pts
-    c1 = magnitude[:, 1:][pts[:, :-1]]
-    c2 = magnitude[1:, 1:][pts[:-1, :-1]]
-    m = magnitude[pts]
-    w = abs_isobel[pts] / abs_jsobel[pts]
-    c_plus = c2 * w + c1 * (1 - w) <= m
-    c1 = magnitude[:, :-1][pts[:, 1:]]
-    c2 = magnitude[:-1, :-1][pts[1:, 1:]]
-    c_minus = c2 * w + c1 * (1 - w) <= m
-    local_maxima[pts] = c_plus & c_minus
-    #----- 90 to 135 degrees ------
-    # Mix anti-diagonal and vertical
-    #
-    pts_plus = (isobel <= 0) & (jsobel >= 0) & (abs_isobel <= abs_jsobel)
-    pts_minus = (isobel >= 0) & (jsobel <= 0) & (abs_isobel <= abs_jsobel)
-    pts = pts_plus | pts_minus
-    pts = eroded_mask & pts
-    c1a = magnitude[:, 1:][pts[:, :-1]]
-    c2a = magnitude[:-1, 1:][pts[1:, :-1]]
-    m = magnitude[pts]
-    w = abs_isobel[pts] / abs_jsobel[pts]
-    c_plus = c2a * w + c1a * (1.0 - w) <= m
-    c1 = magnitude[:, :-1][pts[:, 1:]]
-    c2 = magnitude[1:, :-1][pts[:-1, 1:]]
-    c_minus = c2 * w + c1 * (1.0 - w) <= m
-    local_maxima[pts] = c_plus & c_minus
-    #----- 135 to 180 degrees ------
-    # Mix anti-diagonal and anti-horizontal
-    #
-    pts_plus = (isobel <= 0) & (jsobel >= 0) & (abs_isobel >= abs_jsobel)
-    pts_minus = (isobel >= 0) & (jsobel <= 0) & (abs_isobel >= abs_jsobel)
-    pts = pts_plus | pts_minus
-    pts = eroded_mask & pts
-    c1 = magnitude[:-1, :][pts[1:, :]]
-    c2 = magnitude[:-1, 1:][pts[1:, :-1]]
-    m = magnitude[pts]
-    w = abs_jsobel[pts] / abs_isobel[pts]
-    c_plus = c2 * w + c1 * (1 - w) <= m
-    c1 = magnitude[1:, :][pts[:-1, :]]
-    c2 = magnitude[1:, :-1][pts[:-1, 1:]]
-    c_minus = c2 * w + c1 * (1 - w) <= m
-    local_maxima[pts] = c_plus & c_minus
-    #
-    #---- Create two masks at the two thresholds.
-    #
-    high_mask = local_maxima & (magnitude >= high_threshold)
-    low_mask = local_maxima & (magnitude >= low_threshold)
-    #
-    # Segment the low-mask, then only keep low-segments that have
-    # some high_mask component in them
-    #
-    strel = np.ones((3, 3), bool)
-    labels, count = label(low_mask, strel)
-    if count == 0:
-        return low_mask
-
-    sums = (np.array(ndi.sum(high_mask, labels,
-                             np.arange(count, dtype=np.int32) + 1),
-                     copy=False, ndmin=1))
-    good_label = np.zeros((count + 1,), bool)
-    good_label[1:] = sums > 0
-    output_mask = good_label[labels]
-    return output_mask
+    eroded_mask = np.ascontiguousarray(eroded_mask).view(np.uint8)
+    return bleed_over, eroded_mask
+
+
+def _canny_frame(image, sigma, low_threshold, high_threshold, mask,
+                 prepared, n_jobs):
+    """Edge map of a single frame, see `canny`."""
+    bleed_over, eroded_mask = prepared
+
+    if mask is None:
+        masked_image = image
+    else:
+        masked_image = np.zeros(image.shape, image.dtype)
+        masked_image[mask] = image[mask]
+    smoothed = gaussian_filter(masked_image, sigma, mode='constant')
+    smoothed = smoothed / (bleed_over + np.finfo(float).eps)
+    smoothed = np.ascontiguousarray(smoothed, dtype=np.double)
+
+    codes = np.zeros(image.shape, dtype=np.uint8)
+
+    def suppress(start, stop):
+        _nonmaximum_suppression(smoothed, eroded_mask, low_threshold,
+                                high_threshold, codes, start, stop)
+
+    run_in_bands(suppress, image.shape[0], n_jobs)
+    return _hysteresis(codes)
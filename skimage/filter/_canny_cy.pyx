@@ -0,0 +1,251 @@
+#cython: cdivision=True
+#cython: boundscheck=False
+#cython: nonecheck=False
+#cython: wraparound=False
+
+"""Compiled stages of the Canny edge detector.
+
+The Sobel gradients, their magnitude and the non-maximum suppression are
+fused into a single pass which only keeps three rows of gradients alive, so
+that the working set of each band of rows stays in cache. Hysteresis
+thresholding is a union-find over the candidate edge pixels in which every
+tree remembers whether it contains a strong edge pixel.
+"""
+
+import numpy as np
+
+cimport numpy as cnp
+from libc.math cimport hypot, fabs
+
+
+cdef enum:
+    NO_EDGE = 0
+    WEAK_EDGE = 1
+    STRONG_EDGE = 2
+
+
+cdef inline Py_ssize_t _clip(Py_ssize_t i, Py_ssize_t n) nogil:
+    if i < 0:
+        return 0
+    if i >= n:
+        return n - 1
+    return i
+
+
+cdef void _gradient_row(double[:, ::1] smoothed, Py_ssize_t r,
+                        double* isobel, double* jsobel,
+                        double* magnitude) nogil:
+    """Sobel gradients and their norm for row `r` of `smoothed`.
+
+    Matches ``ndimage.sobel`` with its default ``'reflect'`` mode, which for
+    a distance of one pixel amounts to repeating the border pixels.
+    """
+
+    cdef Py_ssize_t rows = smoothed.shape[0]
+    cdef Py_ssize_t cols = smoothed.shape[1]
+    cdef Py_ssize_t rm = _clip(r - 1, rows)
+    cdef Py_ssize_t rp = _clip(r + 1, rows)
+    cdef Py_ssize_t c, cm, cp
+
+    for c in range(cols):
+        cm = _clip(c - 1, cols)
+        cp = _clip(c + 1, cols)
+        # same order of operations as the symmetric filters of ndimage
+        isobel[c] = (2 * (smoothed[rp, c] - smoothed[rm, c])
+                     + ((smoothed[rp, cm] - smoothed[rm, cm])
+                        + (smoothed[rp, cp] - smoothed[rm, cp])))
+        jsobel[c] = (2 * (smoothed[r, cp] - smoothed[r, cm])
+                     + ((smoothed[rm, cp] - smoothed[rm, cm])
+                        + (smoothed[rp, cp] - smoothed[rp, cm])))
+        magnitude[c] = hypot(isobel[c], jsobel[c])
+
+
+def _nonmaximum_suppression(double[:, ::1] smoothed, cnp.uint8_t[:, ::1] mask,
+                            double low_threshold, double high_threshold,
+                            cnp.uint8_t[:, ::1] out,
+                            Py_ssize_t start, Py_ssize_t stop):
+    """Classify the pixels of rows ``[start, stop)`` as edge candidates.
+
+    A pixel is a candidate if its gradient magnitude is a local maximum
+    along the gradient direction, interpolating between the two closest
+    neighbors on either side, and at least `low_threshold`. The border
+    pixels of the image are never candidates.
+
+    Parameters
+    ----------
+    smoothed : (M, N) ndarray of float64
+        Smoothed image.
+    mask : (M, N) ndarray of uint8 or None
+        Pixels which may be candidates. Must already be eroded so that no
+        masked pixel contributes to the gradient of an unmasked one.
+    low_threshold, high_threshold : float
+        Hysteresis thresholds.
+    out : (M, N) ndarray of uint8
+        Written with 0 for non-candidates, 1 for weak and 2 for strong
+        (i.e. at least `high_threshold`) candidates. Rows outside of
+        ``[start, stop)`` are left untouched.
+    start, stop : int
+        Range of rows to process.
+    """
+
+    cdef Py_ssize_t rows = smoothed.shape[0]
+    cdef Py_ssize_t cols = smoothed.shape[1]
+    cdef bint has_mask = mask is not None
+    cdef Py_ssize_t r, c, lo, hi
+    cdef double i, j, abs_i, abs_j, m, w
+    cdef double c_plus, c_minus
+    cdef double* row_prev
+    cdef double* row_cur
+    cdef double* row_next
+
+    lo = max(start, 1)
+    hi = min(stop, rows - 1)
+    if lo >= hi:
+        return
+
+    # ring buffer with the gradients of three consecutive rows
+    isobel_buf = np.empty((3, cols), dtype=np.double)
+    jsobel_buf = np.empty((3, cols), dtype=np.double)
+    magnitude_buf = np.empty((3, cols), dtype=np.double)
+    cdef double[:, ::1] isobel = isobel_buf
+    cdef double[:, ::1] jsobel = jsobel_buf
+    cdef double[:, ::1] magnitude = magnitude_buf
+
+    with nogil:
+        for r in range(lo - 1, lo + 1):
+            _gradient_row(smoothed, r, &isobel[r % 3, 0], &jsobel[r % 3, 0],
+                          &magnitude[r % 3, 0])
+
+        for r in range(lo, hi):
+            _gradient_row(smoothed, r + 1, &isobel[(r + 1) % 3, 0],
+                          &jsobel[(r + 1) % 3, 0],
+                          &magnitude[(r + 1) % 3, 0])
+            row_prev = &magnitude[(r - 1) % 3, 0]
+            row_cur = &magnitude[r % 3, 0]
+            row_next = &magnitude[(r + 1) % 3, 0]
+
+            for c in range(1, cols - 1):
+                out[r, c] = NO_EDGE
+                m = row_cur[c]
+                if m == 0 or m < low_threshold:
+                    continue
+                if has_mask and not mask[r, c]:
+                    continue
+
+                i = isobel[r % 3, c]
+                j = jsobel[r % 3, c]
+                abs_i = fabs(i)
+                abs_j = fabs(j)
+
+                # Where the gradient lies on the boundary between two
+                # sectors, the later sector takes precedence.
+                if (i <= 0 and j >= 0) or (i >= 0 and j <= 0):
+                    if abs_i >= abs_j:
+                        # 135 to 180 degrees: anti-diagonal and vertical
+                        w = abs_j / abs_i
+                        c_plus = (row_prev[c + 1] * w
+                                  + row_prev[c] * (1 - w))
+                        c_minus = (row_next[c - 1] * w
+                                   + row_next[c] * (1 - w))
+                    else:
+                        # 90 to 135 degrees: anti-diagonal and horizontal
+                        w = abs_i / abs_j
+                        c_plus = (row_prev[c + 1] * w
+                                  + row_cur[c + 1] * (1 - w))
+                        c_minus = (row_next[c - 1] * w
+                                   + row_cur[c - 1] * (1 - w))
+                elif abs_i <= abs_j:
+                    # 45 to 90 degrees: diagonal and horizontal
+                    w = abs_i / abs_j
+                    c_plus = row_next[c + 1] * w + row_cur[c + 1] * (1 - w)
+                    c_minus = row_prev[c - 1] * w + row_cur[c - 1] * (1 - w)
+                else:
+                    # 0 to 45 degrees: diagonal and vertical
+                    w = abs_j / abs_i
+                    c_plus = row_next[c + 1] * w + row_next[c] * (1 - w)
+                    c_minus = row_prev[c - 1] * w + row_prev[c] * (1 - w)
+
+                if c_plus <= m and c_minus <= m:
+                    if m >= high_threshold:
+                        out[r, c] = STRONG_EDGE
+                    else:
+                        out[r, c] = WEAK_EDGE
+
+
+cdef inline Py_ssize_t _find_root(Py_ssize_t* forest, Py_ssize_t n) nogil:
+    while forest[n] != n:
+        forest[n] = forest[forest[n]]
+        n = forest[n]
+    return n
+
+
+cdef inline void _join(Py_ssize_t* forest, cnp.uint8_t* codes,
+                       Py_ssize_t n, Py_ssize_t m) nogil:
+    """Join the trees of `n` and `m`, keeping the strongest code at the root.
+    """
+    cdef Py_ssize_t root_n = _find_root(forest, n)
+    cdef Py_ssize_t root_m = _find_root(forest, m)
+    if root_n == root_m:
+        return
+    if root_m < root_n:
+        root_n, root_m = root_m, root_n
+    forest[root_m] = root_n
+    if codes[root_m] > codes[root_n]:
+        codes[root_n] = codes[root_m]
+
+
+def _hysteresis(cnp.uint8_t[:, ::1] codes):
+    """Keep the candidates 8-connected to at least one strong candidate.
+
+    Parameters
+    ----------
+    codes : (M, N) ndarray of uint8
+        Output of `_nonmaximum_suppression`. Overwritten.
+
+    Returns
+    -------
+    edges : (M, N) ndarray of bool
+        Edge map.
+    """
+
+    cdef Py_ssize_t rows = codes.shape[0]
+    cdef Py_ssize_t cols = codes.shape[1]
+    cdef Py_ssize_t r, c, n
+
+    edges = np.zeros((rows, cols), dtype=np.uint8)
+    cdef cnp.uint8_t[:, ::1] edges_view = edges
+
+    if rows == 0 or cols == 0:
+        return edges.view(bool)
+
+    forest_arr = np.empty(rows * cols, dtype=np.intp)
+    cdef Py_ssize_t[::1] forest_view = forest_arr
+    cdef Py_ssize_t* forest = &forest_view[0]
+    cdef cnp.uint8_t* flat = &codes[0, 0]
+
+    with nogil:
+        for r in range(rows):
+            for c in range(cols):
+                n = r * cols + c
+                forest[n] = n
+                if not flat[n]:
+                    continue
+                # join with the already visited 8-neighbors
+                if c > 0 and flat[n - 1]:
+                    _join(forest, flat, n, n - 1)
+                if r > 0:
+                    if c > 0 and flat[n - cols - 1]:
+                        _join(forest, flat, n, n - cols - 1)
+                    if flat[n - cols]:
+                        _join(forest, flat, n, n - cols)
+                    if c < cols - 1 and flat[n - cols + 1]:
+                        _join(forest, flat, n, n - cols + 1)
+
+        for r in range(rows):
+            for c in range(cols):
+                n = r * cols + c
+                if flat[n]:
+                    edges_view[r, c] = \
+                        flat[_find_root(forest, n)] == STRONG_EDGE
+
+    return edges.view(bool)
@@ -3,6 +3,12 @@
 Reference: S. Perreault and P. Hebert, "Median Filtering in Constant Time",
 IEEE Transactions on Image Processing, September 2007.
 
+Images with up to 16 bits per pixel are supported by scaling the two levels
+of the histograms with the bit depth (16 coarse bins of 16 fine bins for 8
+bits, up to 256 coarse bins of 256 fine bins for 16 bits). Octagons of more
+than 65535 pixels are histogrammed with 32-bit counts, so that any radius can
+be used.
+
 Originally part of CellProfiler, code licensed under both GPL and BSD licenses.
 Website: http://www.cellprofiler.org
 Copyright (c) 2003-2009 Massachusetts Institute of Technology
@@ -16,13 +22,17 @@ import numpy as np
 cimport numpy as cnp
 cimport cython
 
-from libc.stdlib cimport malloc, free
+from libc.stdlib cimport malloc, calloc, free
 from libc.string cimport memset
 
+from skimage._shared.utils import run_in_bands, effective_n_jobs
+
 
 cdef extern from "../_shared/vectorized_ops.h":
-    void add16(cnp.uint16_t *dest, cnp.uint16_t *src)
-    void sub16(cnp.uint16_t *dest, cnp.uint16_t *src)
+    void add16(cnp.uint16_t *dest, cnp.uint16_t *src) nogil
+    void sub16(cnp.uint16_t *dest, cnp.uint16_t *src) nogil
+    void add16_32(cnp.uint32_t *dest, cnp.uint16_t *src) nogil
+    void sub16_32(cnp.uint32_t *dest, cnp.uint16_t *src) nogil
 
 
 ##############################################################################
@@ -34,7 +44,8 @@ cdef extern from "../_shared/vectorized_ops.h":
 #                 SEPTEMBER 2007.
 #
 # Inputs:
-#    a 2d array of uint8's to be median filtered
+#    a 2d array of uint16's to be median filtered, with values below
+#         2 ** bits
 #    a similarly shaped uint8 masking array with "1" indicating a significant
 #         pixel and "0" indicating a pixel to be masked.
 #
@@ -52,23 +63,27 @@ ctypedef cnp.uint16_t pixel_count_t
 # Histograms
 #
 # There are five separate histograms for the octagonal filter and
-# there are two levels (coarse = 16 values, fine = 256 values)
-# per histogram. There are four histograms to maintain per position
-# representing the four diagonals of the histogram plus one histogram
-# for the straight side (which is used for adding and subtracting)
+# there are two levels (coarse = 2 ** (bits - fine_shift) values,
+# fine = 2 ** bits values, e.g. 16 and 256 for 8 bits) per histogram.
+# There are four histograms to maintain per position representing the
+# four diagonals of the histogram plus one histogram for the straight side
+# (which is used for adding and subtracting)
+#
+# The histograms of a position are stored one after the other, each piece
+# holding its coarse bins followed by its fine bins. A piece only holds pixels
+# of a single column, so that 16-bit counts suffice. The accumulator, which
+# holds the octagon, has the same layout with 16-bit counts, or 32-bit counts
+# for octagons of more than 65535 pixels.
 #
 ###########
 
-cdef struct HistogramPiece:
-    cnp.uint16_t coarse[16]
-    cnp.uint16_t fine[256]
-
-cdef struct Histogram:
-    HistogramPiece top_left      # top-left corner
-    HistogramPiece top_right     # top-right corner
-    HistogramPiece edge          # leading/trailing edge
-    HistogramPiece bottom_left   # bottom-left corner
-    HistogramPiece bottom_right  # bottom-right corner
+cdef enum:
+    TOP_LEFT = 0       # top-left corner
+    TOP_RIGHT = 1      # top-right corner
+    EDGE = 2           # leading/trailing edge
+    BOTTOM_LEFT = 3    # bottom-left corner
+    BOTTOM_RIGHT = 4   # bottom-right corner
+    N_PIECES = 5
 
 # The pixel count has the number of pixels histogrammed in
 # each of the five compartments for this position. This changes
@@ -91,13 +106,17 @@ cdef struct SCoord:
     Py_ssize_t y
 
 cdef struct Histograms:
-    HistogramPiece accumulator  # running histogram (32-byte aligned)
+    void *accumulator           # running histogram (32-byte aligned)
+    bint wide_accumulator       # whether the accumulator has 32-bit counts
     void *memory                # pointer to the unaligned allocated memory
-    Histogram *histogram        # pointer to the histogram memory (aligned)
+    cnp.uint16_t *histogram     # pointer to the histogram memory (aligned)
     PixelCount *pixel_count     # pointer to the pixel count memory
-    cnp.uint8_t *data           # pointer to the image data
+    cnp.uint16_t *data          # pointer to the image data
     cnp.uint8_t *mask           # pointer to the image mask
-    cnp.uint8_t *output         # pointer to the output array
+    cnp.uint16_t *output        # pointer to the output array
+    Py_ssize_t n_coarse         # number of coarse bins
+    Py_ssize_t fine_shift       # value >> fine_shift is the coarse bin
+    Py_ssize_t piece_size       # number of coarse and fine bins of a piece
     Py_ssize_t column_count     # number of columns represented by this
                                 # structure
     Py_ssize_t stripe_length    # number of columns including "radius" before
@@ -108,6 +127,7 @@ cdef struct Histograms:
     Py_ssize_t current_stride   # offset in data and mask to current location
     Py_ssize_t radius           # the "radius" of the octagon
     Py_ssize_t a_2              # 1/2 of the length of a side of the octagon
+    Py_ssize_t octagon_size     # number of pixels of the octagon
     #
     #
     # The strides are the offsets in the array to the points that need to
@@ -159,7 +179,7 @@ cdef struct Histograms:
     # stays in one coarse block so only one fine histogram might
     # need to be updated
     #
-    Py_ssize_t last_update_column[16]
+    Py_ssize_t *last_update_column
 
 ############################################################################
 #
@@ -172,38 +192,48 @@ cdef Histograms *allocate_histograms(Py_ssize_t rows,
                                      Py_ssize_t col_stride,
                                      Py_ssize_t radius,
                                      Py_ssize_t percent,
-                                     cnp.uint8_t *data,
+                                     Py_ssize_t bits,
+                                     cnp.uint16_t *data,
                                      cnp.uint8_t *mask,
-                                     cnp.uint8_t *output):
+                                     cnp.uint16_t *output) nogil:
     cdef:
         Py_ssize_t adjusted_stripe_length = columns + 2*radius + 1
+        Py_ssize_t fine_shift = (bits + 1) / 2
+        Py_ssize_t n_coarse = 1 << (bits - fine_shift)
+        Py_ssize_t piece_size = n_coarse + (1 << bits)
         Py_ssize_t memory_size
-        void *ptr
         Histograms *ph
         Py_ssize_t roundoff
         Py_ssize_t a
-        SCoord *psc
-
-    memory_size = (adjusted_stripe_length *
-                   (sizeof(Histogram) + sizeof(PixelCount)) +
-                   sizeof(Histograms) + 64)
-    ptr = malloc(memory_size)
-    memset(ptr, 0, memory_size)
-    # align ph.accumulator to 32-byte boundary
-    roundoff = (<Py_ssize_t> ptr + 31) % 32
-    ph = <Histograms *> (<Py_ssize_t> ptr + 31 - roundoff)
-    if not ptr:
-        return ph
-    ph.memory = ptr
-    ptr = <void *> (ph + 1)
-    ph.pixel_count = <PixelCount *> ptr
-    ptr = <void *> (ph.pixel_count + adjusted_stripe_length)
+        Py_ssize_t a_2
+        Py_ssize_t y
+
+    ph = <Histograms *> calloc(1, sizeof(Histograms))
+    if not ph:
+        return NULL
     #
-    # Align histogram memory to a 32-byte boundary
+    # The accumulator is followed by the histograms of every position.
+    # Both hold a multiple of 16 bins, so aligning the accumulator to a
+    # 32-byte boundary aligns all of them.
     #
-    roundoff = (<Py_ssize_t> ptr + 31) % 32
-    ptr = <void *> (<Py_ssize_t> ptr + 31 - roundoff)
-    ph.histogram = <Histogram *> ptr
+    memory_size = (piece_size * sizeof(cnp.uint32_t) +
+                   adjusted_stripe_length * N_PIECES * piece_size *
+                   sizeof(cnp.uint16_t) + 32)
+    ph.memory = calloc(memory_size, 1)
+    ph.pixel_count = <PixelCount *> calloc(adjusted_stripe_length,
+                                           sizeof(PixelCount))
+    ph.last_update_column = <Py_ssize_t *> malloc(n_coarse *
+                                                  sizeof(Py_ssize_t))
+    if not ph.memory or not ph.pixel_count or not ph.last_update_column:
+        free_histograms(ph)
+        return NULL
+    roundoff = (<Py_ssize_t> ph.memory + 31) % 32
+    ph.accumulator = <void *> (<Py_ssize_t> ph.memory + 31 - roundoff)
+    ph.histogram = <cnp.uint16_t *> (<cnp.uint32_t *> ph.accumulator +
+                                     piece_size)
+    ph.n_coarse = n_coarse
+    ph.fine_shift = fine_shift
+    ph.piece_size = piece_size
     #
     # Fill in the statistical things we keep around
     #
@@ -240,6 +270,15 @@ cdef Histograms *allocate_histograms(Py_ssize_t rows,
     if radius <= a_2:
         radius = a_2+1
         ph.radius = radius
+    #
+    # The octagon spans the rows -radius to radius. Rows up to a_2 away from
+    # the center span the columns -radius to radius, the other rows lose one
+    # column on each side per row.
+    #
+    ph.octagon_size = (2 * a_2 + 1) * (2 * radius + 1)
+    for y in range(a_2 + 1, radius + 1):
+        ph.octagon_size += 2 * (2 * (a_2 + radius - y) + 1)
+    ph.wide_accumulator = ph.octagon_size > 0xffff
 
     ph.last_top_left.x = -a_2
     ph.last_top_left.y = -radius - 1
@@ -292,8 +331,11 @@ cdef Histograms *allocate_histograms(Py_ssize_t rows,
 # free_histograms - frees the Histograms structure
 #
 ############################################################################
-cdef void free_histograms(Histograms *ph):
+cdef void free_histograms(Histograms *ph) nogil:
     free(ph.memory)
+    free(ph.pixel_count)
+    free(ph.last_update_column)
+    free(ph)
 
 ############################################################################
 #
@@ -301,7 +343,7 @@ cdef void free_histograms(Histograms *ph):
 #
 ############################################################################
 
-cdef void set_stride(Histograms *ph, SCoord *psc):
+cdef void set_stride(Histograms *ph, SCoord *psc) nogil:
     psc.stride = psc.x * ph.col_stride + psc.y * ph.row_stride
 
 ############################################################################
@@ -326,19 +368,92 @@ cdef void set_stride(Histograms *ph, SCoord *psc):
 # a column that is "radius" to the left.
 #
 ############################################################################
-cdef inline Py_ssize_t tl_br_colidx(Histograms *ph, Py_ssize_t colidx):
+cdef inline Py_ssize_t tl_br_colidx(Histograms *ph, Py_ssize_t colidx) nogil:
     return (colidx + 3*ph.radius + ph.current_row) % ph.stripe_length
 
-cdef inline Py_ssize_t tr_bl_colidx(Histograms *ph, Py_ssize_t colidx):
+cdef inline Py_ssize_t tr_bl_colidx(Histograms *ph, Py_ssize_t colidx) nogil:
     return (colidx + 3*ph.radius + ph.row_count-ph.current_row) % \
            ph.stripe_length
 
-cdef inline Py_ssize_t leading_edge_colidx(Histograms *ph, Py_ssize_t colidx):
+cdef inline Py_ssize_t leading_edge_colidx(Histograms *ph, Py_ssize_t colidx) nogil:
     return (colidx + 5*ph.radius) % ph.stripe_length
 
-cdef inline Py_ssize_t trailing_edge_colidx(Histograms *ph, Py_ssize_t colidx):
+cdef inline Py_ssize_t trailing_edge_colidx(Histograms *ph, Py_ssize_t colidx) nogil:
     return (colidx + 3*ph.radius - 1) % ph.stripe_length
 
+############################################################################
+#
+# histogram_piece - the coarse bins of one of the five histograms at an
+#                   index, which are followed by its fine bins
+#
+############################################################################
+cdef inline cnp.uint16_t *histogram_piece(Histograms *ph, Py_ssize_t offset,
+                                          Py_ssize_t piece) nogil:
+    return ph.histogram + (offset * N_PIECES + piece) * ph.piece_size
+
+############################################################################
+#
+# add_bins, sub_bins - add or subtract a multiple of 16 bins
+# add_bins_32, sub_bins_32 - the same with 32-bit destination bins
+#
+############################################################################
+cdef inline void add_bins(cnp.uint16_t *dest, cnp.uint16_t *src,
+                          Py_ssize_t count) nogil:
+    cdef Py_ssize_t i
+    for i in range(0, count, 16):
+        add16(dest + i, src + i)
+
+cdef inline void sub_bins(cnp.uint16_t *dest, cnp.uint16_t *src,
+                          Py_ssize_t count) nogil:
+    cdef Py_ssize_t i
+    for i in range(0, count, 16):
+        sub16(dest + i, src + i)
+
+cdef inline void add_bins_32(cnp.uint32_t *dest, cnp.uint16_t *src,
+                             Py_ssize_t count) nogil:
+    cdef Py_ssize_t i
+    for i in range(0, count, 16):
+        add16_32(dest + i, src + i)
+
+cdef inline void sub_bins_32(cnp.uint32_t *dest, cnp.uint16_t *src,
+                             Py_ssize_t count) nogil:
+    cdef Py_ssize_t i
+    for i in range(0, count, 16):
+        sub16_32(dest + i, src + i)
+
+############################################################################
+#
+# add_to_accumulator, sub_from_accumulator - add or subtract the bins
+#                   start to start + count of a piece to or from the
+#                   accumulator
+#
+# accumulator_bin - the count of a bin of the accumulator
+#
+############################################################################
+cdef inline void add_to_accumulator(Histograms *ph, cnp.uint16_t *piece,
+                                    Py_ssize_t start, Py_ssize_t count) nogil:
+    if ph.wide_accumulator:
+        add_bins_32(<cnp.uint32_t *> ph.accumulator + start, piece + start,
+                    count)
+    else:
+        add_bins(<cnp.uint16_t *> ph.accumulator + start, piece + start,
+                 count)
+
+cdef inline void sub_from_accumulator(Histograms *ph, cnp.uint16_t *piece,
+                                      Py_ssize_t start,
+                                      Py_ssize_t count) nogil:
+    if ph.wide_accumulator:
+        sub_bins_32(<cnp.uint32_t *> ph.accumulator + start, piece + start,
+                    count)
+    else:
+        sub_bins(<cnp.uint16_t *> ph.accumulator + start, piece + start,
+                 count)
+
+cdef inline Py_ssize_t accumulator_bin(Histograms *ph, Py_ssize_t i) nogil:
+    if ph.wide_accumulator:
+        return (<cnp.uint32_t *> ph.accumulator)[i]
+    return (<cnp.uint16_t *> ph.accumulator)[i]
+
 ############################################################################
 #
 # accumulate_coarse_histogram - accumulate the coarse histogram
@@ -348,20 +463,24 @@ cdef inline Py_ssize_t trailing_edge_colidx(Histograms *ph, Py_ssize_t colidx):
 # colidx - the index of the column to add
 #
 ############################################################################
-cdef inline void accumulate_coarse_histogram(Histograms *ph, Py_ssize_t colidx):
+cdef inline void accumulate_coarse_histogram(Histograms *ph,
+                                             Py_ssize_t colidx) nogil:
     cdef Py_ssize_t offset
 
     offset = tr_bl_colidx(ph, colidx)
     if ph.pixel_count[offset].top_right > 0:
-        add16(ph.accumulator.coarse, ph.histogram[offset].top_right.coarse)
+        add_to_accumulator(ph, histogram_piece(ph, offset, TOP_RIGHT),
+                           0, ph.n_coarse)
         ph.accumulator_count += ph.pixel_count[offset].top_right
     offset = leading_edge_colidx(ph, colidx)
     if ph.pixel_count[offset].edge > 0:
-        add16(ph.accumulator.coarse, ph.histogram[offset].edge.coarse)
+        add_to_accumulator(ph, histogram_piece(ph, offset, EDGE),
+                           0, ph.n_coarse)
         ph.accumulator_count += ph.pixel_count[offset].edge
     offset = tl_br_colidx(ph, colidx)
     if ph.pixel_count[offset].bottom_right > 0:
-        add16(ph.accumulator.coarse, ph.histogram[offset].bottom_right.coarse)
+        add_to_accumulator(ph, histogram_piece(ph, offset, BOTTOM_RIGHT),
+                           0, ph.n_coarse)
         ph.accumulator_count += ph.pixel_count[offset].bottom_right
 
 ############################################################################
@@ -370,7 +489,8 @@ cdef inline void accumulate_coarse_histogram(Histograms *ph, Py_ssize_t colidx):
 #                                 for a given column
 #
 ############################################################################
-cdef inline void deaccumulate_coarse_histogram(Histograms *ph, Py_ssize_t colidx):
+cdef inline void deaccumulate_coarse_histogram(Histograms *ph,
+                                               Py_ssize_t colidx) nogil:
     cdef Py_ssize_t offset
     #
     # The trailing diagonals don't appear until here
@@ -379,7 +499,8 @@ cdef inline void deaccumulate_coarse_histogram(Histograms *ph, Py_ssize_t colidx
         return
     offset = tl_br_colidx(ph, colidx)
     if ph.pixel_count[offset].top_left > 0:
-        sub16(ph.accumulator.coarse, ph.histogram[offset].top_left.coarse)
+        sub_from_accumulator(ph, histogram_piece(ph, offset, TOP_LEFT),
+                             0, ph.n_coarse)
         ph.accumulator_count -= ph.pixel_count[offset].top_left
     #
     # The trailing edge doesn't appear from the border until here
@@ -387,47 +508,51 @@ cdef inline void deaccumulate_coarse_histogram(Histograms *ph, Py_ssize_t colidx
     if colidx > ph.radius:
         offset = trailing_edge_colidx(ph, colidx)
         if ph.pixel_count[offset].edge > 0:
-            sub16(ph.accumulator.coarse, ph.histogram[offset].edge.coarse)
+            sub_from_accumulator(ph, histogram_piece(ph, offset, EDGE),
+                                 0, ph.n_coarse)
             ph.accumulator_count -= ph.pixel_count[offset].edge
     offset = tr_bl_colidx(ph, colidx)
     if ph.pixel_count[offset].bottom_left > 0:
-        sub16(ph.accumulator.coarse, ph.histogram[offset].bottom_left.coarse)
+        sub_from_accumulator(ph, histogram_piece(ph, offset, BOTTOM_LEFT),
+                             0, ph.n_coarse)
         ph.accumulator_count -= ph.pixel_count[offset].bottom_left
 
 ############################################################################
 #
-# accumulate_fine_histogram - accumulate one of the 16 fine histograms
+# accumulate_fine_histogram - accumulate one of the fine histograms
 #
 ############################################################################
 cdef inline void accumulate_fine_histogram(Histograms *ph,
                                            Py_ssize_t colidx,
-                                           Py_ssize_t fineidx):
+                                           Py_ssize_t fineidx) nogil:
     cdef:
-        Py_ssize_t fineoffset = fineidx * 16
+        Py_ssize_t fineoffset = ph.n_coarse + (fineidx << ph.fine_shift)
+        Py_ssize_t finesize = 1 << ph.fine_shift
         Py_ssize_t offset
 
     offset = tr_bl_colidx(ph, colidx)
-    add16(ph.accumulator.fine + fineoffset,
-          ph.histogram[offset].top_right.fine + fineoffset)
+    add_to_accumulator(ph, histogram_piece(ph, offset, TOP_RIGHT),
+                       fineoffset, finesize)
 
     offset = leading_edge_colidx(ph, colidx)
-    add16(ph.accumulator.fine + fineoffset,
-          ph.histogram[offset].edge.fine + fineoffset)
+    add_to_accumulator(ph, histogram_piece(ph, offset, EDGE),
+                       fineoffset, finesize)
 
     offset = tl_br_colidx(ph, colidx)
-    add16(ph.accumulator.fine + fineoffset,
-          ph.histogram[offset].bottom_right.fine + fineoffset)
+    add_to_accumulator(ph, histogram_piece(ph, offset, BOTTOM_RIGHT),
+                       fineoffset, finesize)
 
 ############################################################################
 #
-# deaccumulate_fine_histogram - subtract one of the 16 fine histograms
+# deaccumulate_fine_histogram - subtract one of the fine histograms
 #
 ############################################################################
 cdef inline void deaccumulate_fine_histogram(Histograms *ph,
                                              Py_ssize_t colidx,
-                                             Py_ssize_t fineidx):
+                                             Py_ssize_t fineidx) nogil:
     cdef:
-        Py_ssize_t fineoffset = fineidx * 16
+        Py_ssize_t fineoffset = ph.n_coarse + (fineidx << ph.fine_shift)
+        Py_ssize_t finesize = 1 << ph.fine_shift
         Py_ssize_t offset
 
     #
@@ -437,17 +562,17 @@ cdef inline void deaccumulate_fine_histogram(Histograms *ph,
         return
 
     offset = tl_br_colidx(ph, colidx)
-    sub16(ph.accumulator.fine + fineoffset,
-          ph.histogram[offset].top_left.fine + fineoffset)
+    sub_from_accumulator(ph, histogram_piece(ph, offset, TOP_LEFT),
+                         fineoffset, finesize)
 
     if colidx >= ph.radius:
         offset = trailing_edge_colidx(ph, colidx)
-        sub16(ph.accumulator.fine+fineoffset,
-              ph.histogram[offset].edge.fine + fineoffset)
+        sub_from_accumulator(ph, histogram_piece(ph, offset, EDGE),
+                             fineoffset, finesize)
 
     offset = tr_bl_colidx(ph, colidx)
-    sub16(ph.accumulator.fine + fineoffset,
-          ph.histogram[offset].bottom_left.fine + fineoffset)
+    sub_from_accumulator(ph, histogram_piece(ph, offset, BOTTOM_LEFT),
+                         fineoffset, finesize)
 
 ############################################################################
 #
@@ -455,40 +580,92 @@ cdef inline void deaccumulate_fine_histogram(Histograms *ph,
 #
 ############################################################################
 
-cdef inline void accumulate(Histograms *ph):
-    cdef cnp.int32_t accumulator
+cdef inline void accumulate(Histograms *ph) nogil:
     accumulate_coarse_histogram(ph, ph.current_column)
     deaccumulate_coarse_histogram(ph, ph.current_column)
 
+############################################################################
+#
+# recount_fine - recount one of the fine histograms from the pixels of the
+#                octagon around the current location
+#
+############################################################################
+
+cdef inline void recount_fine(Histograms *ph, Py_ssize_t fineidx) nogil:
+    cdef:
+        Py_ssize_t fine_shift = ph.fine_shift
+        Py_ssize_t first_bin = ph.n_coarse + (fineidx << fine_shift)
+        Py_ssize_t radius = ph.radius
+        Py_ssize_t a_2 = ph.a_2
+        Py_ssize_t dy
+        Py_ssize_t half_width
+        Py_ssize_t x
+        Py_ssize_t x_start
+        Py_ssize_t x_stop
+        Py_ssize_t y
+        Py_ssize_t stride
+        cnp.uint16_t value
+
+    if ph.wide_accumulator:
+        memset(<cnp.uint32_t *> ph.accumulator + first_bin, 0,
+               (1 << fine_shift) * sizeof(cnp.uint32_t))
+    else:
+        memset(<cnp.uint16_t *> ph.accumulator + first_bin, 0,
+               (1 << fine_shift) * sizeof(cnp.uint16_t))
+    for dy in range(-radius, radius + 1):
+        y = ph.current_row + dy
+        if y < 0 or y >= ph.row_count:
+            continue
+        if dy <= a_2 and dy >= -a_2:
+            half_width = radius
+        elif dy > 0:
+            half_width = a_2 + radius - dy
+        else:
+            half_width = a_2 + radius + dy
+        x_start = max(ph.current_column - half_width, 0)
+        x_stop = min(ph.current_column + half_width + 1, ph.column_count)
+        for x in range(x_start, x_stop):
+            stride = y * ph.row_stride + x * ph.col_stride
+            if ph.mask[stride]:
+                value = ph.data[stride]
+                if (value >> fine_shift) != fineidx:
+                    continue
+                if ph.wide_accumulator:
+                    (<cnp.uint32_t *> ph.accumulator)[ph.n_coarse + value] += 1
+                else:
+                    (<cnp.uint16_t *> ph.accumulator)[ph.n_coarse + value] += 1
+
 ############################################################################
 #
 # update_fine - update one of the fine histograms to the current column
 #
 # The code has two choices:
-#    redo the fine histogram from scratch - this involves accumulating
-#         the entire histogram from the top_left.x to the top_right.x,
-#         the center (edge) histogram from the trailing edge x to the
-#         top_left.x and then computing a histogram of all points between
-#         the trailing edge top, the point, (top_left.x,trailing edge top.y)
-#         and the top_right and the corresponding triangle in the octagon's
-#         lower half.
+#    recount the fine histogram from the pixels of the octagon, which costs
+#         a visit of every pixel of the octagon.
 #
 #    accumulate and deaccumulate within the fine histogram from the last
-#    column computed.
+#    column computed, which costs six additions of the fine histogram per
+#    column since the last update.
 #
-#    The code below only implements the accumulate; redo and the code
-#    to choose remains to be done.
+#    The cheaper of the two is chosen. Small octagons, whose median changes
+#    coarse bins often, are recounted, while the fine histograms of large
+#    octagons are caught up with the few columns since their last update.
 ############################################################################
 
-cdef inline void update_fine(Histograms *ph, Py_ssize_t fineidx):
+cdef inline void update_fine(Histograms *ph, Py_ssize_t fineidx) nogil:
     cdef:
         Py_ssize_t first_update_column = ph.last_update_column[fineidx]+1
         Py_ssize_t update_limit = ph.current_column+1
         Py_ssize_t i
 
-    for i in range(first_update_column, update_limit):
-        accumulate_fine_histogram(ph, i, fineidx)
-        deaccumulate_fine_histogram(ph, i, fineidx)
+    # one addition of 16 bins costs about as much as a visit of a pixel
+    if ((update_limit - first_update_column) * 6 * (1 << ph.fine_shift) / 16
+            > ph.octagon_size):
+        recount_fine(ph, fineidx)
+    else:
+        for i in range(first_update_column, update_limit):
+            accumulate_fine_histogram(ph, i, fineidx)
+            deaccumulate_fine_histogram(ph, i, fineidx)
     ph.last_update_column[fineidx] = ph.current_column
 
 ############################################################################
@@ -504,17 +681,18 @@ cdef inline void update_fine(Histograms *ph, Py_ssize_t fineidx):
 #
 ############################################################################
 cdef inline void update_histogram(Histograms *ph,
-                                  HistogramPiece *hist_piece,
+                                  cnp.uint16_t *hist_piece,
                                   pixel_count_t *pixel_count,
                                   SCoord *last_coord,
-                                  SCoord *coord):
+                                  SCoord *coord) nogil:
     cdef:
         Py_ssize_t current_column = ph.current_column
         Py_ssize_t current_row    = ph.current_row
         Py_ssize_t current_stride = ph.current_stride
         Py_ssize_t column_count   = ph.column_count
         Py_ssize_t row_count      = ph.row_count
-        cnp.uint8_t value
+        cnp.uint16_t *fine = hist_piece + ph.n_coarse
+        cnp.uint16_t value
         Py_ssize_t stride
         Py_ssize_t x
         Py_ssize_t y
@@ -528,8 +706,8 @@ cdef inline void update_histogram(Histograms *ph,
             ph.mask[stride]):
         value = ph.data[stride]
         pixel_count[0] -= 1
-        hist_piece.fine[value] -= 1
-        hist_piece.coarse[value / 16] -= 1
+        fine[value] -= 1
+        hist_piece[value >> ph.fine_shift] -= 1
 
     x = coord.x + current_column
     y = coord.y + current_row
@@ -540,53 +718,45 @@ cdef inline void update_histogram(Histograms *ph,
             ph.mask[stride]):
         value = ph.data[stride]
         pixel_count[0] += 1
-        hist_piece.fine[value] += 1
-        hist_piece.coarse[value / 16] += 1
+        fine[value] += 1
+        hist_piece[value >> ph.fine_shift] += 1
 
 ############################################################################
 #
 # update_current_location - update the histograms at the current location
 #
 ############################################################################
-cdef inline void update_current_location(Histograms *ph):
+cdef inline void update_current_location(Histograms *ph) nogil:
     cdef:
         Py_ssize_t current_column = ph.current_column
-        Py_ssize_t radius = ph.radius
         Py_ssize_t top_left_off = tl_br_colidx(ph, current_column)
         Py_ssize_t top_right_off = tr_bl_colidx(ph, current_column)
         Py_ssize_t bottom_left_off = tr_bl_colidx(ph, current_column)
         Py_ssize_t bottom_right_off = tl_br_colidx(ph, current_column)
         Py_ssize_t leading_edge_off = leading_edge_colidx(ph, current_column)
-        cnp.int32_t *coarse_histogram
-        cnp.int32_t *fine_histogram
-        Py_ssize_t last_xoff
-        Py_ssize_t last_yoff
-        Py_ssize_t last_stride
-        Py_ssize_t xoff
-        Py_ssize_t yoff
-        Py_ssize_t stride
 
-    update_histogram(ph, &ph.histogram[top_left_off].top_left,
+    update_histogram(ph, histogram_piece(ph, top_left_off, TOP_LEFT),
                      &ph.pixel_count[top_left_off].top_left,
                      &ph.last_top_left,
                      &ph.top_left)
 
-    update_histogram(ph, &ph.histogram[top_right_off].top_right,
+    update_histogram(ph, histogram_piece(ph, top_right_off, TOP_RIGHT),
                      &ph.pixel_count[top_right_off].top_right,
                      &ph.last_top_right,
                      &ph.top_right)
 
-    update_histogram(ph, &ph.histogram[bottom_left_off].bottom_left,
+    update_histogram(ph, histogram_piece(ph, bottom_left_off, BOTTOM_LEFT),
                      &ph.pixel_count[bottom_left_off].bottom_left,
                      &ph.last_bottom_left,
                      &ph.bottom_left)
 
-    update_histogram(ph, &ph.histogram[bottom_right_off].bottom_right,
+    update_histogram(ph,
+                     histogram_piece(ph, bottom_right_off, BOTTOM_RIGHT),
                      &ph.pixel_count[bottom_right_off].bottom_right,
                      &ph.last_bottom_right,
                      &ph.bottom_right)
 
-    update_histogram(ph, &ph.histogram[leading_edge_off].edge,
+    update_histogram(ph, histogram_piece(ph, leading_edge_off, EDGE),
                      &ph.pixel_count[leading_edge_off].edge,
                      &ph.last_leading_edge,
                      &ph.leading_edge)
@@ -597,13 +767,12 @@ cdef inline void update_current_location(Histograms *ph):
 #
 ############################################################################
 
-cdef inline cnp.uint8_t find_median(Histograms *ph):
+cdef inline cnp.uint16_t find_median(Histograms *ph) nogil:
     cdef:
         Py_ssize_t pixels_below      # of pixels below the median
         Py_ssize_t i
         Py_ssize_t j
-        Py_ssize_t k
-        cnp.uint32_t accumulator
+        Py_ssize_t accumulator
 
     if ph.accumulator_count == 0:
         return 0
@@ -615,17 +784,17 @@ cdef inline cnp.uint8_t find_median(Histograms *ph):
         pixels_below -= 1
 
     accumulator = 0
-    for i in range(16):
-        accumulator += ph.accumulator.coarse[i]
+    for i in range(ph.n_coarse):
+        accumulator += accumulator_bin(ph, i)
         if accumulator > pixels_below:
             break
 
-    accumulator -= ph.accumulator.coarse[i]
+    accumulator -= accumulator_bin(ph, i)
     update_fine(ph, i)
-    for j in range(i*16, (i + 1)*16):
-        accumulator += ph.accumulator.fine[j]
+    for j in range(i << ph.fine_shift, (i + 1) << ph.fine_shift):
+        accumulator += accumulator_bin(ph, ph.n_coarse + j)
         if accumulator > pixels_below:
-            return <cnp.uint8_t>j
+            return <cnp.uint16_t>j
 
     return 0
 
@@ -635,13 +804,17 @@ cdef inline cnp.uint8_t find_median(Histograms *ph):
 #
 # rows    - # of rows in each array
 # columns - # of columns in each array
-# row_stride - stride from one row to the next in each array
-# col_stride - stride from one column to the next in each array
+# row_stride - stride (in pixels) from one row to the next in each array
+# col_stride - stride (in pixels) from one column to the next in each array
 # radius - radius of circle inscribed into octagon
 # percent - "median" cutoff: 50 = median, 25 = lower quartile, etc
+# bits - number of bits of the pixel values
 # data - array of image pixels to be filtered
 # mask - mask of significant pixels
 # output - array to be filled with filtered pixels
+# out_row_start, out_row_stop,
+# out_col_start, out_col_stop - the part of output to be filled. The filter
+#          only reads the pixels within "radius" of that part.
 #
 ############################################################################
 cdef int c_median_filter(Py_ssize_t rows,
@@ -650,26 +823,30 @@ cdef int c_median_filter(Py_ssize_t rows,
                          Py_ssize_t col_stride,
                          Py_ssize_t radius,
                          Py_ssize_t percent,
-                         cnp.uint8_t *data,
+                         Py_ssize_t bits,
+                         cnp.uint16_t *data,
                          cnp.uint8_t *mask,
-                         cnp.uint8_t *output):
+                         cnp.uint16_t *output,
+                         Py_ssize_t out_row_start,
+                         Py_ssize_t out_row_stop,
+                         Py_ssize_t out_col_start,
+                         Py_ssize_t out_col_stop) nogil:
     cdef:
         Histograms *ph
-        Histogram  *phistogram
         Py_ssize_t row
         Py_ssize_t col
         Py_ssize_t i
-        Py_ssize_t top_left_off
-        Py_ssize_t top_right_off
-        Py_ssize_t bottom_left_off
-        Py_ssize_t bottom_right_off
+        Py_ssize_t tl_br_off
+        Py_ssize_t tr_bl_off
+        Py_ssize_t piece_bytes
 
     ph = allocate_histograms(rows, columns, row_stride, col_stride,
-                             radius, percent, data, mask, output)
+                             radius, percent, bits, data, mask, output)
     if not ph:
         return 1
+    piece_bytes = ph.piece_size * sizeof(cnp.uint16_t)
 
-    for row in range(-radius, rows):
+    for row in range(-radius, out_row_stop):
         #
         # Initialize the starting diagonal histograms to zero. The leading
         # and trailing histograms descend from above and so are initialized
@@ -681,10 +858,10 @@ cdef int c_median_filter(Py_ssize_t rows,
         tl_br_off = tl_br_colidx(ph, -radius)
         tr_bl_off = tr_bl_colidx(ph, columns + radius - 1)
 
-        memset(&ph.histogram[tl_br_off].top_left, 0, sizeof(HistogramPiece))
-        memset(&ph.histogram[tl_br_off].bottom_right, 0, sizeof(HistogramPiece))
-        memset(&ph.histogram[tr_bl_off].top_right, 0, sizeof(HistogramPiece))
-        memset(&ph.histogram[tr_bl_off].bottom_left, 0, sizeof(HistogramPiece))
+        memset(histogram_piece(ph, tl_br_off, TOP_LEFT), 0, piece_bytes)
+        memset(histogram_piece(ph, tl_br_off, BOTTOM_RIGHT), 0, piece_bytes)
+        memset(histogram_piece(ph, tr_bl_off, TOP_RIGHT), 0, piece_bytes)
+        memset(histogram_piece(ph, tr_bl_off, BOTTOM_LEFT), 0, piece_bytes)
 
         ph.pixel_count[tl_br_off].top_left = 0
         ph.pixel_count[tl_br_off].bottom_right = 0
@@ -694,56 +871,71 @@ cdef int c_median_filter(Py_ssize_t rows,
         #
         # Initialize the accumulator (octagon histogram) to zero
         #
-        memset(&(ph.accumulator), 0, sizeof(ph.accumulator))
+        if ph.wide_accumulator:
+            memset(ph.accumulator, 0, ph.piece_size * sizeof(cnp.uint32_t))
+        else:
+            memset(ph.accumulator, 0, piece_bytes)
         ph.accumulator_count = 0
-        for i in range(16):
+        for i in range(ph.n_coarse):
             ph.last_update_column[i] = -radius-1
         #
         # Initialize the current stride to the beginning of the row
         #
         ph.current_row = row
         #
+        # Rows above the output only update the location histograms
+        #
+        if row < out_row_start:
+            for col in range(-radius, columns+radius):
+                ph.current_column = col
+                ph.current_stride = row * row_stride + col * col_stride
+                update_current_location(ph)
+            continue
+        #
         # Update locations and coarse accumulator for the octagon
-        # for points before 0
+        # for points before the output
         #
-        for col in range(-radius, 0 if row >= 0 else columns+radius):
+        for col in range(-radius, out_col_start):
             ph.current_column = col
             ph.current_stride = row * row_stride + col * col_stride
             update_current_location(ph)
             accumulate(ph)
         #
         # Update locations and coarse accumulator and compute
-        # the median for points between 0 and "columns"
+        # the median for points of the output
         #
-        if row >= 0:
-            for col in range(0, columns):
-                ph.current_column = col
-                ph.current_stride = row * row_stride + col * col_stride
-                update_current_location(ph)
-                accumulate(ph)
-                ph.output[ph.current_stride] = find_median(ph)
-            for col in range(columns, columns+radius):
-                ph.current_column = col
-                ph.current_stride = row * row_stride + col * col_stride
-                update_current_location(ph)
+        for col in range(out_col_start, out_col_stop):
+            ph.current_column = col
+            ph.current_stride = row * row_stride + col * col_stride
+            update_current_location(ph)
+            accumulate(ph)
+            ph.output[ph.current_stride] = find_median(ph)
+        for col in range(out_col_stop, columns+radius):
+            ph.current_column = col
+            ph.current_stride = row * row_stride + col * col_stride
+            update_current_location(ph)
 
     free_histograms(ph)
     return 0
 
 
-def median_filter(cnp.uint8_t[:, ::1] data, cnp.uint8_t[:, ::1] mask,
-                  cnp.uint8_t[:, ::1] output, int radius,
-                  cnp.int32_t percent):
+# Upper bound of the memory used by the histograms of all threads.
+_MAX_MEMORY = 256 * 2 ** 20
+
+
+def median_filter(cnp.uint16_t[:, ::1] data, cnp.uint8_t[:, ::1] mask,
+                  cnp.uint16_t[:, ::1] output, int radius,
+                  cnp.int32_t percent, int bits=8, n_jobs=1):
     """Median filter with octagon shape and masking.
 
     Parameters
     ----------
-    data : (M,N) ndarray, dtype uint8
+    data : (M,N) ndarray, dtype uint16
         Input image.
     mask : (M,N) array, dtype uint8
         A value of 1 indicates a significant pixel, 0
         that a pixel is masked.
-    output : (M,N) array, dtype uint8
+    output : (M,N) array, dtype uint16
         Array of same size as the input in which to store
         the filtered image.
     radius : int
@@ -752,14 +944,32 @@ def median_filter(cnp.uint8_t[:, ::1] data, cnp.uint8_t[:, ::1] mask,
         The unmasked pixels within the octagon are sorted, and the
         value at the `percent`-th index chosen.  For example, the
         default value of 50 chooses the median pixel.
+    bits : int, optional
+        Number of bits of the values in `data`, between 8 and 16.
+    n_jobs : int, optional
+        Number of threads, each filtering a band of rows. Values smaller
+        than 1 select all available CPU cores.
+
+    Notes
+    -----
+    The histograms take ``10 * (2 ** bits + 2 ** (bits // 2))`` bytes per
+    column. If the histograms of all threads do not fit into 256 MB, the
+    image is additionally split into strips of columns, each of which
+    extends by `radius` into its neighbors.
 
     """
+    cdef Py_ssize_t rows = data.shape[0]
+    cdef Py_ssize_t columns = data.shape[1]
+
     if percent < 0:
         raise ValueError('Median filter percent = %d is less than zero' %
                          percent)
     if percent > 100:
         raise ValueError('Median filter percent = %d is greater than 100' %
                          percent)
+    if bits < 8 or bits > 16:
+        raise ValueError('Median filter bits = %d is not between 8 and 16' %
+                         bits)
     if data.shape[0] != mask.shape[0] or data.shape[1] != mask.shape[1]:
         raise ValueError('Data shape (%d, %d) is not mask shape (%d, %d)' %
                          (data.shape[0], data.shape[1],
@@ -768,10 +978,37 @@ def median_filter(cnp.uint8_t[:, ::1] data, cnp.uint8_t[:, ::1] mask,
         raise ValueError('Data shape (%d, %d) is not output shape (%d, %d)' %
                          (data.shape[0], data.shape[1],
                           output.shape[0], output.shape[1]))
-    if c_median_filter(data.shape[0], data.shape[1],
-                       data.strides[0], data.strides[1],
-                       radius, percent,
-                       &data[0, 0],
-                       &mask[0, 0],
-                       &output[0, 0]):
-        raise MemoryError('Failed to allocate scratchpad memory')
+    if rows == 0 or columns == 0:
+        return
+
+    n_bands = min(effective_n_jobs(n_jobs), rows)
+    column_bytes = (N_PIECES * ((1 << bits) + (1 << (bits - (bits + 1) // 2)))
+                    * sizeof(cnp.uint16_t))
+    width = _MAX_MEMORY // n_bands // column_bytes - 2 * radius - 1
+    width = max(width, 2 * radius + 1)
+    strips = [(c, min(c + width, columns)) for c in range(0, columns, width)]
+    band_bounds = [(rows * i) // n_bands for i in range(n_bands + 1)]
+    parts = [(band_bounds[i], band_bounds[i + 1], c0, c1)
+             for i in range(n_bands) for c0, c1 in strips]
+
+    def filter_parts(start, stop):
+        cdef Py_ssize_t r0, r1, c0, c1, vr0, vr1, vc0, vc1
+        cdef int failed
+        for k in range(start, stop):
+            r0, r1, c0, c1 = parts[k]
+            # the part of the image within radius of the output
+            vr0 = max(r0 - radius, 0)
+            vr1 = min(r1 + radius, rows)
+            vc0 = max(c0 - radius, 0)
+            vc1 = min(c1 + radius, columns)
+            with nogil:
+                failed = c_median_filter(vr1 - vr0, vc1 - vc0, columns, 1,
+                                         radius, percent, bits,
+                                         &data[vr0, vc0], &mask[vr0, vc0],
+                                         &output[vr0, vc0],
+                                         r0 - vr0, r1 - vr0,
+                                         c0 - vc0, c1 - vc0)
+            if failed:
+                raise MemoryError('Failed to allocate scratchpad memory')
+
+    run_in_bands(filter_parts, len(parts), n_jobs)
@@ -19,7 +19,8 @@ from .._shared.utils import deprecated
 
 
 @deprecated('filter.rank.median')
-def median_filter(image, radius=2, mask=None, percent=50):
+def median_filter(image, radius=2, mask=None, percent=50, out=None,
+                  n_jobs=1):
     """Masked median filter with octagon shape.
 
     Parameters
@@ -36,6 +37,13 @@ def median_filter(image, radius=2, mask=None, percent=50):
         The unmasked pixels within the octagon are sorted, and the
         value at `percent` percent of the index range is chosen.
         Default value of 50 gives the median pixel.
+    out : (M, N) ndarray, optional
+        If given, the filtered image is stored in this array. For unsigned
+        integer images with at most 16 bits per pixel and a C-contiguous
+        `out` of dtype uint16, no intermediate output array is allocated.
+    n_jobs : int, optional
+        Number of threads, each filtering a band of rows. Values smaller
+        than 1 select all available CPU cores.
 
     Returns
     -------
@@ -47,7 +55,13 @@ def median_filter(image, radius=2, mask=None, percent=50):
     Notes
     -----
     Because of the histogram implementation, the number of unique values
-    for the output is limited to 256.
+    for the output is limited to 65536. Non-negative integer images with
+    values below 65536 are filtered directly, using histograms with as many
+    bins as the bit depth of the image requires (e.g. 1024 bins for 10-bit
+    images). Other images are first converted to the ranks of their values.
+
+    The running time per pixel does not depend on `radius`, but grows with
+    the square root of the number of histogram bins. Any radius can be used.
 
     Examples
     --------
@@ -64,46 +78,77 @@ def median_filter(image, radius=2, mask=None, percent=50):
     if radius < 2:
         raise ValueError("Input 'radius' must be >= 2.")
 
+    # the histograms of single columns of the octagon count up to 65535
+    # pixels, the histogram of the whole octagon is not limited
+    if min(2 * radius + 1, image.shape[0]) > 65535:
+        raise ValueError("Input 'radius' is too large for this image.")
+
+    if out is not None and out.shape != image.shape:
+        raise ValueError("Output 'out' must have the shape of 'image'.")
+
     if mask is None:
         mask = np.ones(image.shape, dtype=np.bool)
     mask = np.ascontiguousarray(mask, dtype=np.bool)
 
     if np.all(~ mask):
         warnings.warn('Mask is all over image! Returning copy of input image.')
-        return image.copy()
-    
-    if (not np.issubdtype(image.dtype, np.int) or
-        np.min(image) < 0 or np.max(image) > 255):
-        ranked_values, translation = rank_order(image[mask])
+        return _store(image.copy(), out)
+
+    values = image[mask]
+    if (np.issubdtype(image.dtype, np.integer) and
+            np.min(values) >= 0 and np.max(values) <= 0xffff):
+        max_value = np.max(values)
+        if mask.all():
+            data = np.ascontiguousarray(image, dtype=np.uint16)
+        else:
+            data = np.zeros(image.shape, np.uint16)
+            data[mask] = values
+        was_ranked = False
+    else:
+        ranked_values, translation = rank_order(values)
         max_ranked_values = np.max(ranked_values)
         if max_ranked_values == 0:
             warnings.warn('Particular case? Returning copy of input image.')
-            return image.copy()
-        if max_ranked_values > 255:
-            ranked_values = ranked_values * 255 // max_ranked_values
+            return _store(image.copy(), out)
+        max_value = min(max_ranked_values, 0xffff)
+        if max_ranked_values > 0xffff:
+            ranked_values = (ranked_values.astype(np.uint64) * 0xffff //
+                             max_ranked_values)
+        data = np.zeros(image.shape, np.uint16)
+        data[mask] = ranked_values
         was_ranked = True
-    else:
-        ranked_values = image[mask]
-        was_ranked = False
-    ranked_image = np.zeros(image.shape, np.uint8)
-    ranked_image[mask] = ranked_values
+    bits = max(8, int(max_value).bit_length())
 
-    mask.dtype = np.uint8
-    output = np.zeros(image.shape, np.uint8)
+    # the output must not overwrite pixels which are still to be read
+    if (out is not None and not was_ranked and out.dtype == np.uint16 and
+            out.flags.c_contiguous and not np.may_share_memory(out, data)):
+        output = out
+    else:
+        output = np.zeros(image.shape, np.uint16)
 
-    _ctmf.median_filter(ranked_image, mask, output, radius, percent)
+    _ctmf.median_filter(data, mask.view(np.uint8), output, radius, percent,
+                        bits, n_jobs)
     if was_ranked:
         #
         # The translation gives the original value at each ranking.
         # We rescale the output to the original ranking and then
         # use the translation to look up the original value in the image.
         #
-        if max_ranked_values > 255:
-            result = translation[output.astype(np.uint32) *
-                                 max_ranked_values // 255]
+        if max_ranked_values > 0xffff:
+            result = translation[output.astype(np.uint64) *
+                                 max_ranked_values // 0xffff]
         else:
             result = translation[output]
-    else:
+    elif output.dtype == image.dtype:
         result = output
-    return result
+    else:
+        result = output.astype(image.dtype)
+    return _store(result, out)
+
 
+def _store(result, out):
+    """Copy `result` into `out`, if given."""
+    if out is None or out is result:
+        return result
+    out[...] = result
+    return out
@@ -1,6 +1,7 @@
 from .generic import (autolevel, bottomhat, equalize, gradient, maximum, mean,
                       subtract_mean, median, minimum, modal, enhance_contrast,
-                      pop, threshold, tophat, noise_filter, entropy, otsu)
+                      pop, threshold, tophat, noise_filter, entropy, otsu,
+                      multi)
 from .percentile import (autolevel_percentile, gradient_percentile,
                          mean_percentile, subtract_mean_percentile,
                          enhance_contrast_percentile, percentile,
@@ -56,8 +57,9 @@ __all__ = ['autolevel',
            'tophat',
            'noise_filter',
            'entropy',
-           'otsu'
+           'otsu',
            'percentile',
+           'multi',
            # Deprecated
            'percentile_autolevel',
            'percentile_gradient',
@@ -25,6 +25,7 @@ References
 
 import numpy as np
 from skimage import img_as_ubyte
+from skimage._shared.utils import run_in_bands
 
 from . import bilateral_cy
 from .generic import _handle_input
@@ -34,19 +35,23 @@ __all__ = ['mean_bilateral', 'pop_bilateral']
 
 
 def _apply(func, image, selem, out, mask, shift_x, shift_y, s0, s1,
-           out_dtype=None):
+           out_dtype=None, n_jobs=1):
 
     image, selem, out, mask, max_bin = _handle_input(image, selem, out, mask,
                                                      out_dtype)
 
-    func(image, selem, shift_x=shift_x, shift_y=shift_y, mask=mask,
-         out=out, max_bin=max_bin, s0=s0, s1=s1)
+    def band(r_start, r_stop):
+        func(image, selem, shift_x=shift_x, shift_y=shift_y, mask=mask,
+             out=out, max_bin=max_bin, s0=s0, s1=s1,
+             r_start=r_start, r_stop=r_stop)
+
+    run_in_bands(band, image.shape[0], n_jobs)
 
     return out
 
 
 def mean_bilateral(image, selem, out=None, mask=None, shift_x=False,
-                   shift_y=False, s0=10, s1=10):
+                   shift_y=False, s0=10, s1=10, n_jobs=1):
     """Apply a flat kernel bilateral filter.
 
     This is an edge-preserving and noise reducing denoising filter. It averages
@@ -78,6 +83,9 @@ def mean_bilateral(image, selem, out=None, mask=None, shift_x=False,
     s0, s1 : int
         Define the [s0, s1] interval around the greyvalue of the center pixel
         to be considered for computing the value.
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -101,11 +109,12 @@ def mean_bilateral(image, selem, out=None, mask=None, shift_x=False,
     """
 
     return _apply(bilateral_cy._mean, image, selem, out=out,
-                  mask=mask, shift_x=shift_x, shift_y=shift_y, s0=s0, s1=s1)
+                  mask=mask, shift_x=shift_x, shift_y=shift_y, s0=s0, s1=s1,
+                  n_jobs=n_jobs)
 
 
 def pop_bilateral(image, selem, out=None, mask=None, shift_x=False,
-                  shift_y=False, s0=10, s1=10):
+                  shift_y=False, s0=10, s1=10, n_jobs=1):
     """Return the number (population) of pixels actually inside the bilateral
     neighborhood, i.e. being inside the structuring element AND having a gray
     level inside the interval [g-s0, g+s1].
@@ -128,6 +137,9 @@ def pop_bilateral(image, selem, out=None, mask=None, shift_x=False,
     s0, s1 : int
         Define the [s0, s1] interval around the greyvalue of the center pixel
         to be considered for computing the value.
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -154,4 +166,5 @@ def pop_bilateral(image, selem, out=None, mask=None, shift_x=False,
     """
 
     return _apply(bilateral_cy._pop, image, selem, out=out,
-                  mask=mask, shift_x=shift_x, shift_y=shift_y, s0=s0, s1=s1)
+                  mask=mask, shift_x=shift_x, shift_y=shift_y, s0=s0, s1=s1,
+                  n_jobs=n_jobs)
@@ -12,7 +12,7 @@ from .core_cy cimport dtype_t, dtype_t_out, _core
 cdef inline double _kernel_mean(Py_ssize_t* histo, double pop, dtype_t g,
                                 Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                 double p0, double p1,
-                                Py_ssize_t s0, Py_ssize_t s1):
+                                Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     cdef Py_ssize_t i
     cdef Py_ssize_t bilat_pop = 0
@@ -34,7 +34,7 @@ cdef inline double _kernel_mean(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_pop(Py_ssize_t* histo, double pop, dtype_t g,
                                Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                double p0, double p1,
-                               Py_ssize_t s0, Py_ssize_t s1):
+                               Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     cdef Py_ssize_t i
     cdef Py_ssize_t bilat_pop = 0
@@ -53,10 +53,10 @@ def _mean(dtype_t[:, ::1] image,
           char[:, ::1] mask,
           dtype_t_out[:, ::1] out,
           char shift_x, char shift_y, Py_ssize_t s0, Py_ssize_t s1,
-          Py_ssize_t max_bin):
+          Py_ssize_t max_bin, Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_mean[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, s0, s1, max_bin)
+          shift_x, shift_y, 0, 0, s0, s1, max_bin, r_start, r_stop)
 
 
 def _pop(dtype_t[:, ::1] image,
@@ -64,7 +64,7 @@ def _pop(dtype_t[:, ::1] image,
          char[:, ::1] mask,
          dtype_t_out[:, ::1] out,
          char shift_x, char shift_y, Py_ssize_t s0, Py_ssize_t s1,
-         Py_ssize_t max_bin):
+         Py_ssize_t max_bin, Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_pop[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, s0, s1, max_bin)
+          shift_x, shift_y, 0, 0, s0, s1, max_bin, r_start, r_stop)
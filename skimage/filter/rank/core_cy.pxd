@@ -11,13 +11,20 @@ ctypedef fused dtype_t_out:
     double_t
 
 
-cdef dtype_t _max(dtype_t a, dtype_t b)
-cdef dtype_t _min(dtype_t a, dtype_t b)
+cdef dtype_t _max(dtype_t a, dtype_t b) nogil
+cdef dtype_t _min(dtype_t a, dtype_t b) nogil
+
+cdef Py_ssize_t _histogram_rank(Py_ssize_t* histo, Py_ssize_t max_bin,
+                                double count, char inclusive) nogil
+cdef Py_ssize_t _histogram_rank_top(Py_ssize_t* histo, Py_ssize_t max_bin,
+                                    double count, char inclusive) nogil
+cdef Py_ssize_t _histogram_min(Py_ssize_t* histo, Py_ssize_t max_bin) nogil
+cdef Py_ssize_t _histogram_max(Py_ssize_t* histo, Py_ssize_t max_bin) nogil
 
 
 cdef void _core(double kernel(Py_ssize_t*, double, dtype_t,
                               Py_ssize_t, Py_ssize_t, double,
-                              double, Py_ssize_t, Py_ssize_t),
+                              double, Py_ssize_t, Py_ssize_t) nogil,
                 dtype_t[:, ::1] image,
                 char[:, ::1] selem,
                 char[:, ::1] mask,
@@ -25,4 +32,21 @@ cdef void _core(double kernel(Py_ssize_t*, double, dtype_t,
                 char shift_x, char shift_y,
                 double p0, double p1,
                 Py_ssize_t s0, Py_ssize_t s1,
-                Py_ssize_t max_bin) except *
+                Py_ssize_t max_bin,
+                Py_ssize_t r_start, Py_ssize_t r_stop) except *
+
+
+cdef void _core_multi(double (**kernels)(Py_ssize_t*, double, dtype_t,
+                                         Py_ssize_t, Py_ssize_t, double,
+                                         double, Py_ssize_t,
+                                         Py_ssize_t) nogil,
+                      Py_ssize_t n_kernels,
+                      dtype_t[:, ::1] image,
+                      char[:, ::1] selem,
+                      char[:, ::1] mask,
+                      dtype_t_out[:, :, ::1] out,
+                      char shift_x, char shift_y,
+                      double p0, double p1,
+                      Py_ssize_t s0, Py_ssize_t s1,
+                      Py_ssize_t max_bin,
+                      Py_ssize_t r_start, Py_ssize_t r_stop) except *
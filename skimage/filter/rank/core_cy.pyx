@@ -9,29 +9,132 @@ cimport numpy as cnp
 from libc.stdlib cimport malloc, free
 
 
-cdef inline dtype_t _max(dtype_t a, dtype_t b):
+cdef inline dtype_t _max(dtype_t a, dtype_t b) nogil:
     return a if a >= b else b
 
 
-cdef inline dtype_t _min(dtype_t a, dtype_t b):
+cdef inline dtype_t _min(dtype_t a, dtype_t b) nogil:
     return a if a <= b else b
 
 
-cdef inline void histogram_increment(Py_ssize_t* histo, double* pop,
-                                     dtype_t value):
+cdef inline Py_ssize_t _coarse_shift(Py_ssize_t max_bin) nogil:
+    """Number of bits dropped from a value to get its coarse histogram bin.
+
+    Half of the bit depth of `max_bin` (rounded up), so that both the coarse
+    and the fine histogram levels have about sqrt(max_bin) bins.
+    """
+    cdef Py_ssize_t bits = 0
+    max_bin -= 1
+    while max_bin > 0:
+        max_bin >>= 1
+        bits += 1
+    return (bits + 1) / 2
+
+
+cdef inline Py_ssize_t _coarse_bins(Py_ssize_t max_bin) nogil:
+    """Number of bins of the coarse histogram."""
+    return ((max_bin - 1) >> _coarse_shift(max_bin)) + 1
+
+
+cdef inline char _reached(Py_ssize_t sum, double count, char inclusive) nogil:
+    if inclusive:
+        return sum >= count
+    else:
+        return sum > count
+
+
+cdef inline Py_ssize_t _histogram_rank(Py_ssize_t* histo, Py_ssize_t max_bin,
+                                       double count, char inclusive) nogil:
+    """Return the first bin where the cumulative sum of the histogram exceeds
+    `count` (or reaches it, if `inclusive`).
+
+    The coarse histogram stored after the `max_bin` fine bins is scanned
+    first, then only the fine bins of the selected coarse bin, which takes
+    O(sqrt(max_bin)) steps instead of O(max_bin).
+    """
+    cdef Py_ssize_t shift = _coarse_shift(max_bin)
+    cdef Py_ssize_t n_coarse = ((max_bin - 1) >> shift) + 1
+    cdef Py_ssize_t* coarse = histo + max_bin
+    cdef Py_ssize_t i, j, stop
+    cdef Py_ssize_t sum = 0
+
+    for j in range(n_coarse):
+        if _reached(sum + coarse[j], count, inclusive):
+            break
+        sum += coarse[j]
+    else:
+        return max_bin - 1
+
+    stop = (j + 1) << shift
+    if stop > max_bin:
+        stop = max_bin
+    for i in range(j << shift, stop):
+        sum += histo[i]
+        if _reached(sum, count, inclusive):
+            return i
+    return max_bin - 1
+
+
+cdef inline Py_ssize_t _histogram_rank_top(Py_ssize_t* histo,
+                                           Py_ssize_t max_bin, double count,
+                                           char inclusive) nogil:
+    """Same as `_histogram_rank`, but cumulate the histogram starting from
+    the highest bin and return the last bin where the sum exceeds `count`.
+    """
+    cdef Py_ssize_t shift = _coarse_shift(max_bin)
+    cdef Py_ssize_t n_coarse = ((max_bin - 1) >> shift) + 1
+    cdef Py_ssize_t* coarse = histo + max_bin
+    cdef Py_ssize_t i, j, stop
+    cdef Py_ssize_t sum = 0
+
+    for j in range(n_coarse - 1, -1, -1):
+        if _reached(sum + coarse[j], count, inclusive):
+            break
+        sum += coarse[j]
+    else:
+        return 0
+
+    stop = (j + 1) << shift
+    if stop > max_bin:
+        stop = max_bin
+    for i in range(stop - 1, (j << shift) - 1, -1):
+        sum += histo[i]
+        if _reached(sum, count, inclusive):
+            return i
+    return 0
+
+
+cdef inline Py_ssize_t _histogram_min(Py_ssize_t* histo,
+                                      Py_ssize_t max_bin) nogil:
+    """Return the lowest non-empty bin of the histogram."""
+    return _histogram_rank(histo, max_bin, 0, 0)
+
+
+cdef inline Py_ssize_t _histogram_max(Py_ssize_t* histo,
+                                      Py_ssize_t max_bin) nogil:
+    """Return the highest non-empty bin of the histogram."""
+    return _histogram_rank_top(histo, max_bin, 0, 0)
+
+
+cdef inline void histogram_increment(Py_ssize_t* histo, Py_ssize_t* coarse,
+                                     Py_ssize_t shift, double* pop,
+                                     dtype_t value) nogil:
     histo[value] += 1
+    coarse[value >> shift] += 1
     pop[0] += 1
 
 
-cdef inline void histogram_decrement(Py_ssize_t* histo, double* pop,
-                                     dtype_t value):
+cdef inline void histogram_decrement(Py_ssize_t* histo, Py_ssize_t* coarse,
+                                     Py_ssize_t shift, double* pop,
+                                     dtype_t value) nogil:
     histo[value] -= 1
+    coarse[value >> shift] -= 1
     pop[0] -= 1
 
 
 cdef inline char is_in_mask(Py_ssize_t rows, Py_ssize_t cols,
                             Py_ssize_t r, Py_ssize_t c,
-                            char* mask):
+                            char* mask) nogil:
     """Check whether given coordinate is within image and mask is true."""
     if r < 0 or r > rows - 1 or c < 0 or c > cols - 1:
         return 0
@@ -42,9 +145,25 @@ cdef inline char is_in_mask(Py_ssize_t rows, Py_ssize_t cols,
             return 0
 
 
+cdef inline void _evaluate(double (**kernels)(Py_ssize_t*, double, dtype_t,
+                                             Py_ssize_t, Py_ssize_t, double,
+                                             double, Py_ssize_t,
+                                             Py_ssize_t) nogil,
+                           Py_ssize_t n_kernels, dtype_t_out* out,
+                           Py_ssize_t* histo, double pop, dtype_t g,
+                           Py_ssize_t max_bin, Py_ssize_t mid_bin,
+                           double p0, double p1,
+                           Py_ssize_t s0, Py_ssize_t s1) nogil:
+    """Store the return value of each kernel function in `out`."""
+    cdef Py_ssize_t k
+    for k in range(n_kernels):
+        out[k] = <dtype_t_out>kernels[k](histo, pop, g, max_bin, mid_bin,
+                                         p0, p1, s0, s1)
+
+
 cdef void _core(double kernel(Py_ssize_t*, double, dtype_t,
                               Py_ssize_t, Py_ssize_t, double,
-                              double, Py_ssize_t, Py_ssize_t),
+                              double, Py_ssize_t, Py_ssize_t) nogil,
                 dtype_t[:, ::1] image,
                 char[:, ::1] selem,
                 char[:, ::1] mask,
@@ -52,9 +171,49 @@ cdef void _core(double kernel(Py_ssize_t*, double, dtype_t,
                 char shift_x, char shift_y,
                 double p0, double p1,
                 Py_ssize_t s0, Py_ssize_t s1,
-                Py_ssize_t max_bin) except *:
+                Py_ssize_t max_bin,
+                Py_ssize_t r_start, Py_ssize_t r_stop) except *:
     """Compute histogram for each pixel neighborhood, apply kernel function and
     use kernel function return value for output image.
+
+    See `_core_multi` for the meaning of `r_start` and `r_stop`.
+    """
+
+    cdef double (*kernels[1])(Py_ssize_t*, double, dtype_t,
+                              Py_ssize_t, Py_ssize_t, double,
+                              double, Py_ssize_t, Py_ssize_t) nogil
+    kernels[0] = kernel
+
+    cdef dtype_t_out[:, :, ::1] out_3d = \
+        np.asarray(out).reshape(out.shape[0], out.shape[1], 1)
+
+    _core_multi(kernels, 1, image, selem, mask, out_3d, shift_x, shift_y,
+                p0, p1, s0, s1, max_bin, r_start, r_stop)
+
+
+cdef void _core_multi(double (**kernels)(Py_ssize_t*, double, dtype_t,
+                                         Py_ssize_t, Py_ssize_t, double,
+                                         double, Py_ssize_t,
+                                         Py_ssize_t) nogil,
+                      Py_ssize_t n_kernels,
+                      dtype_t[:, ::1] image,
+                      char[:, ::1] selem,
+                      char[:, ::1] mask,
+                      dtype_t_out[:, :, ::1] out,
+                      char shift_x, char shift_y,
+                      double p0, double p1,
+                      Py_ssize_t s0, Py_ssize_t s1,
+                      Py_ssize_t max_bin,
+                      Py_ssize_t r_start, Py_ssize_t r_stop) except *:
+    """Compute histogram for each pixel neighborhood, apply all kernel
+    functions to the same histogram and store the return value of the k-th
+    kernel in ``out[..., k]``.
+
+    Only the output rows ``r_start <= r < r_stop`` are computed, the pixels of
+    the neighborhood are still read from the complete image. Output rows are
+    thereby independent from each other and disjoint row bands can be
+    processed concurrently. The sliding histogram is updated without holding
+    the GIL.
     """
 
     cdef Py_ssize_t rows = image.shape[0]
@@ -70,6 +229,10 @@ cdef void _core(double kernel(Py_ssize_t*, double, dtype_t,
     assert centre_c >= 0
     assert centre_r < srows
     assert centre_c < scols
+    assert 0 <= r_start <= r_stop <= rows
+
+    if r_start == r_stop:
+        return
 
     # add 1 to ensure maximum value is included in histogram -> range(max_bin)
     max_bin += 1
@@ -85,9 +248,13 @@ cdef void _core(double kernel(Py_ssize_t*, double, dtype_t,
     # number of pixels actually inside the neighborhood (double)
     cdef double pop = 0
 
-    # the current local histogram distribution
-    cdef Py_ssize_t* histo = <Py_ssize_t*>malloc(max_bin * sizeof(Py_ssize_t))
-    for i in range(max_bin):
+    # the current local histogram distribution: `max_bin` fine bins followed
+    # by the coarse bins, each summing `2 ** shift` consecutive fine bins
+    cdef Py_ssize_t shift = _coarse_shift(max_bin)
+    cdef Py_ssize_t n_bins = max_bin + _coarse_bins(max_bin)
+    cdef Py_ssize_t* histo = <Py_ssize_t*>malloc(n_bins * sizeof(Py_ssize_t))
+    cdef Py_ssize_t* coarse = histo + max_bin
+    for i in range(n_bins):
         histo[i] = 0
 
     # these lists contain the relative pixel row and column for each of the 4
@@ -141,96 +308,105 @@ cdef void _core(double kernel(Py_ssize_t*, double, dtype_t,
                 se_s_c[num_se_s] = c - centre_c
                 num_se_s += 1
 
-    for r in range(srows):
-        for c in range(scols):
-            rr = r - centre_r
-            cc = c - centre_c
-            if selem[r, c]:
-                if is_in_mask(rows, cols, rr, cc, mask_data):
-                    histogram_increment(histo, &pop, image[rr, cc])
-
-    r = 0
-    c = 0
-    out[r, c] = <dtype_t_out>kernel(histo, pop, image[r, c], max_bin, mid_bin,
-                                    p0, p1, s0, s1)
-
-    # main loop
-    r = 0
-    for even_row in range(0, rows, 2):
-
-        # ---> west to east
-        for c in range(1, cols):
-            for s in range(num_se_e):
-                rr = r + se_e_r[s]
-                cc = c + se_e_c[s]
+    with nogil:
+        for r in range(srows):
+            for c in range(scols):
+                rr = r_start + r - centre_r
+                cc = c - centre_c
+                if selem[r, c]:
+                    if is_in_mask(rows, cols, rr, cc, mask_data):
+                        histogram_increment(histo, coarse, shift, &pop,
+                                            image[rr, cc])
+
+        r = r_start
+        c = 0
+        _evaluate(kernels, n_kernels, &out[r, c, 0], histo, pop,
+                  image[r, c], max_bin, mid_bin, p0, p1, s0, s1)
+
+        # main loop
+        for even_row in range(r_start, r_stop, 2):
+
+            # ---> west to east
+            for c in range(1, cols):
+                for s in range(num_se_e):
+                    rr = r + se_e_r[s]
+                    cc = c + se_e_c[s]
+                    if is_in_mask(rows, cols, rr, cc, mask_data):
+                        histogram_increment(histo, coarse, shift, &pop,
+                                            image[rr, cc])
+
+                for s in range(num_se_w):
+                    rr = r + se_w_r[s]
+                    cc = c + se_w_c[s] - 1
+                    if is_in_mask(rows, cols, rr, cc, mask_data):
+                        histogram_decrement(histo, coarse, shift, &pop,
+                                            image[rr, cc])
+
+                _evaluate(kernels, n_kernels, &out[r, c, 0], histo, pop,
+                          image[r, c], max_bin, mid_bin, p0, p1, s0, s1)
+
+            r += 1  # pass to the next row
+            if r >= r_stop:
+                break
+
+            # ---> north to south
+            for s in range(num_se_s):
+                rr = r + se_s_r[s]
+                cc = c + se_s_c[s]
                 if is_in_mask(rows, cols, rr, cc, mask_data):
-                    histogram_increment(histo, &pop, image[rr, cc])
+                    histogram_increment(histo, coarse, shift, &pop,
+                                        image[rr, cc])
 
-            for s in range(num_se_w):
-                rr = r + se_w_r[s]
-                cc = c + se_w_c[s] - 1
+            for s in range(num_se_n):
+                rr = r + se_n_r[s] - 1
+                cc = c + se_n_c[s]
                 if is_in_mask(rows, cols, rr, cc, mask_data):
-                    histogram_decrement(histo, &pop, image[rr, cc])
-
-            out[r, c] = <dtype_t_out>kernel(histo, pop, image[r, c],
-                                            max_bin, mid_bin, p0, p1, s0, s1)
-
-        r += 1  # pass to the next row
-        if r >= rows:
-            break
-
-        # ---> north to south
-        for s in range(num_se_s):
-            rr = r + se_s_r[s]
-            cc = c + se_s_c[s]
-            if is_in_mask(rows, cols, rr, cc, mask_data):
-                histogram_increment(histo, &pop, image[rr, cc])
-
-        for s in range(num_se_n):
-            rr = r + se_n_r[s] - 1
-            cc = c + se_n_c[s]
-            if is_in_mask(rows, cols, rr, cc, mask_data):
-                histogram_decrement(histo, &pop, image[rr, cc])
-
-        out[r, c] = <dtype_t_out>kernel(histo, pop, image[r, c],
-                                        max_bin, mid_bin, p0, p1, s0, s1)
-
-        # ---> east to west
-        for c in range(cols - 2, -1, -1):
-            for s in range(num_se_w):
-                rr = r + se_w_r[s]
-                cc = c + se_w_c[s]
+                    histogram_decrement(histo, coarse, shift, &pop,
+                                        image[rr, cc])
+
+            _evaluate(kernels, n_kernels, &out[r, c, 0], histo, pop,
+                      image[r, c], max_bin, mid_bin, p0, p1, s0, s1)
+
+            # ---> east to west
+            for c in range(cols - 2, -1, -1):
+                for s in range(num_se_w):
+                    rr = r + se_w_r[s]
+                    cc = c + se_w_c[s]
+                    if is_in_mask(rows, cols, rr, cc, mask_data):
+                        histogram_increment(histo, coarse, shift, &pop,
+                                            image[rr, cc])
+
+                for s in range(num_se_e):
+                    rr = r + se_e_r[s]
+                    cc = c + se_e_c[s] + 1
+                    if is_in_mask(rows, cols, rr, cc, mask_data):
+                        histogram_decrement(histo, coarse, shift, &pop,
+                                            image[rr, cc])
+
+                _evaluate(kernels, n_kernels, &out[r, c, 0], histo, pop,
+                          image[r, c], max_bin, mid_bin, p0, p1, s0, s1)
+
+            r += 1  # pass to the next row
+            if r >= r_stop:
+                break
+
+            # ---> north to south
+            for s in range(num_se_s):
+                rr = r + se_s_r[s]
+                cc = c + se_s_c[s]
                 if is_in_mask(rows, cols, rr, cc, mask_data):
-                    histogram_increment(histo, &pop, image[rr, cc])
+                    histogram_increment(histo, coarse, shift, &pop,
+                                        image[rr, cc])
 
-            for s in range(num_se_e):
-                rr = r + se_e_r[s]
-                cc = c + se_e_c[s] + 1
+            for s in range(num_se_n):
+                rr = r + se_n_r[s] - 1
+                cc = c + se_n_c[s]
                 if is_in_mask(rows, cols, rr, cc, mask_data):
-                    histogram_decrement(histo, &pop, image[rr, cc])
-
-            out[r, c] = <dtype_t_out>kernel(histo, pop, image[r, c],
-                                            max_bin, mid_bin, p0, p1, s0, s1)
-
-        r += 1  # pass to the next row
-        if r >= rows:
-            break
+                    histogram_decrement(histo, coarse, shift, &pop,
+                                        image[rr, cc])
 
-        # ---> north to south
-        for s in range(num_se_s):
-            rr = r + se_s_r[s]
-            cc = c + se_s_c[s]
-            if is_in_mask(rows, cols, rr, cc, mask_data):
-                histogram_increment(histo, &pop, image[rr, cc])
-
-        for s in range(num_se_n):
-            rr = r + se_n_r[s] - 1
-            cc = c + se_n_c[s]
-            if is_in_mask(rows, cols, rr, cc, mask_data):
-                histogram_decrement(histo, &pop, image[rr, cc])
-
-        out[r, c] = <dtype_t_out>kernel(histo, pop, image[r, c],
-                                        max_bin, mid_bin, p0, p1, s0, s1)
+            _evaluate(kernels, n_kernels, &out[r, c, 0], histo, pop,
+                      image[r, c], max_bin, mid_bin, p0, p1, s0, s1)
 
     # release memory allocated by malloc
     free(se_e_r)
@@ -19,16 +19,31 @@ References
 import warnings
 import numpy as np
 from skimage import img_as_ubyte
+from skimage._shared.utils import run_in_bands
 
 from . import generic_cy
 
 
 __all__ = ['autolevel', 'bottomhat', 'equalize', 'gradient', 'maximum', 'mean',
            'subtract_mean', 'median', 'minimum', 'modal', 'enhance_contrast',
-           'pop', 'threshold', 'tophat', 'noise_filter', 'entropy', 'otsu']
+           'pop', 'threshold', 'tophat', 'noise_filter', 'entropy', 'otsu',
+           'multi']
 
 
-def _handle_input(image, selem, out, mask, out_dtype=None):
+# filters that can share a local histogram in `multi`
+_MULTI_OPS = ('autolevel', 'bottomhat', 'equalize', 'gradient', 'maximum',
+              'mean', 'subtract_mean', 'median', 'minimum', 'modal',
+              'enhance_contrast', 'pop', 'threshold', 'tophat', 'entropy',
+              'otsu')
+
+# filters which search the two-level histogram instead of visiting every bin,
+# so that their speed hardly depends on the bit depth
+_SEARCH_OPS = ('autolevel', 'bottomhat', 'gradient', 'maximum', 'median',
+               'minimum', 'enhance_contrast', 'pop', 'tophat')
+
+
+def _handle_input(image, selem, out, mask, out_dtype=None, pixel_size=None,
+                  all_bins=True):
 
     if image.dtype not in (np.uint8, np.uint16):
         image = img_as_ubyte(image)
@@ -45,7 +60,10 @@ def _handle_input(image, selem, out, mask, out_dtype=None):
     if out is None:
         if out_dtype is None:
             out_dtype = image.dtype
-        out = np.empty_like(image, dtype=out_dtype)
+        if pixel_size is None:
+            out = np.empty_like(image, dtype=out_dtype)
+        else:
+            out = np.empty(image.shape + (pixel_size, ), dtype=out_dtype)
 
     if image is out:
         raise NotImplementedError("Cannot perform rank operation in place.")
@@ -58,25 +76,31 @@ def _handle_input(image, selem, out, mask, out_dtype=None):
         max_bin = max(4, image.max())
 
     bitdepth = int(np.log2(max_bin))
-    if bitdepth > 10:
-        warnings.warn("Bitdepth of %d may result in bad rank filter "
-                      "performance due to large number of bins." % bitdepth)
+    if all_bins and bitdepth > 10:
+        warnings.warn("Bitdepth of %d may result in bad performance of rank "
+                      "filters which visit every histogram bin." % bitdepth)
 
     return image, selem, out, mask, max_bin
 
 
-def _apply(func, image, selem, out, mask, shift_x, shift_y, out_dtype=None):
+def _apply(func, image, selem, out, mask, shift_x, shift_y, out_dtype=None,
+           n_jobs=1):
+
+    image, selem, out, mask, max_bin = _handle_input(
+        image, selem, out, mask, out_dtype,
+        all_bins=func.__name__[1:] not in _SEARCH_OPS)
 
-    image, selem, out, mask, max_bin = _handle_input(image, selem, out, mask,
-                                                     out_dtype)
+    def band(r_start, r_stop):
+        func(image, selem, shift_x=shift_x, shift_y=shift_y, mask=mask,
+             out=out, max_bin=max_bin, r_start=r_start, r_stop=r_stop)
 
-    func(image, selem, shift_x=shift_x, shift_y=shift_y, mask=mask,
-         out=out, max_bin=max_bin)
+    run_in_bands(band, image.shape[0], n_jobs)
 
     return out
 
 
-def autolevel(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def autolevel(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+              n_jobs=1):
     """Autolevel image using local histogram.
 
     Parameters
@@ -94,6 +118,9 @@ def autolevel(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -113,10 +140,12 @@ def autolevel(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
     """
 
     return _apply(generic_cy._autolevel, image, selem,
-                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y,
+                  n_jobs=n_jobs)
 
 
-def bottomhat(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def bottomhat(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+              n_jobs=1):
     """Returns greyscale local bottomhat of an image.
 
     Parameters
@@ -134,6 +163,9 @@ def bottomhat(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -143,10 +175,12 @@ def bottomhat(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
     """
 
     return _apply(generic_cy._bottomhat, image, selem,
-                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y,
+                  n_jobs=n_jobs)
 
 
-def equalize(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def equalize(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+             n_jobs=1):
     """Equalize image using local histogram.
 
     Parameters
@@ -164,6 +198,9 @@ def equalize(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -183,10 +220,12 @@ def equalize(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
     """
 
     return _apply(generic_cy._equalize, image, selem,
-                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y,
+                  n_jobs=n_jobs)
 
 
-def gradient(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def gradient(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+             n_jobs=1):
     """Return greyscale local gradient of an image (i.e. local maximum - local
     minimum).
 
@@ -206,6 +245,9 @@ def gradient(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -215,10 +257,12 @@ def gradient(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
     """
 
     return _apply(generic_cy._gradient, image, selem,
-                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y,
+                  n_jobs=n_jobs)
 
 
-def maximum(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def maximum(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+            n_jobs=1):
     """Return greyscale local maximum of an image.
 
 
@@ -237,6 +281,9 @@ def maximum(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -255,10 +302,12 @@ def maximum(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
     """
 
     return _apply(generic_cy._maximum, image, selem,
-                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y,
+                  n_jobs=n_jobs)
 
 
-def mean(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def mean(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+         n_jobs=1):
     """Return greyscale local mean of an image.
 
     Parameters
@@ -276,6 +325,9 @@ def mean(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -295,11 +347,11 @@ def mean(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
     """
 
     return _apply(generic_cy._mean, image, selem, out=out,
-                  mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  mask=mask, shift_x=shift_x, shift_y=shift_y, n_jobs=n_jobs)
 
 
 def subtract_mean(image, selem, out=None, mask=None, shift_x=False,
-                  shift_y=False):
+                  shift_y=False, n_jobs=1):
     """Return image subtracted from its local mean.
 
     Parameters
@@ -317,6 +369,9 @@ def subtract_mean(image, selem, out=None, mask=None, shift_x=False,
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -326,10 +381,12 @@ def subtract_mean(image, selem, out=None, mask=None, shift_x=False,
     """
 
     return _apply(generic_cy._subtract_mean, image, selem,
-                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y,
+                  n_jobs=n_jobs)
 
 
-def median(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def median(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+           n_jobs=1):
     """Return greyscale local median of an image.
 
     Parameters
@@ -347,6 +404,9 @@ def median(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -366,10 +426,12 @@ def median(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
     """
 
     return _apply(generic_cy._median, image, selem,
-                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y,
+                  n_jobs=n_jobs)
 
 
-def minimum(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def minimum(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+            n_jobs=1):
     """Return greyscale local minimum of an image.
 
     Parameters
@@ -387,6 +449,9 @@ def minimum(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -405,10 +470,12 @@ def minimum(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
     """
 
     return _apply(generic_cy._minimum, image, selem,
-                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y,
+                  n_jobs=n_jobs)
 
 
-def modal(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def modal(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+          n_jobs=1):
     """Return greyscale local mode of an image.
 
     Parameters
@@ -426,6 +493,9 @@ def modal(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -435,11 +505,12 @@ def modal(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
     """
 
     return _apply(generic_cy._modal, image, selem,
-                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y,
+                  n_jobs=n_jobs)
 
 
 def enhance_contrast(image, selem, out=None, mask=None, shift_x=False,
-                     shift_y=False):
+                     shift_y=False, n_jobs=1):
     """Enhance an image replacing each pixel by the local maximum if pixel
     greylevel is closest to maximimum than local minimum OR local minimum
     otherwise.
@@ -459,6 +530,9 @@ def enhance_contrast(image, selem, out=None, mask=None, shift_x=False,
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
         Output image.
@@ -478,10 +552,12 @@ def enhance_contrast(image, selem, out=None, mask=None, shift_x=False,
     """
 
     return _apply(generic_cy._enhance_contrast, image, selem,
-                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y,
+                  n_jobs=n_jobs)
 
 
-def pop(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def pop(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+        n_jobs=1):
     """Return the number (population) of pixels actually inside the
     neighborhood.
 
@@ -500,6 +576,9 @@ def pop(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -526,10 +605,11 @@ def pop(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
     """
 
     return _apply(generic_cy._pop, image, selem, out=out,
-                  mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  mask=mask, shift_x=shift_x, shift_y=shift_y, n_jobs=n_jobs)
 
 
-def threshold(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def threshold(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+              n_jobs=1):
     """Return greyscale local threshold of an image.
 
     Parameters
@@ -547,6 +627,9 @@ def threshold(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -573,10 +656,12 @@ def threshold(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
     """
 
     return _apply(generic_cy._threshold, image, selem,
-                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y,
+                  n_jobs=n_jobs)
 
 
-def tophat(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def tophat(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+           n_jobs=1):
     """Return greyscale local tophat of an image.
 
     Parameters
@@ -594,6 +679,9 @@ def tophat(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -603,11 +691,12 @@ def tophat(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
     """
 
     return _apply(generic_cy._tophat, image, selem,
-                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  out=out, mask=mask, shift_x=shift_x, shift_y=shift_y,
+                  n_jobs=n_jobs)
 
 
 def noise_filter(image, selem, out=None, mask=None, shift_x=False,
-                 shift_y=False):
+                 shift_y=False, n_jobs=1):
     """Returns the noise feature as described in [Hashimoto12]_
 
     Parameters
@@ -625,6 +714,9 @@ def noise_filter(image, selem, out=None, mask=None, shift_x=False,
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     References
     ----------
@@ -646,10 +738,11 @@ def noise_filter(image, selem, out=None, mask=None, shift_x=False,
     selem_cpy[centre_r, centre_c] = 0
 
     return _apply(generic_cy._noise_filter, image, selem_cpy, out=out,
-                  mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  mask=mask, shift_x=shift_x, shift_y=shift_y, n_jobs=n_jobs)
 
 
-def entropy(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def entropy(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+            n_jobs=1):
     """Returns the entropy [1]_ computed locally. Entropy is computed
     using base 2 logarithm i.e. the filter returns the minimum number of
     bits needed to encode local greylevel distribution.
@@ -669,6 +762,9 @@ def entropy(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -692,10 +788,11 @@ def entropy(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
 
     return _apply(generic_cy._entropy, image, selem,
                   out=out, mask=mask, shift_x=shift_x, shift_y=shift_y,
-                  out_dtype=np.double)
+                  out_dtype=np.double, n_jobs=n_jobs)
 
 
-def otsu(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
+def otsu(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
+         n_jobs=1):
     """Returns the Otsu's threshold value for each pixel.
 
     Parameters
@@ -713,6 +810,9 @@ def otsu(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
         Offset added to the structuring element center point. Shift is bounded
         to the structuring element sizes (center must be inside the given
         structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -737,4 +837,80 @@ def otsu(image, selem, out=None, mask=None, shift_x=False, shift_y=False):
     """
 
     return _apply(generic_cy._otsu, image, selem, out=out,
-                  mask=mask, shift_x=shift_x, shift_y=shift_y)
+                  mask=mask, shift_x=shift_x, shift_y=shift_y, n_jobs=n_jobs)
+
+
+def multi(image, selem, ops, out=None, mask=None, shift_x=False,
+          shift_y=False, n_jobs=1):
+    """Apply several rank filters in a single pass over the image.
+
+    The local histogram is built only once for each pixel neighborhood and
+    all requested filters are evaluated on it, which is considerably faster
+    than calling each filter separately with the same structuring element.
+
+    Parameters
+    ----------
+    image : ndarray (uint8, uint16)
+        Image array.
+    selem : ndarray
+        The neighborhood expressed as a 2-D array of 1's and 0's.
+    ops : sequence of str
+        Names of the rank filters to apply, e.g. ``['mean', 'entropy']``.
+        Supported are autolevel, bottomhat, equalize, gradient, maximum, mean,
+        subtract_mean, median, minimum, modal, enhance_contrast, pop,
+        threshold, tophat, entropy and otsu.
+    out : ndarray, shape (M, N, len(ops))
+        If None, a new array will be allocated.
+    mask : ndarray
+        Mask array that defines (>0) area of the image included in the local
+        neighborhood. If None, the complete image is used (default).
+    shift_x, shift_y : int
+        Offset added to the structuring element center point. Shift is bounded
+        to the structuring element sizes (center must be inside the given
+        structuring element).
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
+
+    Returns
+    -------
+    out : ndarray, shape (M, N, len(ops))
+        Output images stacked along the last axis, ``out[..., k]`` holds the
+        result of ``ops[k]``. The dtype is the one of the input image, or
+        double if ``'entropy'`` is requested (the other filters are then not
+        rounded to integers).
+
+    Examples
+    --------
+    >>> from skimage import data
+    >>> from skimage.morphology import disk
+    >>> from skimage.filter.rank import multi
+    >>> ima = data.camera()
+    >>> features = multi(ima, disk(5), ['minimum', 'maximum', 'mean'])
+    >>> features.shape
+    (512, 512, 3)
+
+    """
+
+    ops = list(ops)
+    for op in ops:
+        if op not in _MULTI_OPS:
+            raise ValueError("Unsupported rank filter: %r" % (op, ))
+
+    out_dtype = np.double if 'entropy' in ops else None
+    image, selem, out, mask, max_bin = _handle_input(
+        image, selem, out, mask, out_dtype, len(ops),
+        all_bins=any(op not in _SEARCH_OPS for op in ops))
+
+    if out.shape != image.shape + (len(ops), ):
+        raise ValueError("Output array must have shape %s." %
+                         (image.shape + (len(ops), ), ))
+
+    def band(r_start, r_stop):
+        generic_cy._multi(image, selem, shift_x=shift_x, shift_y=shift_y,
+                          mask=mask, out=out, max_bin=max_bin,
+                          r_start=r_start, r_stop=r_stop, ops=ops)
+
+    run_in_bands(band, image.shape[0], n_jobs)
+
+    return out
@@ -5,26 +5,22 @@
 
 cimport numpy as cnp
 from libc.math cimport log
+from libc.stdlib cimport malloc, free
 
-from .core_cy cimport dtype_t, dtype_t_out, _core
+from .core_cy cimport (dtype_t, dtype_t_out, _core, _core_multi,
+                       _histogram_rank, _histogram_min, _histogram_max)
 
 
 cdef inline double _kernel_autolevel(Py_ssize_t* histo, double pop, dtype_t g,
                                      Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                      double p0, double p1,
-                                     Py_ssize_t s0, Py_ssize_t s1):
+                                     Py_ssize_t s0, Py_ssize_t s1) nogil:
 
-    cdef Py_ssize_t i, imin, imax, delta
+    cdef Py_ssize_t imin, imax, delta
 
     if pop:
-        for i in range(max_bin - 1, -1, -1):
-            if histo[i]:
-                imax = i
-                break
-        for i in range(max_bin):
-            if histo[i]:
-                imin = i
-                break
+        imin = _histogram_min(histo, max_bin)
+        imax = _histogram_max(histo, max_bin)
         delta = imax - imin
         if delta > 0:
             return <double>(max_bin - 1) * (g - imin) / delta
@@ -37,15 +33,10 @@ cdef inline double _kernel_autolevel(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_bottomhat(Py_ssize_t* histo, double pop, dtype_t g,
                                      Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                      double p0, double p1,
-                                     Py_ssize_t s0, Py_ssize_t s1):
-
-    cdef Py_ssize_t i
+                                     Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     if pop:
-        for i in range(max_bin):
-            if histo[i]:
-                break
-        return g - i
+        return g - _histogram_min(histo, max_bin)
     else:
         return 0
 
@@ -53,7 +44,7 @@ cdef inline double _kernel_bottomhat(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_equalize(Py_ssize_t* histo, double pop, dtype_t g,
                                     Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                     double p0, double p1,
-                                    Py_ssize_t s0, Py_ssize_t s1):
+                                    Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     cdef Py_ssize_t i
     cdef Py_ssize_t sum = 0
@@ -71,19 +62,13 @@ cdef inline double _kernel_equalize(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_gradient(Py_ssize_t* histo, double pop, dtype_t g,
                                     Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                     double p0, double p1,
-                                    Py_ssize_t s0, Py_ssize_t s1):
+                                    Py_ssize_t s0, Py_ssize_t s1) nogil:
 
-    cdef Py_ssize_t i, imin, imax
+    cdef Py_ssize_t imin, imax
 
     if pop:
-        for i in range(max_bin - 1, -1, -1):
-            if histo[i]:
-                imax = i
-                break
-        for i in range(max_bin):
-            if histo[i]:
-                imin = i
-                break
+        imin = _histogram_min(histo, max_bin)
+        imax = _histogram_max(histo, max_bin)
         return imax - imin
     else:
         return 0
@@ -92,14 +77,10 @@ cdef inline double _kernel_gradient(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_maximum(Py_ssize_t* histo, double pop, dtype_t g,
                                    Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                    double p0, double p1,
-                                   Py_ssize_t s0, Py_ssize_t s1):
-
-    cdef Py_ssize_t i
+                                   Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     if pop:
-        for i in range(max_bin - 1, -1, -1):
-            if histo[i]:
-                return i
+        return _histogram_max(histo, max_bin)
     else:
         return 0
 
@@ -107,7 +88,7 @@ cdef inline double _kernel_maximum(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_mean(Py_ssize_t* histo, double pop,dtype_t g,
                                 Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                 double p0, double p1,
-                                Py_ssize_t s0, Py_ssize_t s1):
+                                Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     cdef Py_ssize_t i
     cdef Py_ssize_t mean = 0
@@ -125,7 +106,7 @@ cdef inline double _kernel_subtract_mean(Py_ssize_t* histo, double pop,
                                          Py_ssize_t max_bin,
                                          Py_ssize_t mid_bin, double p0,
                                          double p1, Py_ssize_t s0,
-                                         Py_ssize_t s1):
+                                         Py_ssize_t s1) nogil:
 
     cdef Py_ssize_t i
     cdef Py_ssize_t mean = 0
@@ -141,17 +122,10 @@ cdef inline double _kernel_subtract_mean(Py_ssize_t* histo, double pop,
 cdef inline double _kernel_median(Py_ssize_t* histo, double pop, dtype_t g,
                                   Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                   double p0, double p1,
-                                  Py_ssize_t s0, Py_ssize_t s1):
-
-    cdef Py_ssize_t i
-    cdef double sum = pop / 2.0
+                                  Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     if pop:
-        for i in range(max_bin):
-            if histo[i]:
-                sum -= histo[i]
-                if sum < 0:
-                    return i
+        return _histogram_rank(histo, max_bin, pop / 2.0, 0)
     else:
         return 0
 
@@ -159,14 +133,10 @@ cdef inline double _kernel_median(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_minimum(Py_ssize_t* histo, double pop, dtype_t g,
                                    Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                    double p0, double p1,
-                                   Py_ssize_t s0, Py_ssize_t s1):
-
-    cdef Py_ssize_t i
+                                   Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     if pop:
-        for i in range(max_bin):
-            if histo[i]:
-                return i
+        return _histogram_min(histo, max_bin)
     else:
         return 0
 
@@ -174,7 +144,7 @@ cdef inline double _kernel_minimum(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_modal(Py_ssize_t* histo, double pop, dtype_t g,
                                  Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                  double p0, double p1,
-                                 Py_ssize_t s0, Py_ssize_t s1):
+                                 Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     cdef Py_ssize_t hmax = 0, imax = 0
 
@@ -193,19 +163,13 @@ cdef inline double _kernel_enhance_contrast(Py_ssize_t* histo, double pop,
                                             Py_ssize_t max_bin,
                                             Py_ssize_t mid_bin, double p0,
                                             double p1, Py_ssize_t s0,
-                                            Py_ssize_t s1):
+                                            Py_ssize_t s1) nogil:
 
-    cdef Py_ssize_t i, imin, imax
+    cdef Py_ssize_t imin, imax
 
     if pop:
-        for i in range(max_bin - 1, -1, -1):
-            if histo[i]:
-                imax = i
-                break
-        for i in range(max_bin):
-            if histo[i]:
-                imin = i
-                break
+        imin = _histogram_min(histo, max_bin)
+        imax = _histogram_max(histo, max_bin)
         if imax - g < g - imin:
             return imax
         else:
@@ -217,7 +181,7 @@ cdef inline double _kernel_enhance_contrast(Py_ssize_t* histo, double pop,
 cdef inline double _kernel_pop(Py_ssize_t* histo, double pop, dtype_t g,
                                Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                double p0, double p1,
-                               Py_ssize_t s0, Py_ssize_t s1):
+                               Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     return pop
 
@@ -225,7 +189,7 @@ cdef inline double _kernel_pop(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_threshold(Py_ssize_t* histo, double pop, dtype_t g,
                                      Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                      double p0, double p1,
-                                     Py_ssize_t s0, Py_ssize_t s1):
+                                     Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     cdef Py_ssize_t i
     cdef Py_ssize_t mean = 0
@@ -241,15 +205,10 @@ cdef inline double _kernel_threshold(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_tophat(Py_ssize_t* histo, double pop, dtype_t g,
                                   Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                   double p0, double p1,
-                                  Py_ssize_t s0, Py_ssize_t s1):
-
-    cdef Py_ssize_t i
+                                  Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     if pop:
-        for i in range(max_bin - 1, -1, -1):
-            if histo[i]:
-                break
-        return i - g
+        return _histogram_max(histo, max_bin) - g
     else:
         return 0
 
@@ -258,7 +217,7 @@ cdef inline double _kernel_noise_filter(Py_ssize_t* histo, double pop,
                                         dtype_t g, Py_ssize_t max_bin,
                                         Py_ssize_t mid_bin, double p0,
                                         double p1, Py_ssize_t s0,
-                                        Py_ssize_t s1):
+                                        Py_ssize_t s1) nogil:
 
     cdef Py_ssize_t i
     cdef Py_ssize_t min_i
@@ -283,7 +242,7 @@ cdef inline double _kernel_noise_filter(Py_ssize_t* histo, double pop,
 cdef inline double _kernel_entropy(Py_ssize_t* histo, double pop, dtype_t g,
                                    Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                    double p0, double p1,
-                                   Py_ssize_t s0, Py_ssize_t s1):
+                                   Py_ssize_t s0, Py_ssize_t s1) nogil:
     cdef Py_ssize_t i
     cdef double e, p
 
@@ -301,7 +260,7 @@ cdef inline double _kernel_entropy(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_otsu(Py_ssize_t* histo, double pop, dtype_t g,
                                 Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                 double p0, double p1,
-                                Py_ssize_t s0, Py_ssize_t s1):
+                                Py_ssize_t s0, Py_ssize_t s1) nogil:
     cdef Py_ssize_t i
     cdef Py_ssize_t max_i
     cdef double P, mu1, mu2, q1, new_q1, sigma_b, max_sigma_b
@@ -340,167 +299,244 @@ def _autolevel(dtype_t[:, ::1] image,
                char[:, ::1] selem,
                char[:, ::1] mask,
                dtype_t_out[:, ::1] out,
-               char shift_x, char shift_y, Py_ssize_t max_bin):
+               char shift_x, char shift_y, Py_ssize_t max_bin,
+               Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_autolevel[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _bottomhat(dtype_t[:, ::1] image,
                char[:, ::1] selem,
                char[:, ::1] mask,
                dtype_t_out[:, ::1] out,
-               char shift_x, char shift_y, Py_ssize_t max_bin):
+               char shift_x, char shift_y, Py_ssize_t max_bin,
+               Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_bottomhat[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _equalize(dtype_t[:, ::1] image,
               char[:, ::1] selem,
               char[:, ::1] mask,
               dtype_t_out[:, ::1] out,
-              char shift_x, char shift_y, Py_ssize_t max_bin):
+              char shift_x, char shift_y, Py_ssize_t max_bin,
+              Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_equalize[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _gradient(dtype_t[:, ::1] image,
               char[:, ::1] selem,
               char[:, ::1] mask,
               dtype_t_out[:, ::1] out,
-              char shift_x, char shift_y, Py_ssize_t max_bin):
+              char shift_x, char shift_y, Py_ssize_t max_bin,
+              Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_gradient[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _maximum(dtype_t[:, ::1] image,
              char[:, ::1] selem,
              char[:, ::1] mask,
              dtype_t_out[:, ::1] out,
-             char shift_x, char shift_y, Py_ssize_t max_bin):
+             char shift_x, char shift_y, Py_ssize_t max_bin,
+             Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_maximum[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _mean(dtype_t[:, ::1] image,
           char[:, ::1] selem,
           char[:, ::1] mask,
           dtype_t_out[:, ::1] out,
-          char shift_x, char shift_y, Py_ssize_t max_bin):
+          char shift_x, char shift_y, Py_ssize_t max_bin,
+          Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_mean[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _subtract_mean(dtype_t[:, ::1] image,
                    char[:, ::1] selem,
                    char[:, ::1] mask,
                    dtype_t_out[:, ::1] out,
-                   char shift_x, char shift_y, Py_ssize_t max_bin):
+                   char shift_x, char shift_y, Py_ssize_t max_bin,
+                   Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_subtract_mean[dtype_t], image, selem, mask,
-          out, shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          out, shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _median(dtype_t[:, ::1] image,
             char[:, ::1] selem,
             char[:, ::1] mask,
             dtype_t_out[:, ::1] out,
-            char shift_x, char shift_y, Py_ssize_t max_bin):
+            char shift_x, char shift_y, Py_ssize_t max_bin,
+            Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_median[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _minimum(dtype_t[:, ::1] image,
              char[:, ::1] selem,
              char[:, ::1] mask,
              dtype_t_out[:, ::1] out,
-             char shift_x, char shift_y, Py_ssize_t max_bin):
+             char shift_x, char shift_y, Py_ssize_t max_bin,
+             Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_minimum[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _enhance_contrast(dtype_t[:, ::1] image,
                       char[:, ::1] selem,
                       char[:, ::1] mask,
                       dtype_t_out[:, ::1] out,
-                      char shift_x, char shift_y, Py_ssize_t max_bin):
+                      char shift_x, char shift_y, Py_ssize_t max_bin,
+                      Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_enhance_contrast[dtype_t], image, selem, mask,
-          out, shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          out, shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _modal(dtype_t[:, ::1] image,
            char[:, ::1] selem,
            char[:, ::1] mask,
            dtype_t_out[:, ::1] out,
-           char shift_x, char shift_y, Py_ssize_t max_bin):
+           char shift_x, char shift_y, Py_ssize_t max_bin,
+           Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_modal[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _pop(dtype_t[:, ::1] image,
          char[:, ::1] selem,
          char[:, ::1] mask,
          dtype_t_out[:, ::1] out,
-         char shift_x, char shift_y, Py_ssize_t max_bin):
+         char shift_x, char shift_y, Py_ssize_t max_bin,
+         Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_pop[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _threshold(dtype_t[:, ::1] image,
                char[:, ::1] selem,
                char[:, ::1] mask,
                dtype_t_out[:, ::1] out,
-               char shift_x, char shift_y, Py_ssize_t max_bin):
+               char shift_x, char shift_y, Py_ssize_t max_bin,
+               Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_threshold[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _tophat(dtype_t[:, ::1] image,
             char[:, ::1] selem,
             char[:, ::1] mask,
             dtype_t_out[:, ::1] out,
-            char shift_x, char shift_y, Py_ssize_t max_bin):
+            char shift_x, char shift_y, Py_ssize_t max_bin,
+            Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_tophat[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _noise_filter(dtype_t[:, ::1] image,
                   char[:, ::1] selem,
                   char[:, ::1] mask,
                   dtype_t_out[:, ::1] out,
-                  char shift_x, char shift_y, Py_ssize_t max_bin):
+                  char shift_x, char shift_y, Py_ssize_t max_bin,
+                  Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_noise_filter[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _entropy(dtype_t[:, ::1] image,
              char[:, ::1] selem,
              char[:, ::1] mask,
              dtype_t_out[:, ::1] out,
-             char shift_x, char shift_y, Py_ssize_t max_bin):
+             char shift_x, char shift_y, Py_ssize_t max_bin,
+             Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_entropy[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
 
 
 def _otsu(dtype_t[:, ::1] image,
           char[:, ::1] selem,
           char[:, ::1] mask,
           dtype_t_out[:, ::1] out,
-          char shift_x, char shift_y, Py_ssize_t max_bin):
+          char shift_x, char shift_y, Py_ssize_t max_bin,
+          Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_otsu[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, 0, 0, 0, 0, max_bin)
+          shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
+
+
+def _multi(dtype_t[:, ::1] image,
+           char[:, ::1] selem,
+           char[:, ::1] mask,
+           dtype_t_out[:, :, ::1] out,
+           char shift_x, char shift_y, Py_ssize_t max_bin,
+           Py_ssize_t r_start, Py_ssize_t r_stop, ops):
+
+    cdef Py_ssize_t k, n_kernels = len(ops)
+    cdef double (**kernels)(Py_ssize_t*, double, dtype_t,
+                            Py_ssize_t, Py_ssize_t, double,
+                            double, Py_ssize_t, Py_ssize_t) nogil
+    kernels = <double (**)(Py_ssize_t*, double, dtype_t,
+                           Py_ssize_t, Py_ssize_t, double,
+                           double, Py_ssize_t, Py_ssize_t) nogil> \
+        malloc(n_kernels * sizeof(void*))
+
+    try:
+        for k in range(n_kernels):
+            op = ops[k]
+            if op == 'autolevel':
+                kernels[k] = _kernel_autolevel[dtype_t]
+            elif op == 'bottomhat':
+                kernels[k] = _kernel_bottomhat[dtype_t]
+            elif op == 'equalize':
+                kernels[k] = _kernel_equalize[dtype_t]
+            elif op == 'gradient':
+                kernels[k] = _kernel_gradient[dtype_t]
+            elif op == 'maximum':
+                kernels[k] = _kernel_maximum[dtype_t]
+            elif op == 'mean':
+                kernels[k] = _kernel_mean[dtype_t]
+            elif op == 'subtract_mean':
+                kernels[k] = _kernel_subtract_mean[dtype_t]
+            elif op == 'median':
+                kernels[k] = _kernel_median[dtype_t]
+            elif op == 'minimum':
+                kernels[k] = _kernel_minimum[dtype_t]
+            elif op == 'modal':
+                kernels[k] = _kernel_modal[dtype_t]
+            elif op == 'enhance_contrast':
+                kernels[k] = _kernel_enhance_contrast[dtype_t]
+            elif op == 'pop':
+                kernels[k] = _kernel_pop[dtype_t]
+            elif op == 'threshold':
+                kernels[k] = _kernel_threshold[dtype_t]
+            elif op == 'tophat':
+                kernels[k] = _kernel_tophat[dtype_t]
+            elif op == 'entropy':
+                kernels[k] = _kernel_entropy[dtype_t]
+            elif op == 'otsu':
+                kernels[k] = _kernel_otsu[dtype_t]
+            else:
+                raise ValueError("Unsupported rank filter: %r" % (op, ))
+
+        _core_multi(kernels, n_kernels, image, selem, mask, out,
+                    shift_x, shift_y, 0, 0, 0, 0, max_bin, r_start, r_stop)
+    finally:
+        free(kernels)
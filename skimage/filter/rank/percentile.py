@@ -23,6 +23,7 @@ References
 """
 
 import numpy as np
+from skimage._shared.utils import run_in_bands
 
 from . import percentile_cy
 from .generic import _handle_input
@@ -34,20 +35,30 @@ __all__ = ['autolevel_percentile', 'gradient_percentile',
            'threshold_percentile']
 
 
+# filters which search the two-level histogram instead of visiting every bin
+_SEARCH_OPS = ('autolevel', 'gradient', 'enhance_contrast', 'percentile',
+               'threshold')
+
+
 def _apply(func, image, selem, out, mask, shift_x, shift_y, p0, p1,
-           out_dtype=None):
+           out_dtype=None, n_jobs=1):
+
+    image, selem, out, mask, max_bin = _handle_input(
+        image, selem, out, mask, out_dtype,
+        all_bins=func.__name__[1:] not in _SEARCH_OPS)
 
-    image, selem, out, mask, max_bin = _handle_input(image, selem, out, mask,
-                                                     out_dtype)
+    def band(r_start, r_stop):
+        func(image, selem, shift_x=shift_x, shift_y=shift_y, mask=mask,
+             out=out, max_bin=max_bin, p0=p0, p1=p1,
+             r_start=r_start, r_stop=r_stop)
 
-    func(image, selem, shift_x=shift_x, shift_y=shift_y, mask=mask,
-         out=out, max_bin=max_bin, p0=p0, p1=p1)
+    run_in_bands(band, image.shape[0], n_jobs)
 
     return out
 
 
 def autolevel_percentile(image, selem, out=None, mask=None, shift_x=False,
-                         shift_y=False, p0=0, p1=1):
+                         shift_y=False, p0=0, p1=1, n_jobs=1):
     """Return greyscale local autolevel of an image.
 
     Autolevel is computed on the given structuring element. Only levels between
@@ -71,6 +82,9 @@ def autolevel_percentile(image, selem, out=None, mask=None, shift_x=False,
     p0, p1 : float in [0, ..., 1]
         Define the [p0, p1] percentile interval to be considered for computing
         the value.
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -81,11 +95,11 @@ def autolevel_percentile(image, selem, out=None, mask=None, shift_x=False,
 
     return _apply(percentile_cy._autolevel,
                   image, selem, out=out, mask=mask, shift_x=shift_x,
-                  shift_y=shift_y, p0=p0, p1=p1)
+                  shift_y=shift_y, p0=p0, p1=p1, n_jobs=n_jobs)
 
 
 def gradient_percentile(image, selem, out=None, mask=None, shift_x=False,
-                        shift_y=False, p0=0, p1=1):
+                        shift_y=False, p0=0, p1=1, n_jobs=1):
     """Return greyscale local gradient of an image.
 
     gradient is computed on the given structuring element. Only
@@ -109,6 +123,9 @@ def gradient_percentile(image, selem, out=None, mask=None, shift_x=False,
     p0, p1 : float in [0, ..., 1]
         Define the [p0, p1] percentile interval to be considered for computing
         the value.
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -119,11 +136,11 @@ def gradient_percentile(image, selem, out=None, mask=None, shift_x=False,
 
     return _apply(percentile_cy._gradient,
                   image, selem, out=out, mask=mask, shift_x=shift_x,
-                  shift_y=shift_y, p0=p0, p1=p1)
+                  shift_y=shift_y, p0=p0, p1=p1, n_jobs=n_jobs)
 
 
 def mean_percentile(image, selem, out=None, mask=None, shift_x=False,
-                    shift_y=False, p0=0, p1=1):
+                    shift_y=False, p0=0, p1=1, n_jobs=1):
     """Return greyscale local mean of an image.
 
     Mean is computed on the given structuring element. Only levels between
@@ -147,6 +164,9 @@ def mean_percentile(image, selem, out=None, mask=None, shift_x=False,
     p0, p1 : float in [0, ..., 1]
         Define the [p0, p1] percentile interval to be considered for computing
         the value.
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -157,11 +177,12 @@ def mean_percentile(image, selem, out=None, mask=None, shift_x=False,
 
     return _apply(percentile_cy._mean,
                   image, selem, out=out, mask=mask, shift_x=shift_x,
-                  shift_y=shift_y, p0=p0, p1=p1)
+                  shift_y=shift_y, p0=p0, p1=p1, n_jobs=n_jobs)
 
 
 def subtract_mean_percentile(image, selem, out=None, mask=None,
-                             shift_x=False, shift_y=False, p0=0, p1=1):
+                             shift_x=False, shift_y=False, p0=0, p1=1,
+                             n_jobs=1):
     """Return greyscale local subtract_mean of an image.
 
     subtract_mean is computed on the given structuring element. Only levels
@@ -185,6 +206,9 @@ def subtract_mean_percentile(image, selem, out=None, mask=None,
     p0, p1 : float in [0, ..., 1]
         Define the [p0, p1] percentile interval to be considered for computing
         the value.
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -195,11 +219,12 @@ def subtract_mean_percentile(image, selem, out=None, mask=None,
 
     return _apply(percentile_cy._subtract_mean,
                   image, selem, out=out, mask=mask, shift_x=shift_x,
-                  shift_y=shift_y, p0=p0, p1=p1)
+                  shift_y=shift_y, p0=p0, p1=p1, n_jobs=n_jobs)
 
 
 def enhance_contrast_percentile(image, selem, out=None, mask=None,
-                                shift_x=False, shift_y=False, p0=0, p1=1):
+                                shift_x=False, shift_y=False, p0=0, p1=1,
+                                n_jobs=1):
     """Return greyscale local enhance_contrast of an image.
 
     enhance_contrast is computed on the given structuring element. Only levels
@@ -223,6 +248,9 @@ def enhance_contrast_percentile(image, selem, out=None, mask=None,
     p0, p1 : float in [0, ..., 1]
         Define the [p0, p1] percentile interval to be considered for computing
         the value.
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -233,11 +261,11 @@ def enhance_contrast_percentile(image, selem, out=None, mask=None,
 
     return _apply(percentile_cy._enhance_contrast,
                   image, selem, out=out, mask=mask, shift_x=shift_x,
-                  shift_y=shift_y, p0=p0, p1=p1)
+                  shift_y=shift_y, p0=p0, p1=p1, n_jobs=n_jobs)
 
 
 def percentile(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
-               p0=0):
+               p0=0, n_jobs=1):
     """Return greyscale local percentile of an image.
 
     percentile is computed on the given structuring element. Returns the value
@@ -260,6 +288,9 @@ def percentile(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
         structuring element).
     p0 : float in [0, ..., 1]
         Set the percentile value.
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -270,11 +301,11 @@ def percentile(image, selem, out=None, mask=None, shift_x=False, shift_y=False,
 
     return _apply(percentile_cy._percentile,
                   image, selem, out=out, mask=mask, shift_x=shift_x,
-                  shift_y=shift_y, p0=p0, p1=0.)
+                  shift_y=shift_y, p0=p0, p1=0., n_jobs=n_jobs)
 
 
 def pop_percentile(image, selem, out=None, mask=None, shift_x=False,
-                   shift_y=False, p0=0, p1=1):
+                   shift_y=False, p0=0, p1=1, n_jobs=1):
     """Return greyscale local pop of an image.
 
     pop is computed on the given structuring element. Only levels between
@@ -298,6 +329,9 @@ def pop_percentile(image, selem, out=None, mask=None, shift_x=False,
     p0, p1 : float in [0, ..., 1]
         Define the [p0, p1] percentile interval to be considered for computing
         the value.
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -308,11 +342,11 @@ def pop_percentile(image, selem, out=None, mask=None, shift_x=False,
 
     return _apply(percentile_cy._pop,
                   image, selem, out=out, mask=mask, shift_x=shift_x,
-                  shift_y=shift_y, p0=p0, p1=p1)
+                  shift_y=shift_y, p0=p0, p1=p1, n_jobs=n_jobs)
 
 
 def threshold_percentile(image, selem, out=None, mask=None, shift_x=False,
-                         shift_y=False, p0=0):
+                         shift_y=False, p0=0, n_jobs=1):
     """Return greyscale local threshold of an image.
 
     threshold is computed on the given structuring element. Returns
@@ -337,9 +371,12 @@ def threshold_percentile(image, selem, out=None, mask=None, shift_x=False,
         structuring element).
     p0 : float in [0, ..., 1]
         Set the percentile value.
+    n_jobs : int, optional
+        Number of threads, each filtering one horizontal band of the
+        image. If smaller than 1, all available CPU cores are used.
 
-        out : ndarray (same dtype as input image)
-        Output image.
+    Returns
+    -------
     local threshold : ndarray (same dtype as input)
         The result of the local threshold.
 
@@ -347,4 +384,4 @@ def threshold_percentile(image, selem, out=None, mask=None, shift_x=False,
 
     return _apply(percentile_cy._threshold,
                   image, selem, out=out, mask=mask, shift_x=shift_x,
-                  shift_y=shift_y, p0=p0, p1=0)
+                  shift_y=shift_y, p0=p0, p1=0, n_jobs=n_jobs)
@@ -4,30 +4,20 @@
 #cython: wraparound=False
 
 cimport numpy as cnp
-from .core_cy cimport dtype_t, dtype_t_out, _core, _min, _max
+from .core_cy cimport (dtype_t, dtype_t_out, _core, _min, _max,
+                       _histogram_rank, _histogram_rank_top, _histogram_max)
 
 
 cdef inline double _kernel_autolevel(Py_ssize_t* histo, double pop, dtype_t g,
                                      Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                      double p0, double p1,
-                                     Py_ssize_t s0, Py_ssize_t s1):
+                                     Py_ssize_t s0, Py_ssize_t s1) nogil:
 
-    cdef Py_ssize_t i, imin, imax, sum, delta
+    cdef Py_ssize_t imin, imax, delta
 
     if pop:
-        sum = 0
-        p1 = 1.0 - p1
-        for i in range(max_bin):
-            sum += histo[i]
-            if sum > p0 * pop:
-                imin = i
-                break
-        sum = 0
-        for i in range(max_bin - 1, -1, -1):
-            sum += histo[i]
-            if sum > p1 * pop:
-                imax = i
-                break
+        imin = _histogram_rank(histo, max_bin, p0 * pop, 0)
+        imax = _histogram_rank_top(histo, max_bin, (1.0 - p1) * pop, 0)
 
         delta = imax - imin
         if delta > 0:
@@ -42,24 +32,13 @@ cdef inline double _kernel_autolevel(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_gradient(Py_ssize_t* histo, double pop, dtype_t g,
                                     Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                     double p0, double p1,
-                                    Py_ssize_t s0, Py_ssize_t s1):
+                                    Py_ssize_t s0, Py_ssize_t s1) nogil:
 
-    cdef Py_ssize_t i, imin, imax, sum, delta
+    cdef Py_ssize_t imin, imax, delta
 
     if pop:
-        sum = 0
-        p1 = 1.0 - p1
-        for i in range(max_bin):
-            sum += histo[i]
-            if sum >= p0 * pop:
-                imin = i
-                break
-        sum = 0
-        for i in range(max_bin - 1, -1, -1):
-            sum += histo[i]
-            if sum >= p1 * pop:
-                imax = i
-                break
+        imin = _histogram_rank(histo, max_bin, p0 * pop, 1)
+        imax = _histogram_rank_top(histo, max_bin, (1.0 - p1) * pop, 1)
 
         return imax - imin
     else:
@@ -69,7 +48,7 @@ cdef inline double _kernel_gradient(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_mean(Py_ssize_t* histo, double pop, dtype_t g,
                                 Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                 double p0, double p1,
-                                Py_ssize_t s0, Py_ssize_t s1):
+                                Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     cdef Py_ssize_t i, sum, mean, n
 
@@ -96,7 +75,7 @@ cdef inline double _kernel_subtract_mean(Py_ssize_t* histo, double pop,
                                          Py_ssize_t max_bin,
                                          Py_ssize_t mid_bin, double p0,
                                          double p1, Py_ssize_t s0,
-                                         Py_ssize_t s1):
+                                         Py_ssize_t s1) nogil:
 
     cdef Py_ssize_t i, sum, mean, n
 
@@ -122,24 +101,13 @@ cdef inline double _kernel_enhance_contrast(Py_ssize_t* histo, double pop,
                                             Py_ssize_t max_bin,
                                             Py_ssize_t mid_bin, double p0,
                                             double p1, Py_ssize_t s0,
-                                            Py_ssize_t s1):
+                                            Py_ssize_t s1) nogil:
 
-    cdef Py_ssize_t i, imin, imax, sum, delta
+    cdef Py_ssize_t imin, imax, delta
 
     if pop:
-        sum = 0
-        p1 = 1.0 - p1
-        for i in range(max_bin):
-            sum += histo[i]
-            if sum > p0 * pop:
-                imin = i
-                break
-        sum = 0
-        for i in range(max_bin - 1, -1, -1):
-            sum += histo[i]
-            if sum > p1 * pop:
-                imax = i
-                break
+        imin = _histogram_rank(histo, max_bin, p0 * pop, 0)
+        imax = _histogram_rank_top(histo, max_bin, (1.0 - p1) * pop, 0)
         if g > imax:
             return imax
         if g < imin:
@@ -155,22 +123,13 @@ cdef inline double _kernel_enhance_contrast(Py_ssize_t* histo, double pop,
 cdef inline double _kernel_percentile(Py_ssize_t* histo, double pop, dtype_t g,
                                       Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                       double p0, double p1,
-                                      Py_ssize_t s0, Py_ssize_t s1):
-
-    cdef Py_ssize_t i
-    cdef Py_ssize_t sum = 0
+                                      Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     if pop:
         if p0 == 1:  # make sure p0 = 1 returns the maximum filter
-            for i in range(max_bin - 1, -1, -1):
-                if histo[i]:
-                    break
+            return _histogram_max(histo, max_bin)
         else:
-            for i in range(max_bin):
-                sum += histo[i]
-                if sum > p0 * pop:
-                    break
-        return i
+            return _histogram_rank(histo, max_bin, p0 * pop, 0)
     else:
         return 0
 
@@ -178,7 +137,7 @@ cdef inline double _kernel_percentile(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_pop(Py_ssize_t* histo, double pop, dtype_t g,
                                Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                double p0, double p1,
-                               Py_ssize_t s0, Py_ssize_t s1):
+                               Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     cdef Py_ssize_t i, sum, n
 
@@ -197,18 +156,11 @@ cdef inline double _kernel_pop(Py_ssize_t* histo, double pop, dtype_t g,
 cdef inline double _kernel_threshold(Py_ssize_t* histo, double pop, dtype_t g,
                                      Py_ssize_t max_bin, Py_ssize_t mid_bin,
                                      double p0, double p1,
-                                     Py_ssize_t s0, Py_ssize_t s1):
-
-    cdef int i
-    cdef Py_ssize_t sum = 0
+                                     Py_ssize_t s0, Py_ssize_t s1) nogil:
 
     if pop:
-        for i in range(max_bin):
-            sum += histo[i]
-            if sum >= p0 * pop:
-                break
-
-        return (max_bin - 1) * (g >= i)
+        return (max_bin - 1) * (g >= _histogram_rank(histo, max_bin,
+                                                    p0 * pop, 1))
     else:
         return 0
 
@@ -218,10 +170,10 @@ def _autolevel(dtype_t[:, ::1] image,
                char[:, ::1] mask,
                dtype_t_out[:, ::1] out,
                char shift_x, char shift_y, double p0, double p1,
-               Py_ssize_t max_bin):
+               Py_ssize_t max_bin, Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_autolevel[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, p0, p1, 0, 0, max_bin)
+          shift_x, shift_y, p0, p1, 0, 0, max_bin, r_start, r_stop)
 
 
 def _gradient(dtype_t[:, ::1] image,
@@ -229,10 +181,10 @@ def _gradient(dtype_t[:, ::1] image,
               char[:, ::1] mask,
               dtype_t_out[:, ::1] out,
               char shift_x, char shift_y, double p0, double p1,
-              Py_ssize_t max_bin):
+              Py_ssize_t max_bin, Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_gradient[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, p0, p1, 0, 0, max_bin)
+          shift_x, shift_y, p0, p1, 0, 0, max_bin, r_start, r_stop)
 
 
 def _mean(dtype_t[:, ::1] image,
@@ -240,10 +192,10 @@ def _mean(dtype_t[:, ::1] image,
           char[:, ::1] mask,
           dtype_t_out[:, ::1] out,
           char shift_x, char shift_y, double p0, double p1,
-          Py_ssize_t max_bin):
+          Py_ssize_t max_bin, Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_mean[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, p0, p1, 0, 0, max_bin)
+          shift_x, shift_y, p0, p1, 0, 0, max_bin, r_start, r_stop)
 
 
 def _subtract_mean(dtype_t[:, ::1] image,
@@ -251,10 +203,10 @@ def _subtract_mean(dtype_t[:, ::1] image,
                    char[:, ::1] mask,
                    dtype_t_out[:, ::1] out,
                    char shift_x, char shift_y, double p0, double p1,
-                   Py_ssize_t max_bin):
+                   Py_ssize_t max_bin, Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_subtract_mean[dtype_t], image, selem, mask,
-          out, shift_x, shift_y, p0, p1, 0, 0, max_bin)
+          out, shift_x, shift_y, p0, p1, 0, 0, max_bin, r_start, r_stop)
 
 
 def _enhance_contrast(dtype_t[:, ::1] image,
@@ -262,10 +214,10 @@ def _enhance_contrast(dtype_t[:, ::1] image,
                       char[:, ::1] mask,
                       dtype_t_out[:, ::1] out,
                       char shift_x, char shift_y, double p0, double p1,
-                      Py_ssize_t max_bin):
+                      Py_ssize_t max_bin, Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_enhance_contrast[dtype_t], image, selem, mask,
-          out, shift_x, shift_y, p0, p1, 0, 0, max_bin)
+          out, shift_x, shift_y, p0, p1, 0, 0, max_bin, r_start, r_stop)
 
 
 def _percentile(dtype_t[:, ::1] image,
@@ -273,10 +225,10 @@ def _percentile(dtype_t[:, ::1] image,
                 char[:, ::1] mask,
                 dtype_t_out[:, ::1] out,
                 char shift_x, char shift_y, double p0, double p1,
-                Py_ssize_t max_bin):
+                Py_ssize_t max_bin, Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_percentile[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, p0, 1, 0, 0, max_bin)
+          shift_x, shift_y, p0, 1, 0, 0, max_bin, r_start, r_stop)
 
 
 def _pop(dtype_t[:, ::1] image,
@@ -284,10 +236,10 @@ def _pop(dtype_t[:, ::1] image,
          char[:, ::1] mask,
          dtype_t_out[:, ::1] out,
          char shift_x, char shift_y, double p0, double p1,
-         Py_ssize_t max_bin):
+         Py_ssize_t max_bin, Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_pop[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, p0, p1, 0, 0, max_bin)
+          shift_x, shift_y, p0, p1, 0, 0, max_bin, r_start, r_stop)
 
 
 def _threshold(dtype_t[:, ::1] image,
@@ -295,7 +247,7 @@ def _threshold(dtype_t[:, ::1] image,
                char[:, ::1] mask,
                dtype_t_out[:, ::1] out,
                char shift_x, char shift_y, double p0, double p1,
-               Py_ssize_t max_bin):
+               Py_ssize_t max_bin, Py_ssize_t r_start, Py_ssize_t r_stop):
 
     _core(_kernel_threshold[dtype_t], image, selem, mask, out,
-          shift_x, shift_y, p0, 1, 0, 0, max_bin)
+          shift_x, shift_y, p0, 1, 0, 0, max_bin, r_start, r_stop)
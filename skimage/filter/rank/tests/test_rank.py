@@ -1,5 +1,8 @@
+import warnings
+
 import numpy as np
-from numpy.testing import run_module_suite, assert_array_equal, assert_raises
+from numpy.testing import (run_module_suite, assert_array_equal, assert_equal,
+                           assert_raises)
 
 from skimage import img_as_ubyte, img_as_uint, img_as_float
 from skimage import data, util
@@ -138,6 +141,21 @@ def test_pass_on_bitdepth():
     out = np.empty_like(image)
     mask = np.ones(image.shape, dtype=np.uint8)
 
+    # searching the histogram is fast for any bit depth
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        rank.median(image, elem, out=out, mask=mask)
+        rank.minimum(image, elem, out=out, mask=mask)
+        rank.percentile(image, elem, out=out, mask=mask, p0=.3)
+    assert_equal(len(w), 0)
+
+    # filters which visit every bin still warn
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        rank.mean(image, elem, out=out, mask=mask)
+        rank.mean_percentile(image, elem, out=out, mask=mask)
+    assert_equal(len(w), 2)
+
 
 def test_inplace_output():
     # rank filters are not supposed to filter inplace
@@ -499,5 +517,96 @@ def test_percentile_median():
     assert_array_equal(img_p0, img_max)
 
 
+def test_16bit_rank_kernels():
+    # the two-level histogram must give the exact local ranks on the full
+    # 12-bit and 16-bit range
+    np.random.seed(0)
+    selem = disk(2)
+    radius = 2
+
+    for max_value in (2 ** 12 - 1, 2 ** 16 - 1):
+        image = (np.random.rand(13, 17) * max_value).astype(np.uint16)
+        image[0, 0] = max_value
+        median = np.empty_like(image)
+        low = np.empty_like(image)
+        lowest = np.empty_like(image)
+        highest = np.empty_like(image)
+        for r in range(image.shape[0]):
+            for c in range(image.shape[1]):
+                values = []
+                for i, j in zip(*np.nonzero(selem)):
+                    rr = r + i - radius
+                    cc = c + j - radius
+                    if 0 <= rr < image.shape[0] and 0 <= cc < image.shape[1]:
+                        values.append(image[rr, cc])
+                values = np.sort(values)
+                median[r, c] = values[len(values) // 2]
+                low[r, c] = values[int(0.3 * len(values))]
+                lowest[r, c] = values[0]
+                highest[r, c] = values[-1]
+
+        assert_array_equal(rank.median(image, selem), median)
+        assert_array_equal(rank.percentile(image, selem, p0=.3), low)
+        assert_array_equal(rank.minimum(image, selem), lowest)
+        assert_array_equal(rank.maximum(image, selem), highest)
+
+
+def test_n_jobs():
+    # band-parallel filtering must give the same result as a single pass
+    np.random.seed(0)
+    image = (np.random.rand(61, 47) * 255).astype(np.uint8)
+    mask = np.random.rand(61, 47) > 0.2
+    selem = disk(4)
+
+    for func in (rank.mean, rank.median, rank.entropy, rank.otsu,
+                 rank.gradient):
+        for shift in (0, 2):
+            expected = func(image, selem, mask=mask, shift_x=shift,
+                            shift_y=shift)
+            for n_jobs in (2, 5, 0):
+                assert_array_equal(func(image, selem, mask=mask,
+                                        shift_x=shift, shift_y=shift,
+                                        n_jobs=n_jobs), expected)
+
+    image16 = image.astype(np.uint16) * 4
+    expected = rank.percentile(image16, selem, p0=.3)
+    assert_array_equal(rank.percentile(image16, selem, p0=.3, n_jobs=3),
+                       expected)
+    expected = rank.mean_bilateral(image16, selem, s0=20, s1=20)
+    assert_array_equal(rank.mean_bilateral(image16, selem, s0=20, s1=20,
+                                           n_jobs=3), expected)
+
+    # more threads than rows
+    image = image[:3]
+    assert_array_equal(rank.maximum(image, selem, n_jobs=8),
+                       rank.maximum(image, selem))
+
+
+def test_multi():
+    image = data.camera()[::4, ::4]
+    selem = disk(3)
+    mask = image > 20
+
+    ops = ['mean', 'minimum', 'maximum', 'median', 'otsu', 'gradient']
+    out = rank.multi(image, selem, ops, mask=mask)
+    assert_equal(out.shape, image.shape + (len(ops), ))
+    assert_equal(out.dtype, image.dtype)
+    for k, op in enumerate(ops):
+        assert_array_equal(out[..., k], getattr(rank, op)(image, selem,
+                                                          mask=mask))
+
+    # entropy requires floating point output
+    ops = ['entropy', 'minimum', 'maximum']
+    out = rank.multi(image.astype(np.uint16), selem, ops, n_jobs=3)
+    assert_equal(out.dtype, np.double)
+    assert_array_equal(out[..., 0], rank.entropy(image, selem))
+    assert_array_equal(out[..., 1], rank.minimum(image, selem))
+    assert_array_equal(out[..., 2], rank.maximum(image, selem))
+
+    assert_raises(ValueError, rank.multi, image, selem, ['noise_filter'])
+    assert_raises(ValueError, rank.multi, image, selem, ['mean'],
+                  out=np.empty_like(image))
+
+
 if __name__ == "__main__":
     run_module_suite()
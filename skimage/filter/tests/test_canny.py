@@ -61,8 +61,40 @@ class TestCanny(unittest.TestCase):
 
     def test_image_shape(self):
         self.assertRaises(TypeError, F.canny, np.zeros((20, 20, 20)), 4, 0, 0)
+        self.assertRaises(TypeError, F.canny_batch, np.zeros((20, 20)),
+                          4, 0, 0)
+        self.assertRaises(TypeError, F.canny_batch,
+                          np.zeros((2, 20, 20, 20)), 4, 0, 0)
+        self.assertRaises(ValueError, F.canny, np.zeros((20, 20)), 4, 0, 0,
+                          np.ones((10, 10), bool))
 
     def test_mask_none(self):
         result1 = F.canny(np.zeros((20, 20)), 4, 0, 0, np.ones((20, 20), bool))
         result2 = F.canny(np.zeros((20, 20)), 4, 0, 0)
         self.assertTrue(np.all(result1 == result2))
+
+    def test_batch(self):
+        np.random.seed(0)
+        images = np.zeros((3, 40, 40))
+        images[0, 10:30, 10:30] = 1
+        images[1, 5:20, 15:35] = 1
+        images += 0.2 * np.random.uniform(size=images.shape)
+        mask = np.ones((40, 40), bool)
+        mask[:, 30:] = False
+        for m in (None, mask, np.array([mask] * 3)):
+            result = F.canny_batch(images, 2, .1, .2, m, n_jobs=2)
+            self.assertEqual(result.shape, images.shape)
+            for n in range(3):
+                frame_mask = m if m is None or m.ndim == 2 else m[n]
+                expected = F.canny(images[n], 2, .1, .2, frame_mask)
+                self.assertTrue(np.all(result[n] == expected))
+
+    def test_n_jobs(self):
+        np.random.seed(0)
+        image = np.zeros((60, 50))
+        image[15:45, 10:40] = 1
+        image += 0.2 * np.random.uniform(size=image.shape)
+        result1 = F.canny(image, 2, .1, .2)
+        result2 = F.canny(image, 2, .1, .2, n_jobs=4)
+        self.assertTrue(np.any(result1))
+        self.assertTrue(np.all(result1 == result2))
@@ -123,5 +123,55 @@ def test_wrong_shape():
     median_filter(img)
 
 
+def test_16bit():
+    np.random.seed(0)
+    img = np.random.randint(0, 2 ** 16, (9, 9)).astype(np.uint16)
+    result = median_filter(img, 20)
+    assert result.dtype == np.uint16
+    assert np.all(result == np.median(img))
+
+
+def test_12bit_vs_8bit():
+    np.random.seed(0)
+    img = (np.random.random((30, 40)) * 255).astype(np.uint8)
+    mask = np.random.random((30, 40)) > 0.2
+    result8 = median_filter(img, 4, mask, percent=30)
+    result12 = median_filter(img.astype(np.uint16) * 16, 4, mask, percent=30)
+    np.testing.assert_array_equal(result12, result8.astype(np.uint16) * 16)
+
+
+def test_out_and_n_jobs():
+    np.random.seed(0)
+    img = np.random.randint(0, 1024, (40, 30)).astype(np.uint16)
+    expected = median_filter(img, 5)
+    out = np.empty(img.shape, np.uint16)
+    result = median_filter(img, 5, out=out, n_jobs=3)
+    assert result is out
+    np.testing.assert_array_equal(out, expected)
+    out = np.empty(img.shape)
+    median_filter(img, 5, out=out)
+    np.testing.assert_array_equal(out, expected)
+
+
+def test_out_is_image():
+    np.random.seed(0)
+    img = np.random.randint(0, 1024, (40, 30)).astype(np.uint16)
+    expected = median_filter(img, 5)
+    result = median_filter(img, 5, out=img)
+    assert result is img
+    np.testing.assert_array_equal(img, expected)
+
+
+def test_large_radius():
+    # the octagons of more than 65535 pixels overflow 16-bit counts
+    img = np.zeros((301, 301), np.uint8)
+    img[:, :200] = 3
+    for radius in (130, 150):
+        result = median_filter(img, radius)
+        assert np.all(result[:, :150] == 3)
+        np.testing.assert_equal(result[150, 150], 3)
+        np.testing.assert_equal(result[150, 300], 0)
+
+
 if __name__ == "__main__":
     np.testing.run_module_suite()
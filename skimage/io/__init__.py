@@ -9,6 +9,7 @@ from ._plugins import available as plugins
 from ._plugins import info as plugin_info
 from ._plugins import configuration as plugin_order
 from ._plugins import reset_plugins as _reset_plugins
+from ._plugins.plugin import _prefer as _prefer_plugin
 
 from .sift import *
 from .collection import *
@@ -21,25 +22,19 @@ available_plugins = plugins()
 
 
 def _load_preferred_plugins():
-    # Load preferred plugin for each io function.
+    # Put the preferred plugin for each io function first in line.  Their
+    # modules are only imported once the function is called, falling back to
+    # the next plugin in line if the import fails.
     io_funcs = ['imsave', 'imshow', 'imread_collection', 'imread']
     preferred_plugins = ['matplotlib', 'pil', 'qt', 'freeimage', 'null']
     for func in io_funcs:
-        for plugin in preferred_plugins:
-            if plugin not in available_plugins:
-                continue
-            try:
-                use_plugin(plugin, kind=func)
-                break
-            except (ImportError, RuntimeError, OSError):
-                pass
+        for plugin in reversed(preferred_plugins):
+            if func in available_plugins.get(plugin, []):
+                _prefer_plugin(plugin, func)
 
     # Use PIL as the default imread plugin, since matplotlib (1.2.x)
     # is buggy (flips PNGs around, returns bytes as floats, etc.)
-    try:
-        use_plugin('pil', 'imread')
-    except ImportError:
-        pass
+    _prefer_plugin('pil', 'imread')
 
 def reset_plugins():
     _reset_plugins()
@@ -14,6 +14,7 @@ from io import BytesIO
 import numpy as np
 
 from skimage.io._plugins import call as call_plugin
+from skimage.io._mmap import memmap_image
 from skimage.color import rgb2grey
 from skimage._shared import six
 
@@ -103,7 +104,7 @@ def pop():
     return _image_stack.pop()
 
 
-def imread(fname, as_grey=False, plugin=None, flatten=None,
+def imread(fname, as_grey=False, plugin=None, flatten=None, mmap=False,
            **plugin_args):
     """Load an image from file.
 
@@ -116,6 +117,14 @@ def imread(fname, as_grey=False, plugin=None, flatten=None,
         Images that are already in grey-scale format are not converted.
     plugin : str
         Name of plugin to use (Python Imaging Library by default).
+    mmap : bool, optional
+        Instead of reading the image with a plugin, return a read-only
+        ``np.memmap`` view of the pixel data in the file, which is only read
+        from disk when accessed. This is supported for TIFF files whose
+        (first) page is uncompressed and stored in consecutive strips,
+        ``.npy`` files and raw files. The `shape` and `dtype` (and
+        optionally the `offset`) of raw files must be passed as keywords.
+        TIFF images are returned with the byte order of the file.
 
     Other Parameters
     ----------------
@@ -134,12 +143,21 @@ def imread(fname, as_grey=False, plugin=None, flatten=None,
     plugin_args : keywords
         Passed to the given plugin.
 
+    Raises
+    ------
+    ValueError
+        If ``mmap=True`` and the image cannot be memory-mapped.
+
     """
     # Backward compatibility
     if flatten is not None:
         as_grey = flatten
 
-    if is_url(fname):
+    if mmap:
+        if is_url(fname):
+            raise ValueError('Images at URLs cannot be memory-mapped.')
+        img = memmap_image(fname, **plugin_args)
+    elif is_url(fname):
         _, ext = os.path.splitext(fname)
         with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as f:
             u = urlopen(fname)
@@ -156,7 +174,7 @@ def imread(fname, as_grey=False, plugin=None, flatten=None,
 
 
 def imread_collection(load_pattern, conserve_memory=True,
-                      plugin=None, **plugin_args):
+                      plugin=None, n_jobs=1, **plugin_args):
     """
     Load a collection of images.
 
@@ -169,6 +187,10 @@ def imread_collection(load_pattern, conserve_memory=True,
     conserve_memory : bool, optional
         If True, never keep more than one in memory at a specific
         time.  Otherwise, images will be cached once they are loaded.
+    n_jobs : int, optional
+        Number of threads loading images concurrently in
+        ``ic.concatenate()``. Values smaller than 1 select all available
+        CPU cores.
 
     Returns
     -------
@@ -181,8 +203,12 @@ def imread_collection(load_pattern, conserve_memory=True,
         Passed to the given plugin.
 
     """
-    return call_plugin('imread_collection', load_pattern, conserve_memory,
-                       plugin=plugin, **plugin_args)
+    ic = call_plugin('imread_collection', load_pattern, conserve_memory,
+                     plugin=plugin, **plugin_args)
+    # plugins may return other kinds of collections
+    if hasattr(ic, 'n_jobs'):
+        ic.n_jobs = n_jobs
+    return ic
 
 
 def imsave(fname, arr, plugin=None, **plugin_args):
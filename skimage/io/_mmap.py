@@ -0,0 +1,376 @@
+"""Memory-mapped reading of uncompressed images.
+
+Instead of decoding the pixel data into a new array, the pixels are returned
+as read-only ``np.memmap`` views into the file, so that opening an image is
+instantaneous and only the parts of it which are accessed are read from disk.
+This is possible for ``.npy`` files, raw files and TIFF files whose pages
+are stored without compression in consecutive strips.
+"""
+
+import struct
+
+import numpy as np
+
+
+_NPY_MAGIC = b'\x93NUMPY'
+
+# TIFF tags describing the layout of the pixel data
+IMAGE_WIDTH = 256
+IMAGE_LENGTH = 257
+BITS_PER_SAMPLE = 258
+COMPRESSION = 259
+PHOTOMETRIC = 262
+STRIP_OFFSETS = 273
+SAMPLES_PER_PIXEL = 277
+STRIP_BYTE_COUNTS = 279
+PLANAR_CONFIG = 284
+TILE_WIDTH = 322
+SAMPLE_FORMAT = 339
+
+# struct formats of the integer TIFF field types
+_TIFF_TYPES = {1: 'B', 3: 'H', 4: 'I', 6: 'b', 8: 'h', 9: 'i', 13: 'I',
+               16: 'Q', 17: 'q', 18: 'Q'}
+
+_SAMPLE_KINDS = {1: 'u', 2: 'i', 3: 'f'}
+
+
+def _unpack(fmt, buf):
+    return struct.unpack(fmt, buf)[0]
+
+
+def read_tiff_header(fh):
+    """Parse the header of a TIFF file.
+
+    Parameters
+    ----------
+    fh : file
+        TIFF file opened in binary mode.
+
+    Returns
+    -------
+    byteorder : {'<', '>'}
+        Byte order of the file.
+    bigtiff : bool
+        Whether the file is a BigTIFF file.
+    offset : int
+        File offset of the first image file directory.
+
+    """
+    fh.seek(0)
+    head = fh.read(8)
+    if head[:2] == b'II':
+        byteorder = '<'
+    elif head[:2] == b'MM':
+        byteorder = '>'
+    else:
+        raise ValueError('Not a TIFF file.')
+
+    version = _unpack(byteorder + 'H', head[2:4])
+    if version == 42:
+        return byteorder, False, _unpack(byteorder + 'I', head[4:8])
+    elif version == 43:
+        return byteorder, True, _unpack(byteorder + 'Q', fh.read(8))
+    raise ValueError('Not a TIFF file.')
+
+
+def read_tiff_ifd(fh, offset, byteorder, bigtiff, parse_tags=True):
+    """Parse the integer tags of an image file directory of a TIFF file.
+
+    Parameters
+    ----------
+    fh : file
+        TIFF file opened in binary mode.
+    offset : int
+        File offset of the image file directory.
+    byteorder : {'<', '>'}
+        Byte order of the file.
+    bigtiff : bool
+        Whether the file is a BigTIFF file.
+    parse_tags : bool, optional
+        If False, only find the next image file directory.
+
+    Returns
+    -------
+    tags : dict or None
+        Mapping of tag codes to tuples of values.
+    next_offset : int
+        File offset of the next image file directory, 0 for the last one.
+
+    """
+    if bigtiff:
+        offset_fmt, count_fmt, entry_size = 'Q', 'Q', 20
+    else:
+        offset_fmt, count_fmt, entry_size = 'I', 'H', 12
+    offset_size = struct.calcsize(offset_fmt)
+    count_size = struct.calcsize(count_fmt)
+
+    fh.seek(offset)
+    num_entries = _unpack(byteorder + count_fmt, fh.read(count_size))
+    if not parse_tags:
+        fh.seek(offset + count_size + num_entries * entry_size)
+        return None, _unpack(byteorder + offset_fmt, fh.read(offset_size))
+
+    entries = fh.read(num_entries * entry_size)
+    next_offset = _unpack(byteorder + offset_fmt, fh.read(offset_size))
+
+    tags = {}
+    for i in range(num_entries):
+        entry = entries[i * entry_size:(i + 1) * entry_size]
+        code, field_type = struct.unpack(byteorder + 'HH', entry[:4])
+        if field_type not in _TIFF_TYPES:
+            continue
+        count = _unpack(byteorder + offset_fmt, entry[4:4 + offset_size])
+        fmt = '%s%d%s' % (byteorder, count, _TIFF_TYPES[field_type])
+        size = struct.calcsize(fmt)
+        value = entry[4 + offset_size:]
+        if size > offset_size:
+            # the values do not fit into the entry
+            fh.seek(_unpack(byteorder + offset_fmt, value))
+            value = fh.read(size)
+        tags[code] = struct.unpack(fmt, value[:size])
+
+    return tags, next_offset
+
+
+def tiff_page_offsets(fh, parse_tags=False, max_pages=None):
+    """Find the image file directories (pages) of a TIFF file.
+
+    Parameters
+    ----------
+    fh : file
+        TIFF file opened in binary mode.
+    parse_tags : bool, optional
+        Also parse the tags of every page.
+    max_pages : int, optional
+        Stop after this number of pages. By default, all pages are found.
+
+    Returns
+    -------
+    byteorder : {'<', '>'}
+        Byte order of the file.
+    bigtiff : bool
+        Whether the file is a BigTIFF file.
+    offsets : list of int
+        File offsets of the image file directories.
+    tags : list of dict
+        Tags of every page, see `read_tiff_ifd`. Only if `parse_tags` is
+        True.
+
+    """
+    byteorder, bigtiff, offset = read_tiff_header(fh)
+    offsets = []
+    tags = []
+    visited = set()
+    while offset and offset not in visited and (max_pages is None
+                                                or len(offsets) < max_pages):
+        visited.add(offset)
+        offsets.append(offset)
+        page_tags, offset = read_tiff_ifd(fh, offset, byteorder, bigtiff,
+                                          parse_tags)
+        tags.append(page_tags)
+
+    if parse_tags:
+        return byteorder, bigtiff, offsets, tags
+    return byteorder, bigtiff, offsets
+
+
+def tiff_page_layout(byteorder, tags):
+    """Location of the pixel data of a TIFF page within the file.
+
+    Parameters
+    ----------
+    byteorder : {'<', '>'}
+        Byte order of the file.
+    tags : dict
+        Tags of the page, see `read_tiff_ifd`.
+
+    Returns
+    -------
+    offset : int
+        File offset of the pixel data.
+    shape : tuple
+        Shape of the pixel data as stored in the file.
+    dtype : dtype
+        Type of the pixel data.
+    planar : bool
+        Whether the samples are stored plane by plane, i.e. `shape` is
+        ``(samples, rows, cols)`` instead of ``(rows, cols, samples)``.
+
+    Raises
+    ------
+    ValueError
+        If the pixel data is not stored as one uncompressed block.
+
+    """
+    def get(code, default):
+        return tags.get(code, (default,))[0]
+
+    if get(COMPRESSION, 1) != 1:
+        raise ValueError('compressed pages cannot be memory-mapped')
+    if TILE_WIDTH in tags:
+        raise ValueError('tiled pages cannot be memory-mapped')
+    if get(PHOTOMETRIC, 1) not in (1, 2):
+        raise ValueError('only grey-scale and RGB pages can be '
+                         'memory-mapped')
+    if STRIP_OFFSETS not in tags or STRIP_BYTE_COUNTS not in tags:
+        raise ValueError('pages without strips cannot be memory-mapped')
+
+    bits = tags.get(BITS_PER_SAMPLE, (1,))
+    kind = _SAMPLE_KINDS.get(get(SAMPLE_FORMAT, 1))
+    if len(set(bits)) != 1 or bits[0] not in (8, 16, 32, 64) or kind is None:
+        raise ValueError('only pages with 8, 16, 32 or 64-bit samples can be '
+                         'memory-mapped')
+    dtype = np.dtype('%s%s%d' % (byteorder, kind, bits[0] // 8))
+
+    rows = get(IMAGE_LENGTH, 0)
+    cols = get(IMAGE_WIDTH, 0)
+    samples = get(SAMPLES_PER_PIXEL, 1)
+    planar = samples > 1 and get(PLANAR_CONFIG, 1) == 2
+    if planar:
+        shape = (samples, rows, cols)
+    elif samples > 1:
+        shape = (rows, cols, samples)
+    else:
+        shape = (rows, cols)
+
+    offsets = tags[STRIP_OFFSETS]
+    counts = tags[STRIP_BYTE_COUNTS]
+    for i in range(len(offsets) - 1):
+        if offsets[i] + counts[i] != offsets[i + 1]:
+            raise ValueError('pages with scattered strips cannot be '
+                             'memory-mapped')
+    if sum(counts) < int(np.prod(shape)) * dtype.itemsize:
+        raise ValueError('truncated page')
+
+    return offsets[0], shape, dtype, planar
+
+
+def tiff_page_view(raw, layout):
+    """View of the pixels of a TIFF page within the bytes of the file.
+
+    Parameters
+    ----------
+    raw : 1-D array of uint8
+        Contents of the file, usually memory-mapped.
+    layout : tuple
+        Layout of the page, see `tiff_page_layout`.
+
+    Returns
+    -------
+    frame : ndarray
+        View of the pixels with shape ``(rows, cols[, samples])``.
+
+    """
+    offset, shape, dtype, planar = layout
+    frame = _view(raw, offset, shape, dtype)
+    if planar:
+        frame = frame.transpose(1, 2, 0)
+    return frame
+
+
+def _view(raw, offset, shape, dtype):
+    """Array of the given layout within the bytes `raw` of a file."""
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    if offset + nbytes > raw.shape[0]:
+        raise ValueError('The image data exceeds the end of the file.')
+    return raw[offset:offset + nbytes].view(dtype).reshape(shape)
+
+
+def _tiff_frames(fname, max_pages=None):
+    with open(fname, 'rb') as fh:
+        byteorder, _, _, tags = tiff_page_offsets(fh, True, max_pages)
+    try:
+        layouts = [tiff_page_layout(byteorder, page) for page in tags]
+    except ValueError as e:
+        raise ValueError('%s cannot be memory-mapped: %s.' % (fname, e))
+
+    raw = np.memmap(fname, dtype=np.uint8, mode='r')
+    return [tiff_page_view(raw, layout) for layout in layouts]
+
+
+def _raw_frames(fname, shape, dtype, offset):
+    if shape is None or dtype is None:
+        raise ValueError('%s is neither a TIFF nor a .npy file, the shape '
+                         'and dtype of raw files must be given.' % fname)
+    raw = np.memmap(fname, dtype=np.uint8, mode='r')
+    return _view(raw, offset, tuple(shape), np.dtype(dtype))
+
+
+def _file_kind(fname):
+    with open(fname, 'rb') as fh:
+        magic = fh.read(6)
+    if magic == _NPY_MAGIC:
+        return 'npy'
+    if magic[:4] in (b'II*\x00', b'MM\x00*', b'II+\x00', b'MM\x00+'):
+        return 'tiff'
+    return 'raw'
+
+
+def memmap_frames(fname, shape=None, dtype=None, offset=0):
+    """Memory-map all frames (pages) of an uncompressed image file.
+
+    Parameters
+    ----------
+    fname : str
+        Name of a TIFF, ``.npy`` or raw file. The type of the file is
+        determined from its contents.
+    shape : tuple, optional
+        Shape of the frames of a raw file, including the number of frames
+        as first dimension.
+    dtype : dtype, optional
+        Type of the pixels of a raw file.
+    offset : int, optional
+        Offset of the pixel data within a raw file.
+
+    Returns
+    -------
+    frames : sequence of np.memmap
+        Read-only views of the frames. The frames of ``.npy`` and raw files
+        are given by the first axis of the stored array.
+
+    Raises
+    ------
+    ValueError
+        If the file cannot be memory-mapped.
+
+    """
+    kind = _file_kind(fname)
+    if kind == 'npy':
+        return np.load(fname, mmap_mode='r')
+    if kind == 'tiff':
+        return _tiff_frames(fname)
+    return _raw_frames(fname, shape, dtype, offset)
+
+
+def memmap_image(fname, shape=None, dtype=None, offset=0):
+    """Memory-map an uncompressed image file.
+
+    Parameters
+    ----------
+    fname : str
+        Name of a TIFF, ``.npy`` or raw file. The type of the file is
+        determined from its contents.
+    shape : tuple, optional
+        Shape of the image of a raw file.
+    dtype : dtype, optional
+        Type of the pixels of a raw file.
+    offset : int, optional
+        Offset of the pixel data within a raw file.
+
+    Returns
+    -------
+    img : np.memmap
+        Read-only view of the image, the first page of TIFF files.
+
+    Raises
+    ------
+    ValueError
+        If the file cannot be memory-mapped.
+
+    """
+    kind = _file_kind(fname)
+    if kind == 'npy':
+        return np.load(fname, mmap_mode='r')
+    if kind == 'tiff':
+        return _tiff_frames(fname, max_pages=1)[0]
+    return _raw_frames(fname, shape, dtype, offset)
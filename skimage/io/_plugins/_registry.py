@@ -0,0 +1,46 @@
+"""Plugin meta-data, generated from the plugin .ini files.
+
+Do not edit, run `plugin._write_registry` instead.
+
+"""
+
+plugin_module_name = {'fits': 'fits_plugin',
+ 'freeimage': 'freeimage_plugin',
+ 'gdal': 'gdal_plugin',
+ 'gtk': 'gtk_plugin',
+ 'imread': 'imread_plugin',
+ 'matplotlib': 'matplotlib_plugin',
+ 'null': 'null_plugin',
+ 'pil': 'pil_plugin',
+ 'qt': 'qt_plugin',
+ 'simpleitk': 'simpleitk_plugin',
+ 'test': 'test_plugin',
+ 'tifffile': 'tifffile_plugin'}
+
+plugin_meta_data = {'fits': {'description': 'FITS image reading via PyFITS',
+          'extensions': '.fits, .fit, .fts',
+          'provides': 'imread, imread_collection'},
+ 'freeimage': {'description': 'Load images using the FreeImage library',
+               'provides': 'imread, imsave'},
+ 'gdal': {'description': 'Image reading via the GDAL Library (www.gdal.org)',
+          'provides': 'imread'},
+ 'gtk': {'description': 'Fast image display using the GTK library',
+         'provides': 'imshow, _app_show'},
+ 'imread': {'description': 'Image reading and writing via imread',
+            'provides': 'imread, imsave'},
+ 'matplotlib': {'description': 'Display or save images using Matplotlib',
+                'provides': 'imshow, imread, _app_show'},
+ 'null': {'description': 'Default plugin that does nothing',
+          'provides': 'imshow, imread, _app_show'},
+ 'pil': {'description': 'Image reading via the Python Imaging Library',
+         'provides': 'imread, imsave, imshow, _app_show'},
+ 'qt': {'description': 'Fast image display using the Qt library',
+        'provides': 'imshow, _app_show, imsave, imread'},
+ 'simpleitk': {'description': 'Image reading and writing via SimpleITK',
+               'provides': 'imread, imsave'},
+ 'test': {'description': 'Test plugin',
+          'provides': 'imsave, imshow, imread, imread_collection'},
+ 'tifffile': {'description': 'Load and save TIFF and TIFF-based images using '
+                             'tifffile.py',
+              'extensions': '.tif, .tiff',
+              'provides': 'imread, imsave'}}
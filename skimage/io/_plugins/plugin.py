@@ -11,6 +11,9 @@ except ImportError:
 
 import os.path
 from glob import glob
+from pprint import pformat
+
+from skimage._shared import six
 
 
 plugin_store = None
@@ -18,6 +21,20 @@ plugin_store = None
 plugin_provides = {}
 plugin_module_name = {}
 plugin_meta_data = {}
+plugin_extensions = {}
+
+# Plugins whose modules have been imported and whose functions are stored
+_loaded = set()
+
+# Function called for each (kind, plugin, file suffix), see `call`
+_dispatch_cache = {}
+
+# Plugin chosen with `use` for each kind of function, which is called for
+# files of any suffix
+_user_choice = {}
+
+# Kinds of functions whose first argument is a file name
+_file_kinds = ('imread', 'imsave')
 
 
 def reset_plugins():
@@ -30,6 +47,9 @@ def reset_plugins():
                     'imshow': [],
                     'imread_collection': [],
                     '_app_show': []}
+    _loaded.clear()
+    _dispatch_cache.clear()
+    _user_choice.clear()
 
 reset_plugins()
 
@@ -38,21 +58,59 @@ def _scan_plugins():
     """Scan the plugins directory for .ini files and parse them
     to gather plugin meta-data.
 
+    Returns
+    -------
+    module_name : dict
+        Name of the module of every plugin.
+    meta_data : dict
+        Meta-data of every plugin, as specified in its ``.ini`` file.
+
     """
     pd = os.path.dirname(__file__)
     ini = glob(os.path.join(pd, '*.ini'))
 
+    module_name = {}
+    meta_data = {}
     for f in ini:
         cp = ConfigParser()
         cp.read(f)
         name = cp.sections()[0]
 
-        meta_data = {}
-        for opt in cp.options(name):
-            meta_data[opt] = cp.get(name, opt)
-        plugin_meta_data[name] = meta_data
+        meta_data[name] = dict((opt, cp.get(name, opt))
+                               for opt in cp.options(name))
+        module_name[name] = os.path.basename(f)[:-4]
+
+    return module_name, meta_data
+
+
+def _write_registry():
+    """Store the meta-data of the plugins in the ``_registry`` module.
 
-        provides = [s.strip() for s in cp.get(name, 'provides').split(',')]
+    This has to be run whenever a plugin ``.ini`` file is added or changed.
+
+    """
+    module_name, meta_data = _scan_plugins()
+    filename = os.path.join(os.path.dirname(__file__), '_registry.py')
+    with open(filename, 'w') as f:
+        f.write('"""Plugin meta-data, generated from the plugin .ini files.\n\n'
+                'Do not edit, run `plugin._write_registry` instead.\n\n'
+                '"""\n\n')
+        f.write('plugin_module_name = %s\n\n' % pformat(module_name))
+        f.write('plugin_meta_data = %s\n' % pformat(meta_data))
+
+
+def _register_plugins():
+    """Gather the meta-data of the plugins from the registry.
+
+    The registry is generated from the ``.ini`` files of the plugins, so that
+    they do not have to be found and parsed on every import.
+
+    """
+    from ._registry import plugin_module_name as module_name
+    from ._registry import plugin_meta_data as meta_data
+
+    for name in meta_data:
+        provides = [s.strip() for s in meta_data[name]['provides'].split(',')]
         valid_provides = [p for p in provides if p in plugin_store]
 
         for p in provides:
@@ -60,55 +118,159 @@ def _scan_plugins():
                 print("Plugin `%s` wants to provide non-existent `%s`." \
                       " Ignoring." % (name, p))
 
+        extensions = meta_data[name].get('extensions')
+        if extensions is not None:
+            plugin_extensions[name] = set(
+                e.strip().lower() for e in extensions.split(','))
+
         plugin_provides[name] = valid_provides
-        plugin_module_name[name] = os.path.basename(f)[:-4]
+        plugin_module_name[name] = module_name[name]
+        plugin_meta_data[name] = meta_data[name]
 
-_scan_plugins()
+_register_plugins()
 
 
-def call(kind, *args, **kwargs):
-    """Find the appropriate plugin of 'kind' and execute it.
+def _file_suffix(kind, args):
+    """Lower case suffix of the file name passed to a plugin function."""
+    if kind in _file_kinds and args and isinstance(args[0],
+                                                   six.string_types):
+        return os.path.splitext(args[0])[1].lower()
+    return None
 
-    Parameters
-    ----------
-    kind : {'imshow', 'imsave', 'imread', 'imread_collection'}
-        Function to look up.
-    plugin : str, optional
-        Plugin to load.  Defaults to None, in which case the first
-        matching plugin is used.
-    *args, **kwargs : arguments and keyword arguments
-        Passed to the plugin function.
+
+def _find_function(kind, plugin, suffix):
+    """Find the plugin function to call, importing its module if needed.
+
+    Without a given plugin, the plugin chosen with `use` is called.
+    Otherwise, the plugins in line which claim the given suffix are tried
+    first, then the remaining ones, and plugins whose modules cannot be
+    imported are dropped.
 
     """
     if not kind in plugin_store:
         raise ValueError('Invalid function (%s) requested.' % kind)
 
-    plugin_funcs = plugin_store[kind]
-    if len(plugin_funcs) == 0:
+    if len(plugin_store[kind]) == 0:
         raise RuntimeError('''No suitable plugin registered for %s.
 
 You may load I/O plugins with the `skimage.io.use_plugin`
 command.  A list of all available plugins can be found using
 `skimage.io.plugins()`.''' % kind)
 
-    plugin = kwargs.pop('plugin', None)
-    if plugin is None:
-        _, func = plugin_funcs[0]
-    else:
+    if plugin is not None:
         _load(plugin)
         try:
-            func = [f for (p, f) in plugin_funcs if p == plugin][0]
+            return [f for (p, f) in plugin_store[kind] if p == plugin][0]
         except IndexError:
             raise RuntimeError('Could not find the plugin "%s" for %s.' % \
                                (plugin, kind))
 
+    if kind in _user_choice:
+        return _find_function(kind, _user_choice[kind], suffix)
+
+    candidates = [p for (p, f) in plugin_store[kind]]
+    if suffix is not None:
+        claimed = [p for p in candidates
+                   if suffix in plugin_extensions.get(p, [suffix])]
+        candidates = claimed + [p for p in candidates if p not in claimed]
+    for name in candidates:
+        if not _try_load(name):
+            continue
+        funcs = [f for (p, f) in plugin_store[kind] if p == name]
+        if funcs:
+            return funcs[0]
+
+    raise RuntimeError('No plugin for %s could be imported.' % kind)
+
+
+def call(kind, *args, **kwargs):
+    """Find the appropriate plugin of 'kind' and execute it.
+
+    Parameters
+    ----------
+    kind : {'imshow', 'imsave', 'imread', 'imread_collection'}
+        Function to look up.
+    plugin : str, optional
+        Plugin to load.  Defaults to None, in which case the first
+        matching plugin is used.
+    *args, **kwargs : arguments and keyword arguments
+        Passed to the plugin function.
+
+    Notes
+    -----
+    The plugin function chosen for every kind of function, plugin and file
+    suffix is cached until the plugins change, e.g. by `use`.
+
+    """
+    plugin = kwargs.pop('plugin', None)
+    key = (kind, plugin, _file_suffix(kind, args))
+    try:
+        func = _dispatch_cache[key]
+    except KeyError:
+        func = _dispatch_cache[key] = _find_function(*key)
+
     return func(*args, **kwargs)
 
 
+def _prefer(name, kind):
+    """Put a plugin first in line for a function without importing it.
+
+    The module of the plugin is only imported once the function is called.
+
+    """
+    kinds = [kind, '_app_show'] if kind == 'imshow' else [kind]
+    for k in kinds:
+        funcs = plugin_store[k]
+        plugin_store[k] = [(n, f) for (n, f) in funcs if n == name] or \
+                          [(name, None)]
+        plugin_store[k] += [(n, f) for (n, f) in funcs if n != name]
+    _dispatch_cache.clear()
+
+
+def _drop(name):
+    """Remove a plugin which cannot be imported from all functions."""
+    for k in plugin_store:
+        plugin_store[k] = [(n, f) for (n, f) in plugin_store[k] if n != name]
+    _dispatch_cache.clear()
+
+
+def _try_load(name):
+    """Load a plugin, or drop it if it cannot be imported.
+
+    Returns
+    -------
+    loaded : bool
+        Whether the plugin could be loaded.
+
+    """
+    if name not in _loaded:
+        try:
+            _load(name)
+        except (ImportError, RuntimeError, OSError):
+            _drop(name)
+            return False
+    return True
+
+
+def _load_preferred():
+    """Load all plugins put in line by `_prefer` which are not loaded yet.
+
+    Plugins which cannot be imported are dropped.
+
+    """
+    names = set(n for k in plugin_store for (n, f) in plugin_store[k]
+                if f is None)
+    for name in sorted(names):
+        _try_load(name)
+
+
 def use(name, kind=None):
     """Set the default plugin for a specified operation.  The plugin
     will be loaded if it hasn't been already.
 
+    The plugin is used for files of any type, even if other plugins claim
+    the file extension.
+
     Parameters
     ----------
     name : str
@@ -148,6 +310,9 @@ def use(name, kind=None):
         if not k in plugin_store:
             raise RuntimeError("'%s' is not a known plugin function." % k)
 
+        if k in plugin_provides[name]:
+            _user_choice[k] = name
+
         funcs = plugin_store[k]
 
         # Shuffle the plugins so that the requested plugin stands first
@@ -157,6 +322,8 @@ def use(name, kind=None):
 
         plugin_store[k] = funcs
 
+    _dispatch_cache.clear()
+
 
 def available(loaded=False):
     """List available plugins.
@@ -173,15 +340,20 @@ def available(loaded=False):
         Dictionary with plugin names as keys and exposed functions as
         values.
 
+    Notes
+    -----
+    Plugins which are put in line for a function, e.g. the default plugins,
+    are only imported when the function is first called.  Listing the loaded
+    plugins imports them first, so that plugins which cannot be imported are
+    not listed.
+
     """
-    active_plugins = set()
-    for plugin_func in plugin_store.values():
-        for plugin, func in plugin_func:
-            active_plugins.add(plugin)
+    if loaded:
+        _load_preferred()
 
     d = {}
     for plugin in plugin_provides:
-        if not loaded or plugin in active_plugins:
+        if not loaded or plugin in _loaded:
             d[plugin] = [f for f in plugin_provides[plugin] \
                          if not f.startswith('_')]
 
@@ -201,7 +373,7 @@ def _load(plugin):
     plugins : List of available plugins
 
     """
-    if plugin in available(loaded=True):
+    if plugin in _loaded:
         return
     if not plugin in plugin_module_name:
         raise ValueError("Plugin %s not found." % plugin)
@@ -212,15 +384,23 @@ def _load(plugin):
 
     provides = plugin_provides[plugin]
     for p in provides:
+        store = plugin_store[p]
         if not hasattr(plugin_module, p):
             print("Plugin %s does not provide %s as advertised.  Ignoring." % \
                   (plugin, p))
+            plugin_store[p] = [(n, f) for (n, f) in store if n != plugin]
         else:
-            store = plugin_store[p]
             func = getattr(plugin_module, p)
+            # replace the placeholder of a preferred plugin, see `_prefer`
+            for i, (n, f) in enumerate(store):
+                if n == plugin and f is None:
+                    store[i] = (plugin, func)
             if not (plugin, func) in store:
                 store.append((plugin, func))
 
+    _loaded.add(plugin)
+    _dispatch_cache.clear()
+
 
 def info(plugin):
     """Return plugin meta-data.
@@ -251,7 +431,14 @@ def configuration():
         Dictionary of preferred plugin order, with function name as key and
         plugins (in order of preference) as value.
 
+    Notes
+    -----
+    The plugins in line are imported first (see `available`), so that
+    plugins which cannot be imported are not listed.
+
     """
+    _load_preferred()
+
     p = {}
     for func in plugin_store:
         p[func] = [plugin_name for (plugin_name, f) in plugin_store[func]]
@@ -4,22 +4,34 @@ from __future__ import with_statement
 
 __all__ = ['MultiImage', 'ImageCollection', 'imread', 'concatenate_images']
 
+import os
 from glob import glob
 import re
+import struct
+import threading
 from copy import copy
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 from ._io import imread
+from ._mmap import (memmap_frames, read_tiff_header, read_tiff_ifd,
+                    tiff_page_layout, tiff_page_offsets)
 from .._shared import six
+from .._shared.utils import run_in_bands
 
 
-def concatenate_images(ic):
+def concatenate_images(ic, n_jobs=1):
     """Concatenate all images in the image collection into an array.
 
     Parameters
     ----------
     ic: an iterable of images (including ImageCollection and MultiImage)
         The images to be concatenated.
+    n_jobs : int, optional
+        Number of threads loading the images of an `ImageCollection` or
+        `MultiImage` (or a list of images) concurrently. Values smaller than
+        1 select all available CPU cores.
 
     Returns
     -------
@@ -35,11 +47,49 @@ def concatenate_images(ic):
     ValueError
         If images in `ic` don't have identical shapes.
     """
-    all_images = [img[np.newaxis, ...] for img in ic]
-    try:
-        ar = np.concatenate(all_images)
-    except ValueError:
-        raise ValueError('Image dimensions must agree.')
+    if isinstance(ic, (ImageCollection, MultiImage)):
+        return _stack_images(ic._load_image, len(ic), n_jobs)
+    if not isinstance(ic, (list, tuple)):
+        ic = list(ic)
+    return _stack_images(ic.__getitem__, len(ic), n_jobs)
+
+
+def _stack_images(load, num, n_jobs=1):
+    """Stack images ``load(0), ..., load(num - 1)`` into one array.
+
+    The output is allocated from the shape and type of the first image and
+    every image is copied into it as soon as it is loaded, so that only the
+    images being loaded by the `n_jobs` threads are held in memory on top
+    of the output. Images whose type cannot be safely cast to the type of
+    the first image are kept aside and upcast the output at the end, like
+    ``np.concatenate`` would.
+    """
+    if num == 0:
+        raise ValueError('Need at least one image to concatenate.')
+
+    first = np.asarray(load(0))
+    ar = np.empty((num,) + first.shape, dtype=first.dtype)
+    ar[0] = first
+    uncast = {}
+
+    def fill(start, stop):
+        for i in range(max(start, 1), stop):
+            img = np.asarray(load(i))
+            if img.shape != first.shape:
+                raise ValueError('Image dimensions must agree.')
+            if np.can_cast(img.dtype, ar.dtype):
+                ar[i] = img
+            else:
+                uncast[i] = img
+
+    run_in_bands(fill, num, n_jobs)
+
+    if uncast:
+        dtype = np.result_type(ar.dtype,
+                               *[img.dtype for img in uncast.values()])
+        ar = ar.astype(dtype)
+        for i, img in uncast.items():
+            ar[i] = img
     return ar
 
 
@@ -69,6 +119,138 @@ def alphanumeric_key(s):
     return k
 
 
+class _ImageCache(object):
+    """Least recently used cache of images.
+
+    Parameters
+    ----------
+    max_items : int or None
+        Maximum number of cached images, unbounded if None.
+    max_bytes : int or None
+        Maximum total size of the cached images (as given by their `nbytes`
+        attribute), unbounded if None. The most recently stored image is
+        always kept, even if it alone exceeds this size.
+
+    """
+    def __init__(self, max_items=None, max_bytes=None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._images = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._images
+
+    def __len__(self):
+        return len(self._images)
+
+    def get(self, key):
+        """Return the image stored as `key` and mark it as recently used."""
+        img = self._images.pop(key)
+        self._images[key] = img
+        return img
+
+    def peek(self, key):
+        """Return the image stored as `key` or None, without marking it."""
+        return self._images.get(key)
+
+    def put(self, key, img):
+        """Store an image, evicting the least recently used ones if needed."""
+        self.discard(key)
+        self._images[key] = img
+        self.nbytes += getattr(img, 'nbytes', 0)
+        while len(self._images) > 1 and (
+                (self.max_items is not None
+                 and len(self._images) > self.max_items)
+                or (self.max_bytes is not None
+                    and self.nbytes > self.max_bytes)):
+            self.discard(next(iter(self._images)))
+
+    def discard(self, key):
+        """Remove the image stored as `key`, if any."""
+        if key in self._images:
+            self.nbytes -= getattr(self._images.pop(key), 'nbytes', 0)
+
+    def clear(self):
+        """Remove all images."""
+        self._images.clear()
+        self.nbytes = 0
+
+    def remap(self, keys):
+        """New cache with the images of `keys` stored under their position.
+        """
+        positions = dict((key, i) for i, key in enumerate(keys))
+        cache = _ImageCache(self.max_items, self.max_bytes)
+        for key, img in self._images.items():
+            if key in positions:
+                cache.put(positions[key], img)
+        return cache
+
+
+class _Prefetcher(object):
+    """Load the items following the last accessed one in background threads.
+
+    Parameters
+    ----------
+    count : int
+        Number of items loaded ahead, which is also the number of threads.
+
+    """
+    def __init__(self, count):
+        self.count = count
+        self._pool = None
+        self._pending = {}
+
+    def __del__(self):
+        if self._pool is not None:
+            self._pool.close()
+
+    def get(self, n, load):
+        """Return ``load(n)``, waiting for it if it is being loaded ahead."""
+        result = self._pending.pop(n, None)
+        if result is None:
+            return load(n)
+        return result.get()
+
+    def schedule(self, n, num, load, is_loaded):
+        """Start loading the items following the `n`-th one.
+
+        Parameters
+        ----------
+        n : int
+            Index of the last accessed item.
+        num : int
+            Total number of items.
+        load : callable
+            Function loading an item, ``load(i)``. Must be thread-safe.
+        is_loaded : callable
+            Function telling whether an item is already available,
+            ``is_loaded(i)``.
+
+        """
+        if self.count <= 0:
+            return
+        ahead = range(n + 1, min(n + 1 + self.count, num))
+
+        # forget about items which are not ahead anymore
+        for i in list(self._pending):
+            if i not in ahead:
+                del self._pending[i]
+
+        if self._pool is None:
+            self._pool = ThreadPool(self.count)
+        for i in ahead:
+            if i not in self._pending and not is_loaded(i):
+                self._pending[i] = self._pool.apply_async(load, (i,))
+
+    def discard(self, n=None):
+        """Forget about the `n`-th item, or all items by default."""
+        if n is None:
+            self._pending.clear()
+        else:
+            self._pending.pop(n, None)
+
+
 class MultiImage(object):
     """A class containing a single multi-frame image.
 
@@ -79,6 +261,23 @@ class MultiImage(object):
     conserve_memory : bool, optional
         Whether to conserve memory by only caching a single frame. Default is
         True.
+    mmap : bool, optional
+        Return read-only ``np.memmap`` views of the frames in the file, which
+        are only read from disk when accessed, instead of reading them with
+        PIL. This is supported for TIFF files whose pages are uncompressed
+        and stored in consecutive strips, and for ``.npy`` files whose first
+        axis indexes the frames.
+    cache_size : int, optional
+        Maximum number of frames kept in memory. The least recently used
+        frames are evicted first. Overrides `conserve_memory`.
+    prefetch : int, optional
+        Number of frames following the last accessed one which are read by
+        a pool of background threads, e.g. while the current frame is being
+        processed when iterating over the frames.
+    persist_index : bool, optional
+        Store the index of the pages of a TIFF file next to it, as
+        ``filename + '.index.npy'``, and reuse it when the file is opened
+        again unless the file has been modified since.
 
     Notes
     -----
@@ -89,7 +288,13 @@ class MultiImage(object):
     The last accessed frame is cached, all other frames will have to be read
     from file.
 
-    The current implementation makes use of PIL.
+    The pages of TIFF files are indexed when the `MultiImage` is created,
+    without decoding them, so that every frame can be accessed directly.
+    Uncompressed pages are read from their position in the file, all other
+    frames are read with PIL.
+
+    Every thread reading frames with PIL keeps the file open until `close`
+    is called or the `MultiImage` is deleted.
 
     Examples
     --------
@@ -108,20 +313,34 @@ class MultiImage(object):
     .. plot:: show_collection.py
 
     """
-    def __init__(self, filename, conserve_memory=True, dtype=None):
+    def __init__(self, filename, conserve_memory=True, dtype=None, mmap=False,
+                 cache_size=None, prefetch=0, persist_index=False):
         """Load a multi-img."""
         self._filename = filename
         self._conserve_memory = conserve_memory
         self._dtype = dtype
-        self._cached = None
-
-        from PIL import Image
-        img = Image.open(self._filename)
-        if self._conserve_memory:
-            self._numframes = self._find_numframes(img)
-        else:
-            self._frames = self._getallframes(img)
+        self._mmap = mmap
+
+        if cache_size is None and conserve_memory:
+            cache_size = 1
+        self._cache = _ImageCache(cache_size)
+        self._prefetcher = _Prefetcher(prefetch)
+        # every thread reads frames with its own PIL image
+        self._local = threading.local()
+        self._pil_images = []
+
+        if mmap:
+            self._frames = memmap_frames(filename)
             self._numframes = len(self._frames)
+            return
+
+        try:
+            self._pages = self._index_pages(persist_index)
+            self._numframes = len(self._pages)
+        except (ValueError, struct.error):
+            # not a (valid) TIFF file
+            self._pages = None
+            self._numframes = self._find_numframes(self._pil_image())
 
     @property
     def filename(self):
@@ -131,6 +350,58 @@ class MultiImage(object):
     def conserve_memory(self):
         return self._conserve_memory
 
+    def _index_pages(self, persist):
+        """Find the file offsets of the pages of a TIFF file."""
+        index_name = self.filename + '.index.npy'
+        stat = os.stat(self.filename)
+        stamp = [stat.st_size, int(stat.st_mtime * 1e6)]
+
+        with open(self.filename, 'rb') as fh:
+            byteorder, bigtiff, _ = read_tiff_header(fh)
+            self._tiff_format = (byteorder, bigtiff)
+
+            if persist and os.path.exists(index_name):
+                index = np.load(index_name)
+                if list(index[:2]) == stamp:
+                    return index[2:]
+
+            _, _, pages = tiff_page_offsets(fh)
+
+        if persist:
+            try:
+                np.save(index_name, np.array(stamp + pages, dtype=np.int64))
+            except (IOError, OSError):
+                pass
+        return pages
+
+    def _pil_image(self):
+        """The PIL image of the current thread."""
+        img = getattr(self._local, 'img', None)
+        if img is None:
+            from PIL import Image
+            img = self._local.img = Image.open(self.filename)
+            self._pil_images.append(img)
+        return img
+
+    def close(self):
+        """Close the file handles held by PIL.
+
+        The file is opened again if frames are read afterwards.
+        """
+        self._prefetcher.discard()
+        images, self._pil_images = self._pil_images, []
+        self._local = threading.local()
+        for img in images:
+            if hasattr(img, 'close'):
+                img.close()
+            elif getattr(img, 'fp', None) is not None:
+                # PIL versions without `Image.close`
+                img.fp.close()
+
+    def __del__(self):
+        if getattr(self, '_pil_images', None):
+            self.close()
+
     def _find_numframes(self, img):
         """Find the number of frames in the multi-img."""
         i = 0
@@ -142,53 +413,91 @@ class MultiImage(object):
                 break
         return i
 
-    def _getframe(self, framenum):
-        """Open the image and extract the frame."""
-        from PIL import Image
-        img = Image.open(self.filename)
-        img.seek(framenum)
-        return np.asarray(img, dtype=self._dtype)
-
-    def _getallframes(self, img):
-        """Extract all frames from the multi-img."""
-        frames = []
-        try:
-            i = 0
-            while True:
-                frames.append(np.asarray(img, dtype=self._dtype))
-                i += 1
-                img.seek(i)
-        except EOFError:
-            return frames
+    def _read_page(self, n):
+        """Read an uncompressed TIFF page, None for compressed pages."""
+        byteorder, bigtiff = self._tiff_format
+        with open(self.filename, 'rb') as fh:
+            tags, _ = read_tiff_ifd(fh, int(self._pages[n]), byteorder,
+                                    bigtiff)
+            try:
+                offset, shape, dtype, planar = tiff_page_layout(byteorder,
+                                                                tags)
+            except ValueError:
+                return None
+            size = int(np.prod(shape))
+            fh.seek(offset)
+            frame = np.fromfile(fh, dtype=dtype, count=size)
+        if frame.size != size:
+            return None
+        frame = frame.reshape(shape)
+        if planar:
+            frame = frame.transpose(1, 2, 0)
+        return np.ascontiguousarray(frame, dtype=self._dtype)
+
+    def _load_frame(self, n):
+        """Read the `n`-th frame from the file.
+
+        This can be called from several threads at once.
+        """
+        if self._mmap:
+            frame = self._frames[n]
+            if self._dtype is not None:
+                frame = np.asarray(frame, dtype=self._dtype)
+            return frame
+
+        frame = None
+        if self._pages is not None:
+            frame = self._read_page(n)
+        if frame is None:
+            img = self._pil_image()
+            img.seek(n)
+            frame = np.asarray(img, dtype=self._dtype)
+        return frame
+
+    def _load_image(self, n):
+        """Return the `n`-th frame without touching the cache.
+
+        Unlike ``self[n]``, this can be called from several threads at once.
+        """
+        frame = self._cache.peek(n)
+        if frame is None:
+            frame = self._load_frame(n)
+        return frame
 
     def __getitem__(self, n):
         """Return the n-th frame as an array.
 
         Parameters
         ----------
-        n : int
-            Number of the required frame.
+        n : int or slice
+            Number of the required frame, or a slice selecting frames.
 
         Returns
         -------
-        frame : ndarray
-           The n-th frame.
+        frame : ndarray or list of ndarray
+           The n-th frame, or a list of the selected frames.
         """
         numframes = self._numframes
+        if isinstance(n, slice):
+            return [self[i] for i in range(numframes)[n]]
+
         if -numframes <= n < numframes:
             n = n % numframes
         else:
             raise IndexError("There are only %s frames in the image"
                              % numframes)
 
-        if self.conserve_memory:
-            if not self._cached == n:
-                frame = self._getframe(n)
-                self._cached = n
-                self._cachedframe = frame
-            return self._cachedframe
+        if self._mmap:
+            return self._load_frame(n)
+
+        if n in self._cache:
+            frame = self._cache.get(n)
         else:
-            return self._frames[n]
+            frame = self._prefetcher.get(n, self._load_frame)
+            self._cache.put(n, frame)
+        self._prefetcher.schedule(n, numframes, self._load_frame,
+                                  self._cache.__contains__)
+        return frame
 
     def __iter__(self):
         """Iterate over the frames."""
@@ -202,9 +511,14 @@ class MultiImage(object):
     def __str__(self):
         return str(self.filename) + ' [%s frames]' % self._numframes
 
-    def concatenate(self):
+    def concatenate(self, n_jobs=1):
         """Concatenate all images in the multi-image into an array.
 
+        Parameters
+        ----------
+        n_jobs : int, optional
+            Number of threads reading the frames.
+
         Returns
         -------
         ar : np.ndarray
@@ -219,7 +533,7 @@ class MultiImage(object):
         ValueError
             If images in the `MultiImage` don't have identical shapes.
         """
-        return concatenate_images(self)
+        return concatenate_images(self, n_jobs)
 
 
 class ImageCollection(object):
@@ -238,6 +552,19 @@ class ImageCollection(object):
     conserve_memory : bool, optional
         If True, never keep more than one in memory at a specific
         time.  Otherwise, images will be cached once they are loaded.
+    cache_size : int, optional
+        Maximum number of images kept in memory. The least recently used
+        images are evicted first. Overrides `conserve_memory`.
+    cache_bytes : int, optional
+        Maximum total size in bytes of the images kept in memory. The least
+        recently used images are evicted first. Overrides `conserve_memory`.
+    prefetch : int, optional
+        Number of images following the last accessed one which are loaded
+        by a pool of background threads, e.g. while the current image is
+        being processed when iterating over the collection.
+    n_jobs : int, optional
+        Number of threads loading images concurrently in `concatenate`.
+        Values smaller than 1 select all available CPU cores.
 
     Other parameters
     ----------------
@@ -250,6 +577,9 @@ class ImageCollection(object):
         If a glob string is given for `load_pattern`, this attribute
         stores the expanded file list.  Otherwise, this is simply
         equal to `load_pattern`.
+    data : (N, ) ndarray of object
+        The cached images at the positions of their files, None for images
+        which are not in memory. Read-only.
 
     Notes
     -----
@@ -295,7 +625,8 @@ class ImageCollection(object):
     >>> ic = io.ImageCollection('/tmp/work/*.png:/tmp/other/*.jpg')
 
     """
-    def __init__(self, load_pattern, conserve_memory=True, load_func=None):
+    def __init__(self, load_pattern, conserve_memory=True, load_func=None,
+                 cache_size=None, cache_bytes=None, prefetch=0, n_jobs=1):
         """Load and manage a collection of images."""
         if isinstance(load_pattern, six.string_types):
             load_pattern = load_pattern.split(':')
@@ -306,21 +637,19 @@ class ImageCollection(object):
         else:
             self._files = load_pattern
 
-        if conserve_memory:
-            memory_slots = 1
-        else:
-            memory_slots = len(self._files)
+        if cache_size is None and cache_bytes is None and conserve_memory:
+            cache_size = 1
 
         self._conserve_memory = conserve_memory
-        self._cached = None
+        self._cache = _ImageCache(cache_size, cache_bytes)
+        self._prefetcher = _Prefetcher(prefetch)
+        self.n_jobs = n_jobs
 
         if load_func is None:
             self.load_func = imread
         else:
             self.load_func = load_func
 
-        self.data = np.empty(memory_slots, dtype=object)
-
     @property
     def files(self):
         return self._files
@@ -329,6 +658,13 @@ class ImageCollection(object):
     def conserve_memory(self):
         return self._conserve_memory
 
+    @property
+    def data(self):
+        data = np.empty(len(self.files), dtype=object)
+        for n in range(len(data)):
+            data[n] = self._cache.peek(n)
+        return data
+
     def __getitem__(self, n):
         """Return selected image(s) in the collection.
 
@@ -355,32 +691,41 @@ class ImageCollection(object):
 
         if type(n) is int:
             n = self._check_imgnum(n)
-            idx = n % len(self.data)
 
-            if (self.conserve_memory and n != self._cached) or \
-                (self.data[idx] is None):
-                self.data[idx] = self.load_func(self.files[n])
-                self._cached = n
+            if n in self._cache:
+                img = self._cache.get(n)
+            else:
+                img = self._prefetcher.get(n, self._load_file)
+                self._cache.put(n, img)
+            self._prefetcher.schedule(n, len(self.files), self._load_file,
+                                      self._cache.__contains__)
 
-            return self.data[idx]
+            return img
         else:
             # A slice object was provided, so create a new ImageCollection
             # object. Any loaded image data in the original ImageCollection
             # will be copied by reference to the new object.  Image data
             # loaded after this creation is not linked.
-            fidx = range(len(self.files))[n]
+            fidx = list(range(len(self.files))[n])
             new_ic = copy(self)
             new_ic._files = [self.files[i] for i in fidx]
-            if self.conserve_memory:
-                if self._cached in fidx:
-                    new_ic._cached = fidx.index(self._cached)
-                    new_ic.data = np.copy(self.data)
-                else:
-                    new_ic.data = np.empty(1, dtype=object)
-            else:
-                new_ic.data = self.data[fidx]
+            new_ic._cache = self._cache.remap(fidx)
+            new_ic._prefetcher = _Prefetcher(self._prefetcher.count)
             return new_ic
 
+    def _load_image(self, n):
+        """Return the `n`-th image without touching the cache.
+
+        Unlike ``self[n]``, this can be called from several threads at once.
+        """
+        img = self._cache.peek(n)
+        if img is None:
+            img = self._load_file(n)
+        return img
+
+    def _load_file(self, n):
+        return self.load_func(self.files[n])
+
     def _check_imgnum(self, n):
         """Check that the given image number is valid."""
         num = len(self.files)
@@ -413,11 +758,25 @@ class ImageCollection(object):
             entire cache is erased.
 
         """
-        self.data = np.empty_like(self.data)
+        if n is None:
+            self._cache.clear()
+        else:
+            n = self._check_imgnum(n)
+            self._cache.discard(n)
+        self._prefetcher.discard(n)
 
-    def concatenate(self):
+    def concatenate(self, n_jobs=None):
         """Concatenate all images in the collection into an array.
 
+        The images are loaded by `n_jobs` threads and copied into the output
+        array as they come, without keeping them in the cache.
+
+        Parameters
+        ----------
+        n_jobs : int, optional
+            Number of threads loading the images. Defaults to the `n_jobs`
+            of the collection.
+
         Returns
         -------
         ar : np.ndarray
@@ -432,4 +791,6 @@ class ImageCollection(object):
         ValueError
             If images in the `ImageCollection` don't have identical shapes.
         """
-        return concatenate_images(self)
+        if n_jobs is None:
+            n_jobs = self.n_jobs
+        return concatenate_images(self, n_jobs)
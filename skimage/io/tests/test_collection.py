@@ -1,5 +1,6 @@
 import sys
 import os.path
+from tempfile import NamedTemporaryFile
 
 import numpy as np
 from numpy.testing import (assert_raises,
@@ -99,6 +100,90 @@ class TestImageCollection():
                                 self.collection[0].shape)
         assert_raises(ValueError, self.collection.concatenate)
 
+    def test_concatenate_n_jobs(self):
+        ar = self.collection_matched.concatenate(n_jobs=2)
+        assert_equal(ar, self.collection_matched.concatenate(n_jobs=1))
+        assert_raises(ValueError, self.collection.concatenate, n_jobs=2)
+
+    def test_concatenate_upcast(self):
+        images = [np.zeros((2, 3), dtype=np.uint8),
+                  np.ones((2, 3), dtype=np.uint16),
+                  0.5 * np.ones((2, 3))]
+        ic = ImageCollection(list(range(3)), load_func=images.__getitem__)
+        ar = ic.concatenate(n_jobs=3)
+        assert_equal(ar.dtype, np.double)
+        assert_equal(ar, np.concatenate([img[np.newaxis] for img in images]))
+
+    def test_cache_size(self):
+        loaded = []
+
+        def load_fn(x):
+            loaded.append(x)
+            return np.zeros(x)
+
+        ic = ImageCollection(list(range(1, 6)), load_func=load_fn,
+                             cache_size=2)
+        for i in [0, 1, 0, 2, 0, 1]:
+            assert_equal(ic[i].shape, (i + 1,))
+        # image 1 is the least recently used one when image 2 is loaded
+        assert_equal(loaded, [1, 2, 3, 2])
+
+        ic.reload(0)
+        ic[0]
+        assert_equal(loaded, [1, 2, 3, 2, 1])
+
+    def test_data(self):
+        ic = ImageCollection(list(range(1, 4)), load_func=np.zeros,
+                             cache_size=2)
+        assert_equal(list(ic.data), [None] * 3)
+        ic[0]
+        ic[2]
+        assert_equal([d is None for d in ic.data], [False, True, False])
+        assert_equal(ic.data[2], np.zeros(3))
+
+        def set_data(d):
+            ic.data = d
+        assert_raises(AttributeError, set_data, None)
+
+    def test_cache_bytes(self):
+        loaded = []
+
+        def load_fn(x):
+            loaded.append(x)
+            return np.zeros(x, dtype=np.uint8)
+
+        ic = ImageCollection([10, 20, 30], load_func=load_fn, cache_bytes=50)
+        for i in [0, 1, 2, 1, 0]:
+            ic[i]
+        assert_equal(loaded, [10, 20, 30, 10])
+
+    def test_cache_slicing(self):
+        loaded = []
+
+        def load_fn(x):
+            loaded.append(x)
+            return x
+
+        ic = ImageCollection(list(range(4)), load_func=load_fn,
+                             conserve_memory=False)
+        ic[1]
+        ic[2]
+        new_ic = ic[::-1]
+        assert_equal(new_ic[1], 2)
+        assert_equal(new_ic[2], 1)
+        assert_equal(loaded, [1, 2])
+
+    def test_prefetch(self):
+        loaded = []
+
+        def load_fn(x):
+            loaded.append(x)
+            return np.array([x])
+
+        ic = ImageCollection(list(range(10)), load_func=load_fn, prefetch=3)
+        assert_equal([img[0] for img in ic], list(range(10)))
+        assert_equal(sorted(loaded), list(range(10)))
+
 
 class TestMultiImage():
 
@@ -148,6 +233,101 @@ class TestMultiImage():
         assert_equal(ar.shape, (len(self.img),) + 
                                 self.img[0].shape)
 
+    @skipif(not PIL_available)
+    def test_frames_match_pil(self):
+        pil_img = Image.open(os.path.join(data_dir, 'multipage.tif'))
+        for conserve_memory in (True, False):
+            img = MultiImage(os.path.join(data_dir, 'multipage.tif'),
+                             conserve_memory=conserve_memory)
+            for i in [1, 0, 1]:
+                pil_img.seek(i)
+                assert_equal(img[i], np.asarray(pil_img))
+
+    @skipif(not PIL_available)
+    def test_slicing(self):
+        frames = self.img[::-1]
+        assert_equal(len(frames), 2)
+        assert_equal(frames[0], self.img[1])
+        assert_equal(frames[1], self.img[0])
+
+    @skipif(not PIL_available)
+    def test_compressed_pages(self):
+        frames = [np.arange(i, i + 20, dtype=np.uint8).reshape(4, 5)
+                  for i in range(3)]
+        f = NamedTemporaryFile(suffix='.tif', delete=False)
+        f.close()
+        try:
+            pil_frames = [Image.fromarray(frame) for frame in frames]
+            pil_frames[0].save(f.name, compression='tiff_lzw',
+                               save_all=True, append_images=pil_frames[1:])
+            img = MultiImage(f.name, cache_size=2, prefetch=2)
+            assert_equal(len(img), 3)
+            for i in [2, 0, 1, 2]:
+                assert_equal(img[i], frames[i])
+            assert_equal(img.concatenate(n_jobs=2), np.array(frames))
+            img.close()
+        finally:
+            os.remove(f.name)
+
+    @skipif(not PIL_available)
+    def test_close(self):
+        frames = [np.arange(i, i + 20, dtype=np.uint8).reshape(4, 5)
+                  for i in range(3)]
+        f = NamedTemporaryFile(suffix='.tif', delete=False)
+        f.close()
+        try:
+            pil_frames = [Image.fromarray(frame) for frame in frames]
+            pil_frames[0].save(f.name, compression='tiff_lzw',
+                               save_all=True, append_images=pil_frames[1:])
+            img = MultiImage(f.name)
+            img.concatenate(n_jobs=2)
+            pil_images = list(img._pil_images)
+            assert len(pil_images) > 0
+            img.close()
+            for pil_img in pil_images:
+                assert pil_img.fp is None or pil_img.fp.closed
+            # frames can still be read after closing
+            assert_equal(img[1], frames[1])
+            img.close()
+        finally:
+            os.remove(f.name)
+
+    @skipif(not PIL_available)
+    def test_persist_index(self):
+        f = NamedTemporaryFile(suffix='.tif', delete=False)
+        f.write(open(os.path.join(data_dir, 'multipage.tif'), 'rb').read())
+        f.close()
+        try:
+            img = MultiImage(f.name, persist_index=True)
+            assert os.path.exists(f.name + '.index.npy')
+            img2 = MultiImage(f.name, persist_index=True)
+            assert_equal(len(img2), 2)
+            for i in range(2):
+                assert_equal(img2[i], self.img[i])
+        finally:
+            os.remove(f.name)
+            if os.path.exists(f.name + '.index.npy'):
+                os.remove(f.name + '.index.npy')
+
+    @skipif(not PIL_available)
+    def test_mmap(self):
+        img = MultiImage(os.path.join(data_dir, 'multipage.tif'), mmap=True)
+        assert_equal(len(img), len(self.img))
+        for i in range(len(img)):
+            assert isinstance(img[i], np.memmap)
+            assert_equal(img[i], self.img[i])
+
+    @skipif(not PIL_available)
+    def test_mmap_compressed(self):
+        f = NamedTemporaryFile(suffix='.tif', delete=False)
+        f.close()
+        try:
+            Image.fromarray(np.zeros((5, 5), dtype=np.uint8)).save(
+                f.name, compression='tiff_lzw')
+            assert_raises(ValueError, MultiImage, f.name, mmap=True)
+        finally:
+            os.remove(f.name)
+
 
 if __name__ == "__main__":
     from numpy.testing import run_module_suite
@@ -1,6 +1,8 @@
 import os
+from tempfile import NamedTemporaryFile
 
-from numpy.testing import assert_array_equal, raises, run_module_suite
+from numpy.testing import (assert_array_equal, assert_raises, raises,
+                           run_module_suite)
 import numpy as np
 
 import skimage.io as io
@@ -28,5 +30,39 @@ def test_imread_url():
     assert image.shape == (512, 512)
 
 
+def test_imread_mmap_tiff():
+    expected = np.load(os.path.join(data_dir, 'chessboard_GRAY_U8.npy'))
+    for name in ['chessboard_GRAY_U16.tif', 'chessboard_GRAY_U16B.tif']:
+        img = io.imread(os.path.join(data_dir, name), mmap=True)
+        assert isinstance(img, np.memmap)
+        assert not img.flags.writeable
+        assert_array_equal(img, expected)
+
+
+def test_imread_mmap_npy():
+    fname = os.path.join(data_dir, 'chessboard_RGB_U8.npy')
+    img = io.imread(fname, mmap=True)
+    assert isinstance(img, np.memmap)
+    assert_array_equal(img, np.load(fname))
+
+
+def test_imread_mmap_raw():
+    x = np.arange(60, dtype=np.uint16).reshape(5, 12)
+    f = NamedTemporaryFile(suffix='.raw', delete=False)
+    try:
+        f.write(b'head')
+        f.write(x.tostring())
+        f.close()
+        img = io.imread(f.name, mmap=True, shape=(5, 12), dtype=np.uint16,
+                        offset=4)
+        assert_array_equal(img, x)
+        assert_raises(ValueError, io.imread, f.name, mmap=True)
+        assert_raises(ValueError, io.imread, f.name, mmap=True,
+                      shape=(6, 12), dtype=np.uint16, offset=4)
+        del img
+    finally:
+        os.remove(f.name)
+
+
 if __name__ == "__main__":
     run_module_suite()
@@ -84,5 +84,72 @@ class TestPlugin:
         assert 'qt' in io.plugins()
         assert 'test' in io.plugins(loaded=True)
 
+    def test_registry(self):
+        # the registry must be regenerated when a plugin .ini file changes
+        module_name, meta_data = plugin._scan_plugins()
+        assert_equal(plugin.plugin_module_name, module_name)
+        assert_equal(plugin.plugin_meta_data, meta_data)
+
+    def test_loaded_after_reset(self):
+        io.reset_plugins()
+        try:
+            loaded = io.plugins(loaded=True)
+            assert 'null' in loaded
+            order = io.plugin_order()
+            for kind in order:
+                for name in order[kind]:
+                    assert name in loaded
+        finally:
+            plugin.use('test')
+
+    @skipif(not PIL_available)
+    def test_extension_dispatch(self):
+        io.reset_plugins()
+        plugin._prefer('pil', 'imread')
+        plugin._prefer('test', 'imread')
+        plugin.plugin_extensions['test'] = set(['.png'])
+        try:
+            func = plugin._find_function('imread', None, '.png')
+            assert_equal(func.__module__, 'skimage.io._plugins.test_plugin')
+            # the test plugin does not claim .tif files
+            func = plugin._find_function('imread', None, '.tif')
+            assert_equal(func.__module__, 'skimage.io._plugins.pil_plugin')
+            # but reads them once chosen by the user
+            plugin.use('test', 'imread')
+            func = plugin._find_function('imread', None, '.tif')
+            assert_equal(func.__module__, 'skimage.io._plugins.test_plugin')
+        finally:
+            del plugin.plugin_extensions['test']
+            io.reset_plugins()
+            plugin.use('test')
+
+
+class TestLazyPlugin:
+    def setUp(self):
+        # the test plugin and a plugin which cannot be imported are in line
+        plugin.reset_plugins()
+        plugin._prefer('test', 'imread')
+        plugin._prefer('asd_not_importable', 'imread')
+        plugin.plugin_module_name['asd_not_importable'] = 'asd_not_importable'
+        plugin.plugin_provides['asd_not_importable'] = ['imread']
+
+    def tearDown(self):
+        del plugin.plugin_module_name['asd_not_importable']
+        del plugin.plugin_provides['asd_not_importable']
+        io.reset_plugins()
+        plugin.use('test')
+
+    def test_lazy_import(self):
+        assert 'test' not in plugin._loaded
+        io.imread('test.png', dtype='i4')
+        assert 'test' in plugin._loaded
+        assert_equal(io.plugin_order()['imread'], ['test'])
+
+    def test_introspection_loads_preferred(self):
+        assert_equal(io.plugin_order()['imread'], ['test'])
+        assert 'test' in io.plugins(loaded=True)
+        assert 'asd_not_importable' not in io.plugins(loaded=True)
+
+
 if __name__ == "__main__":
     run_module_suite()
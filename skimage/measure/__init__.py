@@ -1,6 +1,6 @@
 from .find_contours import find_contours
 from ._marching_cubes import marching_cubes, mesh_surface_area
-from ._regionprops import regionprops, perimeter
+from ._regionprops import regionprops, regionprops_table, perimeter
 from ._structural_similarity import structural_similarity
 from ._polygon import approximate_polygon, subdivide_polygon
 from ._moments import moments, moments_central, moments_normalized, moments_hu
@@ -10,6 +10,7 @@ from .block import block_reduce
 
 __all__ = ['find_contours',
            'regionprops',
+           'regionprops_table',
            'perimeter',
            'structural_similarity',
            'approximate_polygon',
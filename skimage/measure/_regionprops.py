@@ -10,7 +10,7 @@ from skimage.morphology import convex_hull_image, label
 from skimage.measure import _moments
 
 
-__all__ = ['regionprops', 'perimeter']
+__all__ = ['regionprops', 'regionprops_table', 'perimeter']
 
 
 STREL_4 = np.array([[0, 1, 0],
@@ -512,6 +512,185 @@ def regionprops(label_image, properties=None,
     return regions
 
 
+TABLE_PROPS = ('label', 'area', 'bbox', 'centroid', 'moments',
+               'moments_central', 'inertia_tensor', 'inertia_tensor_eigvals',
+               'eccentricity', 'orientation', 'major_axis_length',
+               'minor_axis_length', 'equivalent_diameter', 'extent',
+               'max_intensity', 'mean_intensity', 'min_intensity')
+_CENTRAL_PROPS = ('moments_central', 'inertia_tensor',
+                  'inertia_tensor_eigvals', 'eccentricity', 'orientation',
+                  'major_axis_length', 'minor_axis_length')
+_INTENSITY_PROPS = ('max_intensity', 'mean_intensity', 'min_intensity')
+
+
+def _group_extrema(values, region, n_regions):
+    """Return the minimum and maximum of `values` within each region."""
+    order = np.lexsort((values, region))
+    region = region[order]
+    values = values[order]
+    index = np.arange(n_regions)
+    first = np.searchsorted(region, index, side='left')
+    last = np.searchsorted(region, index, side='right') - 1
+    return values[first], values[last]
+
+
+def _moments_table(dr, dc, region, n_regions, weights=None, order=3):
+    """Return the moments ``m[k, p, q] = sum(dc ** p * dr ** q)`` of all
+    regions `k`, optionally weighted."""
+    m = np.zeros((n_regions, order + 1, order + 1), dtype=np.double)
+    for p in range(order + 1):
+        for q in range(order + 1):
+            w = dc ** p * dr ** q
+            if weights is not None:
+                w = w * weights
+            m[:, p, q] = np.bincount(region, w, minlength=n_regions)
+    return m
+
+
+def regionprops_table(label_image, intensity_image=None,
+                      properties=('label', 'area', 'bbox', 'centroid')):
+    """Measure properties of all labelled image regions at once.
+
+    In contrast to `regionprops`, no object is created per region. Every
+    property is computed for all regions in a single pass over the image,
+    which is much faster for images with many regions.
+
+    Parameters
+    ----------
+    label_image : (N, M) ndarray
+        Labelled input image. Pixels with labels smaller than 1 are ignored.
+    intensity_image : (N, M) ndarray, optional
+        Intensity image with same size as labelled image. Required for the
+        intensity properties.
+    properties : sequence of str, optional
+        Properties to compute. Supported are 'label', 'area', 'bbox',
+        'centroid', 'moments', 'moments_central', 'inertia_tensor',
+        'inertia_tensor_eigvals', 'eccentricity', 'orientation',
+        'major_axis_length', 'minor_axis_length', 'equivalent_diameter',
+        'extent', 'max_intensity', 'mean_intensity' and 'min_intensity',
+        see `regionprops` for their definition.
+
+    Returns
+    -------
+    table : dict
+        Mapping of column names to arrays with one entry per region, in
+        increasing order of the labels. Properties with several values are
+        split into one column per value, e.g. ``bbox-0`` to ``bbox-3`` and
+        ``moments-0-0`` to ``moments-3-3``.
+
+    Examples
+    --------
+    >>> from skimage.data import coins
+    >>> from skimage.morphology import label
+    >>> label_img = label(coins() > 110, background=0) + 1
+    >>> table = regionprops_table(label_img, properties=['label', 'area'])
+    >>> table['area'] # area of all labelled objects
+    """
+
+    label_image = np.squeeze(label_image)
+
+    if label_image.ndim != 2:
+        raise TypeError('Only 2-D images supported.')
+
+    for prop in properties:
+        if prop not in TABLE_PROPS:
+            raise ValueError('Unsupported property %r.' % prop)
+
+    cols = label_image.shape[1]
+    flat_labels = label_image.ravel()
+    pixels = np.flatnonzero(flat_labels > 0)
+    pixel_labels = flat_labels[pixels].astype(np.intp)
+    rr = pixels // cols
+    cc = pixels % cols
+
+    # consecutive region index of each pixel
+    if pixel_labels.size:
+        counts = np.bincount(pixel_labels)
+    else:
+        counts = np.zeros(1, dtype=np.intp)
+    labels = np.flatnonzero(counts)
+    n_regions = len(labels)
+    index = np.zeros(len(counts), dtype=np.intp)
+    index[labels] = np.arange(n_regions)
+    region = index[pixel_labels]
+
+    area = counts[labels]
+    min_row, max_row = _group_extrema(rr, region, n_regions)
+    min_col, max_col = _group_extrema(cc, region, n_regions)
+
+    moments = _moments_table(rr - min_row[region], cc - min_col[region],
+                             region, n_regions)
+    local_row = moments[:, 0, 1] / moments[:, 0, 0]
+    local_col = moments[:, 1, 0] / moments[:, 0, 0]
+    centroid_row = local_row + min_row
+    centroid_col = local_col + min_col
+
+    computed = {
+        'label': labels,
+        'area': area,
+        'bbox': (min_row, min_col, max_row + 1, max_col + 1),
+        'centroid': (centroid_row, centroid_col),
+        'moments': moments,
+        'equivalent_diameter': np.sqrt(4 * area / PI),
+        'extent': area / ((max_row - min_row + 1.)
+                          * (max_col - min_col + 1.)),
+    }
+
+    if set(properties) & set(_CENTRAL_PROPS):
+        mu = _moments_table(rr - centroid_row[region],
+                            cc - centroid_col[region], region, n_regions)
+        a = mu[:, 2, 0] / mu[:, 0, 0]
+        b = -mu[:, 1, 1] / mu[:, 0, 0]
+        c = mu[:, 0, 2] / mu[:, 0, 0]
+        root = np.sqrt(4 * b ** 2 + (a - c) ** 2) / 2
+        l1 = (a + c) / 2 + root
+        l2 = (a + c) / 2 - root
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            eccentricity = np.where(l1 == 0, 0, np.sqrt(1 - l2 / l1))
+        orientation = np.where(a - c == 0,
+                               np.where(-b > 0, -PI / 4., PI / 4.),
+                               -0.5 * np.arctan2(-2 * b, a - c))
+
+        computed.update({
+            'moments_central': mu,
+            'inertia_tensor': np.array([[a, b], [b, c]]).transpose(2, 0, 1),
+            'inertia_tensor_eigvals': (l1, l2),
+            'eccentricity': eccentricity,
+            'orientation': orientation,
+            'major_axis_length': 4 * np.sqrt(l1),
+            'minor_axis_length': 4 * np.sqrt(np.maximum(l2, 0)),
+        })
+
+    if set(properties) & set(_INTENSITY_PROPS):
+        if intensity_image is None:
+            raise AttributeError('No intensity image specified.')
+        intensity = np.asarray(intensity_image).ravel()[pixels]
+        min_intensity, max_intensity = _group_extrema(intensity, region,
+                                                      n_regions)
+        computed.update({
+            'max_intensity': max_intensity,
+            'mean_intensity': np.bincount(region, intensity,
+                                          minlength=n_regions) / area,
+            'min_intensity': min_intensity,
+        })
+
+    table = {}
+    for prop in properties:
+        value = computed[prop]
+        if isinstance(value, tuple):
+            for i, column in enumerate(value):
+                table['%s-%d' % (prop, i)] = column
+        elif value.ndim == 3:
+            for i in range(value.shape[1]):
+                for j in range(value.shape[2]):
+                    table['%s-%d-%d' % (prop, i, j)] = value[:, i, j]
+        else:
+            table[prop] = value
+
+    return table
+
+
 def perimeter(image, neighbourhood=4):
     """Calculate total perimeter of all objects in binary image.
 
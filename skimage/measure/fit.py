@@ -2,6 +2,8 @@ import math
 import numpy as np
 from scipy import optimize
 
+from .._shared.utils import effective_n_jobs, run_in_bands
+
 
 def _check_data_dim(data, dim):
     if data.ndim != 2 or data.shape[1] != dim:
@@ -450,9 +452,94 @@ class EllipseModel(BaseModel):
         return np.concatenate((x[..., None], y[..., None]), axis=t.ndim)
 
 
+def _dynamic_max_trials(n_inliers, n_samples, min_samples, probability):
+    """Number of trials needed to draw an outlier-free sample set.
+
+    Parameters
+    ----------
+    n_inliers : int
+        Number of inliers of the best model so far.
+    n_samples : int
+        Total number of samples.
+    min_samples : int
+        Number of samples drawn per trial.
+    probability : float
+        Probability (confidence) of drawing at least one outlier-free sample
+        set within the returned number of trials.
+
+    Returns
+    -------
+    trials : int or inf
+        Number of trials.
+
+    """
+    if probability >= 1 or n_inliers == 0:
+        return np.inf
+    if probability <= 0:
+        return 0
+    inlier_ratio = n_inliers / float(n_samples)
+    nom = math.log(1 - probability)
+    denom = 1 - inlier_ratio ** min_samples
+    if denom <= 0:
+        return 1
+    denom = math.log(denom)
+    if denom == 0:
+        return np.inf
+    return int(math.ceil(nom / denom))
+
+
+def _score_model(model, data, residual_threshold, min_inlier_num,
+                 min_chunk_size):
+    """Classify all data as inliers or outliers of a model.
+
+    The residuals are computed in chunks which end where the model could
+    first fail to reach `min_inlier_num` inliers, and the scoring is
+    abandoned as soon as it does.
+
+    Returns
+    -------
+    inliers : (N, ) array or None
+        Boolean mask of inliers, None if the scoring was abandoned.
+    inlier_num : int
+        Number of inliers.
+    residuals_sum : float
+        Sum of the squared residuals.
+
+    """
+    N = data[0].shape[0]
+    if N <= min_chunk_size:
+        residuals = np.abs(model.residuals(*data))
+        inliers = residuals < residual_threshold
+        inlier_num = np.sum(inliers)
+        if inlier_num < min_inlier_num:
+            return None, inlier_num, np.inf
+        return inliers, inlier_num, np.sum(residuals ** 2)
+
+    inliers = np.empty(N, dtype=bool)
+    inlier_num = 0
+    residuals_sum = 0
+    start = 0
+    while start < N:
+        # the model fails as soon as it misses more than
+        # `N - min_inlier_num` samples
+        stop = max(N - min_inlier_num + inlier_num + 1,
+                   start + min_chunk_size)
+        stop = min(stop, N)
+        residuals = np.abs(model.residuals(*[d[start:stop] for d in data]))
+        chunk_inliers = inliers[start:stop]
+        chunk_inliers[:] = residuals < residual_threshold
+        inlier_num += np.sum(chunk_inliers)
+        residuals_sum += np.sum(residuals ** 2)
+        if inlier_num + N - stop < min_inlier_num:
+            return None, inlier_num, np.inf
+        start = stop
+    return inliers, inlier_num, residuals_sum
+
+
 def ransac(data, model_class, min_samples, residual_threshold,
            is_data_valid=None, is_model_valid=None,
-           max_trials=100, stop_sample_num=np.inf, stop_residuals_sum=0):
+           max_trials=100, stop_sample_num=np.inf, stop_residuals_sum=0,
+           stop_probability=1, n_jobs=1):
     """Fit a model to data with the RANSAC (random sample consensus) algorithm.
 
     RANSAC is an iterative algorithm for the robust estimation of parameters
@@ -477,6 +564,10 @@ def ransac(data, model_class, min_samples, residual_threshold,
     the special stop criteria are met. The final model is estimated using all
     inlier samples of the previously determined best model.
 
+    The residuals of step 3 are computed in chunks, and a model is discarded
+    as soon as it cannot reach the number of inliers of the best model
+    anymore. This does not change the result.
+
     Parameters
     ----------
     data : [list, tuple of] (N, D) array
@@ -511,6 +602,24 @@ def ransac(data, model_class, min_samples, residual_threshold,
         Stop iteration if at least this number of inliers are found.
     stop_residuals_sum : float, optional
         Stop iteration if sum of residuals is less equal than this threshold.
+    stop_probability : float in range [0, 1], optional
+        RANSAC iteration stops if at least one outlier-free set of the
+        training data is sampled with ``probability >= stop_probability``,
+        depending on the current best model's inlier ratio and the number
+        of trials. This requires to generate at least N samples (trials):
+
+            N >= log(1 - probability) / log(1 - e**m)
+
+        where the probability (confidence) is typically set to a high value
+        such as 0.99, e is the current fraction of inliers w.r.t. the total
+        number of samples, and m is the `min_samples` value. The default
+        value of 1 disables this criterion.
+    n_jobs : int, optional
+        Number of threads which estimate and score the models of a batch of
+        random sample sets in parallel. Values smaller than 1 select all
+        available CPU cores. The result does not depend on `n_jobs`, but
+        `is_data_valid`, `is_model_valid` and the methods of `model_class`
+        must be thread-safe if it is not 1.
 
     Returns
     -------
@@ -598,49 +707,111 @@ def ransac(data, model_class, min_samples, residual_threshold,
     # number of samples
     N = data[0].shape[0]
 
-    for _ in range(max_trials):
+    # score at least a thousand samples per chunk to keep the overhead of
+    # calling `residuals` low; smaller data sets are scored in one go
+    min_chunk_size = max(1024, N // 16)
+    n_threads = effective_n_jobs(n_jobs)
 
-        # choose random sample set
-        samples = []
-        random_idxs = np.random.randint(0, N, min_samples)
-        for d in data:
-            samples.append(d[random_idxs])
+    # models are reused for the following trials unless they become the best
+    # model, instead of creating a new one for every trial
+    spare_models = []
 
+    def evaluate(model, sample, min_inlier_num):
         # check if random sample set is valid
-        if is_data_valid is not None and not is_data_valid(*samples):
-            continue
+        if is_data_valid is not None and not is_data_valid(*sample):
+            return None
 
         # estimate model for current random sample set
-        sample_model = model_class()
-        sample_model.estimate(*samples)
+        model.estimate(*sample)
 
         # check if estimated model is valid
-        if is_model_valid is not None and not is_model_valid(sample_model,
-                                                             *samples):
-            continue
-
-        sample_model_residuals = np.abs(sample_model.residuals(*data))
-        # consensus set / inliers
-        sample_model_inliers = sample_model_residuals < residual_threshold
-        sample_model_residuals_sum = np.sum(sample_model_residuals**2)
-
-        # choose as new best model if number of inliers is maximal
-        sample_inlier_num = np.sum(sample_model_inliers)
-        if (
-            # more inliers
-            sample_inlier_num > best_inlier_num
-            # same number of inliers but less "error" in terms of residuals
-            or (sample_inlier_num == best_inlier_num
-                and sample_model_residuals_sum < best_inlier_residuals_sum)
-        ):
-            best_model = sample_model
-            best_inlier_num = sample_inlier_num
-            best_inlier_residuals_sum = sample_model_residuals_sum
-            best_inliers = sample_model_inliers
-            if (
-                best_inlier_num >= stop_sample_num
-                or best_inlier_residuals_sum <= stop_residuals_sum
-            ):
+        if is_model_valid is not None and not is_model_valid(model, *sample):
+            return None
+
+        return _score_model(model, data, residual_threshold, min_inlier_num,
+                            min_chunk_size)
+
+    def evaluate_batch(start, stop, models, samples, results,
+                       min_inlier_num):
+        for i in range(start, stop):
+            results[i] = evaluate(models[i], samples[i], min_inlier_num)
+
+    # threads only pay off if the residuals of a model take a while
+    sequential = n_threads == 1 or N <= min_chunk_size
+
+    num_trials = 0
+    done = False
+    while not done and num_trials < max_trials:
+
+        if sequential:
+            random_idxs = np.random.randint(0, N, min_samples)
+            if spare_models:
+                sample_model = spare_models.pop()
+            else:
+                sample_model = model_class()
+            models = [sample_model]
+            results = [evaluate(sample_model, [d[random_idxs] for d in data],
+                                best_inlier_num)]
+        else:
+            # choose a batch of random sample sets
+            batch_size = int(min(n_threads, max_trials - num_trials))
+            samples = []
+            for _ in range(batch_size):
+                random_idxs = np.random.randint(0, N, min_samples)
+                samples.append([d[random_idxs] for d in data])
+
+            while len(spare_models) < batch_size:
+                spare_models.append(model_class())
+            models = spare_models[-batch_size:]
+            del spare_models[-batch_size:]
+
+            # models with fewer inliers than the current best model are never
+            # chosen, no matter which model of the batch wins
+            results = [None] * batch_size
+            run_in_bands(lambda start, stop: evaluate_batch(start, stop,
+                                                            models, samples,
+                                                            results,
+                                                            best_inlier_num),
+                         batch_size, n_threads)
+
+        # process the batch in the same order as sequential trials
+        for sample_model, result in zip(models, results):
+            num_trials += 1
+            if result is None or result[0] is None:
+                spare_models.append(sample_model)
+            else:
+                (sample_model_inliers, sample_inlier_num,
+                 sample_model_residuals_sum) = result
+
+                # choose as new best model if number of inliers is maximal
+                if (
+                    # more inliers
+                    sample_inlier_num > best_inlier_num
+                    # same number of inliers but less "error" in terms of
+                    # residuals
+                    or (sample_inlier_num == best_inlier_num
+                        and sample_model_residuals_sum
+                            < best_inlier_residuals_sum)
+                ):
+                    if best_model is not None:
+                        spare_models.append(best_model)
+                    best_model = sample_model
+                    best_inlier_num = sample_inlier_num
+                    best_inlier_residuals_sum = sample_model_residuals_sum
+                    best_inliers = sample_model_inliers
+                    max_trials = min(max_trials,
+                                     _dynamic_max_trials(best_inlier_num, N,
+                                                         min_samples,
+                                                         stop_probability))
+                    if (
+                        best_inlier_num >= stop_sample_num
+                        or best_inlier_residuals_sum <= stop_residuals_sum
+                    ):
+                        done = True
+                else:
+                    spare_models.append(sample_model)
+
+            if done or num_trials >= max_trials:
                 break
 
     # estimate final model using all inliers
@@ -1,6 +1,7 @@
 import numpy as np
 from numpy.testing import assert_equal, assert_raises, assert_almost_equal
 from skimage.measure import LineModel, CircleModel, EllipseModel, ransac
+from skimage.measure.fit import _dynamic_max_trials
 from skimage.transform import AffineTransform
 
 
@@ -204,5 +205,82 @@ def test_ransac_is_model_valid():
     assert_equal(inliers, None)
 
 
+def test_ransac_dynamic_max_trials():
+    # Numbers hand-calculated and confirmed on page 119 (Table 4.3) in
+    #   Hartley, R.~I. and Zisserman, A., 2004,
+    #   Multiple View Geometry in Computer Vision, Second Edition,
+    #   Cambridge University Press, ISBN: 0521540518
+
+    # e = 0%, min_samples = X
+    assert_equal(_dynamic_max_trials(100, 100, 2, 0.99), 1)
+
+    # e = 5%, min_samples = 2
+    assert_equal(_dynamic_max_trials(95, 100, 2, 0.99), 2)
+    # e = 10%, min_samples = 2
+    assert_equal(_dynamic_max_trials(90, 100, 2, 0.99), 3)
+    # e = 30%, min_samples = 2
+    assert_equal(_dynamic_max_trials(70, 100, 2, 0.99), 7)
+    # e = 50%, min_samples = 2
+    assert_equal(_dynamic_max_trials(50, 100, 2, 0.99), 17)
+
+    # e = 5%, min_samples = 8
+    assert_equal(_dynamic_max_trials(95, 100, 8, 0.99), 5)
+    # e = 50%, min_samples = 8
+    assert_equal(_dynamic_max_trials(50, 100, 8, 0.99), 1177)
+
+    # stop_probability = 1 disables the criterion
+    assert_equal(_dynamic_max_trials(50, 100, 2, 1), np.inf)
+    assert_equal(_dynamic_max_trials(0, 100, 2, 0.99), np.inf)
+
+
+def _line_data_with_outliers():
+    np.random.seed(1)
+    x = np.arange(-200, 200)
+    y = 0.2 * x + 20
+    data = np.column_stack([x, y]).astype(np.double)
+    data[::2] = 400 * np.random.random((200, 2)) - 200
+    return data
+
+
+def test_ransac_stop_probability():
+    data = _line_data_with_outliers()
+    trials = []
+
+    def is_data_valid(data):
+        trials.append(True)
+        return True
+
+    np.random.seed(1)
+    model, inliers = ransac(data, LineModel, 2, 1, max_trials=1000,
+                            stop_probability=0.99,
+                            is_data_valid=is_data_valid)
+    # about 17 trials are needed for 50% inliers (see above)
+    assert len(trials) < 100
+    assert np.all(inliers[1::2])
+    assert np.sum(inliers[::2]) < 10
+
+
+def test_ransac_n_jobs():
+    data = _line_data_with_outliers()
+    np.random.seed(2)
+    model1, inliers1 = ransac(data, LineModel, 2, 1, max_trials=50)
+    np.random.seed(2)
+    model3, inliers3 = ransac(data, LineModel, 2, 1, max_trials=50, n_jobs=3)
+    assert_equal(inliers1, inliers3)
+    assert_almost_equal(model1._params, model3._params)
+
+
+def test_ransac_n_jobs_chunked():
+    # enough samples to score the models in several chunks
+    data = np.tile(_line_data_with_outliers(), (8, 1))
+    np.random.seed(2)
+    model1, inliers1 = ransac(data, LineModel, 2, 1, max_trials=50)
+    np.random.seed(2)
+    model3, inliers3 = ransac(data, LineModel, 2, 1, max_trials=50, n_jobs=3)
+    assert_equal(inliers1, inliers3)
+    assert_almost_equal(model1._params, model3._params)
+    assert np.all(inliers1[1::2])
+
+
 if __name__ == "__main__":
     np.testing.run_module_suite()
@@ -3,7 +3,9 @@ from numpy.testing import assert_array_equal, assert_almost_equal, \
 import numpy as np
 import math
 
-from skimage.measure._regionprops import regionprops, PROPS, perimeter
+from skimage.measure._regionprops import (regionprops, regionprops_table,
+                                          PROPS, TABLE_PROPS, perimeter)
+from skimage.morphology import label
 
 
 SAMPLE = np.array(
@@ -347,6 +349,37 @@ def test_old_dict_interface():
     assert_equal(len(feats[0]), 8)
 
 
+def test_regionprops_table():
+    label_image = label(SAMPLE, neighbors=4, background=0) + 1
+    table = regionprops_table(label_image, INTENSITY_SAMPLE, TABLE_PROPS)
+    regions = regionprops(label_image, intensity_image=INTENSITY_SAMPLE)
+
+    assert_equal(len(table['label']), len(regions))
+    for k, region in enumerate(regions):
+        for prop in TABLE_PROPS:
+            expected = np.asarray(region[prop], dtype=np.double)
+            if expected.ndim == 0:
+                observed = table[prop][k]
+            elif expected.ndim == 1:
+                observed = [table['%s-%d' % (prop, i)][k]
+                            for i in range(len(expected))]
+            else:
+                observed = [[table['%s-%d-%d' % (prop, i, j)][k]
+                             for j in range(expected.shape[1])]
+                            for i in range(expected.shape[0])]
+            assert_array_almost_equal(observed, expected)
+
+
+def test_regionprops_table_columns():
+    table = regionprops_table(SAMPLE)
+    assert_equal(sorted(table), ['area', 'bbox-0', 'bbox-1', 'bbox-2',
+                                 'bbox-3', 'centroid-0', 'centroid-1',
+                                 'label'])
+    assert_raises(ValueError, regionprops_table, SAMPLE,
+                  properties=['convex_image'])
+    assert_raises(AttributeError, regionprops_table, SAMPLE,
+                  properties=['mean_intensity'])
+
 if __name__ == "__main__":
     from numpy.testing import run_module_suite
     run_module_suite()
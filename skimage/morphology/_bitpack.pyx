@@ -0,0 +1,178 @@
+#cython: cdivision=True
+#cython: boundscheck=False
+#cython: nonecheck=False
+#cython: wraparound=False
+
+"""Binary morphology on bit-packed images.
+
+Every image row is stored as ``ceil(cols / 64)`` 64-bit words, pixel ``c`` of
+a row being bit ``c % 64`` of word ``c // 64``. Erosion and dilation are
+computed as the AND respectively OR of the image shifted by the offsets of
+the structuring element, i.e. 64 pixels are processed per operation.
+"""
+
+import numpy as np
+
+cimport numpy as cnp
+
+
+ctypedef cnp.uint64_t word_t
+
+cdef word_t ALL_ONES = ~(<word_t>0)
+
+
+cdef void _set_padding(word_t[:, ::1] packed, Py_ssize_t cols,
+                       char value) nogil:
+    """Set the unused bits of the last word of every row to `value`."""
+
+    cdef Py_ssize_t r
+    cdef Py_ssize_t last = packed.shape[1] - 1
+    cdef Py_ssize_t n_valid = cols - 64 * last
+    cdef word_t padding
+
+    if last < 0 or n_valid == 64:
+        return
+
+    padding = ALL_ONES << n_valid
+    for r in range(packed.shape[0]):
+        if value:
+            packed[r, last] |= padding
+        else:
+            packed[r, last] &= ~padding
+
+
+def pack(cnp.uint8_t[:, ::1] image):
+    """Pack a binary image into 64 pixels per word.
+
+    Parameters
+    ----------
+    image : (M, N) ndarray of uint8
+        Binary image, non-zero pixels are foreground.
+
+    Returns
+    -------
+    packed : (M, ceil(N / 64)) ndarray of uint64
+        Bit-packed image.
+    """
+
+    cdef Py_ssize_t rows = image.shape[0]
+    cdef Py_ssize_t cols = image.shape[1]
+    cdef Py_ssize_t r, c
+
+    packed = np.zeros((rows, (cols + 63) // 64), dtype=np.uint64)
+    cdef word_t[:, ::1] packed_view = packed
+
+    with nogil:
+        for r in range(rows):
+            for c in range(cols):
+                if image[r, c]:
+                    packed_view[r, c >> 6] |= (<word_t>1) << (c & 63)
+
+    return packed
+
+
+def unpack(word_t[:, ::1] packed, Py_ssize_t cols):
+    """Unpack a bit-packed image.
+
+    Parameters
+    ----------
+    packed : (M, ceil(N / 64)) ndarray of uint64
+        Bit-packed image.
+    cols : int
+        Number of columns `N` of the unpacked image.
+
+    Returns
+    -------
+    image : (M, N) ndarray of bool
+        Unpacked binary image.
+    """
+
+    cdef Py_ssize_t rows = packed.shape[0]
+    cdef Py_ssize_t r, c
+
+    image = np.empty((rows, cols), dtype=np.uint8)
+    cdef cnp.uint8_t[:, ::1] image_view = image
+
+    with nogil:
+        for r in range(rows):
+            for c in range(cols):
+                image_view[r, c] = (packed[r, c >> 6] >> (c & 63)) & 1
+
+    return image.view(bool)
+
+
+def morph(word_t[:, ::1] packed, Py_ssize_t cols,
+          Py_ssize_t[::1] offset_r, Py_ssize_t[::1] offset_w,
+          Py_ssize_t[::1] offset_b, char is_dilation):
+    """Erode or dilate a bit-packed image.
+
+    Pixel ``(r, c)`` of the output combines the input pixels
+    ``(r + offset_r[k], c + 64 * offset_w[k] + offset_b[k])`` for every
+    offset ``k`` of the structuring element. Pixels outside of the image are
+    ignored.
+
+    Parameters
+    ----------
+    packed : (M, ceil(N / 64)) ndarray of uint64
+        Bit-packed image. The unused bits of the last word of each row are
+        overwritten.
+    cols : int
+        Number of columns `N` of the unpacked image.
+    offset_r : ndarray of intp
+        Row offsets.
+    offset_w, offset_b : ndarray of intp
+        Column offsets split into whole words and remaining bits
+        (``0 <= offset_b < 64``).
+    is_dilation : bool
+        Compute the dilation (OR) instead of the erosion (AND).
+
+    Returns
+    -------
+    out : (M, ceil(N / 64)) ndarray of uint64
+        Bit-packed result.
+    """
+
+    cdef Py_ssize_t rows = packed.shape[0]
+    cdef Py_ssize_t n_words = packed.shape[1]
+    cdef Py_ssize_t n_offsets = offset_r.shape[0]
+    cdef Py_ssize_t r, rr, w, k, base, shift
+    cdef word_t lo, hi, word
+
+    # pixels outside of the image are the neutral element of the operation
+    cdef word_t fill = 0 if is_dilation else ALL_ONES
+
+    out = np.empty((rows, n_words), dtype=np.uint64)
+    cdef word_t[:, ::1] out_view = out
+
+    with nogil:
+        _set_padding(packed, cols, not is_dilation)
+
+        for r in range(rows):
+            for w in range(n_words):
+                out_view[r, w] = fill
+
+            for k in range(n_offsets):
+                rr = r + offset_r[k]
+                if rr < 0 or rr >= rows:
+                    continue
+                shift = offset_b[k]
+                for w in range(n_words):
+                    base = w + offset_w[k]
+                    if 0 <= base < n_words:
+                        lo = packed[rr, base]
+                    else:
+                        lo = fill
+                    if shift:
+                        if 0 <= base + 1 < n_words:
+                            hi = packed[rr, base + 1]
+                        else:
+                            hi = fill
+                        word = (lo >> shift) | (hi << (64 - shift))
+                    else:
+                        word = lo
+                    if is_dilation:
+                        out_view[r, w] |= word
+                    else:
+                        out_view[r, w] &= word
+
+    return out
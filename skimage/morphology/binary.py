@@ -2,12 +2,55 @@ import warnings
 import numpy as np
 from scipy import ndimage
 
+from . import _bitpack
+
+
+def _pack(image):
+    """Return the bit-packed version of a 2-D binary image."""
+    return _bitpack.pack(np.ascontiguousarray((image > 0).view(np.uint8)))
+
+
+def _conv_dtype(selem):
+    """Type of the result of the convolution based morphology."""
+    if np.sum(selem) <= 255:
+        return np.uint8
+    return np.uint
+
+
+def _unpack(packed, cols, selem, out):
+    """Unpack a bit-packed image into `out`.
+
+    If `out` is None, a new array is allocated with the same type as the
+    result of the convolution based morphology for `selem`.
+    """
+    unpacked = _bitpack.unpack(packed, cols).view(np.uint8)
+    if out is None:
+        dtype = _conv_dtype(selem)
+        return unpacked if dtype == np.uint8 else unpacked.astype(dtype)
+    out[...] = unpacked
+    return out
+
+
+def _morph_packed(packed, cols, selem, is_dilation):
+    """Erode or dilate a bit-packed image.
+
+    The offsets follow `ndimage.convolve`, i.e. the structuring element is
+    mirrored about its center.
+    """
+    rows, cols_selem = np.nonzero(selem)
+    offset_r = (selem.shape[0] // 2 - rows).astype(np.intp)
+    offset_c = (selem.shape[1] // 2 - cols_selem).astype(np.intp)
+    return _bitpack.morph(packed, cols, offset_r,
+                          np.ascontiguousarray(offset_c // 64),
+                          np.ascontiguousarray(offset_c % 64), is_dilation)
+
 
 def binary_erosion(image, selem, out=None):
     """Return fast binary morphological erosion of an image.
 
     This function returns the same result as greyscale erosion but performs
-    faster for binary images.
+    faster for binary images. 2-D images are processed in a bit-packed
+    representation, 64 pixels per machine word.
 
     Morphological erosion sets a pixel at ``(i,j)`` to the minimum over all
     pixels in the neighborhood centered at ``(i,j)``. Erosion shrinks bright
@@ -30,12 +73,14 @@ def binary_erosion(image, selem, out=None):
 
     """
     selem = (selem != 0)
+
+    if image.ndim == 2 and selem.ndim == 2:
+        packed = _morph_packed(_pack(image), image.shape[1], selem, False)
+        return _unpack(packed, image.shape[1], selem, out)
+
     selem_sum = np.sum(selem)
 
-    if selem_sum <= 255:
-        conv = np.empty_like(image, dtype=np.uint8)
-    else:
-        conv = np.empty_like(image, dtype=np.uint)
+    conv = np.empty_like(image, dtype=_conv_dtype(selem))
 
     binary = (image > 0).view(np.uint8)
     ndimage.convolve(binary, selem, mode='constant', cval=1, output=conv)
@@ -49,7 +94,8 @@ def binary_dilation(image, selem, out=None):
     """Return fast binary morphological dilation of an image.
 
     This function returns the same result as greyscale dilation but performs
-    faster for binary images.
+    faster for binary images. 2-D images are processed in a bit-packed
+    representation, 64 pixels per machine word.
 
     Morphological dilation sets a pixel at ``(i,j)`` to the maximum over all
     pixels in the neighborhood centered at ``(i,j)``. Dilation enlarges bright
@@ -74,10 +120,11 @@ def binary_dilation(image, selem, out=None):
     """
     selem = (selem != 0)
 
-    if np.sum(selem) <= 255:
-        conv = np.empty_like(image, dtype=np.uint8)
-    else:
-        conv = np.empty_like(image, dtype=np.uint)
+    if image.ndim == 2 and selem.ndim == 2:
+        packed = _morph_packed(_pack(image), image.shape[1], selem, True)
+        return _unpack(packed, image.shape[1], selem, out)
+
+    conv = np.empty_like(image, dtype=_conv_dtype(selem))
 
     binary = (image > 0).view(np.uint8)
     ndimage.convolve(binary, selem, mode='constant', cval=0, output=conv)
@@ -114,6 +161,12 @@ def binary_opening(image, selem, out=None):
         The result of the morphological opening.
 
     """
+    if image.ndim == 2 and np.ndim(selem) == 2:
+        selem = (selem != 0)
+        packed = _morph_packed(_pack(image), image.shape[1], selem, False)
+        packed = _morph_packed(packed, image.shape[1], selem, True)
+        return _unpack(packed, image.shape[1], selem, out)
+
     eroded = binary_erosion(image, selem)
     out = binary_dilation(eroded, selem, out=out)
     return out
@@ -147,6 +200,12 @@ def binary_closing(image, selem, out=None):
 
     """
 
+    if image.ndim == 2 and np.ndim(selem) == 2:
+        selem = (selem != 0)
+        packed = _morph_packed(_pack(image), image.shape[1], selem, True)
+        packed = _morph_packed(packed, image.shape[1], selem, False)
+        return _unpack(packed, image.shape[1], selem, out)
+
     dilated = binary_dilation(image, selem)
     out = binary_erosion(dilated, selem, out=out)
     return out
@@ -3,10 +3,14 @@
 #cython: nonecheck=False
 #cython: wraparound=False
 
+import itertools
+
 import numpy as np
 
 cimport numpy as cnp
 
+from skimage._shared.utils import run_in_bands
+
 """
 See also:
 
@@ -29,7 +33,7 @@ See also:
 DTYPE = np.intp
 
 
-cdef DTYPE_t find_root(DTYPE_t *forest, DTYPE_t n):
+cdef DTYPE_t find_root(DTYPE_t *forest, DTYPE_t n) nogil:
     """Find the root of node n.
 
     """
@@ -39,7 +43,7 @@ cdef DTYPE_t find_root(DTYPE_t *forest, DTYPE_t n):
     return root
 
 
-cdef inline void set_root(DTYPE_t *forest, DTYPE_t n, DTYPE_t root):
+cdef inline void set_root(DTYPE_t *forest, DTYPE_t n, DTYPE_t root) nogil:
     """
     Set all nodes on a path to point to new_root.
 
@@ -53,7 +57,7 @@ cdef inline void set_root(DTYPE_t *forest, DTYPE_t n, DTYPE_t root):
     forest[n] = root
 
 
-cdef inline void join_trees(DTYPE_t *forest, DTYPE_t n, DTYPE_t m):
+cdef inline void join_trees(DTYPE_t *forest, DTYPE_t n, DTYPE_t m) nogil:
     """Join two trees containing nodes n and m.
 
     """
@@ -70,7 +74,8 @@ cdef inline void join_trees(DTYPE_t *forest, DTYPE_t n, DTYPE_t m):
         set_root(forest, m, root)
 
 
-cdef inline void link_bg(DTYPE_t *forest, DTYPE_t n, DTYPE_t *background_node):
+cdef inline void link_bg(DTYPE_t *forest, DTYPE_t n,
+                         DTYPE_t *background_node) nogil:
     """
     Link a node to the background node.
 
@@ -81,12 +86,226 @@ cdef inline void link_bg(DTYPE_t *forest, DTYPE_t n, DTYPE_t *background_node):
     join_trees(forest, n, background_node[0])
 
 
+
+
+ctypedef fused input_t:
+    cnp.uint8_t
+    cnp.uint16_t
+    cnp.uint32_t
+    cnp.int32_t
+    cnp.int64_t
+
+ctypedef fused label_t:
+    cnp.uint16_t
+    cnp.uint32_t
+    cnp.int32_t
+    cnp.int64_t
+
+
+def _neighbor_offsets(shape, neighbors):
+    """Return the neighbors preceding a pixel in raster order.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape of the image.
+    neighbors : int or None
+        Total number of neighbors of a pixel, e.g. 4 or 8 in 2-D and 6, 18
+        or 26 in 3-D. None selects the full connectivity.
+
+    Returns
+    -------
+    deltas : (K, ndim) ndarray
+        Coordinate differences of the preceding neighbors.
+    offsets : (K, ) ndarray
+        Corresponding offsets in the raveled image.
+    """
+    ndim = len(shape)
+    deltas = np.array(list(itertools.product((-1, 0, 1), repeat=ndim)),
+                      dtype=DTYPE).reshape(-1, ndim)
+    # the first half of the neighborhood precedes the center
+    deltas = deltas[:len(deltas) // 2]
+    rank = np.sum(deltas != 0, axis=1)
+
+    valid = [2 * np.sum(rank <= c) for c in range(1, ndim + 1)]
+    if neighbors is None:
+        neighbors = valid[ndim - 1]
+    if neighbors not in valid:
+        raise ValueError('Neighbors must be one of %s for %d-D input.'
+                         % (', '.join(str(v) for v in valid), ndim))
+    deltas = np.ascontiguousarray(deltas[rank <= valid.index(neighbors) + 1])
+
+    strides = np.ones(ndim, dtype=DTYPE)
+    for d in range(ndim - 2, -1, -1):
+        strides[d] = strides[d + 1] * shape[d + 1]
+    offsets = np.ascontiguousarray(np.dot(deltas, strides), dtype=DTYPE)
+
+    return deltas, offsets
+
+
+def _link_planes(input_t[::1] data, DTYPE_t[::1] forest,
+                 DTYPE_t[::1] shape, DTYPE_t[:, ::1] deltas,
+                 DTYPE_t[::1] offsets, DTYPE_t start, DTYPE_t stop,
+                 DTYPE_t background, char boundary):
+    """Join each pixel in the planes ``start <= i < stop`` along the first
+    axis with its preceding neighbors of equal value.
+
+    Only neighbors in the planes ``[start, stop)`` are considered, so that
+    disjoint bands of planes can be processed concurrently. With `boundary`,
+    the pixels of plane `start` are joined with their neighbors in the
+    previous plane instead, which merges two adjacent bands.
+
+    Returns
+    -------
+    background_node : int
+        First background pixel of the band, or -999 if there is none.
+    """
+
+    cdef Py_ssize_t ndim = shape.shape[0]
+    cdef Py_ssize_t n_neighbors = offsets.shape[0]
+    cdef DTYPE_t plane_size = 1
+    cdef DTYPE_t background_node = -999
+    cdef DTYPE_t i, j, c, k, d
+    cdef char valid
+
+    for d in range(1, ndim):
+        plane_size *= shape[d]
+
+    cdef DTYPE_t[::1] coords = np.zeros(ndim, dtype=DTYPE)
+    coords[0] = start
+
+    if data.shape[0] == 0:
+        return background_node
+
+    cdef DTYPE_t* forest_p = &forest[0]
+
+    with nogil:
+        for i in range(start * plane_size, stop * plane_size):
+            if not boundary and data[i] == background:
+                link_bg(forest_p, i, &background_node)
+
+            for k in range(n_neighbors):
+                # neighbors in the previous plane belong to another band
+                if (deltas[k, 0] == -1 and coords[0] == start) != boundary:
+                    continue
+
+                valid = 1
+                for d in range(ndim):
+                    c = coords[d] + deltas[k, d]
+                    if c < 0 or c >= shape[d]:
+                        valid = 0
+                        break
+                if not valid:
+                    continue
+
+                j = i + offsets[k]
+                if data[i] == data[j]:
+                    join_trees(forest_p, i, j)
+
+            # advance the coordinates to the next pixel
+            for d in range(ndim - 1, -1, -1):
+                coords[d] += 1
+                if coords[d] < shape[d]:
+                    break
+                coords[d] = 0
+
+    return background_node
+
+
+def _link_rows(input_t[::1] data, DTYPE_t[::1] forest, DTYPE_t cols,
+               bint full, DTYPE_t start, DTYPE_t stop, DTYPE_t background,
+               bint boundary):
+    """Same as `_link_planes` for 2-D images, with 4-connectivity or with
+    8-connectivity if `full`.
+    """
+
+    cdef DTYPE_t background_node = -999
+    cdef DTYPE_t i, j, p, q
+    cdef bint above
+    cdef input_t value
+
+    if data.shape[0] == 0:
+        return background_node
+
+    cdef DTYPE_t* forest_p = &forest[0]
+    cdef input_t* d = &data[0]
+
+    with nogil:
+        for i in range(start, stop):
+            p = i * cols
+            q = p - cols
+            # the previous row belongs to another band unless merging bands
+            above = i > start or boundary
+            for j in range(cols):
+                value = d[p + j]
+                if not boundary and value == background:
+                    link_bg(forest_p, p + j, &background_node)
+
+                # neighbors of equal value in the previous row are already
+                # joined, so the diagonal neighbors are only needed if the
+                # pixel above differs (see Wu et al.)
+                if above:
+                    if value == d[q + j]:
+                        join_trees(forest_p, p + j, q + j)
+                    elif full:
+                        if (j > 0 and value == d[q + j - 1]
+                                and (boundary or value != d[p + j - 1])):
+                            join_trees(forest_p, p + j, q + j - 1)
+                        if j < cols - 1 and value == d[q + j + 1]:
+                            join_trees(forest_p, p + j, q + j + 1)
+
+                if not boundary and j > 0 and value == d[p + j - 1]:
+                    join_trees(forest_p, p + j, p + j - 1)
+
+    return background_node
+
+
+def _join_nodes(DTYPE_t[::1] forest, DTYPE_t n, DTYPE_t m):
+    join_trees(&forest[0], n, m)
+
+
+def _count_roots(DTYPE_t[::1] forest, DTYPE_t background_node):
+    """Return the number of labels, i.e. the number of trees in the forest
+    without the background tree."""
+
+    cdef DTYPE_t i, count = 0
+
+    with nogil:
+        for i in range(forest.shape[0]):
+            if forest[i] == i and i != background_node:
+                count += 1
+
+    return count
+
+
+def _relabel(DTYPE_t[::1] forest, label_t[::1] out,
+             DTYPE_t background_node):
+    """Assign consecutive labels to the trees in raster order of their
+    roots."""
+
+    cdef DTYPE_t i
+    cdef DTYPE_t ctr = 0
+
+    with nogil:
+        for i in range(forest.shape[0]):
+            if i == background_node:
+                out[i] = <label_t>-1
+            elif i == forest[i]:
+                out[i] = <label_t>ctr
+                ctr = ctr + 1
+            else:
+                out[i] = out[forest[i]]
+
+    return ctr
+
+
 # Connected components search as described in Fiorio et al.
-def label(input, DTYPE_t neighbors=8, DTYPE_t background=-1, return_num=False):
+def label(input, neighbors=None, DTYPE_t background=-1, return_num=False,
+          dtype=None, n_jobs=1):
     """Label connected regions of an integer array.
 
     Two pixels are connected when they are neighbors and have the same value.
-    They can be neighbors either in a 4- or 8-connected sense::
+    In 2-D, they can be neighbors either in a 4- or 8-connected sense::
 
       4-connectivity      8-connectivity
 
@@ -96,15 +315,28 @@ def label(input, DTYPE_t neighbors=8, DTYPE_t background=-1, return_num=False):
             |               /  |  \\
            [ ]           [ ]  [ ]  [ ]
 
+    In 3-D, pixels sharing a face, an edge or a corner give 6-, 18- or
+    26-connectivity.
+
     Parameters
     ----------
     input : ndarray of dtype int
         Image to label.
-    neighbors : {4, 8}, int
-        Whether to use 4- or 8-connectivity.
+    neighbors : int, optional
+        Number of neighbors of a pixel, i.e. 4 or 8 in 2-D and 6, 18 or 26
+        in 3-D. By default the full connectivity is used (8 in 2-D, 26 in
+        3-D).
     background : int
         Consider all pixels with this value as background pixels, and label
         them as -1.
+    dtype : dtype, optional
+        Data type of the labels, one of uint16, uint32, int32 or int64.
+        Defaults to ``np.intp``. With unsigned types, background pixels are
+        labeled with the largest value of the type instead of -1.
+    n_jobs : int, optional
+        Number of threads. The image is split into bands along the first
+        axis, which are labeled concurrently and merged at their
+        boundaries. If smaller than 1, all available CPU cores are used.
 
     Returns
     -------
@@ -143,84 +375,71 @@ def label(input, DTYPE_t neighbors=8, DTYPE_t background=-1, return_num=False):
      [-1 -1 -1]]
 
     """
-    cdef DTYPE_t rows = input.shape[0]
-    cdef DTYPE_t cols = input.shape[1]
-
-    cdef cnp.ndarray[DTYPE_t, ndim=2] data = np.array(input, copy=True,
-                                                      dtype=DTYPE)
-    cdef cnp.ndarray[DTYPE_t, ndim=2] forest
-
-    forest = np.arange(data.size, dtype=DTYPE).reshape((rows, cols))
-
-    cdef DTYPE_t *forest_p = <DTYPE_t*>forest.data
-    cdef DTYPE_t *data_p = <DTYPE_t*>data.data
-
-    cdef DTYPE_t i, j
-
-    cdef DTYPE_t background_node = -999
-
-    if neighbors != 4 and neighbors != 8:
-        raise ValueError('Neighbors must be either 4 or 8.')
-
-    # Initialize the first row
-    if data[0, 0] == background:
-        link_bg(forest_p, 0, &background_node)
-
-    for j in range(1, cols):
-        if data[0, j] == background:
-            link_bg(forest_p, j, &background_node)
-
-        if data[0, j] == data[0, j-1]:
-            join_trees(forest_p, j, j-1)
-
-    for i in range(1, rows):
-        # Handle the first column
-        if data[i, 0] == background:
-            link_bg(forest_p, i * cols, &background_node)
-
-        if data[i, 0] == data[i-1, 0]:
-            join_trees(forest_p, i*cols, (i-1)*cols)
-
-        if neighbors == 8:
-            if data[i, 0] == data[i-1, 1]:
-                join_trees(forest_p, i*cols, (i-1)*cols + 1)
+    input = np.asarray(input)
+    if input.dtype == bool:
+        data = input.view(np.uint8)
+    elif input.dtype in (np.uint8, np.uint16, np.uint32, np.int32, np.int64):
+        data = input
+    else:
+        data = input.astype(DTYPE)
+    data = np.ascontiguousarray(data)
+
+    if dtype is None:
+        dtype = DTYPE
+    dtype = np.dtype(dtype)
+
+    shape = data.shape
+    ndim = data.ndim
+    deltas, offsets = _neighbor_offsets(shape, neighbors)
+    shape_arr = np.array(shape, dtype=DTYPE)
+
+    data = data.ravel()
+    forest = np.arange(data.size, dtype=DTYPE)
+
+    if ndim == 2:
+        # specialized for the common 2-D case
+        full = len(offsets) == 4
+        link = lambda start, stop, boundary: _link_rows(
+            data, forest, shape[1], full, start, stop, background, boundary)
+    else:
+        link = lambda start, stop, boundary: _link_planes(
+            data, forest, shape_arr, deltas, offsets, start, stop,
+            background, boundary)
 
-        for j in range(1, cols):
-            if data[i, j] == background:
-                link_bg(forest_p, i * cols + j, &background_node)
+    bands = []
 
-            if neighbors == 8:
-                if data[i, j] == data[i-1, j-1]:
-                    join_trees(forest_p, i*cols + j, (i-1)*cols + j - 1)
+    def band(start, stop):
+        bands.append((start, link(start, stop, False)))
 
-            if data[i, j] == data[i-1, j]:
-                join_trees(forest_p, i*cols + j, (i-1)*cols + j)
+    run_in_bands(band, shape[0], n_jobs)
 
-            if neighbors == 8:
-                if j < cols - 1:
-                    if data[i, j] == data[i - 1, j + 1]:
-                        join_trees(forest_p, i*cols + j, (i-1)*cols + j + 1)
+    # merge the bands at their boundaries
+    background_node = -999
+    for start, node in sorted(bands):
+        if start > 0:
+            link(start, start + 1, True)
+        if node != -999:
+            if background_node == -999:
+                background_node = node
+            else:
+                _join_nodes(forest, background_node, node)
 
-            if data[i, j] == data[i, j-1]:
-                join_trees(forest_p, i*cols + j, i*cols + j - 1)
+    # the labels of intp type cannot overflow
+    if dtype != DTYPE:
+        n_labels = _count_roots(forest, background_node)
+        if n_labels > 0 and n_labels - 1 > np.iinfo(dtype).max:
+            raise ValueError('%d labels do not fit into dtype %s.'
+                             % (n_labels, dtype))
 
-    # Label output
-    cdef DTYPE_t ctr = 0
-    for i in range(rows):
-        for j in range(cols):
-            if (i*cols + j) == background_node:
-                data[i, j] = -1
-            elif (i*cols + j) == forest[i, j]:
-                data[i, j] = ctr
-                ctr = ctr + 1
-            else:
-                data[i, j] = data_p[forest[i, j]]
+    labels = np.empty(data.size, dtype=dtype)
+    ctr = _relabel(forest, labels, background_node)
+    labels = labels.reshape(shape)
 
     # Work around a bug in ndimage's type checking on 32-bit platforms
-    if data.dtype == np.int32:
-        data = data.view(np.int32)
+    if labels.dtype == np.int32:
+        labels = labels.view(np.int32)
 
     if return_num:
-        return data, ctr
+        return labels, ctr
     else:
-        return data
+        return labels
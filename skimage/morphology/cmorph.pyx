@@ -159,3 +159,108 @@ def _erode(np.uint8_t[:, :] image,
     free(sc)
 
     return np.asarray(out)
+
+
+def _line_filter(np.uint8_t[:, ::1] image,
+                 Py_ssize_t length, Py_ssize_t centre,
+                 char axis, char is_max,
+                 np.uint8_t[:, ::1] out=None):
+    """Return the minimum or maximum over a 1-D line neighborhood.
+
+    Uses the van Herk/Gil-Werman algorithm, which needs three comparisons per
+    pixel independent of the line length.
+
+    Parameters
+    ----------
+    image : ndarray
+        Image array.
+    length : int
+        Number of pixels of the line.
+    centre : int
+        Position of the origin pixel within the line.
+    axis : int
+        Axis along which the line is oriented, i.e. 0 for a vertical and 1
+        for a horizontal line.
+    is_max : bool
+        Compute the local maximum (dilation) instead of the local minimum
+        (erosion).
+    out : ndarray
+        The array to store the result. If None is passed, a new array will
+        be allocated.
+
+    Returns
+    -------
+    filtered : uint8 array
+        The image filtered along the line.
+    """
+
+    cdef Py_ssize_t rows = image.shape[0]
+    cdef Py_ssize_t cols = image.shape[1]
+
+    if out is None:
+        out = np.zeros((rows, cols), dtype=np.uint8)
+
+    cdef Py_ssize_t n_lines = cols if axis == 0 else rows
+    cdef Py_ssize_t n = rows if axis == 0 else cols
+
+    # values outside of the image must not change the result
+    cdef np.uint8_t neutral = 0 if is_max else 255
+
+    # each line is padded by `length - 1` neutral values at both ends and
+    # rounded up to a multiple of `length`
+    cdef Py_ssize_t n_pad = n + 2 * (length - 1)
+    n_pad += (length - n_pad % length) % length
+
+    cdef np.uint8_t* f = <np.uint8_t*>malloc(n_pad * sizeof(np.uint8_t))
+    cdef np.uint8_t* g = <np.uint8_t*>malloc(n_pad * sizeof(np.uint8_t))
+    cdef np.uint8_t* h = <np.uint8_t*>malloc(n_pad * sizeof(np.uint8_t))
+
+    cdef Py_ssize_t l, i, start
+    cdef np.uint8_t a, b, value
+
+    with nogil:
+        for l in range(n_lines):
+            for i in range(n_pad):
+                f[i] = neutral
+            for i in range(n):
+                if axis == 0:
+                    f[i + length - 1] = image[i, l]
+                else:
+                    f[i + length - 1] = image[l, i]
+
+            # forward (g) and backward (h) running extrema within blocks of
+            # `length` pixels
+            for i in range(n_pad):
+                if i % length == 0:
+                    g[i] = f[i]
+                elif is_max:
+                    g[i] = g[i - 1] if g[i - 1] > f[i] else f[i]
+                else:
+                    g[i] = g[i - 1] if g[i - 1] < f[i] else f[i]
+            for i in range(n_pad - 1, -1, -1):
+                if i % length == length - 1:
+                    h[i] = f[i]
+                elif is_max:
+                    h[i] = h[i + 1] if h[i + 1] > f[i] else f[i]
+                else:
+                    h[i] = h[i + 1] if h[i + 1] < f[i] else f[i]
+
+            # the window starting at `start` spans at most two blocks
+            for i in range(n):
+                start = i - centre + length - 1
+                a = h[start]
+                b = g[start + length - 1]
+                if is_max:
+                    value = a if a > b else b
+                else:
+                    value = a if a < b else b
+                if axis == 0:
+                    out[i, l] = value
+                else:
+                    out[l, i] = value
+
+    free(f)
+    free(g)
+    free(h)
+
+    return np.asarray(out)
@@ -1,8 +1,199 @@
+import itertools
+import tempfile
+
 import numpy as np
 import scipy.ndimage as nd
 
+from .ccomp import label, _neighbor_offsets
+
+
+def _tile_slices(shape, tile_shape):
+    """Yield the slices of the tiles covering an array of given shape."""
+    starts = [range(0, n, t) for n, t in zip(shape, tile_shape)]
+    for corner in itertools.product(*starts):
+        yield tuple(slice(c, min(c + t, n))
+                    for c, t, n in zip(corner, tile_shape, shape))
+
+
+def _find(parent, n):
+    """Find the root of `n` in a dict based union-find forest."""
+    root = n
+    while parent.get(root, root) != root:
+        root = parent[root]
+    while n != root:
+        parent[n], n = root, parent[n]
+    return root
+
+
+def _boundary_pairs(image_lo, image_hi, labels_lo, labels_hi, delta):
+    """Return the label pairs connected across a tile boundary.
+
+    `image_lo` and `image_hi` are two adjacent planes of the image, `delta`
+    the offset of a neighbor in the second plane, ignoring the plane axis.
+    """
+    src = []
+    dst = []
+    for d in delta:
+        if d == 1:
+            src.append(slice(0, -1))
+            dst.append(slice(1, None))
+        elif d == -1:
+            src.append(slice(1, None))
+            dst.append(slice(0, -1))
+        else:
+            src.append(slice(None))
+            dst.append(slice(None))
+    src = tuple(src)
+    dst = tuple(dst)
+
+    a = labels_lo[src]
+    b = labels_hi[dst]
+    connected = ((image_lo[src] == image_hi[dst]) & (a >= 0) & (b >= 0)
+                 & (a != b))
+    return a[connected], b[connected]
+
+
+def label_tiled(ar, tile_shape, neighbors=None, background=-1, out=None,
+                return_areas=False):
+    """Label connected regions of an array tile by tile.
+
+    Every tile is labeled in memory with `skimage.morphology.label`. The
+    labels of regions crossing tile boundaries are merged with an
+    equivalence table, which only holds the labels touching a boundary, and
+    the tiles are relabeled in a second pass. Only a tile and two planes of
+    the array are loaded at a time, so that arrays larger than the memory
+    can be labeled if `ar` and `out` are e.g. `np.memmap` or chunked arrays
+    supporting NumPy slicing.
+
+    Parameters
+    ----------
+    ar : array_like
+        Array to label, supporting ``ar[slices]`` with a tuple of slices.
+    tile_shape : tuple of int
+        Shape of the tiles.
+    neighbors : int, optional
+        Number of neighbors of a pixel, see `skimage.morphology.label`.
+    background : int, optional
+        Consider all pixels with this value as background pixels, and label
+        them as -1.
+    out : array_like of signed int, optional
+        Array receiving the labels, e.g. a `np.memmap`. Its dtype must hold
+        the number of regions of all tiles before merging. If None, a new
+        array of dtype `np.intp` is allocated in memory.
+    return_areas : bool, optional
+        Whether to return the number of pixels of each region.
+
+    Returns
+    -------
+    labels : array_like
+        Labeled array (`out`). The labels are consecutive, but in contrast
+        to `skimage.morphology.label` they are not numbered in raster order.
+    areas : ndarray, optional
+        Number of pixels of each label, only returned if `return_areas` is
+        True.
+
+    """
+    shape = tuple(ar.shape)
+    ndim = len(shape)
+    if len(tile_shape) != ndim:
+        raise ValueError("tile_shape must have one entry per dimension.")
+
+    if out is None:
+        out = np.empty(shape, dtype=np.intp)
+
+    # first pass: label each tile with provisional, globally unique labels
+    n_labels = 0
+    tile_offsets = []
+    for tile in _tile_slices(shape, tile_shape):
+        labels, num = label(np.asarray(ar[tile]), neighbors=neighbors,
+                            background=background, return_num=True)
+        labels[labels >= 0] += n_labels
+        out[tile] = labels
+        tile_offsets.append((n_labels, num))
+        n_labels += num
 
-def remove_small_objects(ar, min_size=64, connectivity=1, in_place=False):
+    # join the labels of neighboring pixels across the tile boundaries
+    deltas, _ = _neighbor_offsets(shape, neighbors)
+    deltas = np.concatenate((deltas, -deltas))
+    parent = {}
+
+    for axis in range(ndim):
+        axis_deltas = [np.delete(delta, axis) for delta in deltas
+                       if delta[axis] == 1]
+        for start in range(tile_shape[axis], shape[axis], tile_shape[axis]):
+            lo = [slice(None)] * ndim
+            hi = [slice(None)] * ndim
+            lo[axis] = start - 1
+            hi[axis] = start
+            lo = tuple(lo)
+            hi = tuple(hi)
+
+            image_lo = np.asarray(ar[lo])
+            image_hi = np.asarray(ar[hi])
+            labels_lo = np.asarray(out[lo])
+            labels_hi = np.asarray(out[hi])
+
+            for delta in axis_deltas:
+                a, b = _boundary_pairs(image_lo, image_hi,
+                                       labels_lo, labels_hi, delta)
+                if a.size == 0:
+                    continue
+                pairs = np.unique(a.astype(np.int64) * n_labels + b)
+                for n, m in zip(pairs // n_labels, pairs % n_labels):
+                    root_n = _find(parent, n)
+                    root_m = _find(parent, m)
+                    if root_n < root_m:
+                        parent[root_m] = root_n
+                    elif root_m < root_n:
+                        parent[root_n] = root_m
+
+    # The labels merged into the region of a smaller label are dropped, all
+    # other labels are shifted down by the number of dropped labels below
+    # them, so that the final labels are consecutive. Only the dropped
+    # labels, which all touch a tile boundary, are kept in memory.
+    merged = np.array(sorted(parent), dtype=np.intp)
+    merged_root = np.array([_find(parent, n) for n in merged],
+                           dtype=np.intp)
+    merged_final = merged_root - np.searchsorted(merged, merged_root)
+
+    # second pass: write the final labels
+    areas = np.zeros(n_labels - len(merged), dtype=np.intp)
+    tiles = _tile_slices(shape, tile_shape)
+    for tile, (offset, num) in zip(tiles, tile_offsets):
+        if num == 0:
+            continue
+        start, stop = np.searchsorted(merged, [offset, offset + num])
+        tile_merged = merged[start:stop] - offset
+
+        # final label of each label of the tile, relative to `offset`
+        is_merged = np.zeros(num, dtype=np.intp)
+        is_merged[tile_merged] = 1
+        relabel = np.arange(offset - start, offset - start + num,
+                            dtype=np.intp)
+        relabel -= np.cumsum(is_merged)
+        relabel[tile_merged] = merged_final[start:stop]
+
+        labels = np.asarray(out[tile])
+        foreground = labels >= 0
+        tile_labels = labels[foreground] - offset
+        labels[foreground] = relabel[tile_labels]
+        out[tile] = labels
+
+        if return_areas:
+            counts = np.bincount(tile_labels, minlength=num)
+            own = is_merged == 0
+            areas[relabel[own]] += counts[own]
+            # merged labels of the same region may repeat in `relabel`
+            for n in tile_merged:
+                areas[relabel[n]] += counts[n]
+
+    if return_areas:
+        return out, areas
+    return out
+
+
+def remove_small_objects(ar, min_size=64, connectivity=1, in_place=False,
+                         tile_shape=None):
     """Remove connected components smaller than the specified size.
 
     Parameters
@@ -18,6 +209,11 @@ def remove_small_objects(ar, min_size=64, connectivity=1, in_place=False):
     in_place : bool, optional (default: False)
         If `True`, remove the connected components in the input array itself.
         Otherwise, make a copy.
+    tile_shape : tuple of int, optional
+        If given, the array is processed tile by tile with `label_tiled`,
+        the labels being stored in a temporary memory-mapped file. Together
+        with `in_place`, this allows to process memory-mapped arrays larger
+        than the memory.
 
     Raises
     ------
@@ -64,6 +260,10 @@ def remove_small_objects(ar, min_size=64, connectivity=1, in_place=False):
     if min_size == 0:  # shortcut for efficiency
         return out
 
+    if tile_shape is not None:
+        return _remove_small_objects_tiled(out, min_size, connectivity,
+                                           tile_shape)
+
     if out.dtype == bool:
         selem = nd.generate_binary_structure(ar.ndim, connectivity)
         ccs = np.zeros_like(ar, dtype=np.int32)
@@ -83,3 +283,41 @@ def remove_small_objects(ar, min_size=64, connectivity=1, in_place=False):
     out[too_small_mask] = 0
 
     return out
+
+
+def _remove_small_objects_tiled(out, min_size, connectivity, tile_shape):
+    if out.dtype == bool:
+        selem = nd.generate_binary_structure(out.ndim, connectivity)
+        ccs = np.memmap(tempfile.TemporaryFile(), dtype=np.intp, mode='w+',
+                        shape=out.shape)
+        ccs, component_sizes = label_tiled(out, tile_shape,
+                                           neighbors=np.sum(selem) - 1,
+                                           background=0, out=ccs,
+                                           return_areas=True)
+    else:
+        ccs = out
+        component_sizes = np.zeros(0, dtype=np.intp)
+        for tile in _tile_slices(out.shape, tile_shape):
+            try:
+                sizes = np.bincount(np.asarray(out[tile]).ravel())
+            except ValueError:
+                raise ValueError("Negative value labels are not supported. "
+                                 "Try relabeling the input with "
+                                 "`scipy.ndimage.label` or "
+                                 "`skimage.morphology.label`.")
+            if len(sizes) > len(component_sizes):
+                sizes[:len(component_sizes)] += component_sizes
+                component_sizes = sizes
+            else:
+                component_sizes[:len(sizes)] += sizes
+
+    too_small = component_sizes < min_size
+    for tile in _tile_slices(out.shape, tile_shape):
+        labels = np.asarray(ccs[tile])
+        too_small_mask = (labels >= 0) & too_small[np.maximum(labels, 0)]
+        if np.any(too_small_mask):
+            values = np.asarray(out[tile])
+            values[too_small_mask] = 0
+            out[tile] = values
+
+    return out
@@ -19,6 +19,7 @@ def configuration(parent_package='', top_path=None):
     cython(['_pnpoly.pyx'], working_path=base_path)
     cython(['_convex_hull.pyx'], working_path=base_path)
     cython(['_greyreconstruct.pyx'], working_path=base_path)
+    cython(['_bitpack.pyx'], working_path=base_path)
 
     config.add_extension('ccomp', sources=['ccomp.c'],
                          include_dirs=[get_numpy_include_dirs()])
@@ -34,6 +35,8 @@ def configuration(parent_package='', top_path=None):
                          include_dirs=[get_numpy_include_dirs()])
     config.add_extension('_greyreconstruct', sources=['_greyreconstruct.c'],
                          include_dirs=[get_numpy_include_dirs()])
+    config.add_extension('_bitpack', sources=['_bitpack.c'],
+                         include_dirs=[get_numpy_include_dirs()])
 
     return config
 
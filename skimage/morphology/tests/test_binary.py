@@ -1,5 +1,6 @@
 import numpy as np
 from numpy import testing
+from scipy import ndimage
 
 from skimage import data, color
 from skimage.util import img_as_bool
@@ -64,5 +65,54 @@ def test_out_argument():
         testing.assert_(np.any(out != out_saved))
         testing.assert_array_equal(out, func(img, strel))
 
+def test_bitpacked_vs_convolve():
+    # the bit-packed engine must match the convolution based definition,
+    # including across word boundaries and for eccentric selems
+    np.random.seed(0)
+    strels = [selem.square(3), selem.disk(4), selem.rectangle(2, 5),
+              np.array([[1, 0, 0, 1, 1, 0, 1]], dtype=np.uint8),
+              np.ones((1, 70), dtype=np.uint8)]
+    for cols in (1, 63, 64, 65, 150):
+        img = np.random.rand(23, cols) > 0.3
+        for strel in strels:
+            conv = ndimage.convolve(img.view(np.uint8), strel,
+                                    mode='constant', cval=1,
+                                    output=np.uint)
+            testing.assert_array_equal(binary.binary_erosion(img, strel),
+                                       conv == strel.sum())
+            conv = ndimage.convolve(img.view(np.uint8), strel,
+                                    mode='constant', cval=0,
+                                    output=np.uint)
+            testing.assert_array_equal(binary.binary_dilation(img, strel),
+                                       conv != 0)
+
+
+def test_3d_image():
+    strel = np.ones((3, 3, 3), dtype=np.uint8)
+    img = np.zeros((5, 5, 5), dtype=bool)
+    img[1:4, 1:4, 1:4] = True
+    expected = np.zeros_like(img)
+    expected[2, 2, 2] = True
+    testing.assert_array_equal(binary.binary_erosion(img, strel), expected)
+
+
+def test_default_dtype():
+    # the bit-packed engine returns the same type as the convolution based
+    # one, so that e.g. morphological gradients can be computed by
+    # subtraction
+    funcs = (binary.binary_erosion, binary.binary_dilation,
+             binary.binary_opening, binary.binary_closing)
+    img = np.zeros((20, 20), dtype=bool)
+    img[5:15, 5:15] = True
+    for strel, dtype in ((selem.square(3), np.uint8),
+                         (np.ones((17, 17), dtype=np.uint8), np.uint)):
+        for func in funcs:
+            testing.assert_equal(func(img, strel).dtype, dtype)
+            testing.assert_equal(func(img[None], strel[None]).dtype, dtype)
+    gradient = (binary.binary_dilation(img, selem.square(3)) -
+                binary.binary_erosion(img, selem.square(3)))
+    testing.assert_equal(gradient.sum(), 12 ** 2 - 8 ** 2)
+
+
 if __name__ == '__main__':
     testing.run_module_suite()
@@ -1,5 +1,6 @@
 import numpy as np
-from numpy.testing import assert_array_equal, run_module_suite
+from numpy.testing import assert_array_equal, assert_raises, run_module_suite
+from scipy import ndimage
 
 from skimage.morphology import label
 
@@ -91,5 +92,47 @@ class TestConnectedComponents:
         assert_array_equal(label(x, background=0, return_num=True)[1], 3)
 
 
+class TestConnectedComponents3D:
+    def setup(self):
+        np.random.seed(0)
+        self.x = (np.random.random((9, 10, 11)) > 0.6).astype(np.uint8)
+
+    def _check_equivalent(self, labels, expected):
+        # same partition of the pixels, possibly numbered differently
+        pairs = set(zip(labels.ravel(), expected.ravel()))
+        assert len(pairs) == len(np.unique(labels))
+        assert len(pairs) == len(np.unique(expected))
+
+    def test_connectivity(self):
+        for neighbors, rank in ((6, 1), (18, 2), (26, 3)):
+            structure = ndimage.generate_binary_structure(3, rank)
+            expected, _ = ndimage.label(self.x, structure)
+            labels = label(self.x, neighbors=neighbors, background=0)
+            self._check_equivalent(labels, expected)
+            assert np.all((labels == -1) == (self.x == 0))
+
+    def test_invalid_neighbors(self):
+        assert_raises(ValueError, label, self.x, 8)
+
+    def test_n_jobs(self):
+        expected = label(self.x, neighbors=6)
+        for n_jobs in (2, 4, 20, 0):
+            assert_array_equal(label(self.x, neighbors=6, n_jobs=n_jobs),
+                               expected)
+        x2 = self.x[0]
+        assert_array_equal(label(x2, n_jobs=3), label(x2))
+
+    def test_dtype(self):
+        expected, num = label(self.x, background=0, return_num=True)
+        for dtype in (np.uint16, np.uint32, np.int32):
+            labels = label(self.x, background=0, dtype=dtype)
+            assert labels.dtype == dtype
+            assert_array_equal(labels[self.x != 0], expected[self.x != 0])
+        labels = label(self.x, background=0, dtype=np.uint16)
+        assert np.all(labels[self.x == 0] == np.iinfo(np.uint16).max)
+
+        x = np.arange(70000) % 2
+        assert_raises(ValueError, label, x, dtype=np.uint16)
+
 if __name__ == "__main__":
     run_module_suite()
@@ -6,7 +6,7 @@ from numpy import testing
 import skimage
 from skimage import data_dir
 from skimage.util import img_as_bool
-from skimage.morphology import grey, selem
+from skimage.morphology import grey, selem, cmorph
 
 
 lena = np.load(os.path.join(data_dir, 'lena_GRAY_U8.npy'))
@@ -155,5 +155,41 @@ class TestDTypes():
         self._test_image(image)
 
 
+class TestDecomposedStructuringElements():
+
+    def setUp(self):
+        self.image = lena[::4, ::4].copy()
+        self.selems = [selem.square(15), selem.rectangle(7, 12),
+                       selem.rectangle(1, 9), selem.diamond(6),
+                       selem.octagon(5, 3), selem.octagon(4, 2)]
+
+    def test_decomposition_found(self):
+        for s in self.selems:
+            assert grey._decompose(s, False, False) is not None
+        assert grey._decompose(selem.disk(6), False, False) is None
+
+    def test_compare_with_cmorph(self):
+        for s in self.selems:
+            for shift_x, shift_y in ((0, 0), (0, 1), (1, 1)):
+                if grey._decompose(s, shift_x, shift_y) is None:
+                    continue
+                testing.assert_equal(
+                    grey.erosion(self.image, s, shift_x=shift_x,
+                                 shift_y=shift_y),
+                    cmorph._erode(self.image, s, shift_x=shift_x,
+                                  shift_y=shift_y))
+                testing.assert_equal(
+                    grey.dilation(self.image, s, shift_x=shift_x,
+                                  shift_y=shift_y),
+                    cmorph._dilate(self.image, s, shift_x=shift_x,
+                                   shift_y=shift_y))
+
+    def test_out(self):
+        out = np.empty_like(self.image)
+        result = grey.erosion(self.image, selem.square(9), out=out)
+        assert result is out
+        testing.assert_equal(out, cmorph._erode(self.image, selem.square(9)))
+
+
 if __name__ == '__main__':
     testing.run_module_suite()
@@ -1,6 +1,7 @@
 import numpy as np
 from numpy.testing import assert_array_equal, assert_equal, assert_raises
-from skimage.morphology import remove_small_objects
+import tempfile
+from skimage.morphology import remove_small_objects, label, label_tiled
 
 test_image = np.array([[0, 0, 0, 1, 0],
                        [1, 1, 1, 0, 0],
@@ -65,5 +66,55 @@ def test_negative_input():
     assert_raises(ValueError, remove_small_objects, negative_int)
 
 
+
+def _assert_same_partition(labels, expected):
+    pairs = set(zip(labels.ravel(), expected.ravel()))
+    assert_equal(len(pairs), len(np.unique(labels)))
+    assert_equal(len(pairs), len(np.unique(expected)))
+
+
+def test_label_tiled():
+    np.random.seed(0)
+    image = (np.random.rand(37, 41) > 0.5).astype(np.uint8)
+    for neighbors in (4, 8):
+        expected = label(image, neighbors=neighbors, background=0)
+        for tile_shape in ((37, 41), (10, 10), (1, 7), (5, 41)):
+            labels, areas = label_tiled(image, tile_shape,
+                                        neighbors=neighbors, background=0,
+                                        return_areas=True)
+            _assert_same_partition(labels, expected)
+            assert_array_equal(labels == -1, image == 0)
+            assert_array_equal(np.unique(labels[labels >= 0]),
+                               np.arange(expected.max() + 1))
+            assert_array_equal(areas, np.bincount(labels[labels >= 0]))
+
+
+def test_label_tiled_3d_memmap():
+    np.random.seed(0)
+    image = np.random.rand(9, 10, 11) > 0.6
+    out = np.memmap(tempfile.TemporaryFile(), dtype=np.intp, mode='w+',
+                    shape=image.shape)
+    labels = label_tiled(image, (4, 3, 5), neighbors=18, out=out)
+    assert labels is out
+    _assert_same_partition(np.asarray(labels), label(image, neighbors=18))
+
+
+def test_tiled():
+    np.random.seed(0)
+    image = np.random.rand(30, 30) > 0.5
+    for connectivity in (1, 2):
+        expected = remove_small_objects(image, min_size=5,
+                                        connectivity=connectivity)
+        observed = remove_small_objects(image, min_size=5,
+                                        connectivity=connectivity,
+                                        tile_shape=(7, 8))
+        assert_array_equal(observed, expected)
+
+    labeled_image = label(image, background=0) + 1
+    expected = remove_small_objects(labeled_image, min_size=5)
+    observed = remove_small_objects(labeled_image, min_size=5,
+                                    tile_shape=(7, 8))
+    assert_array_equal(observed, expected)
+
 if __name__ == "__main__":
     np.testing.run_module_suite()
@@ -1,16 +1,17 @@
 from ._hough_transform import (hough_circle, hough_ellipse, hough_line,
                                probabilistic_hough_line)
-from .hough_transform import hough_line_peaks
+from .hough_transform import hough_line_peaks, hough_circle_peaks
 from .radon_transform import radon, iradon, iradon_sart
 from .finite_radon_transform import frt2, ifrt2
-from .integral import integral_image, integrate
+from .integral import (integral_image, integrate, integrate_batch,
+                       tilted_integral_image)
 from ._geometric import (warp, warp_coords, estimate_transform,
                          SimilarityTransform, AffineTransform,
                          ProjectiveTransform, PolynomialTransform,
-                         PiecewiseAffineTransform)
+                         PiecewiseAffineTransform, WarpMap)
 from ._warps import swirl, resize, rotate, rescale, downscale_local_mean
 from .pyramids import (pyramid_reduce, pyramid_expand,
-                       pyramid_gaussian, pyramid_laplacian)
+                       pyramid_gaussian, pyramid_laplacian, Pyramid)
 
 
 __all__ = ['hough_circle',
@@ -20,6 +21,7 @@ __all__ = ['hough_circle',
            'probabilistic_hough',
            'hough_peaks',
            'hough_line_peaks',
+           'hough_circle_peaks',
            'radon',
            'iradon',
            'iradon_sart',
@@ -27,8 +29,11 @@ __all__ = ['hough_circle',
            'ifrt2',
            'integral_image',
            'integrate',
+           'integrate_batch',
+           'tilted_integral_image',
            'warp',
            'warp_coords',
+           'WarpMap',
            'estimate_transform',
            'SimilarityTransform',
            'AffineTransform',
@@ -43,4 +48,5 @@ __all__ = ['hough_circle',
            'pyramid_reduce',
            'pyramid_expand',
            'pyramid_gaussian',
-           'pyramid_laplacian']
+           'pyramid_laplacian',
+           'Pyramid']
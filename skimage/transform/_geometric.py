@@ -2,9 +2,9 @@ import math
 import numpy as np
 from scipy import ndimage, spatial
 from skimage.util import img_as_float
-from ._warps_cy import _warp_fast
+from ._warps_cy import _warp_fast, _warp_map_taps, _remap_rows
 
-from skimage._shared.utils import get_bound_method_class
+from skimage._shared.utils import get_bound_method_class, run_in_bands
 from skimage._shared import six
 
 
@@ -944,7 +944,7 @@ def warp_coords(coord_map, shape, dtype=np.float64):
 
 
 def warp(image, inverse_map=None, map_args={}, output_shape=None, order=1,
-         mode='constant', cval=0., reverse_map=None):
+         mode='constant', cval=0., reverse_map=None, n_jobs=1):
     """Warp an image according to a given coordinate transformation.
 
     Parameters
@@ -975,13 +975,24 @@ def warp(image, inverse_map=None, map_args={}, output_shape=None, order=1,
     cval : float, optional
         Used in conjunction with mode 'constant', the value outside
         the image boundaries.
+    n_jobs : int, optional
+        Number of threads used by the fast homography routine (see Notes).
+        Values smaller than 1 select all available CPU cores.
+
+    Returns
+    -------
+    warped : ndarray
+        Warped image. Float32 images are kept and returned in single
+        precision, all other images are converted to double precision. The
+        interpolation itself is always computed in double precision.
 
     Notes
     -----
     In case of a `SimilarityTransform`, `AffineTransform` and
     `ProjectiveTransform` and `order` in [0, 3] this function uses the
     underlying transformation matrix to warp the image with a much faster
-    routine.
+    routine, which interpolates all channels of a multichannel image in a
+    single pass.
 
     Examples
     --------
@@ -1025,7 +1036,9 @@ def warp(image, inverse_map=None, map_args={}, output_shape=None, order=1,
         raise ValueError("Input must have more than 1 dimension.")
 
     orig_ndim = image.ndim
-    image = np.atleast_3d(img_as_float(image))
+    if image.dtype != np.float32:
+        image = img_as_float(image)
+    image = np.atleast_3d(image)
     ishape = np.array(image.shape)
     bands = ishape[2]
 
@@ -1053,13 +1066,10 @@ def warp(image, inverse_map=None, map_args={}, output_shape=None, order=1,
 
         if matrix is not None:
             matrix = matrix.astype(np.double)
-            # transform all bands
-            dims = []
-            for dim in range(image.shape[2]):
-                dims.append(_warp_fast(image[..., dim], matrix,
-                            output_shape=output_shape,
-                            order=order, mode=mode, cval=cval))
-            out = np.dstack(dims)
+            # transform all bands at once
+            out = _warp_fast(image, matrix, output_shape=output_shape,
+                             order=order, mode=mode, cval=cval,
+                             n_jobs=n_jobs)
             if orig_ndim == 2:
                 out = out[..., 0]
 
@@ -1098,3 +1108,142 @@ def warp(image, inverse_map=None, map_args={}, output_shape=None, order=1,
         return out[..., 0]
     else:
         return out
+
+
+class WarpMap(object):
+    """Precomputed warp which can be applied to many images of equal shape.
+
+    The source coordinates of every output pixel are computed once and
+    stored compactly, i.e. as the index of the first sample (int32) and the
+    fractional position relative to the samples (float32) along both axes.
+    Remapping an image then only needs a single pass over the output which
+    does not depend on the complexity of the transformation, so this pays
+    off for expensive transformations (e.g. `PolynomialTransform`) or when
+    warping many frames.
+
+    Parameters
+    ----------
+    inverse_map : transformation object, callable ``xy = f(xy, **kwargs)``, (3, 3) array
+        Inverse coordinate map, see `warp`.
+    input_shape : tuple (rows, cols)
+        Shape of the images to warp. Additional dimensions (channels) are
+        ignored.
+    output_shape : tuple (rows, cols), optional
+        Shape of the warped images. By default `input_shape` is used.
+    order : {0, 1, 2, 3}, optional
+        Order of interpolation, see `warp`.
+    mode : {'constant', 'nearest', 'reflect', 'wrap'}, optional
+        Points outside the boundaries of the input are filled according
+        to the given mode.
+    cval : float, optional
+        Used in conjunction with mode 'constant', the value outside
+        the image boundaries.
+    map_args : dict, optional
+        Keyword arguments passed to `inverse_map`.
+
+    Notes
+    -----
+    The interpolation is the one used by `warp` for homographies, also for
+    other transformations (for which `warp` uses spline interpolation).
+
+    The map needs 16 bytes per output pixel independent of `order`, e.g.
+    about 33 MB for a 1920x1080 output. The interpolation weights are
+    derived from the fractional positions on the fly.
+
+    Examples
+    --------
+    >>> from skimage import data
+    >>> from skimage.transform import PolynomialTransform, WarpMap
+    >>> image = data.camera()
+    >>> tform = PolynomialTransform(np.array([[0, 1, 0, 1e-4, 0, 0],
+    ...                                       [0, 0, 1, 0, 0, 0]]))
+    >>> warp_map = WarpMap(tform, image.shape)
+    >>> warped = warp_map.apply(image)
+
+    """
+
+    def __init__(self, inverse_map, input_shape, output_shape=None, order=1,
+                 mode='constant', cval=0., map_args={}):
+        if order not in range(4):
+            raise ValueError("Invalid order specified. Please use 0, 1, 2 "
+                             "or 3.")
+        if mode not in ('constant', 'wrap', 'reflect', 'nearest'):
+            raise ValueError("Invalid mode specified.  Please use "
+                             "`constant`, `nearest`, `wrap` or `reflect`.")
+
+        self.input_shape = tuple(int(n) for n in input_shape[:2])
+        if output_shape is None:
+            output_shape = self.input_shape
+        self.output_shape = tuple(int(n) for n in output_shape[:2])
+        self.order = order
+        self.mode = mode
+        self.cval = cval
+
+        if isinstance(inverse_map, np.ndarray) and inverse_map.shape == (3, 3):
+            inverse_map = ProjectiveTransform(matrix=inverse_map)
+
+        def coord_map(*args):
+            return inverse_map(*args, **map_args)
+
+        coords = warp_coords(coord_map, self.output_shape)
+        self._row_base, self._row_t = _warp_map_taps(coords[0], order)
+        self._col_base, self._col_t = _warp_map_taps(coords[1], order)
+
+    def apply(self, image, out=None, n_jobs=1):
+        """Warp an image.
+
+        Parameters
+        ----------
+        image : 2-D or 3-D array
+            Input image of shape ``input_shape`` or
+            ``input_shape + (channels,)``.
+        out : ndarray, optional
+            Array of shape ``output_shape`` (plus the channels of `image`)
+            in which to store the result.
+        n_jobs : int, optional
+            Number of threads, each of which remaps a band of output rows.
+            Values smaller than 1 select all available CPU cores.
+
+        Returns
+        -------
+        out : ndarray
+            Warped image, float32 for float32 images and float64 otherwise
+            unless `out` is given.
+
+        """
+        if image.ndim not in (2, 3) or image.shape[:2] != self.input_shape:
+            raise ValueError("Image shape %s does not match the input shape "
+                             "%s of the warp map."
+                             % (image.shape, self.input_shape))
+        if image.dtype != np.float32:
+            image = img_as_float(image)
+        image = np.ascontiguousarray(image)
+
+        shape = self.output_shape + image.shape[2:]
+        if out is None:
+            out = np.empty(shape, dtype=image.dtype)
+        elif out.shape != shape:
+            raise ValueError("Output shape %s does not match the expected "
+                             "shape %s." % (out.shape, shape))
+
+        if out.dtype == image.dtype and out.flags.c_contiguous:
+            result = out
+        else:
+            result = np.empty(shape, dtype=image.dtype)
+
+        channels = image.shape[2] if image.ndim == 3 else 1
+        image3d = image.reshape(self.input_shape + (channels,))
+        result3d = result.reshape(self.output_shape + (channels,))
+        cval = float(self.cval) if self.mode == 'constant' else 0.
+
+        if image.size:
+            run_in_bands(lambda start, stop: _remap_rows(
+                image3d, self._row_base, self._row_t, self._col_base,
+                self._col_t, result3d, self.order, self.mode, cval,
+                start, stop), self.output_shape[0], n_jobs)
+        elif result.size:
+            result.fill(cval)
+
+        if result is not out:
+            out[...] = result
+        return out
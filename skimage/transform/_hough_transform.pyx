@@ -11,18 +11,138 @@ from libc.math cimport abs, fabs, sqrt, ceil, atan2, M_PI
 from libc.stdlib cimport rand
 
 from skimage.draw import circle_perimeter
+from skimage._shared.utils import effective_n_jobs, run_in_bands
 
 cdef double PI_2 = 1.5707963267948966
 cdef double NEG_PI_2 = -PI_2
 
 
-cdef inline Py_ssize_t round(double r):
+ctypedef fused accum_t:
+    cnp.float64_t
+    cnp.float32_t
+    cnp.uint16_t
+
+
+cdef inline Py_ssize_t round(double r) nogil:
     return <Py_ssize_t>((r + 0.5) if (r > 0.0) else (r - 0.5))
 
 
-def hough_circle(cnp.ndarray img,
-                 cnp.ndarray[ndim=1, dtype=cnp.intp_t] radius,
-                 char normalize=True, char full_output=False):
+def _accumulate(vote, shape, dtype, Py_ssize_t length, n_jobs):
+    """Sum the votes of bands of ``[0, length)`` cast in parallel.
+
+    ``vote(accum, start, stop)`` adds the votes of the items in
+    ``[start, stop)`` to `accum`. Every band votes into its own accumulator,
+    so that the threads never write to the same memory; the accumulators are
+    summed at the end, saturating for integer types.
+    """
+    n_bands = min(effective_n_jobs(n_jobs), length)
+    if n_bands <= 1:
+        accum = np.zeros(shape, dtype=dtype)
+        vote(accum, 0, length)
+        return accum
+
+    partial = {}
+
+    def vote_band(start, stop):
+        accum = np.zeros(shape, dtype=dtype)
+        vote(accum, start, stop)
+        partial[start] = accum
+
+    run_in_bands(vote_band, length, n_bands)
+    if np.issubdtype(dtype, np.integer):
+        total = sum(a.astype(np.uint64) for a in partial.values())
+        return np.minimum(total, np.iinfo(dtype).max).astype(dtype)
+    accum = partial.pop(0)
+    for a in partial.values():
+        accum += a
+    return accum
+
+
+def _circle_votes(Py_ssize_t[::1] x, Py_ssize_t[::1] y,
+                  Py_ssize_t[::1] circle_x, Py_ssize_t[::1] circle_y,
+                  double incr, accum_t[:, ::1] acc, Py_ssize_t start,
+                  Py_ssize_t stop):
+    """Add the votes of the edge pixels ``[start, stop)`` for one radius.
+
+    Every pixel votes `incr` for the centers on the circle
+    ``(x + circle_x, y + circle_y)`` which lie within `acc`. Integer
+    accumulators saturate instead of overflowing.
+    """
+
+    cdef Py_ssize_t xmax = acc.shape[0]
+    cdef Py_ssize_t ymax = acc.shape[1]
+    cdef Py_ssize_t num_circle_pixels = circle_x.shape[0]
+    cdef Py_ssize_t p, c, tx, ty
+
+    with nogil:
+        for p in range(start, stop):
+            for c in range(num_circle_pixels):
+                tx = circle_x[c] + x[p]
+                ty = circle_y[c] + y[p]
+                if 0 <= tx < xmax and 0 <= ty < ymax:
+                    if accum_t is cnp.uint16_t:
+                        if acc[tx, ty] < 65535:
+                            acc[tx, ty] += 1
+                    else:
+                        acc[tx, ty] += <accum_t>incr
+
+
+def _hough_circle_plane(x, y, Py_ssize_t rad, shape, char normalize,
+                        dtype, n_jobs):
+    """Circular Hough accumulator for a single radius.
+
+    Parameters
+    ----------
+    x, y : ndarray of intp
+        Coordinates of the edge pixels in the accumulator.
+    rad : int
+        Radius.
+    shape : tuple
+        Shape of the accumulator.
+    normalize : bool
+        Vote with the inverse of the number of circle pixels instead of 1.
+    dtype : dtype
+        Accumulator type, float64, float32 or uint16.
+    n_jobs : int
+        Number of threads.
+    """
+    circle_x, circle_y = circle_perimeter(0, 0, rad)
+    circle_x = np.ascontiguousarray(circle_x, dtype=np.intp)
+    circle_y = np.ascontiguousarray(circle_y, dtype=np.intp)
+    incr = 1.0 / circle_x.size if normalize else 1
+    return _accumulate(lambda acc, start, stop: _circle_votes(
+        x, y, circle_x, circle_y, incr, acc, start, stop),
+        shape, dtype, x.size, n_jobs)
+
+
+def _circle_edge_pixels(img, radius, full_output, dtype, normalize):
+    """Validate the arguments of `hough_circle`.
+
+    Returns the edge pixel coordinates in the accumulator, the shape of the
+    accumulator of one radius and its dtype.
+    """
+    if img.ndim != 2:
+        raise ValueError('The input image must be 2D.')
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float64, np.float32, np.uint16):
+        raise ValueError('The accumulator type must be float64, float32 or '
+                         'uint16.')
+    if normalize and dtype == np.uint16:
+        raise ValueError('A normalized accumulator must be floating point.')
+
+    x, y = np.nonzero(img)
+    offset = 0
+    if full_output and len(radius):
+        # Offset the image
+        offset = np.max(radius)
+    x = np.ascontiguousarray(x + offset, dtype=np.intp)
+    y = np.ascontiguousarray(y + offset, dtype=np.intp)
+    shape = (img.shape[0] + 2 * offset, img.shape[1] + 2 * offset)
+    return x, y, shape, dtype
+
+
+def hough_circle(img, radius, normalize=True, full_output=False,
+                 dtype=np.double, n_jobs=1):
     """Perform a circular Hough transform.
 
     Parameters
@@ -38,6 +158,12 @@ def hough_circle(cnp.ndarray img,
         Extend the output size by twice the largest
         radius in order to detect centers outside the
         input picture.
+    dtype : {np.float64, np.float32, np.uint16}, optional
+        Type of the accumulator. A uint16 accumulator saturates at 65535
+        votes and requires ``normalize=False``.
+    n_jobs : int, optional
+        Number of threads voting in parallel, each for its own chunk of
+        edge pixels. Values smaller than 1 select all available CPU cores.
 
     Returns
     -------
@@ -45,64 +171,104 @@ def hough_circle(cnp.ndarray img,
         Hough transform accumulator for each radius.
         R designates the larger radius if full_output is True.
         Otherwise, R = 0.
-    """
-    if img.ndim != 2:
-        raise ValueError('The input image must be 2D.')
-
-    cdef Py_ssize_t xmax = img.shape[0]
-    cdef Py_ssize_t ymax = img.shape[1]
 
-    # compute the nonzero indexes
-    cdef cnp.ndarray[ndim=1, dtype=cnp.intp_t] x, y
-    x, y = np.nonzero(img)
-
-    cdef Py_ssize_t num_pixels = x.size
-
-    cdef Py_ssize_t offset = 0
-    if full_output:
-        # Offset the image
-        offset = radius.max()
-        x = x + offset
-        y = y + offset
-
-    cdef Py_ssize_t i, p, c, num_circle_pixels, tx, ty
-    cdef double incr
-    cdef cnp.ndarray[ndim=1, dtype=cnp.intp_t] circle_x, circle_y
-
-    cdef cnp.ndarray[ndim=3, dtype=cnp.double_t] acc = \
-         np.zeros((radius.size,
-                   img.shape[0] + 2 * offset,
-                   img.shape[1] + 2 * offset), dtype=np.double)
+    See Also
+    --------
+    hough_circle_peaks : Peaks of the transform, computed one radius at a
+                         time without storing the full accumulator.
+    """
+    radius = np.asarray(radius, dtype=np.intp).ravel()
+    x, y, shape, dtype = _circle_edge_pixels(img, radius, full_output, dtype,
+                                             normalize)
 
+    acc = np.empty((radius.size,) + shape, dtype=dtype)
     for i, rad in enumerate(radius):
-        # Store in memory the circle of given radius
-        # centered at (0,0)
-        circle_x, circle_y = circle_perimeter(0, 0, rad)
-
-        num_circle_pixels = circle_x.size
+        acc[i] = _hough_circle_plane(x, y, rad, shape, normalize, dtype,
+                                     n_jobs)
+    return acc
 
-        if normalize:
-            incr = 1.0 / num_circle_pixels
-        else:
-            incr = 1
 
-        # For each non zero pixel
-        for p in range(num_pixels):
-            # Plug the circle at (px, py),
-            # its coordinates are (tx, ty)
-            for c in range(num_circle_pixels):
-                tx = circle_x[c] + x[p]
-                ty = circle_y[c] + y[p]
-                if offset:
-                    acc[i, tx, ty] += incr
-                elif 0 <= tx < xmax and 0 <= ty < ymax:
-                    acc[i, tx, ty] += incr
+cdef Py_ssize_t _ellipse_pair(Py_ssize_t[::1] xs, Py_ssize_t[::1] ys,
+                              Py_ssize_t p1, Py_ssize_t p2, int min_size,
+                              double max_b_squared, double bin_size,
+                              double[::1] values, Py_ssize_t[::1] hist,
+                              Py_ssize_t* best_bin) nogil:
+    """Vote for the minor axis of the ellipse with vertices `p1` and `p2`.
 
-    return acc
+    Every edge pixel votes for the squared minor axis of the ellipse through
+    it, in bins of `bin_size` which reproduce ``np.histogram`` with bin
+    edges ``np.arange(0, max_vote + bin_size, bin_size)``. Returns the
+    count of the fullest bin, which is stored in `best_bin`, or 0 without
+    votes.
+    """
+    cdef Py_ssize_t num_pixels = xs.shape[0]
+    cdef Py_ssize_t p1x = xs[p1]
+    cdef Py_ssize_t p1y = ys[p1]
+    cdef Py_ssize_t p3, p3x, p3y, i, n_votes, last, hist_max
+    cdef double a, xc, yc, d, f_squared, cos_tau_squared, k, b_squared
+    cdef double max_vote
+
+    # Candidate: center (xc, yc) and main axis a
+    a = 0.5 * sqrt((p1x - xs[p2]) * (p1x - xs[p2])
+                   + (p1y - ys[p2]) * (p1y - ys[p2]))
+    xc = 0.5 * (p1x + xs[p2])
+    yc = 0.5 * (p1y + ys[p2])
+
+    n_votes = 0
+    max_vote = 0
+    for p3 in range(num_pixels):
+        p3x = xs[p3]
+        p3y = ys[p3]
+        d = sqrt((p3x - xc) * (p3x - xc) + (p3y - yc) * (p3y - yc))
+        if d > min_size:
+            f_squared = (p3x - p1x) * (p3x - p1x) + (p3y - p1y) * (p3y - p1y)
+            cos_tau_squared = ((a * a + d * d - f_squared) / (2 * a * d))
+            cos_tau_squared = cos_tau_squared * cos_tau_squared
+            # Consider b2 > 0 and avoid division by zero
+            k = a * a - d * d * cos_tau_squared
+            if k > 0 and cos_tau_squared < 1:
+                b_squared = (a * a) * (d * d) * (1 - cos_tau_squared) / k
+                # b2 range is limited to bound the accumulator size
+                if b_squared <= max_b_squared:
+                    values[n_votes] = b_squared
+                    n_votes += 1
+                    if b_squared > max_vote:
+                        max_vote = b_squared
+    if n_votes == 0:
+        return 0
+
+    # index of the last bin edge
+    last = <Py_ssize_t>ceil((max_vote + bin_size) / bin_size) - 1
+    for i in range(last):
+        hist[i] = 0
+    for p3 in range(n_votes):
+        b_squared = values[p3]
+        i = <Py_ssize_t>(b_squared / bin_size)
+        if i > last:
+            i = last
+        # the edges are i * bin_size, correct for rounding errors
+        while i > 0 and b_squared < i * bin_size:
+            i -= 1
+        while i < last and b_squared >= (i + 1) * bin_size:
+            i += 1
+        if i == last:
+            # the last bin is closed
+            if b_squared > last * bin_size or last == 0:
+                continue
+            i -= 1
+        hist[i] += 1
+
+    hist_max = 0
+    for i in range(last):
+        if hist[i] > hist_max:
+            hist_max = hist[i]
+            best_bin[0] = i
+    return hist_max
 
 
 def hough_ellipse(cnp.ndarray img, int threshold=4, double accuracy=1,
-                  int min_size=4, max_size=None):
+                  int min_size=4, max_size=None, max_major_size=None,
+                  num_samples=None, random_seed=None):
     """Perform an elliptical Hough transform.
 
     Parameters
@@ -119,6 +285,16 @@ def hough_ellipse(cnp.ndarray img, int threshold=4, double accuracy=1,
         Maximal minor axis length. (default None)
         If None, the value is set to the half of the smaller
         image dimension.
+    max_major_size : int, optional
+        Maximal major axis length. Pairs of edge pixels which are further
+        apart are not considered as ellipse vertices. (default None)
+        If None, the major axis is not limited.
+    num_samples : int, optional
+        Number of randomly drawn pairs of edge pixels considered as ellipse
+        vertices (randomized Hough transform), which bounds the run time.
+        (default None) If None, all pairs are considered.
+    random_seed : int, optional
+        Seed of the random number generator used to draw the pairs.
 
     Returns
     -------
@@ -141,6 +317,11 @@ def hough_ellipse(cnp.ndarray img, int threshold=4, double accuracy=1,
     distribution. In other words, a flat accumulator distribution with low
     values may be caused by a too low bin size.
 
+    Considering all pairs of edge pixels takes time proportional to the
+    cube of their number. Limiting the major axis with `max_major_size` or
+    drawing a fixed number of pairs with `num_samples` makes large edge
+    maps tractable.
+
     References
     ----------
     .. [1] Xie, Yonghong, and Qiang Ji. "A new efficient ellipse detection
@@ -150,9 +331,11 @@ def hough_ellipse(cnp.ndarray img, int threshold=4, double accuracy=1,
     if img.ndim != 2:
             raise ValueError('The input image must be 2D.')
 
-    cdef Py_ssize_t[:, ::1] pixels = np.row_stack(np.nonzero(img))
-    cdef Py_ssize_t num_pixels = pixels.shape[1]
-    cdef list acc = list()
+    # nonzero returns the pixels sorted by row
+    ys_arr, xs_arr = np.nonzero(img)
+    cdef Py_ssize_t[::1] ys = np.ascontiguousarray(ys_arr, dtype=np.intp)
+    cdef Py_ssize_t[::1] xs = np.ascontiguousarray(xs_arr, dtype=np.intp)
+    cdef Py_ssize_t num_pixels = ys.shape[0]
     cdef list results = list()
     cdef double bin_size = accuracy ** 2
 
@@ -165,63 +348,75 @@ def hough_ellipse(cnp.ndarray img, int threshold=4, double accuracy=1,
     else:
         max_b_squared = max_size**2
 
-    cdef Py_ssize_t p1, p2, p3, p1x, p1y, p2x, p2y, p3x, p3y
-    cdef double xc, yc, a, b, d, k
-    cdef double cos_tau_squared, b_squared, f_squared, orientation
-
-    for p1 in range(num_pixels):
-        p1x = pixels[1, p1]
-        p1y = pixels[0, p1]
-
-        for p2 in range(p1):
-            p2x = pixels[1, p2]
-            p2y = pixels[0, p2]
-
-            # Candidate: center (xc, yc) and main axis a
-            a = 0.5 * sqrt((p1x - p2x)**2 + (p1y - p2y)**2)
-            if a > 0.5 * min_size:
-                xc = 0.5 * (p1x + p2x)
-                yc = 0.5 * (p1y + p2y)
-
-                for p3 in range(num_pixels):
-                    p3x = pixels[1, p3]
-                    p3y = pixels[0, p3]
-
-                    d = sqrt((p3x - xc)**2 + (p3y - yc)**2)
-                    if d > min_size:
-                        f_squared = (p3x - p1x)**2 + (p3y - p1y)**2
-                        cos_tau_squared = ((a**2 + d**2 - f_squared)
-                                           / (2 * a * d))**2
-                        # Consider b2 > 0 and avoid division by zero
-                        k = a**2 - d**2 * cos_tau_squared
-                        if k > 0 and cos_tau_squared < 1:
-                            b_squared = a**2 * d**2 * (1 - cos_tau_squared) / k
-                            # b2 range is limited to avoid histogram memory
-                            # overflow
-                            if b_squared <= max_b_squared:
-                                acc.append(b_squared)
-
-                if len(acc) > 0:
-                    bins = np.arange(0, np.max(acc) + bin_size, bin_size)
-                    hist, bin_edges = np.histogram(acc, bins=bins)
-                    hist_max = np.max(hist)
-                    if hist_max > threshold:
-                        orientation = atan2(p1x - p2x, p1y - p2y)
-                        b = sqrt(bin_edges[hist.argmax()])
-                        # to keep ellipse_perimeter() convention
-                        if orientation != 0:
-                            orientation = M_PI - orientation
-                            # When orientation is not in [-pi:pi]
-                            # it would mean in ellipse_perimeter()
-                            # that a < b. But we keep a > b.
-                            if orientation > M_PI:
-                                orientation = orientation - M_PI / 2.
-                                a, b = b, a
-                        results.append((hist_max, # Accumulator
-                                        yc, xc,
-                                        a, b,
-                                        orientation))
-                    acc = []
+    cdef double max_a = np.inf
+    if max_major_size is not None:
+        max_a = 0.5 * max_major_size
+
+    # fixed size buffers for the votes of a pair and their histogram
+    cdef double[::1] values = np.empty(num_pixels, dtype=np.double)
+    cdef Py_ssize_t[::1] hist = np.zeros(
+        <Py_ssize_t>(max_b_squared / bin_size) + 3, dtype=np.intp)
+
+    # candidate pairs of vertices, p2 < p1
+    cdef Py_ssize_t[::1] first, pairs_1, pairs_2
+    if num_samples is None:
+        # the vertical distance of the vertices is at most 2 * max_a
+        first = np.searchsorted(ys_arr, ys_arr - 2 * max_a,
+                                side='left').astype(np.intp)
+        num_pairs = num_pixels
+    elif num_pixels > 1:
+        random_state = np.random.RandomState(random_seed)
+        samples = random_state.randint(0, num_pixels, size=(num_samples, 2))
+        samples = samples[samples[:, 0] != samples[:, 1]]
+        samples.sort(axis=1)
+        pairs_2 = np.ascontiguousarray(samples[:, 0], dtype=np.intp)
+        pairs_1 = np.ascontiguousarray(samples[:, 1], dtype=np.intp)
+        num_pairs = samples.shape[0]
+    else:
+        num_pairs = 0
+
+    cdef Py_ssize_t p, p1, p2, p2_start, p2_stop, hist_max, best_bin
+    cdef double xc, yc, a, b, orientation, a_squared
+
+    for p in range(num_pairs):
+        if num_samples is None:
+            p1 = p
+            p2_start = first[p]
+            p2_stop = p
+        else:
+            p1 = pairs_1[p]
+            p2_start = pairs_2[p]
+            p2_stop = p2_start + 1
+
+        for p2 in range(p2_start, p2_stop):
+            a_squared = ((xs[p1] - xs[p2]) * (xs[p1] - xs[p2])
+                         + (ys[p1] - ys[p2]) * (ys[p1] - ys[p2]))
+            a = 0.5 * sqrt(a_squared)
+            if a <= 0.5 * min_size or a > max_a:
+                continue
+
+            with nogil:
+                hist_max = _ellipse_pair(xs, ys, p1, p2, min_size,
+                                         max_b_squared, bin_size, values,
+                                         hist, &best_bin)
+            if hist_max > threshold:
+                xc = 0.5 * (xs[p1] + xs[p2])
+                yc = 0.5 * (ys[p1] + ys[p2])
+                orientation = atan2(xs[p1] - xs[p2], ys[p1] - ys[p2])
+                b = sqrt(best_bin * bin_size)
+                # to keep ellipse_perimeter() convention
+                if orientation != 0:
+                    orientation = M_PI - orientation
+                    # When orientation is not in [-pi:pi]
+                    # it would mean in ellipse_perimeter()
+                    # that a < b. But we keep a > b.
+                    if orientation > M_PI:
+                        orientation = orientation - M_PI / 2.
+                        a, b = b, a
+                results.append((hist_max, # Accumulator
+                                yc, xc,
+                                a, b,
+                                orientation))
 
     return np.array(results, dtype=[('accumulator', np.intp),
                                     ('yc', np.double),
@@ -232,7 +427,8 @@ def hough_ellipse(cnp.ndarray img, int threshold=4, double accuracy=1,
 
 
 def hough_line(cnp.ndarray img,
-               cnp.ndarray[ndim=1, dtype=cnp.double_t] theta=None):
+               cnp.ndarray[ndim=1, dtype=cnp.double_t] theta=None,
+               n_jobs=1):
     """Perform a straight line Hough transform.
 
     Parameters
@@ -242,6 +438,9 @@ def hough_line(cnp.ndarray img,
     theta : 1D ndarray of double
         Angles at which to compute the transform, in radians.
         Defaults to -pi/2 .. pi/2
+    n_jobs : int, optional
+        Number of threads voting in parallel, each for its own chunk of
+        edge pixels. Values smaller than 1 select all available CPU cores.
 
     Returns
     -------
@@ -282,43 +481,52 @@ def hough_line(cnp.ndarray img,
         raise ValueError('The input image must be 2D.')
 
     # Compute the array of angles and their sine and cosine
-    cdef cnp.ndarray[ndim=1, dtype=cnp.double_t] ctheta
-    cdef cnp.ndarray[ndim=1, dtype=cnp.double_t] stheta
-
     if theta is None:
         theta = np.linspace(NEG_PI_2, PI_2, 180)
 
-    ctheta = np.cos(theta)
-    stheta = np.sin(theta)
+    ctheta = np.ascontiguousarray(np.cos(theta))
+    stheta = np.ascontiguousarray(np.sin(theta))
 
-    # compute the bins and allocate the accumulator array
-    cdef cnp.ndarray[ndim=2, dtype=cnp.uint64_t] accum
+    # compute the bins of the accumulator array
     cdef cnp.ndarray[ndim=1, dtype=cnp.double_t] bins
     cdef Py_ssize_t max_distance, offset
 
     max_distance = 2 * <Py_ssize_t>ceil(sqrt(img.shape[0] * img.shape[0] +
                                              img.shape[1] * img.shape[1]))
-    accum = np.zeros((max_distance, theta.shape[0]), dtype=np.uint64)
     bins = np.linspace(-max_distance / 2.0, max_distance / 2.0, max_distance)
     offset = max_distance / 2
 
     # compute the nonzero indexes
-    cdef cnp.ndarray[ndim=1, dtype=cnp.npy_intp] x_idxs, y_idxs
     y_idxs, x_idxs = np.nonzero(img)
+    x_idxs = np.ascontiguousarray(x_idxs, dtype=np.intp)
+    y_idxs = np.ascontiguousarray(y_idxs, dtype=np.intp)
 
     # finally, run the transform
-    cdef Py_ssize_t nidxs, nthetas, i, j, x, y, accum_idx
-    nidxs = y_idxs.shape[0]  # x and y are the same shape
-    nthetas = theta.shape[0]
-    for i in range(nidxs):
-        x = x_idxs[i]
-        y = y_idxs[i]
-        for j in range(nthetas):
-            accum_idx = <int>round((ctheta[j] * x + stheta[j] * y)) + offset
-            accum[accum_idx, j] += 1
+    accum = _accumulate(lambda acc, start, stop: _line_votes(
+        x_idxs, y_idxs, ctheta, stheta, offset, acc, start, stop),
+        (max_distance, theta.shape[0]), np.uint64, x_idxs.shape[0], n_jobs)
     return accum, theta, bins
 
 
+def _line_votes(cnp.intp_t[::1] x_idxs, cnp.intp_t[::1] y_idxs,
+                double[::1] ctheta, double[::1] stheta, Py_ssize_t offset,
+                cnp.uint64_t[:, ::1] accum, Py_ssize_t start,
+                Py_ssize_t stop):
+    """Add the votes of the edge pixels ``[start, stop)`` to `accum`."""
+
+    cdef Py_ssize_t nthetas = ctheta.shape[0]
+    cdef Py_ssize_t i, j, x, y, accum_idx
+
+    with nogil:
+        for i in range(start, stop):
+            x = x_idxs[i]
+            y = y_idxs[i]
+            for j in range(nthetas):
+                accum_idx = <int>round((ctheta[j] * x + stheta[j] * y)) \
+                    + offset
+                accum[accum_idx, j] += 1
+
+
 def probabilistic_hough_line(cnp.ndarray img, int threshold=10,
                              int line_length=50, int line_gap=10,
                              cnp.ndarray[ndim=1, dtype=cnp.double_t] theta=None):
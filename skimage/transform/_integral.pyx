@@ -0,0 +1,134 @@
+#cython: cdivision=True
+#cython: boundscheck=False
+#cython: nonecheck=False
+#cython: wraparound=False
+
+"""Compiled kernels of the summed area table utilities in `integral`."""
+
+cimport numpy as cnp
+
+
+ctypedef fused sat_t:
+    cnp.int64_t
+    cnp.uint64_t
+    cnp.float32_t
+    cnp.float64_t
+
+
+def _integrate_boxes(sat_t[::1] sat, Py_ssize_t[::1] shape,
+                     Py_ssize_t[::1] strides, Py_ssize_t[:, ::1] boxes,
+                     sat_t[::1] out, bint wrap=False):
+    """Sum an n-D array over boxes using its summed area table.
+
+    Every box is evaluated by inclusion-exclusion over its ``2 ** ndim``
+    corners.
+
+    Parameters
+    ----------
+    sat : ndarray
+        Flattened summed area table.
+    shape : (ndim,) ndarray of intp
+        Shape of the summed area table.
+    strides : (ndim,) ndarray of intp
+        Strides of the summed area table, in elements.
+    boxes : (K, 2 * ndim) ndarray of intp
+        First and last (inclusive) index of every box along each axis,
+        ``(start_0, ..., start_{ndim-1}, end_0, ..., end_{ndim-1})``. The
+        indices must lie within the table, except for ``end = start - 1``
+        which selects an empty box.
+    out : (K,) ndarray
+        Sums over the boxes.
+    wrap : bool, optional
+        Clip negative starts to 0 and count negative ends from the end of
+        the axis, like negative indices.
+
+    Returns
+    -------
+    invalid : int
+        Index of the first box which does not lie within the table, or -1
+        if all boxes are valid. The boxes following it are not evaluated.
+    """
+
+    cdef Py_ssize_t ndim = strides.shape[0]
+    cdef Py_ssize_t n_corners = 1 << ndim
+    cdef Py_ssize_t k, corner, d, index, coord
+    cdef Py_ssize_t invalid = -1
+    cdef Py_ssize_t starts[32]
+    cdef Py_ssize_t ends[32]
+    cdef bint negative, outside
+    cdef sat_t total
+
+    if ndim > 32:
+        raise ValueError('At most 32 dimensions are supported.')
+
+    with nogil:
+        for k in range(boxes.shape[0]):
+            for d in range(ndim):
+                starts[d] = boxes[k, d]
+                ends[d] = boxes[k, ndim + d]
+                if wrap:
+                    if starts[d] < 0:
+                        starts[d] = 0
+                    if ends[d] < 0:
+                        ends[d] += shape[d]
+                if (starts[d] < 0 or ends[d] >= shape[d]
+                        or ends[d] < starts[d] - 1):
+                    invalid = k
+            if invalid >= 0:
+                break
+
+            total = 0
+            for corner in range(n_corners):
+                index = 0
+                negative = False
+                outside = False
+                for d in range(ndim):
+                    if (corner >> d) & 1:
+                        # corner before the start of the box
+                        coord = starts[d] - 1
+                        negative = not negative
+                    else:
+                        coord = ends[d]
+                    if coord < 0:
+                        outside = True
+                        break
+                    index += coord * strides[d]
+                if outside:
+                    continue
+                if negative:
+                    total -= sat[index]
+                else:
+                    total += sat[index]
+            out[k] = total
+
+    return invalid
+
+
+def _tilted_sums(sat_t[:, ::1] image, sat_t[:, ::1] out):
+    """Summed area table rotated by 45 degrees.
+
+    ``out[r, c]`` is the sum of ``image[r', c']`` for all ``r' <= r`` and
+    ``|c' - c| <= r - r'``, computed with the recurrence of Lienhart and
+    Maydt. The columns of `image` must be padded with as many zeros on each
+    side as it has rows, so that the triangles reaching beyond the first
+    and last column are empty.
+    """
+
+    cdef Py_ssize_t rows = image.shape[0]
+    cdef Py_ssize_t cols = image.shape[1]
+    cdef Py_ssize_t r, c
+    cdef sat_t total
+
+    with nogil:
+        for r in range(rows):
+            for c in range(cols):
+                total = image[r, c]
+                if r >= 1:
+                    total += image[r - 1, c]
+                    if c >= 1:
+                        total += out[r - 1, c - 1]
+                    if c + 1 < cols:
+                        total += out[r - 1, c + 1]
+                if r >= 2:
+                    total -= out[r - 2, c]
+                out[r, c] = total
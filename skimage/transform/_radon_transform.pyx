@@ -6,7 +6,7 @@ import numpy as np
 
 cimport numpy as cnp
 cimport cython
-from libc.math cimport cos, sin, floor, ceil, sqrt, abs, M_PI
+from libc.math cimport cos, sin, floor, ceil, sqrt, abs, fabs, M_PI
 
 
 cpdef bilinear_ray_sum(cnp.double_t[:, :] image, cnp.double_t theta,
@@ -200,3 +200,433 @@ def sart_projection_update(cnp.double_t[:, :] image not None,
         bilinear_ray_update(image, image_update, theta, ray_position,
                             projection[i])
     return image_update
+
+
+def _backproject(double[:, :, ::1] filtered, double[::1] sin_theta,
+                 double[::1] cos_theta, double[:, :, ::1] out,
+                 bint nearest, Py_ssize_t start, Py_ssize_t stop):
+    """Add the back projections of filtered projections to an image stack.
+
+    The detector position and interpolation weight of a pixel only depend
+    on the angle, so they are computed once and reused for every slice of
+    the stack.
+
+    Parameters
+    ----------
+    filtered : (A, D, S) ndarray of float64
+        Filtered projections of `S` slices taken at `A` angles with `D`
+        detector bins each. The rotation axis lies at bin ``D // 2``.
+    sin_theta, cos_theta : (A,) ndarray of float64
+        Sine and cosine of the projection angles.
+    out : (N, N, S) ndarray of float64
+        Reconstructed stack, rotation axis at pixel ``(N // 2, N // 2)``.
+        Rows ``[start, stop)`` are updated in place.
+    nearest : bool
+        Use nearest neighbour instead of linear interpolation between the
+        detector bins. Positions outside of the detector contribute zero.
+    start, stop : int
+        Range of rows to process.
+    """
+
+    cdef Py_ssize_t n_angles = filtered.shape[0]
+    cdef Py_ssize_t n_detectors = filtered.shape[1]
+    cdef Py_ssize_t n_slices = filtered.shape[2]
+    cdef Py_ssize_t size = out.shape[0]
+    cdef Py_ssize_t mid = n_detectors // 2
+    cdef Py_ssize_t center = size // 2
+    cdef Py_ssize_t a, r, c, s, i
+    cdef double t, w, row_sin
+
+    with nogil:
+        for a in range(n_angles):
+            for r in range(start, stop):
+                row_sin = (r - center) * sin_theta[a]
+                for c in range(size):
+                    # detector position relative to the rotation axis
+                    t = (c - center) * cos_theta[a] - row_sin
+                    if t < -mid or t > n_detectors - 1 - mid:
+                        continue
+                    if nearest:
+                        # ties go to the lower bin, like ``interp1d``
+                        i = <Py_ssize_t>ceil(t - 0.5) + mid
+                        for s in range(n_slices):
+                            out[r, c, s] += filtered[a, i, s]
+                        continue
+                    t += mid
+                    i = <Py_ssize_t>t
+                    if i == n_detectors - 1:
+                        for s in range(n_slices):
+                            out[r, c, s] += filtered[a, i, s]
+                        continue
+                    w = t - i
+                    for s in range(n_slices):
+                        out[r, c, s] += (filtered[a, i, s]
+                                         + w * (filtered[a, i + 1, s]
+                                                - filtered[a, i, s]))
+
+
+cdef inline double _kernel(double u, double[::1] table,
+                           double table_scale) nogil:
+    """Linearly interpolated lookup of a symmetric gridding kernel."""
+    cdef double x = fabs(u) * table_scale
+    cdef Py_ssize_t i = <Py_ssize_t>x
+    if i >= table.shape[0] - 1:
+        return 0
+    x -= i
+    return (1 - x) * table[i] + x * table[i + 1]
+
+
+cdef inline Py_ssize_t _wrap(Py_ssize_t i, Py_ssize_t n) nogil:
+    i = i % n
+    if i < 0:
+        i += n
+    return i
+
+
+cdef inline void _radial_taps(double g, Py_ssize_t width, Py_ssize_t m,
+                              double[::1] table, double table_scale,
+                              Py_ssize_t* index, double* weight) nogil:
+    """Grid nodes within the kernel support around `g` and their weights."""
+    cdef Py_ssize_t j
+    cdef Py_ssize_t first = <Py_ssize_t>ceil(g - width / 2.)
+    for j in range(width):
+        index[j] = _wrap(first + j, m)
+        weight[j] = _kernel(g - (first + j), table, table_scale)
+
+
+def _grid_sample(double complex[:, ::1] grid, double[::1] sin_theta,
+                 double[::1] cos_theta, double[::1] table,
+                 double table_scale, Py_ssize_t width,
+                 double complex[:, ::1] out, Py_ssize_t start,
+                 Py_ssize_t stop):
+    """Interpolate a periodic spectrum along central lines.
+
+    Sample ``k`` of line ``a`` lies at the grid position
+    ``k * (-sin_theta[a], cos_theta[a])``, where ``k`` counts in the order of
+    ``fftfreq``, i.e. the second half of the line has negative frequencies.
+
+    Parameters
+    ----------
+    grid : (M, M) ndarray of complex128
+        Oversampled 2-D spectrum, zero frequency at ``(0, 0)``.
+    sin_theta, cos_theta : (A,) ndarray of float64
+        Sine and cosine of the line angles.
+    table : ndarray of float64
+        Gridding kernel sampled at ``arange(len(table)) / table_scale``.
+    table_scale : float
+        Number of table entries per grid spacing.
+    width : int
+        Width of the kernel support in grid spacings.
+    out : (A, K) ndarray of complex128
+        Samples, only lines ``[start, stop)`` are written.
+    start, stop : int
+        Range of lines to process.
+    """
+
+    cdef Py_ssize_t m = grid.shape[0]
+    cdef Py_ssize_t n_k = out.shape[1]
+    cdef Py_ssize_t a, k, i, j
+    cdef double f
+    cdef double complex acc, row_acc
+
+    index_buf = np.empty((2, width), dtype=np.intp)
+    weight_buf = np.empty((2, width), dtype=np.double)
+    cdef Py_ssize_t[:, ::1] index = index_buf
+    cdef double[:, ::1] weight = weight_buf
+
+    with nogil:
+        for a in range(start, stop):
+            for k in range(n_k):
+                f = k if k < (n_k + 1) // 2 else k - n_k
+                _radial_taps(-f * sin_theta[a], width, m, table, table_scale,
+                             &index[0, 0], &weight[0, 0])
+                _radial_taps(f * cos_theta[a], width, m, table, table_scale,
+                             &index[1, 0], &weight[1, 0])
+                acc = 0
+                for i in range(width):
+                    row_acc = 0
+                    for j in range(width):
+                        row_acc = row_acc + (weight[1, j]
+                                             * grid[index[0, i], index[1, j]])
+                    acc = acc + weight[0, i] * row_acc
+                out[a, k] = acc
+
+
+def _grid_spread(double complex[:, ::1] samples, double[::1] sin_theta,
+                 double[::1] cos_theta, double[::1] table,
+                 double table_scale, Py_ssize_t width,
+                 double complex[:, ::1] grid):
+    """Spread samples on central lines onto a periodic grid.
+
+    This is the adjoint of `_grid_sample`, the samples are added to `grid`.
+    """
+
+    cdef Py_ssize_t m = grid.shape[0]
+    cdef Py_ssize_t n_k = samples.shape[1]
+    cdef Py_ssize_t a, k, i, j
+    cdef double f
+    cdef double complex value
+
+    index_buf = np.empty((2, width), dtype=np.intp)
+    weight_buf = np.empty((2, width), dtype=np.double)
+    cdef Py_ssize_t[:, ::1] index = index_buf
+    cdef double[:, ::1] weight = weight_buf
+
+    with nogil:
+        for a in range(samples.shape[0]):
+            for k in range(n_k):
+                f = k if k < (n_k + 1) // 2 else k - n_k
+                _radial_taps(-f * sin_theta[a], width, m, table, table_scale,
+                             &index[0, 0], &weight[0, 0])
+                _radial_taps(f * cos_theta[a], width, m, table, table_scale,
+                             &index[1, 0], &weight[1, 0])
+                for i in range(width):
+                    value = weight[0, i] * samples[a, k]
+                    for j in range(width):
+                        grid[index[0, i], index[1, j]] = (
+                            grid[index[0, i], index[1, j]]
+                            + weight[1, j] * value)
+
+
+cdef Py_ssize_t _ray_entries(Py_ssize_t size, double theta,
+                             double ray_position, Py_ssize_t* pixels,
+                             double* forward, double* update,
+                             double* weight_norm) nogil:
+    """Pixel weights of a single ray, as used by `bilinear_ray_update`.
+
+    Writes the flat pixel index, the weight of the ray sum and the weight of
+    the update of every interpolation sample (pixels may repeat) and returns
+    their number. `weight_norm` is set to the sum of the squared ray sum
+    weights.
+    """
+    cdef double radius = size // 2 - 1
+    cdef double projection_center = size // 2
+    cdef double rotation_center = size // 2
+    cdef double t = ray_position - projection_center
+    cdef double s0 = sqrt(radius * radius - t * t) if radius ** 2 >= t ** 2 \
+        else 0.
+    cdef Py_ssize_t Ns = 2 * (<Py_ssize_t>ceil(2 * s0))
+    cdef double hamming_beta = 0.46164
+    cdef double ds, dx, dy, x0, y0, x, y, di, dj, index_i, index_j
+    cdef double weight, hamming_window
+    cdef Py_ssize_t k, i, j
+    cdef Py_ssize_t n = 0
+
+    weight_norm[0] = 0
+    if Ns == 0:
+        return 0
+    ds = 2 * s0 / Ns
+    dx = -ds * cos(theta)
+    dy = -ds * sin(theta)
+    x0 = s0 * cos(theta) - t * sin(theta)
+    y0 = s0 * sin(theta) + t * cos(theta)
+    for k in range(Ns + 1):
+        x = x0 + k * dx
+        y = y0 + k * dy
+        index_i = x + rotation_center
+        index_j = y + rotation_center
+        i = <Py_ssize_t>floor(index_i)
+        j = <Py_ssize_t>floor(index_j)
+        di = index_i - floor(index_i)
+        dj = index_j - floor(index_j)
+        hamming_window = ((1 - hamming_beta)
+                          - hamming_beta * cos(2 * M_PI * k / (Ns - 1)))
+        if i > 0 and j > 0:
+            weight = (1. - di) * (1. - dj) * ds
+            pixels[n] = i * size + j
+            forward[n] = weight
+            update[n] = weight * hamming_window
+            weight_norm[0] += weight * weight
+            n += 1
+        if i > 0 and j < size - 1:
+            weight = (1. - di) * dj * ds
+            pixels[n] = i * size + j + 1
+            forward[n] = weight
+            update[n] = weight * hamming_window
+            weight_norm[0] += weight * weight
+            n += 1
+        if i < size - 1 and j > 0:
+            weight = di * (1 - dj) * ds
+            pixels[n] = (i + 1) * size + j
+            forward[n] = weight
+            update[n] = weight * hamming_window
+            weight_norm[0] += weight * weight
+            n += 1
+        if i < size - 1 and j < size - 1:
+            weight = di * dj * ds
+            pixels[n] = (i + 1) * size + j + 1
+            forward[n] = weight
+            update[n] = weight * hamming_window
+            weight_norm[0] += weight * weight
+            n += 1
+    return n
+
+
+def _sart_system_matrix(Py_ssize_t size, double[::1] theta,
+                        double[::1] projection_shifts):
+    """Sparse SART system matrix of a square reconstruction.
+
+    Row ``a * size + d`` holds the pixel weights of the ray through detector
+    ``d`` at angle ``a``, in compressed sparse row format. Repeated pixels of
+    a ray are merged.
+
+    Parameters
+    ----------
+    size : int
+        Number of detectors, and of rows and columns of the reconstruction.
+    theta : (A,) ndarray of float64
+        Projection angles in degrees.
+    projection_shifts : (A,) ndarray of float64
+        Shift of the rays of every projection, in pixels.
+
+    Returns
+    -------
+    indptr : (A * size + 1,) ndarray of intp
+        Row offsets into the other arrays.
+    indices : ndarray of int32
+        Flat pixel indices.
+    forward, update : ndarray of float64
+        Weights of the ray sums and of the update step respectively.
+    weight_norm : (A * size,) ndarray of float64
+        Sum of the squared (unmerged) ray sum weights of every ray.
+    """
+
+    cdef Py_ssize_t n_angles = theta.shape[0]
+    cdef Py_ssize_t n_rays = n_angles * size
+    cdef Py_ssize_t max_entries = 4 * (4 * size + 3)
+    cdef Py_ssize_t ray, a, d, e, n, p, nnz, count
+    cdef double norm
+
+    pixels_buf = np.empty(max_entries, dtype=np.intp)
+    forward_buf = np.empty(max_entries, dtype=np.double)
+    update_buf = np.empty(max_entries, dtype=np.double)
+    marker_buf = np.empty(size * size, dtype=np.intp)
+    slot_buf = np.empty(size * size, dtype=np.intp)
+    cdef Py_ssize_t[::1] pixels = pixels_buf
+    cdef double[::1] forward_tmp = forward_buf
+    cdef double[::1] update_tmp = update_buf
+    cdef Py_ssize_t[::1] marker = marker_buf
+    cdef Py_ssize_t[::1] slot = slot_buf
+
+    indptr_arr = np.zeros(n_rays + 1, dtype=np.intp)
+    weight_norm_arr = np.zeros(n_rays, dtype=np.double)
+    cdef Py_ssize_t[::1] indptr = indptr_arr
+    cdef double[::1] weight_norm = weight_norm_arr
+
+    # first pass: count the distinct pixels of every ray
+    with nogil:
+        for p in range(size * size):
+            marker[p] = -1
+        for a in range(n_angles):
+            for d in range(size):
+                ray = a * size + d
+                n = _ray_entries(size, theta[a] / 180. * M_PI,
+                                 d + projection_shifts[a], &pixels[0],
+                                 &forward_tmp[0], &update_tmp[0], &norm)
+                weight_norm[ray] = norm
+                count = 0
+                for e in range(n):
+                    p = pixels[e]
+                    if marker[p] != ray:
+                        marker[p] = ray
+                        count += 1
+                indptr[ray + 1] = indptr[ray] + count
+
+    nnz = indptr[n_rays]
+    indices_arr = np.empty(nnz, dtype=np.int32)
+    forward_arr = np.zeros(nnz, dtype=np.double)
+    update_arr = np.zeros(nnz, dtype=np.double)
+    cdef cnp.int32_t[::1] indices = indices_arr
+    cdef double[::1] forward = forward_arr
+    cdef double[::1] update = update_arr
+
+    # second pass: accumulate the weights
+    with nogil:
+        for p in range(size * size):
+            marker[p] = -1
+        for a in range(n_angles):
+            for d in range(size):
+                ray = a * size + d
+                n = _ray_entries(size, theta[a] / 180. * M_PI,
+                                 d + projection_shifts[a], &pixels[0],
+                                 &forward_tmp[0], &update_tmp[0], &norm)
+                count = indptr[ray]
+                for e in range(n):
+                    p = pixels[e]
+                    if marker[p] != ray:
+                        marker[p] = ray
+                        slot[p] = count
+                        indices[count] = p
+                        count += 1
+                    forward[slot[p]] += forward_tmp[e]
+                    update[slot[p]] += update_tmp[e]
+
+    return indptr_arr, indices_arr, forward_arr, update_arr, weight_norm_arr
+
+
+def _sart_volume(Py_ssize_t[::1] indptr, cnp.int32_t[::1] indices,
+                 double[::1] forward, double[::1] update,
+                 double[::1] weight_norm, double[:, :, :] sinograms,
+                 Py_ssize_t[::1] order, double[:, ::1] volume,
+                 double relaxation, bint clip, double clip_low,
+                 double clip_high, Py_ssize_t start, Py_ssize_t stop):
+    """One SART iteration for slices ``[start, stop)`` of a stack.
+
+    Parameters
+    ----------
+    indptr, indices, forward, update, weight_norm : ndarray
+        System matrix, see `_sart_system_matrix`.
+    sinograms : (S, D, A) ndarray of float64
+        Sinograms of the slices.
+    order : (A,) ndarray of intp
+        Order in which the projections are used.
+    volume : (S, D * D) ndarray of float64
+        Flattened reconstruction estimates, updated in place.
+    relaxation : float
+        Relaxation parameter of the update step.
+    clip : bool
+        Clip the estimate to ``[clip_low, clip_high]`` after every update.
+    start, stop : int
+        Range of slices to process.
+    """
+
+    cdef Py_ssize_t size = sinograms.shape[1]
+    cdef Py_ssize_t n_pixels = volume.shape[1]
+    cdef Py_ssize_t s, o, a, d, ray, k, p
+    cdef double ray_sum, value
+
+    deviation_buf = np.empty(size, dtype=np.double)
+    image_update_buf = np.empty(n_pixels, dtype=np.double)
+    cdef double[::1] deviation = deviation_buf
+    cdef double[::1] image_update = image_update_buf
+
+    with nogil:
+        for s in range(start, stop):
+            for o in range(order.shape[0]):
+                a = order[o]
+                for d in range(size):
+                    ray = a * size + d
+                    ray_sum = 0
+                    for k in range(indptr[ray], indptr[ray + 1]):
+                        ray_sum += forward[k] * volume[s, indices[k]]
+                    if weight_norm[ray] > 0.:
+                        deviation[d] = (-(ray_sum - sinograms[s, d, a])
+                                        / weight_norm[ray])
+                    else:
+                        deviation[d] = 0.
+
+                for p in range(n_pixels):
+                    image_update[p] = 0
+                for d in range(size):
+                    ray = a * size + d
+                    for k in range(indptr[ray], indptr[ray + 1]):
+                        image_update[indices[k]] += deviation[d] * update[k]
+
+                for p in range(n_pixels):
+                    value = volume[s, p] + relaxation * image_update[p]
+                    if clip:
+                        if value < clip_low:
+                            value = clip_low
+                        elif value > clip_high:
+                            value = clip_high
+                    volume[s, p] = value
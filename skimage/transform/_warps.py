@@ -3,10 +3,95 @@ from scipy import ndimage
 
 from skimage.transform._geometric import (warp, SimilarityTransform,
                                           AffineTransform)
+from skimage.transform._warps_cy import _resize_taps, _resample_axis
 from skimage.measure import block_reduce
+from skimage.util import img_as_float
+from skimage._shared.utils import run_in_bands
 
 
-def resize(image, output_shape, order=1, mode='constant', cval=0.):
+def _integer_factor(in_size, out_size):
+    """Return the integer up- (> 0) or downscale (< 0) factor, or 0."""
+    if out_size >= in_size and out_size % in_size == 0:
+        return out_size // in_size
+    if in_size % out_size == 0:
+        return -(in_size // out_size)
+    return 0
+
+
+def _resize_axis(image, axis, size, order, mode, cval, anti_aliasing,
+                 n_jobs):
+    """Resample one axis of an image with precomputed kernel tables.
+
+    Integer scale factors use exact shortcuts where the result of the
+    kernel is known: the identity, pixel repetition and subsampling for
+    nearest neighbor interpolation and block means for anti-aliased
+    nearest neighbor downscaling.
+
+    """
+    in_size = image.shape[axis]
+    factor = _integer_factor(in_size, size)
+
+    if factor == 1 and order < 2:
+        return image
+    if order == 0 and factor > 1:
+        return np.ascontiguousarray(np.repeat(image, factor, axis=axis))
+    if order == 0 and factor < -1:
+        factor = -factor
+        if anti_aliasing:
+            blocks = image.reshape(image.shape[:axis] + (size, factor)
+                                   + image.shape[axis + 1:])
+            return blocks.mean(axis=axis + 1).astype(image.dtype)
+        index = [slice(None)] * image.ndim
+        index[axis] = slice(factor // 2, None, factor)
+        return np.ascontiguousarray(image[tuple(index)])
+
+    outer = int(np.prod(image.shape[:axis]))
+    inner = int(np.prod(image.shape[axis + 1:]))
+    out_shape = image.shape[:axis] + (size,) + image.shape[axis + 1:]
+    out = np.empty(out_shape, dtype=image.dtype)
+
+    indices, weights = _resize_taps(in_size, size, order, mode, anti_aliasing)
+    image3d = image.reshape(outer, in_size, inner)
+    out3d = out.reshape(outer, size, inner)
+    run_in_bands(lambda start, stop: _resample_axis(image3d, indices, weights,
+                                                    out3d, cval, start, stop),
+                 size, n_jobs)
+    return out
+
+
+def _resize_separable(image, output_shape, order, mode, cval, anti_aliasing,
+                      n_jobs):
+    """Resize each axis in turn, see `resize`.
+
+    The columns are resampled before the rows, which reproduces the order
+    of operations of the interpolation in `warp`.
+
+    """
+    if image.dtype != np.float32:
+        image = img_as_float(image)
+    image = np.ascontiguousarray(image)
+    if image.size == 0 or 0 in output_shape:
+        return np.zeros(output_shape, dtype=image.dtype)
+
+    # channels are only interpolated if their number changes
+    axes = [1, 0]
+    if image.ndim == 3 and output_shape[2] != image.shape[2]:
+        axes.append(2)
+
+    cval = float(cval) if mode == 'constant' else 0.
+    for axis in axes:
+        image = _resize_axis(image, axis, output_shape[axis], order, mode,
+                             cval, anti_aliasing, n_jobs)
+
+    # same post-processing as in `warp`
+    clipped = np.clip(image, 0, 1)
+    if mode == 'constant' and not (0 <= cval <= 1):
+        clipped[image == cval] = cval
+    return clipped
+
+
+def resize(image, output_shape, order=1, mode='constant', cval=0.,
+           anti_aliasing=False, n_jobs=1):
     """Resize image to match a certain size.
 
     Performs interpolation to up-size or down-size images. For down-sampling
@@ -40,6 +125,26 @@ def resize(image, output_shape, order=1, mode='constant', cval=0.):
     cval : float, optional
         Used in conjunction with mode 'constant', the value outside
         the image boundaries.
+    anti_aliasing : bool, optional
+        Whether to low-pass filter axes which are downscaled, by stretching
+        the interpolation kernel to the scale factor: a box for `order` 0
+        and a triangle otherwise. The filter only averages values inside
+        the image. Only used for orders 0-3.
+    n_jobs : int, optional
+        Number of threads used by the separable resampler (see Notes).
+        Values smaller than 1 select all available CPU cores.
+
+    Notes
+    -----
+    For orders 0 and 1, and for orders 2 and 3 with `anti_aliasing`, the
+    image is resampled axis by axis using tables of interpolation weights
+    which are precomputed per output row, column and channel. The
+    interpolation equals the one of `warp`. Integer scale factors take
+    exact shortcuts where possible.
+
+    Float32 images are not converted to double precision; the resized
+    image is float32 as well, while the interpolation itself is computed in
+    double precision.
 
     Examples
     --------
@@ -51,9 +156,22 @@ def resize(image, output_shape, order=1, mode='constant', cval=0.):
 
     """
 
-    rows, cols = output_shape[0], output_shape[1]
+    rows, cols = int(output_shape[0]), int(output_shape[1])
     orig_rows, orig_cols = image.shape[0], image.shape[1]
 
+    # The quadratic and cubic interpolation of `warp` is discontinuous at
+    # integer source coordinates, so these orders keep using the general
+    # transformation unless anti-aliasing is requested.
+    if order < 2 or (anti_aliasing and order < 4):
+        if len(output_shape) == 3:
+            if image.ndim == 2:
+                image = image[..., np.newaxis]
+            output_shape = (rows, cols, int(output_shape[2]))
+        else:
+            output_shape = (rows, cols) + image.shape[2:]
+        return _resize_separable(image, output_shape, order, mode, cval,
+                                 anti_aliasing, n_jobs)
+
     row_scale = float(orig_rows) / rows
     col_scale = float(orig_cols) / cols
 
@@ -92,7 +210,8 @@ def resize(image, output_shape, order=1, mode='constant', cval=0.):
     return out
 
 
-def rescale(image, scale, order=1, mode='constant', cval=0.):
+def rescale(image, scale, order=1, mode='constant', cval=0.,
+            anti_aliasing=False, n_jobs=1):
     """Scale image by a certain factor.
 
     Performs interpolation to upscale or down-scale images. For down-sampling
@@ -124,6 +243,10 @@ def rescale(image, scale, order=1, mode='constant', cval=0.):
     cval : float, optional
         Used in conjunction with mode 'constant', the value outside
         the image boundaries.
+    anti_aliasing : bool, optional
+        Whether to low-pass filter when downscaling, see `resize`.
+    n_jobs : int, optional
+        Number of threads, see `resize`.
 
     Examples
     --------
@@ -147,7 +270,8 @@ def rescale(image, scale, order=1, mode='constant', cval=0.):
     cols = np.round(col_scale * orig_cols)
     output_shape = (rows, cols)
 
-    return resize(image, output_shape, order=order, mode=mode, cval=cval)
+    return resize(image, output_shape, order=order, mode=mode, cval=cval,
+                  anti_aliasing=anti_aliasing, n_jobs=n_jobs)
 
 
 def rotate(image, angle, resize=False, order=1, mode='constant', cval=0.):
@@ -5,14 +5,20 @@
 import numpy as np
 
 cimport numpy as cnp
-from skimage._shared.interpolation cimport (nearest_neighbour_interpolation,
-                                            bilinear_interpolation,
-                                            biquadratic_interpolation,
-                                            bicubic_interpolation)
+from libc.math cimport ceil, floor, fabs
+from skimage._shared.interpolation cimport (quadratic_interpolation,
+                                            cubic_interpolation,
+                                            coord_map)
+from skimage._shared.utils import run_in_bands
+
+
+ctypedef fused dtype_t:
+    cnp.float32_t
+    cnp.float64_t
 
 
 cdef inline void _matrix_transform(double x, double y, double* H, double *x_,
-                                   double *y_):
+                                   double *y_) nogil:
     """Apply a homography to a coordinate.
 
     Parameters
@@ -35,8 +41,159 @@ cdef inline void _matrix_transform(double x, double y, double* H, double *x_,
     y_[0] = yy / zz
 
 
+cdef inline Py_ssize_t _round(double x) nogil:
+    return <Py_ssize_t>((x + 0.5) if (x > 0.0) else (x - 0.5))
+
+
+cdef inline Py_ssize_t _offset(Py_ssize_t coord, Py_ssize_t dim,
+                               Py_ssize_t stride, char mode) nogil:
+    """Memory offset of a row or column, or -1 if it is filled with `cval`.
+    """
+    if mode == 'C':
+        if coord < 0 or coord > dim - 1:
+            return -1
+        return coord * stride
+    return coord_map(dim, coord, mode) * stride
+
+
+cdef inline Py_ssize_t _axis_base(double x, int order, double* t) nogil:
+    """Index of the first sample along one axis needed to interpolate at `x`.
+
+    Uses the same sample positions as the interpolation functions of
+    `skimage._shared.interpolation` and stores the position of `x` relative
+    to them, as expected by the respective interpolation formula, in `t`.
+
+    """
+    cdef Py_ssize_t x0
+
+    if order == 0:
+        t[0] = 0
+        return _round(x)
+    elif order == 1:
+        x0 = <Py_ssize_t>floor(x)
+        t[0] = x - x0
+        return x0
+    elif order == 2:
+        x0 = _round(x)
+        if x < 0:
+            x0 -= 1
+        # scale position to range [-1, 1]
+        t[0] = (x - x0) - 1
+        if x == x0:
+            t[0] += 1
+        return x0
+    else:
+        x0 = <Py_ssize_t>x - 1
+        if x < 0:
+            x0 -= 1
+        # scale position to range [0, 1]
+        t[0] = (x - x0) / 3
+        return x0
+
+
+cdef inline void _axis_offsets(Py_ssize_t x0, int order, double t,
+                               Py_ssize_t dim, Py_ssize_t stride, char mode,
+                               Py_ssize_t* offsets) nogil:
+    """Offsets of the samples found by `_axis_base`."""
+    cdef Py_ssize_t k
+
+    if order == 1:
+        offsets[0] = _offset(x0, dim, stride, mode)
+        # the second sample is the ceiling of the position
+        offsets[1] = _offset(x0 + 1 if t > 0 else x0, dim, stride, mode)
+        return
+    for k in range(order + 1):
+        offsets[k] = _offset(x0 + k, dim, stride, mode)
+
+
+cdef inline double _axis_taps(double x, int order, Py_ssize_t dim,
+                              Py_ssize_t stride, char mode,
+                              Py_ssize_t* offsets) nogil:
+    """Offsets of the samples along one axis needed to interpolate at `x`.
+
+    Returns the position of `x` relative to the samples, see `_axis_base`.
+
+    """
+    cdef double t
+    cdef Py_ssize_t x0 = _axis_base(x, order, &t)
+    _axis_offsets(x0, order, t, dim, stride, mode, offsets)
+    return t
+
+
+cdef inline double _sample(dtype_t* image, Py_ssize_t row_offset,
+                           Py_ssize_t col_offset, double cval) nogil:
+    if row_offset < 0 or col_offset < 0:
+        return cval
+    return image[row_offset + col_offset]
+
+
+cdef inline double _interpolate(dtype_t* image, int order,
+                                Py_ssize_t* row_offsets, double tr,
+                                Py_ssize_t* col_offsets, double tc,
+                                double cval) nogil:
+    """Interpolate one channel from the samples found by `_axis_taps`."""
+    cdef double top, bottom
+    cdef double f2c[3], f2r[3]
+    cdef double f3c[4], f3r[4]
+    cdef Py_ssize_t i, j
+
+    if order == 0:
+        return _sample(image, row_offsets[0], col_offsets[0], cval)
+    elif order == 1:
+        top = (1 - tc) * _sample(image, row_offsets[0], col_offsets[0], cval) \
+              + tc * _sample(image, row_offsets[0], col_offsets[1], cval)
+        bottom = (1 - tc) * _sample(image, row_offsets[1], col_offsets[0],
+                                    cval) \
+                 + tc * _sample(image, row_offsets[1], col_offsets[1], cval)
+        return (1 - tr) * top + tr * bottom
+    elif order == 2:
+        for i in range(3):
+            for j in range(3):
+                f2c[j] = _sample(image, row_offsets[i], col_offsets[j], cval)
+            f2r[i] = quadratic_interpolation(tc, f2c)
+        return quadratic_interpolation(tr, f2r)
+    else:
+        for i in range(4):
+            for j in range(4):
+                f3c[j] = _sample(image, row_offsets[i], col_offsets[j], cval)
+            f3r[i] = cubic_interpolation(tc, f3c)
+        return cubic_interpolation(tr, f3r)
+
+
+def _warp_rows(dtype_t[:, :, ::1] image, double[:, ::1] H,
+               dtype_t[:, :, ::1] out, int order, char mode, double cval,
+               Py_ssize_t start, Py_ssize_t stop):
+    """Warp the output rows ``[start, stop)``, see `_warp_fast`.
+
+    The sample positions and interpolation weights of every output pixel are
+    computed once and shared by all of its channels.
+
+    """
+    cdef Py_ssize_t rows = image.shape[0]
+    cdef Py_ssize_t cols = image.shape[1]
+    cdef Py_ssize_t channels = image.shape[2]
+    cdef Py_ssize_t out_c = out.shape[1]
+    cdef Py_ssize_t tfr, tfc, ch
+    cdef double r, c, tr, tc
+    cdef Py_ssize_t row_offsets[4]
+    cdef Py_ssize_t col_offsets[4]
+    cdef dtype_t* img = &image[0, 0, 0]
+
+    with nogil:
+        for tfr in range(start, stop):
+            for tfc in range(out_c):
+                _matrix_transform(tfc, tfr, &H[0, 0], &c, &r)
+                tr = _axis_taps(r, order, rows, cols * channels, mode,
+                                row_offsets)
+                tc = _axis_taps(c, order, cols, channels, mode, col_offsets)
+                for ch in range(channels):
+                    out[tfr, tfc, ch] = <dtype_t>_interpolate(
+                        img + ch, order, row_offsets, tr, col_offsets, tc,
+                        cval)
+
+
 def _warp_fast(cnp.ndarray image, cnp.ndarray H, output_shape=None,
-               int order=1, mode='constant', double cval=0):
+               int order=1, mode='constant', double cval=0, n_jobs=1):
     """Projective transformation (homography).
 
     Perform a projective transformation (homography) of a
@@ -59,8 +216,9 @@ def _warp_fast(cnp.ndarray image, cnp.ndarray H, output_shape=None,
 
     Parameters
     ----------
-    image : 2-D array
-        Input image.
+    image : 2-D or 3-D array
+        Input image. The channels of a 3-D ``(rows, cols, channels)`` image
+        are interpolated together in a single pass.
     H : array of shape ``(3, 3)``
         Transformation matrix H that defines the homography.
     output_shape : tuple (rows, cols), optional
@@ -76,17 +234,35 @@ def _warp_fast(cnp.ndarray image, cnp.ndarray H, output_shape=None,
     cval : string, optional (default 0)
         Used in conjunction with mode 'C' (constant), the value
         outside the image boundaries.
+    n_jobs : int, optional
+        Number of threads, each of which warps a band of output rows. Values
+        smaller than 1 select all available CPU cores.
 
-    """
+    Returns
+    -------
+    out : array
+        Warped image with as many dimensions as `image`, of type float32
+        for float32 images and double otherwise. Only the storage is kept in
+        single precision; the interpolation itself is computed in double
+        precision.
 
-    cdef double[:, ::1] img = np.ascontiguousarray(image, dtype=np.double)
-    cdef double[:, ::1] M = np.ascontiguousarray(H)
+    """
 
+    if image.ndim not in (2, 3):
+        raise ValueError("Input must be a 2-D or 3-D array.")
+    if order not in (0, 1, 2, 3):
+        raise ValueError("Invalid order specified. Please use 0, 1, 2 or 3.")
     if mode not in ('constant', 'wrap', 'reflect', 'nearest'):
         raise ValueError("Invalid mode specified.  Please use "
                          "`constant`, `nearest`, `wrap` or `reflect`.")
     cdef char mode_c = ord(mode[0].upper())
 
+    dtype = np.float32 if image.dtype == np.float32 else np.double
+    img = np.ascontiguousarray(image, dtype=dtype)
+    if img.ndim == 2:
+        img = img[..., np.newaxis]
+    M = np.ascontiguousarray(H, dtype=np.double)
+
     cdef Py_ssize_t out_r, out_c
     if output_shape is None:
         out_r = int(img.shape[0])
@@ -95,28 +271,305 @@ def _warp_fast(cnp.ndarray image, cnp.ndarray H, output_shape=None,
         out_r = int(output_shape[0])
         out_c = int(output_shape[1])
 
-    cdef double[:, ::1] out = np.zeros((out_r, out_c), dtype=np.double)
+    out = np.zeros((out_r, out_c, img.shape[2]), dtype=dtype)
+
+    if img.size:
+        run_in_bands(lambda start, stop: _warp_rows(img, M, out, order,
+                                                    mode_c, cval, start,
+                                                    stop),
+                     out_r, n_jobs)
+
+    if image.ndim == 2:
+        return out[..., 0]
+    return out
 
-    cdef Py_ssize_t tfr, tfc
-    cdef double r, c
-    cdef Py_ssize_t rows = img.shape[0]
-    cdef Py_ssize_t cols = img.shape[1]
 
-    cdef double (*interp_func)(double*, Py_ssize_t, Py_ssize_t, double, double,
-                               char, double)
+cdef inline void _tap_weights(int order, double t, double* w) nogil:
+    """Weights of the samples found by `_axis_taps` for the position `t`.
+
+    These are the coefficients of the interpolation formulas of
+    `skimage._shared.interpolation` written as linear combinations.
+
+    """
     if order == 0:
-        interp_func = nearest_neighbour_interpolation
+        w[0] = 1
     elif order == 1:
-        interp_func = bilinear_interpolation
+        w[0] = 1 - t
+        w[1] = t
     elif order == 2:
-        interp_func = biquadratic_interpolation
-    elif order == 3:
-        interp_func = bicubic_interpolation
+        w[0] = -0.25 * t
+        w[1] = 1
+        w[2] = 0.25 * t
+    else:
+        w[0] = 0.5 * t * (-1 + t * (2 - t))
+        w[1] = 1 + 0.5 * t * t * (-5 + 3 * t)
+        w[2] = 0.5 * t * (1 + t * (4 - 3 * t))
+        w[3] = 0.5 * t * t * (t - 1)
+
+
+def _warp_map_taps(double[:, ::1] coords, int order):
+    """Precompute the interpolation samples along one axis of a warp.
+
+    Parameters
+    ----------
+    coords : (M, N) array of double
+        Source coordinates along the axis for every output pixel.
+    order : {0, 1, 2, 3}
+        Order of interpolation.
+
+    Returns
+    -------
+    base : (M, N) array of int32
+        Source index of the first sample, see `_axis_base`.
+    t : (M, N) array of float32
+        Position relative to the samples from which `_remap_rows` derives
+        the interpolation weights.
+
+    """
+    cdef Py_ssize_t rows = coords.shape[0]
+    cdef Py_ssize_t cols = coords.shape[1]
+    cdef Py_ssize_t r, c
+    cdef double t
+
+    base = np.empty((rows, cols), dtype=np.int32)
+    offset = np.empty((rows, cols), dtype=np.float32)
+    cdef cnp.int32_t[:, ::1] base_view = base
+    cdef cnp.float32_t[:, ::1] offset_view = offset
+
+    with nogil:
+        for r in range(rows):
+            for c in range(cols):
+                base_view[r, c] = _axis_base(coords[r, c], order, &t)
+                offset_view[r, c] = t
+
+    return base, offset
+
+
+def _remap_rows(dtype_t[:, :, ::1] image,
+                cnp.int32_t[:, ::1] row_base, cnp.float32_t[:, ::1] row_t,
+                cnp.int32_t[:, ::1] col_base, cnp.float32_t[:, ::1] col_t,
+                dtype_t[:, :, ::1] out, int order, mode, double cval,
+                Py_ssize_t start, Py_ssize_t stop):
+    """Remap the output rows ``[start, stop)`` with precomputed samples.
+
+    Like `warp`, values are clipped to [0, 1] unless they equal `cval`.
+    Output pixels whose samples all lie outside of the image in constant
+    mode are set to exactly `cval`.
+
+    """
+    cdef char mode_c = ord(mode[0].upper())
+    cdef Py_ssize_t rows = image.shape[0]
+    cdef Py_ssize_t cols = image.shape[1]
+    cdef Py_ssize_t channels = image.shape[2]
+    cdef Py_ssize_t row_stride = cols * channels
+    cdef Py_ssize_t out_c = out.shape[1]
+    cdef Py_ssize_t n_taps = order + 1
+    cdef Py_ssize_t tfr, tfc, ch, i, j, ri, ci, r0, c0
+    cdef bint row_inside, col_inside
+    cdef double value, partial, sample
+    cdef Py_ssize_t row_offsets[4]
+    cdef Py_ssize_t col_offsets[4]
+    cdef double row_weights[4]
+    cdef double col_weights[4]
+    cdef dtype_t* img = &image[0, 0, 0]
+    cdef dtype_t* src
+
+    with nogil:
+        for tfr in range(start, stop):
+            for tfc in range(out_c):
+                r0 = row_base[tfr, tfc]
+                c0 = col_base[tfr, tfc]
+                if (0 <= r0 and r0 + order < rows
+                        and 0 <= c0 and c0 + order < cols):
+                    # all samples lie inside of the image
+                    _tap_weights(order, row_t[tfr, tfc], row_weights)
+                    _tap_weights(order, col_t[tfr, tfc], col_weights)
+                    for ch in range(channels):
+                        src = img + r0 * row_stride + c0 * channels + ch
+                        value = 0
+                        for i in range(n_taps):
+                            partial = 0
+                            for j in range(n_taps):
+                                partial += col_weights[j] * src[j * channels]
+                            value += row_weights[i] * partial
+                            src += row_stride
+                        if value != cval:
+                            if value < 0:
+                                value = 0
+                            elif value > 1:
+                                value = 1
+                        out[tfr, tfc, ch] = <dtype_t>value
+                    continue
+
+                _axis_offsets(row_base[tfr, tfc], order, row_t[tfr, tfc],
+                              rows, row_stride, mode_c, row_offsets)
+                _axis_offsets(col_base[tfr, tfc], order, col_t[tfr, tfc],
+                              cols, channels, mode_c, col_offsets)
+                row_inside = col_inside = False
+                for i in range(n_taps):
+                    row_inside |= row_offsets[i] >= 0
+                    col_inside |= col_offsets[i] >= 0
+                if not (row_inside and col_inside):
+                    for ch in range(channels):
+                        out[tfr, tfc, ch] = <dtype_t>cval
+                    continue
+
+                _tap_weights(order, row_t[tfr, tfc], row_weights)
+                _tap_weights(order, col_t[tfr, tfc], col_weights)
+                for ch in range(channels):
+                    value = 0
+                    for i in range(n_taps):
+                        ri = row_offsets[i]
+                        partial = 0
+                        for j in range(n_taps):
+                            ci = col_offsets[j]
+                            if ri < 0 or ci < 0:
+                                sample = cval
+                            else:
+                                sample = img[ri + ci + ch]
+                            partial += col_weights[j] * sample
+                        value += row_weights[i] * partial
+                    if value != cval:
+                        if value < 0:
+                            value = 0
+                        elif value > 1:
+                            value = 1
+                    out[tfr, tfc, ch] = <dtype_t>value
+
+
+def _resize_taps(Py_ssize_t in_size, Py_ssize_t out_size, int order, mode,
+                 bint anti_aliasing=False):
+    """Precompute the interpolation samples for resizing one axis.
+
+    Output pixel ``k`` is centered at the source position
+    ``scale * (k + 0.5) - 0.5`` with ``scale = in_size / out_size``, i.e.
+    the image corners are aligned as in `resize`. Without anti-aliasing the
+    samples are those of the fast homography path of `warp`. When
+    anti-aliasing a downscaled axis the interpolation kernel is stretched by
+    the scale: a box of width ``scale`` for order 0 and a triangle of
+    half-width ``scale`` otherwise. The stretched kernel only covers the
+    samples inside the image, and its weights are normalized to sum to 1.
+
+    Parameters
+    ----------
+    in_size, out_size : int
+        Size of the axis before and after resizing.
+    order : {0, 1, 2, 3}
+        Order of interpolation.
+    mode : {'constant', 'reflect', 'wrap', 'nearest'}
+        How to handle values outside the image borders.
+    anti_aliasing : bool, optional
+        Stretch the kernel when downscaling.
+
+    Returns
+    -------
+    indices : (out_size, n_taps) array of int32
+        Source indices of the samples, -1 for samples outside of the image
+        in constant mode.
+    weights : (out_size, n_taps) array of double
+        Interpolation weights of the samples.
+
+    """
+    if mode not in ('constant', 'wrap', 'reflect', 'nearest'):
+        raise ValueError("Invalid mode specified.  Please use "
+                         "`constant`, `nearest`, `wrap` or `reflect`.")
+    cdef char mode_c = ord(mode[0].upper())
+
+    cdef double scale = <double>in_size / out_size
+    cdef bint stretch = anti_aliasing and scale > 1
+    cdef double radius = 0
+    cdef Py_ssize_t n_taps = order + 1
+    if stretch:
+        radius = scale / 2 if order == 0 else scale
+        n_taps = <Py_ssize_t>ceil(2 * radius) + 1
+
+    cdef Py_ssize_t k, j, t, n, offset
+    cdef double x, w_j, total
+    cdef Py_ssize_t offsets[4]
+    cdef double w[4]
+
+    indices = np.zeros((out_size, n_taps), dtype=np.int32)
+    weights = np.zeros((out_size, n_taps), dtype=np.double)
+    cdef cnp.int32_t[:, ::1] indices_view = indices
+    cdef double[:, ::1] weights_view = weights
+
+    with nogil:
+        for k in range(out_size):
+            x = scale * (k + 0.5) - 0.5
+
+            if not stretch:
+                _tap_weights(order, _axis_taps(x, order, in_size, 1, mode_c,
+                                               offsets), w)
+                for t in range(n_taps):
+                    indices_view[k, t] = offsets[t]
+                    weights_view[k, t] = w[t]
+                continue
+
+            n = 0
+            total = 0
+            for j in range(<Py_ssize_t>ceil(x - radius),
+                           <Py_ssize_t>floor(x + radius) + 1):
+                if order == 0:
+                    if j >= x + radius:
+                        continue
+                    w_j = 1
+                else:
+                    w_j = 1 - fabs(j - x) / radius
+                    if w_j <= 0:
+                        continue
+                # the smoothing kernel is cut off at the image borders
+                # instead of averaging in `cval`
+                offset = _offset(j, in_size, 1, mode_c)
+                if offset < 0:
+                    continue
+                indices_view[k, n] = offset
+                weights_view[k, n] = w_j
+                total += w_j
+                n += 1
+            for t in range(n):
+                weights_view[k, t] /= total
+
+    return indices, weights
+
+
+def _resample_axis(dtype_t[:, :, ::1] image, cnp.int32_t[:, ::1] indices,
+                   double[:, ::1] weights, dtype_t[:, :, ::1] out,
+                   double cval, Py_ssize_t start, Py_ssize_t stop):
+    """Resample the middle axis of `image` into ``out[:, start:stop]``.
+
+    ``out[o, k, i]`` is the sum of ``weights[k, t] * image[o, j, i]`` over
+    the samples ``j = indices[k, t]``, where negative indices stand for
+    `cval`. The innermost axis is processed as contiguous runs, so for
+    resampling the rows of an image all columns are updated at once.
+
+    """
+    cdef Py_ssize_t outer = image.shape[0]
+    cdef Py_ssize_t inner = image.shape[2]
+    cdef Py_ssize_t n_taps = indices.shape[1]
+    cdef Py_ssize_t o, k, t, i, j
+    cdef double w
+    cdef dtype_t* src
+
+    accumulator = np.empty(inner, dtype=np.double)
+    cdef double[::1] acc = accumulator
 
-    for tfr in range(out_r):
-        for tfc in range(out_c):
-            _matrix_transform(tfc, tfr, &M[0, 0], &c, &r)
-            out[tfr, tfc] = interp_func(&img[0, 0], rows, cols, r, c,
-                                        mode_c, cval)
+    if inner == 0:
+        return
 
-    return np.asarray(out)
+    with nogil:
+        for o in range(outer):
+            for k in range(start, stop):
+                for i in range(inner):
+                    acc[i] = 0
+                for t in range(n_taps):
+                    j = indices[k, t]
+                    w = weights[k, t]
+                    if j < 0:
+                        for i in range(inner):
+                            acc[i] += w * cval
+                    else:
+                        src = &image[o, j, 0]
+                        for i in range(inner):
+                            acc[i] += w * src[i]
+                for i in range(inner):
+                    out[o, k, i] = <dtype_t>acc[i]
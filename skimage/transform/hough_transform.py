@@ -1,6 +1,7 @@
 import numpy as np
 from scipy import ndimage
 from skimage import measure, morphology
+from ._hough_transform import _circle_edge_pixels, _hough_circle_plane
 
 
 def hough_line_peaks(hspace, angles, dists, min_distance=9, min_angle=10,
@@ -125,3 +126,98 @@ def hough_line_peaks(hspace, angles, dists, min_distance=9, min_angle=10,
         angle_peaks = angle_peaks[idx_maxsort]
 
     return hspace_peaks, angle_peaks, dist_peaks
+
+
+def hough_circle_peaks(img, radius, normalize=True, full_output=False,
+                       min_distance=9, threshold=None, num_peaks=np.inf,
+                       dtype=np.double, n_jobs=1):
+    """Return peaks of the circular Hough transform.
+
+    The accumulator of every radius is computed, searched for peaks and
+    discarded before moving on to the next radius, so that memory only
+    scales with the size of the image and not with the number of radii.
+
+    Parameters
+    ----------
+    img : (M, N) ndarray
+        Input image with nonzero values representing edges.
+    radius : ndarray
+        Radii at which to compute the Hough transform.
+    normalize : boolean, optional (default True)
+        Normalize the accumulator with the number of pixels used to draw
+        the radius.
+    full_output : boolean, optional (default False)
+        Also detect centers outside of the image, up to the largest radius
+        away from it.
+    min_distance : int, optional
+        Minimum distance separating the centers of circles of the same
+        radius (maximum filter size is ``2 * min_distance + 1``).
+    threshold : float, optional
+        Minimum intensity of peaks. Default is half the maximum of the
+        accumulator of each radius.
+    num_peaks : int, optional
+        Maximum number of peaks. When the number of peaks exceeds
+        `num_peaks`, return the `num_peaks` most intense ones.
+    dtype : {np.float64, np.float32, np.uint16}, optional
+        Type of the accumulator, see `hough_circle`.
+    n_jobs : int, optional
+        Number of threads used for voting, see `hough_circle`.
+
+    Returns
+    -------
+    accums, rows, cols, radii : tuple of array
+        Peak values in hough space, row and column of the circle centers in
+        image coordinates, and radii, sorted by decreasing peak value.
+
+    Examples
+    --------
+    >>> from skimage.draw import circle_perimeter
+    >>> img = np.zeros((50, 50), dtype=np.uint8)
+    >>> rr, cc = circle_perimeter(20, 25, 10)
+    >>> img[rr, cc] = 1
+    >>> accums, rows, cols, radii = hough_circle_peaks(img, [9, 10, 11],
+    ...                                                num_peaks=1)
+    >>> rows, cols, radii
+    (array([20]), array([25]), array([10]))
+
+    """
+    radius = np.asarray(radius, dtype=np.intp).ravel()
+    x, y, shape, dtype = _circle_edge_pixels(img, radius, full_output, dtype,
+                                             normalize)
+    offset = (shape[0] - img.shape[0]) // 2
+    size = 2 * min_distance + 1
+
+    accums = []
+    rows = []
+    cols = []
+    radii = []
+    for rad in radius:
+        plane = _hough_circle_plane(x, y, rad, shape, normalize, dtype,
+                                    n_jobs)
+        plane_threshold = threshold
+        if plane_threshold is None:
+            plane_threshold = 0.5 * np.max(plane)
+        plane_max = ndimage.maximum_filter(plane, size=size,
+                                           mode='constant', cval=0)
+        peaks = (plane == plane_max) & (plane > plane_threshold)
+        # keep a single position for peaks spread over several pixels
+        label_peaks, num_labels = ndimage.label(peaks)
+        if num_labels == 0:
+            continue
+        positions = ndimage.maximum_position(plane, label_peaks,
+                                             np.arange(1, num_labels + 1))
+        for r, c in positions:
+            accums.append(plane[r, c])
+            rows.append(r - offset)
+            cols.append(c - offset)
+            radii.append(rad)
+
+    accums = np.array(accums, dtype=dtype)
+    rows = np.array(rows, dtype=np.intp)
+    cols = np.array(cols, dtype=np.intp)
+    radii = np.array(radii, dtype=np.intp)
+
+    order = np.argsort(accums, kind='mergesort')[::-1]
+    if num_peaks < len(order):
+        order = order[:num_peaks]
+    return accums[order], rows[order], cols[order], radii[order]
@@ -1,8 +1,28 @@
 import numpy as np
 
+from ._integral import _integrate_boxes, _tilted_sums
 
-def integral_image(x):
-    """Integral image / summed area table.
+
+def _accumulator_dtype(dtype):
+    """Type wide enough to sum many values of `dtype` without overflow."""
+    dtype = np.dtype(dtype)
+    if dtype.kind in 'bi':
+        return np.dtype(np.int64)
+    if dtype.kind == 'u':
+        return np.dtype(np.uint64)
+    return dtype
+
+
+def _kernel_dtype(dtype):
+    """Closest type supported by the compiled kernels."""
+    dtype = _accumulator_dtype(dtype)
+    if dtype.kind in 'iu' or dtype == np.float32:
+        return dtype
+    return np.dtype(np.double)
+
+
+def integral_image(x, dtype=None, squared=False):
+    r"""Integral image / summed area table.
 
     The integral image contains the sum of all elements above and to the
     left of it, i.e.:
@@ -11,23 +31,138 @@ def integral_image(x):
 
        S[m, n] = \sum_{i \leq m} \sum_{j \leq n} X[i, j]
 
+    The same holds for images of any dimension, summing along all axes.
+
     Parameters
     ----------
     x : ndarray
         Input image.
+    dtype : dtype, optional
+        Type of the sums. By default, boolean and integer images are summed
+        as 64-bit integers (unsigned for unsigned images), so that the sums
+        cannot overflow, and floating point images keep their type.
+    squared : bool, optional
+        Sum the squares of the elements, e.g. to compute local variances.
 
     Returns
     -------
     S : ndarray
         Integral image / summed area table.
 
+    See Also
+    --------
+    integrate_batch, tilted_integral_image
+
     References
     ----------
     .. [1] F.C. Crow, "Summed-area tables for texture mapping,"
            ACM SIGGRAPH Computer Graphics, vol. 18, 1984, pp. 207-212.
 
     """
-    return x.cumsum(1).cumsum(0)
+    x = np.asarray(x)
+    if dtype is None:
+        dtype = _accumulator_dtype(x.dtype)
+    if squared:
+        x = x.astype(dtype)
+        x *= x
+    if x.ndim == 0:
+        return x.astype(dtype)
+    # sum along the last axis first, which is contiguous for C-ordered images
+    S = x.cumsum(x.ndim - 1, dtype=dtype)
+    for axis in range(x.ndim - 2, -1, -1):
+        np.cumsum(S, axis=axis, out=S)
+    return S
+
+
+def tilted_integral_image(x, dtype=None):
+    r"""Integral image rotated by 45 degrees.
+
+    Every element contains the sum of the triangle of elements above it
+    whose width grows by one element on each side per row, i.e.:
+
+    .. math::
+
+       T[m, n] = \sum_{i \leq m} \sum_{|j - n| \leq m - i} X[i, j]
+
+    Tilted integral images allow to compute sums over rectangles rotated by
+    45 degrees, e.g. for tilted Haar-like features, with four lookups.
+
+    Parameters
+    ----------
+    x : (M, N) ndarray
+        Input image.
+    dtype : dtype, optional
+        Type of the sums, see `integral_image`.
+
+    Returns
+    -------
+    T : (M, N) ndarray
+        Tilted integral image.
+
+    References
+    ----------
+    .. [1] R. Lienhart and J. Maydt, "An extended set of Haar-like features
+           for rapid object detection," Proceedings of the International
+           Conference on Image Processing, vol. 1, 2002, pp. 900-903.
+
+    """
+    x = np.asarray(x)
+    if x.ndim != 2:
+        raise ValueError('The input image must be 2-D.')
+    if dtype is None:
+        dtype = _accumulator_dtype(x.dtype)
+    dtype = _kernel_dtype(dtype)
+    rows, cols = x.shape
+    # the triangles of the last row reach `rows - 1` columns to each side
+    padded = np.zeros((rows, cols + 2 * rows), dtype=dtype)
+    padded[:, rows:rows + cols] = x
+    T = np.empty_like(padded)
+    _tilted_sums(padded, T)
+    return np.ascontiguousarray(T[:, rows:rows + cols])
+
+
+def integrate_batch(ii, boxes):
+    """Use an integral image to integrate over many windows at once.
+
+    Parameters
+    ----------
+    ii : ndarray
+        Integral image of any dimension, see `integral_image`.
+    boxes : (K, 2 * ii.ndim) array_like of int
+        First and last (inclusive) index of every window along each axis,
+        ``(start_0, ..., start_{n-1}, end_0, ..., end_{n-1})``, e.g.
+        ``(r0, c0, r1, c1)`` for 2-D images. A window with
+        ``end == start - 1`` along an axis is empty.
+
+    Returns
+    -------
+    S : (K,) ndarray
+        Integral (sum) over every window.
+
+    Examples
+    --------
+    >>> x = np.arange(12).reshape(3, 4)
+    >>> ii = integral_image(x)
+    >>> integrate_batch(ii, [[0, 0, 2, 3], [1, 1, 2, 2]])
+    array([66, 30])
+
+    """
+    return _sum_boxes(np.asarray(ii), boxes, False)
+
+
+def _sum_boxes(ii, boxes, wrap):
+    """Sum over boxes, see `integrate_batch` and `_integrate_boxes`."""
+    boxes = np.ascontiguousarray(boxes, dtype=np.intp)
+    if boxes.ndim != 2 or boxes.shape[1] != 2 * ii.ndim:
+        raise ValueError('boxes must have shape (K, %d).' % (2 * ii.ndim))
+
+    sat = np.ascontiguousarray(ii, dtype=_kernel_dtype(ii.dtype))
+    shape = np.array(sat.shape, dtype=np.intp)
+    strides = np.array(sat.strides, dtype=np.intp) // sat.itemsize
+    S = np.empty(boxes.shape[0], dtype=sat.dtype)
+    if _integrate_boxes(sat.ravel(), shape, strides, boxes, S, wrap) >= 0:
+        raise ValueError('boxes must lie within the integral image.')
+    return S
 
 
 def integrate(ii, r0, c0, r1, c1):
@@ -38,33 +173,31 @@ def integrate(ii, r0, c0, r1, c1):
     ii : ndarray
         Integral image.
     r0, c0 : int or ndarray
-        Top-left corner(s) of block to be summed.
+        Top-left corner(s) of block to be summed. Negative values are
+        treated as 0.
     r1, c1 : int or ndarray
-        Bottom-right corner(s) of block to be summed.
+        Bottom-right corner(s) of block to be summed. Negative values count
+        from the end of the image, like negative indices.
 
     Returns
     -------
     S : scalar or ndarray
         Integral (sum) over the given window(s).
 
-    """
-    if np.isscalar(r0):
-        r0, c0, r1, c1 = [np.asarray([x]) for x in (r0, c0, r1, c1)]
-
-    S = np.zeros(r0.shape, ii.dtype)
-
-    S += ii[r1, c1]
-
-    good = (r0 >= 1) & (c0 >= 1)
-    S[good] += ii[r0[good] - 1, c0[good] - 1]
+    See Also
+    --------
+    integrate_batch : Integrate over many n-D windows.
 
-    good = r0 >= 1
-    S[good] -= ii[r0[good] - 1, c1[good]]
-
-    good = c0 >= 1
-    S[good] -= ii[r1[good], c0[good] - 1]
+    """
+    ii = np.asarray(ii)
+    shape = np.shape(r0)
+    if shape == ():
+        boxes = [[r0, c0, r1, c1]]
+    else:
+        boxes = np.column_stack([np.ravel(x) for x in (r0, c0, r1, c1)])
+    S = _sum_boxes(ii, boxes, True)
 
     if S.size == 1:
-        return np.asscalar(S)
+        return S.item()
 
-    return S
+    return S.reshape(shape)
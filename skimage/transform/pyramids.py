@@ -6,18 +6,18 @@ from skimage.util import img_as_float
 
 
 def _smooth(image, sigma, mode, cval):
-    """Return image with each channel smoothed by the Gaussian filter."""
+    """Return image with each channel smoothed by the Gaussian filter.
 
-    smoothed = np.empty(image.shape, dtype=np.double)
+    The result has the floating point type of `image`.
+    """
+
+    smoothed = np.empty(image.shape, dtype=image.dtype)
 
-    if image.ndim == 3: # apply Gaussian filter to all dimensions independently
-        for dim in range(image.shape[2]):
-            ndimage.gaussian_filter(image[..., dim], sigma,
-                                    output=smoothed[..., dim],
-                                    mode=mode, cval=cval)
-    else:
-        ndimage.gaussian_filter(image, sigma, output=smoothed,
-                                mode=mode, cval=cval)
+    # smooth all channels at once, but not across channels
+    if image.ndim == 3:
+        sigma = (sigma, sigma, 0)
+    ndimage.gaussian_filter(image, sigma, output=smoothed, mode=mode,
+                            cval=cval)
 
     return smoothed
 
@@ -135,8 +135,153 @@ def pyramid_expand(image, upscale=2, sigma=None, order=1,
     return out
 
 
+def _as_float(image, dtype):
+    """Convert an image to float64, or float32 if `dtype` is float32."""
+    if np.dtype(dtype) == np.float32:
+        if image.dtype == np.float32:
+            return image
+        return img_as_float(image).astype(np.float32)
+    return img_as_float(image)
+
+
+def _layer_shapes(shape, max_layer, downscale):
+    """Shapes of the layers of a pyramid, see `pyramid_gaussian`."""
+    shapes = [tuple(shape)]
+    while len(shapes) - 1 != max_layer:
+        rows, cols = shapes[-1][:2]
+        next_shape = (int(math.ceil(rows / float(downscale))),
+                      int(math.ceil(cols / float(downscale)))) + shape[2:]
+        # no change to previous pyramid layer
+        if next_shape == shapes[-1]:
+            break
+        shapes.append(next_shape)
+    return shapes
+
+
+def _pyramid_layers(image, shapes, sigma, order, mode, cval, laplacian,
+                    out):
+    """Compute the layers of a Gaussian or Laplacian pyramid.
+
+    Every layer of the Gaussian pyramid is smoothed exactly once. The
+    smoothed layer is both downsampled to the next layer and, for the
+    Laplacian pyramid, subtracted from the layer itself. The smoothing of a
+    Gaussian layer is deferred until the next layer is requested.
+
+    """
+    smoothed = None
+
+    for layer, shape in enumerate(shapes):
+        if layer > 0:
+            image = resize(smoothed, shape[:2], order=order, mode=mode,
+                           cval=cval)
+
+        if out is not None and layer < len(out):
+            layer_out = out[layer]
+        else:
+            layer_out = None
+
+        if laplacian:
+            smoothed = _smooth(image, sigma, mode, cval)
+            yield np.subtract(image, smoothed, out=layer_out)
+            continue
+
+        if layer_out is not None:
+            layer_out[...] = image
+            yield layer_out
+        else:
+            yield image
+        if layer + 1 < len(shapes):
+            smoothed = _smooth(image, sigma, mode, cval)
+
+
+class Pyramid(object):
+    """Gaussian or Laplacian pyramid with random access to its layers.
+
+    Layers are computed on first access, each from the previous one, and
+    stored. See `pyramid_gaussian` and `pyramid_laplacian` for the
+    definition of the layers.
+
+    Parameters
+    ----------
+    image : array
+        Input image.
+    max_layer : int, optional
+        Number of layers for the pyramid. 0th layer is the original image.
+        Default is -1 which builds all possible layers.
+    downscale : float, optional
+        Downscale factor.
+    sigma : float, optional
+        Sigma for Gaussian filter. Default is `2 * downscale / 6.0` which
+        corresponds to a filter mask twice the size of the scale factor that
+        covers more than 99% of the Gaussian distribution.
+    order : int, optional
+        Order of splines used in interpolation of downsampling. See
+        `skimage.transform.warp` for detail.
+    mode : {'reflect', 'constant', 'nearest', 'mirror', 'wrap'}, optional
+        The mode parameter determines how the array borders are handled, where
+        cval is the value when mode is equal to 'constant'.
+    cval : float, optional
+        Value to fill past edges of input if mode is 'constant'.
+    laplacian : bool, optional
+        Build the Laplacian instead of the Gaussian pyramid.
+    dtype : {np.float64, np.float32}, optional
+        Floating point type of the layers.
+    out : sequence of arrays, optional
+        Arrays in which to store the layers, e.g. the layers of a pyramid of
+        a previous image of the same shape. Layers beyond the length of the
+        sequence are newly allocated.
+
+    Attributes
+    ----------
+    shapes : list of tuples
+        Shapes of the layers.
+
+    Examples
+    --------
+    >>> from skimage import data
+    >>> from skimage.transform import Pyramid
+    >>> pyramid = Pyramid(data.camera())
+    >>> len(pyramid)
+    10
+    >>> pyramid[3].shape
+    (64, 64)
+
+    """
+
+    def __init__(self, image, max_layer=-1, downscale=2, sigma=None, order=1,
+                 mode='reflect', cval=0, laplacian=False, dtype=np.double,
+                 out=None):
+        _check_factor(downscale)
+
+        if sigma is None:
+            # automatically determine sigma which covers > 99% of distribution
+            sigma = 2 * downscale / 6.0
+
+        image = _as_float(image, dtype)
+        self.shapes = _layer_shapes(image.shape, max_layer, downscale)
+        self._layers = []
+        self._engine = _pyramid_layers(image, self.shapes, sigma, order, mode,
+                                       cval, laplacian, out)
+
+    def __len__(self):
+        return len(self.shapes)
+
+    def __getitem__(self, layer):
+        if layer < 0:
+            layer += len(self)
+        if not 0 <= layer < len(self):
+            raise IndexError("Layer %d out of range." % layer)
+        while len(self._layers) <= layer:
+            self._layers.append(next(self._engine))
+        return self._layers[layer]
+
+    def __iter__(self):
+        for layer in range(len(self)):
+            yield self[layer]
+
+
 def pyramid_gaussian(image, max_layer=-1, downscale=2, sigma=None, order=1,
-                     mode='reflect', cval=0):
+                     mode='reflect', cval=0, dtype=np.double, out=None):
     """Yield images of the Gaussian pyramid formed by the input image.
 
     Recursively applies the `pyramid_reduce` function to the image, and yields
@@ -168,12 +313,20 @@ def pyramid_gaussian(image, max_layer=-1, downscale=2, sigma=None, order=1,
         cval is the value when mode is equal to 'constant'.
     cval : float, optional
         Value to fill past edges of input if mode is 'constant'.
+    dtype : {np.float64, np.float32}, optional
+        Floating point type of the layers.
+    out : sequence of arrays, optional
+        Arrays in which to store the layers, see `Pyramid`.
 
     Returns
     -------
     pyramid : generator
         Generator yielding pyramid layers as float images.
 
+    See also
+    --------
+    Pyramid : Pyramid with random access to its layers.
+
     References
     ----------
     .. [1] http://web.mit.edu/persci/people/adelson/pub_pdfs/pyramid83.pdf
@@ -182,39 +335,20 @@ def pyramid_gaussian(image, max_layer=-1, downscale=2, sigma=None, order=1,
 
     _check_factor(downscale)
 
-    # cast to float for consistent data type in pyramid
-    image = img_as_float(image)
-
-    layer = 0
-    rows = image.shape[0]
-    cols = image.shape[1]
-
-    prev_layer_image = image
-    yield image
-
-    # build downsampled images until max_layer is reached or downscale process
-    # does not change image size
-    while layer != max_layer:
-        layer += 1
-
-        layer_image = pyramid_reduce(prev_layer_image, downscale, sigma, order,
-                                     mode, cval)
-
-        prev_rows = rows
-        prev_cols = cols
-        prev_layer_image = layer_image
-        rows = layer_image.shape[0]
-        cols = layer_image.shape[1]
+    if sigma is None:
+        # automatically determine sigma which covers > 99% of distribution
+        sigma = 2 * downscale / 6.0
 
-        # no change to previous pyramid layer
-        if prev_rows == rows and prev_cols == cols:
-            break
+    # cast to float for consistent data type in pyramid
+    image = _as_float(image, dtype)
+    shapes = _layer_shapes(image.shape, max_layer, downscale)
 
-        yield layer_image
+    return _pyramid_layers(image, shapes, sigma, order, mode, cval, False,
+                           out)
 
 
 def pyramid_laplacian(image, max_layer=-1, downscale=2, sigma=None, order=1,
-                      mode='reflect', cval=0):
+                      mode='reflect', cval=0, dtype=np.double, out=None):
     """Yield images of the laplacian pyramid formed by the input image.
 
     Each layer contains the difference between the downsampled and the
@@ -249,12 +383,20 @@ def pyramid_laplacian(image, max_layer=-1, downscale=2, sigma=None, order=1,
         cval is the value when mode is equal to 'constant'.
     cval : float, optional
         Value to fill past edges of input if mode is 'constant'.
+    dtype : {np.float64, np.float32}, optional
+        Floating point type of the layers.
+    out : sequence of arrays, optional
+        Arrays in which to store the layers, see `Pyramid`.
 
     Returns
     -------
     pyramid : generator
         Generator yielding pyramid layers as float images.
 
+    See also
+    --------
+    Pyramid : Pyramid with random access to its layers.
+
     References
     ----------
     .. [1] http://web.mit.edu/persci/people/adelson/pub_pdfs/pyramid83.pdf
@@ -264,39 +406,13 @@ def pyramid_laplacian(image, max_layer=-1, downscale=2, sigma=None, order=1,
 
     _check_factor(downscale)
 
-    # cast to float for consistent data type in pyramid
-    image = img_as_float(image)
-
     if sigma is None:
         # automatically determine sigma which covers > 99% of distribution
         sigma = 2 * downscale / 6.0
 
-    layer = 0
-    rows = image.shape[0]
-    cols = image.shape[1]
-
-    smoothed_image = _smooth(image, sigma, mode, cval)
-    yield image - smoothed_image
-
-    # build downsampled images until max_layer is reached or downscale process
-    # does not change image size
-    while layer != max_layer:
-        layer += 1
-
-        out_rows = math.ceil(rows / float(downscale))
-        out_cols = math.ceil(cols / float(downscale))
-
-        resized_image = resize(smoothed_image, (out_rows, out_cols),
-                               order=order, mode=mode, cval=cval)
-        smoothed_image = _smooth(resized_image, sigma, mode, cval)
-
-        prev_rows = rows
-        prev_cols = cols
-        rows = resized_image.shape[0]
-        cols = resized_image.shape[1]
-
-        # no change to previous pyramid layer
-        if prev_rows == rows and prev_cols == cols:
-            break
+    # cast to float for consistent data type in pyramid
+    image = _as_float(image, dtype)
+    shapes = _layer_shapes(image.shape, max_layer, downscale)
 
-        yield resized_image - smoothed_image
+    return _pyramid_layers(image, shapes, sigma, order, mode, cval, True,
+                           out)
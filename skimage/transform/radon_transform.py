@@ -15,17 +15,89 @@ References:
 """
 from __future__ import division
 import numpy as np
-from scipy.fftpack import fft, ifft, fftfreq
+from scipy.fftpack import fft, ifft, fft2, ifft2, fftfreq
 from scipy.interpolate import interp1d
 from ._warps_cy import _warp_fast
-from ._radon_transform import sart_projection_update
+from ._radon_transform import (sart_projection_update, _backproject,
+                               _grid_sample, _grid_spread,
+                               _sart_system_matrix, _sart_volume)
 from .. import util
+from .._shared.utils import run_in_bands
 
 
 __all__ = ["radon", "iradon", "iradon_sart"]
 
 
-def radon(image, theta=None, circle=False):
+# Width (in grid spacings) and oversampling of the Kaiser-Bessel kernel used
+# by the Fourier slice projectors; this keeps the relative interpolation
+# error around 1e-4 (Beatty et al. 2005).
+_GRIDDING_WIDTH = 6
+_GRIDDING_OVERSAMPLING = 2
+_GRIDDING_TABLE_SCALE = 512
+
+
+def _gridding_kernel(width=_GRIDDING_WIDTH,
+                     oversampling=_GRIDDING_OVERSAMPLING,
+                     table_scale=_GRIDDING_TABLE_SCALE):
+    """Lookup table of the Kaiser-Bessel gridding kernel.
+
+    Returns the kernel sampled at ``arange(len(table)) / table_scale`` for
+    distances up to ``width / 2``.
+    """
+    beta = np.pi * np.sqrt((width / oversampling) ** 2
+                           * (oversampling - 0.5) ** 2 - 0.8)
+    u = np.arange(int(table_scale * width / 2) + 1) / table_scale
+    table = np.i0(beta * np.sqrt(np.maximum(1 - (2 * u / width) ** 2, 0)))
+    return table / table[0]
+
+
+def _gridding_apodization(table, offsets, grid_size,
+                          table_scale=_GRIDDING_TABLE_SCALE):
+    """Fourier transform of the gridding kernel at image `offsets`.
+
+    Interpolating an oversampled spectrum with the kernel multiplies the
+    image by this profile (along each axis), so dividing by it undoes the
+    interpolation blur.
+    """
+    u = np.arange(len(table)) / table_scale
+    phase = 2 * np.pi * np.outer(offsets, u) / grid_size
+    return 2 * np.trapz(table * np.cos(phase), u, axis=1)
+
+
+def _radon_fourier(image, theta, n_jobs):
+    """Radon transform of a square image by the Fourier slice theorem.
+
+    The projection at angle ``theta`` is the inverse Fourier transform of
+    the central line of the image spectrum at that angle. The lines are
+    interpolated from the oversampled spectrum with a Kaiser-Bessel kernel.
+    """
+    size = image.shape[0]
+    center = size // 2
+    grid_size = _GRIDDING_OVERSAMPLING * size
+    table = _gridding_kernel()
+
+    apodization = _gridding_apodization(table, np.arange(size) - center,
+                                        grid_size)
+    grid = np.zeros((grid_size, grid_size), dtype=np.complex128)
+    grid[:size, :size] = image / np.outer(apodization, apodization)
+    # move the rotation axis to the origin of the periodic grid
+    grid = np.roll(np.roll(grid, -center, axis=0), -center, axis=1)
+    spectrum = np.ascontiguousarray(fft2(grid), dtype=np.complex128)
+
+    th = np.deg2rad(theta)
+    sin_theta = np.ascontiguousarray(np.sin(th), dtype=np.double)
+    cos_theta = np.ascontiguousarray(np.cos(th), dtype=np.double)
+    lines = np.empty((len(th), grid_size), dtype=np.complex128)
+    run_in_bands(lambda start, stop: _grid_sample(
+        spectrum, sin_theta, cos_theta, table, _GRIDDING_TABLE_SCALE,
+        _GRIDDING_WIDTH, lines, start, stop), len(th), n_jobs)
+
+    projections = np.real(ifft(lines, axis=1))
+    detectors = (np.arange(size) - center) % grid_size
+    return np.ascontiguousarray(projections[:, detectors].T)
+
+
+def radon(image, theta=None, circle=False, method='direct', n_jobs=1):
     """
     Calculates the radon transform of an image given specified
     projection angles.
@@ -41,6 +113,15 @@ def radon(image, theta=None, circle=False):
         Assume image is zero outside the inscribed circle, making the
         width of each projection (the first dimension of the sinogram)
         equal to ``min(image.shape)``.
+    method : {'direct', 'fourier'}, optional
+        'direct' rotates the image for every angle and sums it along the
+        columns. 'fourier' samples the central lines of the image spectrum
+        (Fourier slice theorem), which is much faster for many angles. The
+        two methods interpolate differently, so their projections differ
+        slightly, mostly at sharp edges.
+    n_jobs : int, optional
+        Number of threads used by the 'fourier' method. Values smaller
+        than 1 select all available CPU cores.
 
     Returns
     -------
@@ -57,6 +138,8 @@ def radon(image, theta=None, circle=False):
     """
     if image.ndim != 2:
         raise ValueError('The input image must be 2-D')
+    if method not in ('direct', 'fourier'):
+        raise ValueError("Unknown method: %s" % method)
     if theta is None:
         theta = np.arange(180)
 
@@ -91,6 +174,8 @@ def radon(image, theta=None, circle=False):
                                 constant_values=0)
     # padded_image is always square
     assert padded_image.shape[0] == padded_image.shape[1]
+    if method == 'fourier':
+        return _radon_fourier(padded_image, np.asarray(theta), n_jobs)
     radon_image = np.zeros((padded_image.shape[0], len(theta)))
     center = padded_image.shape[0] // 2
 
@@ -115,17 +200,67 @@ def radon(image, theta=None, circle=False):
 
 
 def _sinogram_circle_to_square(sinogram):
-    diagonal = int(np.ceil(np.sqrt(2) * sinogram.shape[0]))
-    pad = diagonal - sinogram.shape[0]
-    old_center = sinogram.shape[0] // 2
+    diagonal = int(np.ceil(np.sqrt(2) * sinogram.shape[-2]))
+    pad = diagonal - sinogram.shape[-2]
+    old_center = sinogram.shape[-2] // 2
     new_center = diagonal // 2
     pad_before = new_center - old_center
-    pad_width = ((pad_before, pad - pad_before), (0, 0))
+    pad_width = [(0, 0)] * sinogram.ndim
+    pad_width[-2] = (pad_before, pad - pad_before)
     return util.pad(sinogram, pad_width, mode='constant', constant_values=0)
 
 
+def _get_fourier_filter(size, filter):
+    """Frequency response of the reconstruction filter, shape (size, 1)."""
+    f = fftfreq(size).reshape(-1, 1)     # digital frequency
+    omega = 2 * np.pi * f                # angular frequency
+    fourier_filter = 2 * np.abs(f)       # ramp filter
+    if filter == "ramp":
+        pass
+    elif filter == "shepp-logan":
+        # Start from first element to avoid divide by zero
+        fourier_filter[1:] = fourier_filter[1:] * np.sin(omega[1:]) / omega[1:]
+    elif filter == "cosine":
+        fourier_filter *= np.cos(omega)
+    elif filter == "hamming":
+        fourier_filter *= (0.54 + 0.46 * np.cos(omega / 2))
+    elif filter == "hann":
+        fourier_filter *= (1 + np.cos(omega / 2)) / 2
+    elif filter is None:
+        fourier_filter[:] = 1
+    else:
+        raise ValueError("Unknown filter: %s" % filter)
+    return fourier_filter
+
+
+def _iradon_fourier(spectra, theta, output_size):
+    """Back project filtered projection spectra by Fourier gridding.
+
+    The spectra, of shape (detectors, angles) and with the rotation axis at
+    the origin, are spread onto a Cartesian grid with a Kaiser-Bessel
+    kernel; the inverse 2-D Fourier transform of the grid is the sum of the
+    back projections, apart from the kernel apodization.
+    """
+    grid_size = spectra.shape[0]
+    table = _gridding_kernel()
+    sin_theta = np.ascontiguousarray(np.sin(theta), dtype=np.double)
+    cos_theta = np.ascontiguousarray(np.cos(theta), dtype=np.double)
+
+    grid = np.zeros((grid_size, grid_size), dtype=np.complex128)
+    _grid_spread(np.ascontiguousarray(spectra.T, dtype=np.complex128),
+                 sin_theta, cos_theta, table, _GRIDDING_TABLE_SCALE,
+                 _GRIDDING_WIDTH, grid)
+
+    offsets = np.arange(output_size) - output_size // 2
+    apodization = _gridding_apodization(table, offsets, grid_size)
+    pixels = offsets % grid_size
+    reconstructed = np.real(ifft2(grid))[np.ix_(pixels, pixels)]
+    return reconstructed * grid_size / np.outer(apodization, apodization)
+
+
 def iradon(radon_image, theta=None, output_size=None,
-           filter="ramp", interpolation="linear", circle=False):
+           filter="ramp", interpolation="linear", circle=False,
+           method='direct', n_jobs=1):
     """
     Inverse radon transform.
 
@@ -139,7 +274,8 @@ def iradon(radon_image, theta=None, output_size=None,
         the image corresponds to a projection along a different angle. The
         tomography rotation axis should lie at the pixel index
         ``radon_image.shape[0] // 2`` along the 0th dimension of
-        ``radon_image``.
+        ``radon_image``. A stack of sinograms of shape (S, N, M) is
+        reconstructed slice by slice.
     theta : array_like, dtype=float, optional
         Reconstruction angles (in degrees). Default: m angles evenly spaced
         between 0 and 180 (if the shape of `radon_image` is (N, M)).
@@ -151,18 +287,29 @@ def iradon(radon_image, theta=None, output_size=None,
         Assign None to use no filter.
     interpolation : str, optional (default 'linear')
         Interpolation method used in reconstruction. Methods available:
-        'linear', 'nearest', and 'cubic' ('cubic' is slow).
+        'linear', 'nearest', and 'cubic' ('cubic' is slow). Ignored by the
+        'fourier' method.
     circle : boolean, optional
         Assume the reconstructed image is zero outside the inscribed circle.
         Also changes the default output_size to match the behaviour of
         ``radon`` called with ``circle=True``.
+    method : {'direct', 'fourier'}, optional
+        'direct' back projects the filtered projections in image space.
+        'fourier' spreads their spectra onto a Cartesian grid (Fourier
+        slice theorem) and needs a single inverse 2-D FFT per slice, which
+        is faster for large images and many angles.
+    n_jobs : int, optional
+        Number of threads used by the 'direct' method with 'linear' or
+        'nearest' interpolation. Values smaller than 1 select all available
+        CPU cores.
 
     Returns
     -------
     reconstructed : ndarray
-        Reconstructed image. The rotation axis will be located in the pixel
-        with indices
-        ``(reconstructed.shape[0] // 2, reconstructed.shape[1] // 2)``.
+        Reconstructed image, or stack of shape (S, output_size, output_size)
+        for a stack of sinograms. The rotation axis will be located in the
+        pixel with indices
+        ``(reconstructed.shape[-2] // 2, reconstructed.shape[-1] // 2)``.
 
     Notes
     -----
@@ -170,89 +317,114 @@ def iradon(radon_image, theta=None, output_size=None,
     multiplying the frequency domain of the filter with the FFT of the
     projection data. This algorithm is called filtered back projection.
 
+    The 'direct' method computes the detector positions and interpolation
+    weights of every angle once for all slices of a stack.
+
     """
-    if radon_image.ndim != 2:
-        raise ValueError('The input image must be 2-D')
+    radon_image = np.asarray(radon_image)
+    if radon_image.ndim not in (2, 3):
+        raise ValueError('The input image must be 2-D or 3-D')
+    is_stack = radon_image.ndim == 3
+    if not is_stack:
+        radon_image = radon_image[np.newaxis]
     if theta is None:
-        m, n = radon_image.shape
+        m, n = radon_image.shape[1:]
         theta = np.linspace(0, 180, n, endpoint=False)
     else:
         theta = np.asarray(theta)
-    if len(theta) != radon_image.shape[1]:
+    if len(theta) != radon_image.shape[2]:
         raise ValueError("The given ``theta`` does not match the number of "
                          "projections in ``radon_image``.")
     interpolation_types = ('linear', 'nearest', 'cubic')
     if not interpolation in interpolation_types:
         raise ValueError("Unknown interpolation: %s" % interpolation)
+    if method not in ('direct', 'fourier'):
+        raise ValueError("Unknown method: %s" % method)
     if not output_size:
         # If output size not specified, estimate from input radon image
         if circle:
-            output_size = radon_image.shape[0]
+            output_size = radon_image.shape[1]
         else:
-            output_size = int(np.floor(np.sqrt((radon_image.shape[0])**2
+            output_size = int(np.floor(np.sqrt((radon_image.shape[1])**2
                                                / 2.0)))
+    output_size = int(output_size)
     if circle:
         radon_image = _sinogram_circle_to_square(radon_image)
 
+    n_slices, n_detectors = radon_image.shape[:2]
     th = (np.pi / 180.0) * theta
     # resize image to next power of two (but no less than 64) for
     # Fourier analysis; speeds up Fourier and lessens artifacts
     projection_size_padded = \
-        max(64, int(2**np.ceil(np.log2(2 * radon_image.shape[0]))))
-    pad_width = ((0, projection_size_padded - radon_image.shape[0]), (0, 0))
+        max(64, int(2**np.ceil(np.log2(2 * n_detectors))))
+    pad_width = ((0, 0), (0, projection_size_padded - n_detectors), (0, 0))
     img = util.pad(radon_image, pad_width, mode='constant', constant_values=0)
-
-    # Construct the Fourier filter
-    f = fftfreq(projection_size_padded).reshape(-1, 1)   # digital frequency
-    omega = 2 * np.pi * f                                # angular frequency
-    fourier_filter = 2 * np.abs(f)                       # ramp filter
-    if filter == "ramp":
-        pass
-    elif filter == "shepp-logan":
-        # Start from first element to avoid divide by zero
-        fourier_filter[1:] = fourier_filter[1:] * np.sin(omega[1:]) / omega[1:]
-    elif filter == "cosine":
-        fourier_filter *= np.cos(omega)
-    elif filter == "hamming":
-        fourier_filter *= (0.54 + 0.46 * np.cos(omega / 2))
-    elif filter == "hann":
-        fourier_filter *= (1 + np.cos(omega / 2)) / 2
-    elif filter is None:
-        fourier_filter[:] = 1
+    fourier_filter = _get_fourier_filter(projection_size_padded, filter)
+    # Determine the center of the projections (= center of sinogram)
+    mid_index = n_detectors // 2
+
+    if method == 'fourier':
+        # Apply filter in Fourier domain, to projections centered at the
+        # origin, and spread every slice onto the Fourier grid
+        img = np.roll(img, -mid_index, axis=1)
+        projection = fft(img, axis=1) * fourier_filter
+        reconstructed = np.empty((n_slices, output_size, output_size))
+        for s in range(n_slices):
+            reconstructed[s] = _iradon_fourier(projection[s], th, output_size)
     else:
-        raise ValueError("Unknown filter: %s" % filter)
-    # Apply filter in Fourier domain
-    projection = fft(img, axis=0) * fourier_filter
-    radon_filtered = np.real(ifft(projection, axis=0))
+        # Apply filter in Fourier domain
+        projection = fft(img, axis=1) * fourier_filter
+        radon_filtered = np.real(ifft(projection, axis=1))
+        # Resize filtered image back to original size
+        radon_filtered = radon_filtered[:, :n_detectors, :]
+        reconstructed = _back_project(radon_filtered, th, output_size,
+                                      interpolation, n_jobs)
+
+    xpr, ypr = np.ogrid[0:output_size, 0:output_size]
+    xpr = xpr - output_size // 2
+    ypr = ypr - output_size // 2
+    if circle:
+        radius = output_size // 2
+        reconstruction_circle = (xpr**2 + ypr**2) <= radius**2
+        reconstructed[:, ~reconstruction_circle] = 0.
 
-    # Resize filtered image back to original size
-    radon_filtered = radon_filtered[:radon_image.shape[0], :]
-    reconstructed = np.zeros((output_size, output_size))
-    # Determine the center of the projections (= center of sinogram)
-    mid_index = radon_image.shape[0] // 2
+    reconstructed *= np.pi / (2 * len(th))
+    if not is_stack:
+        return reconstructed[0]
+    return reconstructed
 
-    [X, Y] = np.mgrid[0:output_size, 0:output_size]
-    xpr = X - int(output_size) // 2
-    ypr = Y - int(output_size) // 2
 
+def _back_project(radon_filtered, th, output_size, interpolation, n_jobs):
+    """Sum the back projections of a stack of filtered sinograms.
+
+    Returns a stack of shape (S, output_size, output_size).
+    """
+    n_slices, n_detectors = radon_filtered.shape[:2]
+    if interpolation != 'cubic':
+        # the kernel wants the slices as innermost axis, so that positions
+        # and weights are computed once for all slices
+        filtered = np.ascontiguousarray(radon_filtered.transpose(2, 1, 0),
+                                        dtype=np.double)
+        out = np.zeros((output_size, output_size, n_slices))
+        sin_theta = np.ascontiguousarray(np.sin(th), dtype=np.double)
+        cos_theta = np.ascontiguousarray(np.cos(th), dtype=np.double)
+        run_in_bands(lambda start, stop: _backproject(
+            filtered, sin_theta, cos_theta, out, interpolation == 'nearest',
+            start, stop), output_size, n_jobs)
+        return np.ascontiguousarray(out.transpose(2, 0, 1))
+
+    reconstructed = np.zeros((n_slices, output_size, output_size))
+    [X, Y] = np.mgrid[0:output_size, 0:output_size]
+    xpr = X - output_size // 2
+    ypr = Y - output_size // 2
+    x = np.arange(n_detectors) - n_detectors // 2
     # Reconstruct image by interpolation
-    for i in range(len(theta)):
+    for i in range(len(th)):
         t = ypr * np.cos(th[i]) - xpr * np.sin(th[i])
-        x = np.arange(radon_filtered.shape[0]) - mid_index
-        if interpolation == 'linear':
-            backprojected = np.interp(t, x, radon_filtered[:, i],
-                                      left=0, right=0)
-        else:
-            interpolant = interp1d(x, radon_filtered[:, i], kind=interpolation,
-                                   bounds_error=False, fill_value=0)
-            backprojected = interpolant(t)
-        reconstructed += backprojected
-    if circle:
-        radius = output_size // 2
-        reconstruction_circle = (xpr**2 + ypr**2) <= radius**2
-        reconstructed[~reconstruction_circle] = 0.
-
-    return reconstructed * np.pi / (2 * len(th))
+        interpolant = interp1d(x, radon_filtered[:, :, i], kind=interpolation,
+                               bounds_error=False, fill_value=0)
+        reconstructed += interpolant(t)
+    return reconstructed
 
 
 def order_angles_golden_ratio(theta):
@@ -314,7 +486,7 @@ def order_angles_golden_ratio(theta):
 
 
 def iradon_sart(radon_image, theta=None, image=None, projection_shifts=None,
-                clip=None, relaxation=0.15):
+                clip=None, relaxation=0.15, n_jobs=1):
     """
     Inverse radon transform
 
@@ -323,19 +495,21 @@ def iradon_sart(radon_image, theta=None, image=None, projection_shifts=None,
 
     Parameters
     ----------
-    radon_image : 2D array, dtype=float
+    radon_image : 2D or 3D array, dtype=float
         Image containing radon transform (sinogram). Each column of
         the image corresponds to a projection along a different angle. The
         tomography rotation axis should lie at the pixel index
         ``radon_image.shape[0] // 2`` along the 0th dimension of
-        ``radon_image``.
+        ``radon_image``. A stack of sinograms of shape (S, N, M), sharing
+        the same angles, is reconstructed slice by slice (see Notes).
     theta : 1D array, dtype=float, optional
         Reconstruction angles (in degrees). Default: m angles evenly spaced
         between 0 and 180 (if the shape of `radon_image` is (N, M)).
-    image : 2D array, dtype=float, optional
+    image : 2D or 3D array, dtype=float, optional
         Image containing an initial reconstruction estimate. Shape of this
-        array should be ``(radon_image.shape[0], radon_image.shape[0])``. The
-        default is an array of zeros.
+        array should be ``(radon_image.shape[0], radon_image.shape[0])``, or
+        ``(S, N, N)`` for a stack of sinograms. The default is an array of
+        zeros.
     projection_shifts : 1D array, dtype=float
         Shift the projections contained in ``radon_image`` (the sinogram) by
         this many pixels before reconstructing the image. The i'th value
@@ -347,13 +521,16 @@ def iradon_sart(radon_image, theta=None, image=None, projection_shifts=None,
         Relaxation parameter for the update step. A higher value can
         improve the convergence rate, but one runs the risk of instabilities.
         Values close to or higher than 1 are not recommended.
+    n_jobs : int, optional
+        Number of threads used to reconstruct a stack of sinograms. Values
+        smaller than 1 select all available CPU cores.
 
     Returns
     -------
     reconstructed : ndarray
-        Reconstructed image. The rotation axis will be located in the pixel
-        with indices
-        ``(reconstructed.shape[0] // 2, reconstructed.shape[1] // 2)``.
+        Reconstructed image, or stack of images. The rotation axis will be
+        located in the pixel with indices
+        ``(reconstructed.shape[-2] // 2, reconstructed.shape[-1] // 2)``.
 
     Notes
     -----
@@ -370,6 +547,11 @@ def iradon_sart(radon_image, theta=None, image=None, projection_shifts=None,
     reconstruction. Further iterations will tend to enhance high-frequency
     information, but will also often increase the noise.
 
+    For a stack of sinograms the weights of all rays are computed once, as a
+    sparse system matrix, and shared by the updates of all slices. The
+    matrix holds about ``2 * N`` weights per ray, i.e. its memory footprint
+    is roughly ``40 * N**2 * M`` bytes.
+
     References
     ----------
     .. [1] AC Kak, M Slaney, "Principles of Computerized Tomographic
@@ -386,15 +568,16 @@ def iradon_sart(radon_image, theta=None, image=None, projection_shifts=None,
     .. [5] Kaczmarz' method, Wikipedia,
            http://en.wikipedia.org/wiki/Kaczmarz_method
     """
-    if radon_image.ndim != 2:
-        raise ValueError('radon_image must be two dimensional')
-    reconstructed_shape = (radon_image.shape[0], radon_image.shape[0])
+    if radon_image.ndim not in (2, 3):
+        raise ValueError('radon_image must be two or three dimensional')
+    n_detectors, n_angles = radon_image.shape[-2:]
+    reconstructed_shape = radon_image.shape[:-2] + (n_detectors, n_detectors)
     if theta is None:
-        theta = np.linspace(0, 180, radon_image.shape[1], endpoint=False)
-    elif theta.shape != (radon_image.shape[1],):
+        theta = np.linspace(0, 180, n_angles, endpoint=False)
+    elif theta.shape != (n_angles,):
         raise ValueError('Shape of theta (%s) does not match the '
                          'number of projections (%d)'
-                         % (projection_shifts.shape, radon_image.shape[1]))
+                         % (theta.shape, n_angles))
     if image is None:
         image = np.zeros(reconstructed_shape, dtype=np.float)
     elif image.shape != reconstructed_shape:
@@ -402,17 +585,22 @@ def iradon_sart(radon_image, theta=None, image=None, projection_shifts=None,
                          'of radon_image (%s)'
                          % (image.shape, reconstructed_shape))
     if projection_shifts is None:
-        projection_shifts = np.zeros((radon_image.shape[1],), dtype=np.float)
-    elif projection_shifts.shape != (radon_image.shape[1],):
+        projection_shifts = np.zeros((n_angles,), dtype=np.float)
+    elif projection_shifts.shape != (n_angles,):
         raise ValueError('Shape of projection_shifts (%s) does not match the '
                          'number of projections (%d)'
-                         % (projection_shifts.shape, radon_image.shape[1]))
+                         % (projection_shifts.shape, n_angles))
     if not clip is None:
         if len(clip) != 2:
             raise ValueError('clip must be a length-2 sequence')
         clip = (float(clip[0]), float(clip[1]))
     relaxation = float(relaxation)
 
+    if radon_image.ndim == 3:
+        return _iradon_sart_volume(radon_image, theta, image,
+                                   projection_shifts, clip, relaxation,
+                                   n_jobs)
+
     for angle_index in order_angles_golden_ratio(theta):
         image_update = sart_projection_update(image, theta[angle_index],
                                               radon_image[:, angle_index],
@@ -421,3 +609,26 @@ def iradon_sart(radon_image, theta=None, image=None, projection_shifts=None,
         if not clip is None:
             image = np.clip(image, clip[0], clip[1])
     return image
+
+
+def _iradon_sart_volume(radon_image, theta, image, projection_shifts, clip,
+                        relaxation, n_jobs):
+    """SART iteration for a (S, N, M) stack of sinograms, see `iradon_sart`.
+    """
+    n_slices, size = radon_image.shape[:2]
+    indptr, indices, forward, update, weight_norm = _sart_system_matrix(
+        size, np.ascontiguousarray(theta, dtype=np.double),
+        np.ascontiguousarray(projection_shifts, dtype=np.double))
+    order = np.array(list(order_angles_golden_ratio(theta)), dtype=np.intp)
+    sinograms = np.asarray(radon_image, dtype=np.double)
+    volume = np.array(image, dtype=np.double, order='C')
+    volume = volume.reshape(n_slices, size * size)
+    if clip is None:
+        clip_low, clip_high = 0., 0.
+    else:
+        clip_low, clip_high = clip
+    run_in_bands(lambda start, stop: _sart_volume(
+        indptr, indices, forward, update, weight_norm, sinograms, order,
+        volume, relaxation, clip is not None, clip_low, clip_high,
+        start, stop), n_slices, n_jobs)
+    return volume.reshape(n_slices, size, size)
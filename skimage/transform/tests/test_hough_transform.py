@@ -1,5 +1,5 @@
 import numpy as np
-from numpy.testing import assert_almost_equal, assert_equal
+from numpy.testing import assert_almost_equal, assert_equal, assert_raises
 
 import skimage.transform as tf
 from skimage.draw import line, circle_perimeter, ellipse_perimeter
@@ -30,6 +30,12 @@ def test_hough_line():
     assert_almost_equal(theta, 1.41, 1)
 
 
+def test_hough_line_n_jobs():
+    img = np.random.RandomState(0).rand(60, 80) > 0.9
+    out = tf.hough_line(img)[0]
+    assert_equal(tf.hough_line(img, n_jobs=3)[0], out)
+
+
 def test_hough_line_angles():
     img = np.zeros((10, 10))
     img[0, 0] = 1
@@ -153,6 +159,58 @@ def test_hough_circle_extended():
     assert_equal(y[0], y_0 + radius)
 
 
+def test_hough_circle_dtype():
+    img = np.zeros((60, 70), dtype=int)
+    y, x = circle_perimeter(30, 35, 12)
+    img[y, x] = 1
+    img[::7, ::5] = 1
+    radii = np.array([10, 12, 14], dtype=np.intp)
+
+    expected = tf.hough_circle(img, radii)
+    assert_almost_equal(tf.hough_circle(img, radii, n_jobs=3), expected)
+    out = tf.hough_circle(img, radii, dtype=np.float32)
+    assert_equal(out.dtype, np.float32)
+    assert_almost_equal(out, expected, 6)
+
+    counts = tf.hough_circle(img, radii, normalize=False)
+    out = tf.hough_circle(img, radii, normalize=False, dtype=np.uint16,
+                          n_jobs=2)
+    assert_equal(out.dtype, np.uint16)
+    assert_equal(out, counts)
+
+    assert_raises(ValueError, tf.hough_circle, img, radii, dtype=np.uint16)
+    assert_raises(ValueError, tf.hough_circle, img, radii, dtype=np.int8)
+
+
+def test_hough_circle_peaks():
+    img = np.zeros((120, 100), dtype=int)
+    y, x = circle_perimeter(40, 30, 15)
+    img[y, x] = 1
+    y, x = circle_perimeter(80, 60, 25)
+    img[y, x] = 1
+    radii = np.arange(10, 30, dtype=np.intp)
+
+    accums, rows, cols, r = tf.hough_circle_peaks(img, radii, num_peaks=2)
+    assert_equal(sorted(zip(rows, cols, r)), [(40, 30, 15), (80, 60, 25)])
+    assert np.all(accums[:-1] >= accums[1:])
+
+    # the peaks match those of the full accumulator
+    hspace = tf.hough_circle(img, radii)
+    for accum, row, col, radius in zip(accums, rows, cols, r):
+        assert_almost_equal(hspace[radius - 10, row, col], accum)
+
+
+def test_hough_circle_peaks_extended():
+    img = np.zeros((100, 100), dtype=int)
+    y, x = circle_perimeter(-5, 50, 20)
+    inside = y >= 0
+    img[y[inside], x[inside]] = 1
+
+    accums, rows, cols, r = tf.hough_circle_peaks(
+        img, [20], full_output=True, num_peaks=1, dtype=np.float32, n_jobs=2)
+    assert_equal((rows[0], cols[0], r[0]), (-5, 50, 20))
+
+
 def test_hough_ellipse_zero_angle():
     img = np.zeros((25, 25), dtype=int)
     rx = 6
@@ -177,6 +235,37 @@ def test_hough_ellipse_zero_angle():
     assert_equal(cc, cc2)
 
 
+def test_hough_ellipse_max_major_size():
+    img = np.zeros((40, 40), dtype=int)
+    rr, cc = ellipse_perimeter(20, 18, 12, 7, orientation=0.4)
+    img[rr, cc] = 1
+    result = tf.hough_ellipse(img, threshold=6, accuracy=2)
+    pruned = tf.hough_ellipse(img, threshold=6, accuracy=2,
+                              max_major_size=20)
+    assert 0 < len(pruned) < len(result)
+    # pruning only removes candidates, whose vertices are too far apart
+    assert set(pruned.tolist()) <= set(result.tolist())
+    assert np.all(np.minimum(pruned['a'], pruned['b']) <= 10)
+
+
+def test_hough_ellipse_random_samples():
+    img = np.zeros((25, 25), dtype=int)
+    rr, cc = ellipse_perimeter(15, 12, 8, 6)
+    img[rr, cc] = 1
+    result = tf.hough_ellipse(img, threshold=9, num_samples=2000,
+                              random_seed=0)
+    again = tf.hough_ellipse(img, threshold=9, num_samples=2000,
+                             random_seed=0)
+    assert_equal(result, again)
+    assert len(result) > 0
+    best = result[np.argmax(result['accumulator'])]
+    assert_equal((best['yc'], best['xc']), (15, 12))
+    assert_almost_equal(best['a'], 8, decimal=1)
+    assert_almost_equal(best['b'], 6, decimal=1)
+
+    assert_equal(len(tf.hough_ellipse(img, num_samples=0)), 0)
+
+
 def test_hough_ellipse_non_zero_posangle1():
     # ry > rx, angle in [0:pi/2]
     img = np.zeros((30, 24), dtype=int)
@@ -1,7 +1,8 @@
 import numpy as np
-from numpy.testing import assert_equal
+from numpy.testing import assert_equal, assert_almost_equal, assert_raises
 
-from skimage.transform import integral_image, integrate
+from skimage.transform import (integral_image, integrate, integrate_batch,
+                               tilted_integral_image)
 
 x = (np.random.random((50, 50)) * 255).astype(np.uint8)
 s = integral_image(x)
@@ -26,6 +27,16 @@ def test_single():
     assert_equal(x[0, 0], integrate(s, 0, 0, 0, 0))
     assert_equal(x[10, 10], integrate(s, 10, 10, 10, 10))
 
+
+def test_negative_coordinates():
+    # negative ends index from the end, negative starts are clipped to 0
+    assert_equal(x.sum(), integrate(s, 0, 0, -1, -1))
+    assert_equal(x[:49, 10:].sum(), integrate(s, 0, 10, -2, -1))
+    assert_equal(x[:20, :20].sum(), integrate(s, -5, -1, 19, 19))
+    assert_equal(integrate(s, [0, 12], [0, 10], [-1, -27], [-1, 19]),
+                 [x.sum(), x[12:24, 10:20].sum()])
+
+
 def test_vectorized_integrate():
     r0 = np.array([12, 0, 0, 10, 0, 10, 30])
     c0 = np.array([10, 0, 10, 0, 0, 10, 31])
@@ -42,6 +53,61 @@ def test_vectorized_integrate():
     assert_equal(expected, integrate(s, r0, c0, r1, c1))
 
 
+def test_dtype():
+    y = 255 * np.ones((300, 300), dtype=np.uint8)
+    ii = integral_image(y)
+    assert_equal(ii.dtype, np.uint64)
+    assert_equal(ii[-1, -1], 255 * 300 * 300)
+    assert_equal(integral_image(y.astype(np.int8)).dtype, np.int64)
+    assert_equal(integral_image(y.astype(np.float32)).dtype, np.float32)
+    assert_equal(integral_image(y, dtype=np.double).dtype, np.double)
+
+
+def test_squared():
+    ii = integral_image(x, squared=True)
+    assert_equal(ii[-1, -1], np.sum(x.astype(np.int64) ** 2))
+    assert_equal(integrate(ii, 12, 10, 23, 19),
+                 np.sum(x[12:24, 10:20].astype(np.int64) ** 2))
+
+
+def test_nd():
+    np.random.seed(0)
+    y = np.random.randint(0, 100, size=(6, 7, 8))
+    ii = integral_image(y)
+    assert_equal(ii[-1, -1, -1], y.sum())
+    assert_equal(ii[2, 3, 4], y[:3, :4, :5].sum())
+
+
+def test_integrate_batch():
+    np.random.seed(0)
+    y = np.random.random((6, 7, 8))
+    ii = integral_image(y)
+    starts = np.random.randint(0, 6, size=(100, 3))
+    ends = starts + np.random.randint(-1, 3, size=(100, 3))
+    ends = np.minimum(ends, np.array(y.shape) - 1)
+    boxes = np.hstack([starts, ends])
+    expected = [y[s0:e0 + 1, s1:e1 + 1, s2:e2 + 1].sum()
+                for s0, s1, s2, e0, e1, e2 in boxes]
+    assert_almost_equal(integrate_batch(ii, boxes), expected)
+
+    assert_raises(ValueError, integrate_batch, ii, boxes[:, :4])
+    assert_raises(ValueError, integrate_batch, ii, [[0, 0, 0, 6, 0, 0]])
+    assert_raises(ValueError, integrate_batch, ii, [[-1, 0, 0, 2, 2, 2]])
+
+
+def test_tilted():
+    np.random.seed(0)
+    y = np.random.randint(0, 10, size=(9, 12))
+    T = tilted_integral_image(y)
+    assert_equal(T.dtype, np.int64)
+    rows, cols = np.mgrid[:9, :12]
+    for r in range(9):
+        for c in range(12):
+            mask = (rows <= r) & (np.abs(cols - c) <= r - rows)
+            assert_equal(T[r, c], y[mask].sum())
+    assert_raises(ValueError, tilted_integral_image, np.zeros((2, 2, 2)))
+
+
 if __name__ == '__main__':
     from numpy.testing import run_module_suite
     run_module_suite()
@@ -1,4 +1,6 @@
-from numpy.testing import assert_array_equal, assert_raises, run_module_suite
+import numpy as np
+from numpy.testing import (assert_array_equal, assert_array_almost_equal,
+                           assert_raises, run_module_suite)
 from skimage import data
 from skimage.transform import pyramids
 
@@ -63,6 +65,43 @@ def test_build_laplacian_pyramid_gray():
         assert_array_equal(out.shape, layer_shape)
 
 
+def test_pyramid_random_access():
+    pyramid = pyramids.Pyramid(image_gray, downscale=2)
+    layers = list(pyramids.pyramid_gaussian(image_gray, downscale=2))
+    assert len(pyramid) == len(layers)
+    assert_array_equal(pyramid[3], layers[3])
+    assert_array_equal(pyramid[-1], layers[-1])
+    assert_array_equal(pyramid[1], layers[1])
+    assert_raises(IndexError, pyramid.__getitem__, len(layers))
+
+
+def test_laplacian_pyramid_object():
+    pyramid = pyramids.Pyramid(image, max_layer=3, laplacian=True)
+    layers = list(pyramids.pyramid_laplacian(image, max_layer=3))
+    assert len(pyramid) == 4
+    for layer, out in zip(pyramid, layers):
+        assert_array_equal(layer, out)
+
+
+def test_pyramid_float32():
+    layers = list(pyramids.pyramid_laplacian(image_gray, max_layer=3))
+    layers32 = list(pyramids.pyramid_laplacian(image_gray, max_layer=3,
+                                               dtype=np.float32))
+    for layer, layer32 in zip(layers, layers32):
+        assert layer32.dtype == np.float32
+        assert_array_almost_equal(layer, layer32, decimal=5)
+
+
+def test_pyramid_out():
+    shapes = [layer.shape for layer in
+              pyramids.pyramid_gaussian(image, max_layer=2)]
+    out = [np.empty(shape) for shape in shapes]
+    for layer, buf in zip(pyramids.pyramid_gaussian(image, max_layer=2,
+                                                    out=out), out):
+        assert layer is buf
+    assert_array_equal(out[2], pyramids.Pyramid(image, max_layer=2)[2])
+
+
 def test_check_factor():
     assert_raises(ValueError, pyramids._check_factor, 0.99)
     assert_raises(ValueError, pyramids._check_factor, - 2)
@@ -204,6 +204,46 @@ def test_reconstruct_with_wrong_angles():
     assert_raises(ValueError, iradon, p, theta=[0, 1, 2, 3])
 
 
+def test_radon_fourier():
+    image = _get_phantom()
+    theta = np.linspace(0, 180, 90, endpoint=False)
+    for circle in (False, True):
+        direct = radon(image, theta, circle=circle)
+        fourier = radon(image, theta, circle=circle, method='fourier',
+                        n_jobs=2)
+        assert fourier.shape == direct.shape
+        assert np.allclose(fourier.sum(axis=0), direct.sum(axis=0),
+                           rtol=1e-3)
+        assert np.mean(np.abs(fourier - direct)) < 0.02 * direct.mean()
+    assert_raises(ValueError, radon, image, method='spline')
+
+
+def test_iradon_fourier():
+    image = _get_phantom()
+    sinogram = radon(image)
+    reconstructed = iradon(sinogram, method='fourier')
+    assert reconstructed.shape == image.shape
+    delta = np.mean(np.abs(image - reconstructed))
+    assert delta < 0.03
+    assert_raises(ValueError, iradon, sinogram, method='spline')
+
+
+def test_iradon_stack():
+    image = _get_phantom()
+    theta = np.linspace(0, 180, 60, endpoint=False)
+    sinogram = radon(image, theta, circle=True)
+    stack = np.array([sinogram, 2 * sinogram[::-1]])
+    for interpolation in ('linear', 'nearest'):
+        for method in ('direct', 'fourier'):
+            reconstructed = iradon(stack, theta, circle=True, n_jobs=2,
+                                   interpolation=interpolation, method=method)
+            assert reconstructed.shape == (2,) + image.shape
+            for s in range(2):
+                expected = iradon(stack[s], theta, circle=True,
+                                  interpolation=interpolation, method=method)
+                assert np.allclose(reconstructed[s], expected)
+
+
 def _random_circle(shape):
     # Synthetic random data, zero outside reconstruction circle
     np.random.seed(98312871)
@@ -379,6 +419,30 @@ def test_iradon_sart():
         print('delta (1 iteration, shifted sinogram) =', delta)
         assert delta < 0.018 * error_factor
 
+
+def test_iradon_sart_volume():
+    from skimage.transform import iradon_sart
+
+    image = _random_circle((32, 32))
+    theta = np.linspace(0., 180., 32, endpoint=False)
+    sinogram = radon(image, theta, circle=True)
+    stack = np.array([sinogram, 0.5 * sinogram[::-1]])
+    np.random.seed(1239867)
+    shifts = np.random.uniform(-1, 1, len(theta))
+    for kwargs in ({}, {'clip': (0, 1)}, {'projection_shifts': shifts}):
+        reconstructed = iradon_sart(stack, theta, n_jobs=2, **kwargs)
+        assert reconstructed.shape == (2, 32, 32)
+        for s in range(2):
+            expected = iradon_sart(stack[s], theta, **kwargs)
+            assert np.allclose(reconstructed[s], expected)
+        # second iteration from the first estimate
+        refined = iradon_sart(stack, theta, image=reconstructed, **kwargs)
+        expected = iradon_sart(stack[0], theta, image=reconstructed[0].copy(),
+                               **kwargs)
+        assert np.allclose(refined[0], expected)
+    assert_raises(ValueError, iradon_sart, stack, theta,
+                  image=np.zeros((32, 32)))
+
 if __name__ == "__main__":
     from numpy.testing import run_module_suite
     run_module_suite()
@@ -1,4 +1,5 @@
-from numpy.testing import assert_array_almost_equal, run_module_suite, assert_array_equal
+from numpy.testing import (assert_array_almost_equal, run_module_suite,
+                           assert_array_equal, assert_raises)
 import numpy as np
 from scipy.ndimage import map_coordinates
 
@@ -6,6 +7,8 @@ from skimage.transform import (warp, warp_coords, rotate, resize, rescale,
                                AffineTransform,
                                ProjectiveTransform,
                                SimilarityTransform,
+                               PolynomialTransform,
+                               WarpMap,
                                downscale_local_mean)
 from skimage import transform as tf, data, img_as_float
 from skimage.color import rgb2gray
@@ -100,6 +103,78 @@ def test_fast_homography():
             assert d < 0.001
 
 
+def test_fast_homography_multichannel():
+    np.random.seed(0)
+    img = np.random.rand(30, 40, 3)
+    tform = SimilarityTransform(scale=0.8, rotation=0.3,
+                                translation=(5, -3))
+
+    for order in range(4):
+        for mode in ('constant', 'reflect', 'wrap', 'nearest'):
+            out = warp(img, tform, mode=mode, order=order, n_jobs=3)
+            assert out.shape == img.shape
+            for i in range(img.shape[2]):
+                ref = warp(img[..., i], tform, mode=mode, order=order)
+                assert_array_equal(out[..., i], ref)
+
+
+def test_fast_homography_float32():
+    np.random.seed(0)
+    img = np.random.rand(30, 40, 3)
+    tform = SimilarityTransform(rotation=0.3)
+
+    out = warp(img.astype(np.float32), tform, order=3)
+    assert out.dtype == np.float32
+    assert_array_almost_equal(out, warp(img, tform, order=3), decimal=5)
+
+
+def test_warp_map_homography():
+    np.random.seed(0)
+    img = np.random.rand(30, 40, 3)
+    tform = SimilarityTransform(scale=0.8, rotation=0.3,
+                                translation=(5, -3))
+
+    for order in range(4):
+        for mode in ('constant', 'reflect', 'wrap', 'nearest'):
+            warp_map = WarpMap(tform, img.shape, (35, 25), order=order,
+                               mode=mode, cval=2)
+            ref = warp(img, tform, output_shape=(35, 25), order=order,
+                       mode=mode, cval=2)
+            assert_array_almost_equal(warp_map.apply(img, n_jobs=2), ref)
+            assert_array_almost_equal(warp_map.apply(img[..., 0]),
+                                      ref[..., 0])
+
+
+def test_warp_map_polynomial():
+    x = np.zeros((5, 5), dtype=np.double)
+    x[2, 2] = 1
+    refx = np.zeros((5, 5), dtype=np.double)
+    refx[1, 1] = 1
+
+    # shift by one pixel along both axes
+    tform = PolynomialTransform(np.array([[1, 1, 0], [1, 0, 1]]))
+    warp_map = WarpMap(tform, x.shape)
+    assert_array_almost_equal(warp_map.apply(x), refx)
+
+    out = np.empty((5, 5), dtype=np.float32)
+    assert warp_map.apply(x.astype(np.float32), out=out) is out
+    assert_array_almost_equal(out, refx)
+
+
+def test_warp_map_shape_mismatch():
+    warp_map = WarpMap(SimilarityTransform(), (5, 5))
+    assert_raises(ValueError, warp_map.apply, np.zeros((5, 6)))
+    assert_raises(ValueError, warp_map.apply, np.zeros((5, 5)),
+                  out=np.zeros((6, 5)))
+
+
+def test_warp_map_invalid_parameters():
+    assert_raises(ValueError, WarpMap, SimilarityTransform(), (5, 5),
+                  order=4)
+    assert_raises(ValueError, WarpMap, SimilarityTransform(), (5, 5),
+                  mode='foo')
+
+
 def test_rotate():
     x = np.zeros((5, 5), dtype=np.double)
     x[1, 1] = 1
@@ -181,6 +256,61 @@ def test_resize3d_bilinear():
     assert_array_almost_equal(resized, ref)
 
 
+def test_resize_matches_warp():
+    np.random.seed(0)
+    x = np.random.rand(37, 41, 3)
+    for order in (0, 1):
+        for mode in ('constant', 'reflect', 'wrap', 'nearest'):
+            for shape in ((50, 23), (74, 82), (12, 13)):
+                row_scale = 37. / shape[0]
+                col_scale = 41. / shape[1]
+                matrix = np.array([[col_scale, 0, 0.5 * col_scale - 0.5],
+                                   [0, row_scale, 0.5 * row_scale - 0.5],
+                                   [0, 0, 1]])
+                ref = warp(x, matrix, output_shape=shape, order=order,
+                           mode=mode, cval=0.3)
+                resized = resize(x, shape, order=order, mode=mode, cval=0.3,
+                                 n_jobs=2)
+                assert_array_almost_equal(resized, ref)
+
+
+def test_resize_integer_factors():
+    x = np.arange(36, dtype=np.double).reshape(6, 6) / 36
+    assert_array_equal(resize(x, (6, 6), order=1), x)
+    assert_array_equal(resize(x, (12, 6), order=0), np.repeat(x, 2, axis=0))
+    assert_array_equal(resize(x, (6, 2), order=0), x[:, 1::3])
+    assert_array_almost_equal(resize(x, (3, 3), order=0, anti_aliasing=True),
+                              x.reshape(3, 2, 3, 2).mean(axis=3).mean(axis=1))
+
+
+def test_resize_anti_aliasing():
+    x = np.zeros((20, 20))
+    x[::2, ::2] = 1
+    x[1::2, 1::2] = 1
+    for order in range(4):
+        resized = resize(x, (10, 7), order=order, anti_aliasing=True,
+                         mode='reflect')
+        assert_array_almost_equal(resized[1:-1, 1:-1], 0.5, decimal=1)
+    assert_array_almost_equal(resize(x, (10, 10), order=0,
+                                     anti_aliasing=True), 0.5)
+
+
+def test_resize_anti_aliasing_constant():
+    # values outside of the image do not leak into the smoothed borders
+    x = np.ones((40, 40))
+    for order in range(4):
+        for shape in [(5, 5), (13, 7)]:
+            assert_array_almost_equal(resize(x, shape, order=order,
+                                             anti_aliasing=True), 1)
+
+
+def test_resize_float32():
+    x = np.random.rand(10, 10).astype(np.float32)
+    resized = resize(x, (7, 15))
+    assert resized.dtype == np.float32
+    assert_array_almost_equal(resized, resize(x.astype(np.double), (7, 15)))
+
+
 def test_swirl():
     image = img_as_float(data.checkerboard())
 